@@ -2,7 +2,9 @@
 import alu_pkg::*;
 
 module alu #(
-    parameter integer N = 16
+    parameter integer N = 16,
+    // 0: operações da extensão M feitas fora da ALU (mul_div_unit)
+    parameter integer MULDIV = 1
 ) (
     input  logic [N-1:0] A,
     input  logic [N-1:0] B,
@@ -77,13 +79,19 @@ module alu #(
   assign _and = A & B;
 
   // operações da extensão M
-  assign {_mulhu, _mul} = A * B;
-  assign {_mulhsu, _mulhsu_aux} = $signed(A) * B;
-  assign {_mulh, _mulh_aux} = $signed(A) * $signed(B);
-  assign _div = $signed(A) / $signed(B);
-  assign _divu = A / B;
-  assign _rem = $signed(A) % $signed(B);
-  assign _remu = A % B;
+  generate
+    if (MULDIV != 0) begin : gen_muldiv
+      assign {_mulhu, _mul} = A * B;
+      assign {_mulhsu, _mulhsu_aux} = $signed(A) * B;
+      assign {_mulh, _mulh_aux} = $signed(A) * $signed(B);
+      assign _div = $signed(A) / $signed(B);
+      assign _divu = A / B;
+      assign _rem = $signed(A) % $signed(B);
+      assign _remu = A % B;
+    end else begin : gen_no_muldiv
+      assign {_mulhu, _mul, _mulhsu, _mulh, _div, _divu, _rem, _remu} = '0;
+    end
+  endgenerate
 
   // multiplexador de saída da ALU
   gen_mux #(
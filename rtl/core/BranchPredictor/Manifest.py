@@ -0,0 +1,9 @@
+files = [
+    "branch_predictor.sv"
+]
+
+modules = {
+    "local": [
+        "../BranchDecoderUnit"
+    ],
+}
@@ -0,0 +1,99 @@
+
+import branch_decoder_unit_pkg::*;
+
+module branch_predictor #(
+    parameter integer ADDR_SIZE = 32,
+    // Entradas do BTB (potência de 2); 0 desliga a predição (sempre PC + 4)
+    parameter integer BTB_ENTRIES = 16,
+    // Contadores de 2 bits da BHT (potência de 2)
+    parameter integer BHT_ENTRIES = 64,
+    // Bits de histórico global: 0 = bimodal, > 0 = gshare
+    parameter integer HISTORY_SIZE = 0
+) (
+    /* Sinais do sistema */
+    input logic clock,
+    input logic reset,
+    /* //// */
+
+    /* Predição (IF) */
+    input  logic [ADDR_SIZE-1:0] pc,
+    input  logic fetch_en,  // A instrução em IF passa para ID
+    output logic predicted_taken,
+    output logic [ADDR_SIZE-1:0] predicted_target,
+    /* //// */
+
+    /* Resolução do desvio em ID */
+    input logic update_en,
+    input branch_t branch_type,
+    input logic taken,
+    input logic [ADDR_SIZE-1:0] update_pc,
+    input logic [ADDR_SIZE-1:0] target
+    /* //// */
+);
+
+  generate
+    if (BTB_ENTRIES == 0) begin : gen_no_prediction
+      assign predicted_taken = 1'b0;
+      assign predicted_target = '0;
+    end else begin : gen_prediction
+      /* Quantidade de bits para cada campo */
+      localparam integer BtbIndex = BTB_ENTRIES == 1 ? 1 : $clog2(BTB_ENTRIES);
+      localparam integer BhtIndex = BHT_ENTRIES == 1 ? 1 : $clog2(BHT_ENTRIES);
+      localparam integer Tag = ADDR_SIZE - 2 - BtbIndex;
+      localparam integer History = HISTORY_SIZE == 0 ? 1 : HISTORY_SIZE;
+
+      logic [BTB_ENTRIES-1:0] btb_valid, btb_cond;
+      logic [BTB_ENTRIES-1:0] [Tag-1:0] btb_tag;
+      logic [BTB_ENTRIES-1:0] [ADDR_SIZE-1:0] btb_target;
+      logic [BHT_ENTRIES-1:0] [1:0] bht;
+      logic [History-1:0] history;
+
+      logic [BtbIndex-1:0] btb_index_if, btb_index_id;
+      logic [BhtIndex-1:0] bht_index_if, bht_index_id;
+      logic btb_hit_if;
+
+      /* Predição: acerto no BTB e, para desvios condicionais, contador em taken */
+      assign btb_index_if = pc[2+:BtbIndex];
+      assign bht_index_if = HISTORY_SIZE == 0 ? pc[2+:BhtIndex] :
+                            pc[2+:BhtIndex] ^ BhtIndex'(history);
+      assign btb_hit_if = btb_valid[btb_index_if] &&
+                          (btb_tag[btb_index_if] == pc[ADDR_SIZE-1-:Tag]);
+      assign predicted_taken = btb_hit_if && (!btb_cond[btb_index_if] || bht[bht_index_if][1]);
+      assign predicted_target = btb_target[btb_index_if];
+
+      /* O índice da BHT usado na predição acompanha a instrução até ID, para que
+      * o contador atualizado seja o mesmo que foi consultado */
+      always_ff @(posedge clock iff fetch_en or posedge reset) begin
+        if (reset) bht_index_id <= '0;
+        else bht_index_id <= bht_index_if;
+      end
+
+      assign btb_index_id = update_pc[2+:BtbIndex];
+
+      always_ff @(posedge clock or posedge reset) begin
+        if (reset) begin
+          btb_valid <= '0;
+          btb_cond <= '0;
+          btb_tag <= '0;
+          btb_target <= '0;
+          bht <= {BHT_ENTRIES{2'b01}};  // Fracamente não tomado
+          history <= '0;
+        end else if (update_en) begin
+          if (branch_type == CondBranch) begin
+            if (taken && bht[bht_index_id] != 2'b11) bht[bht_index_id] <= bht[bht_index_id] + 1;
+            else if (!taken && bht[bht_index_id] != 2'b00)
+              bht[bht_index_id] <= bht[bht_index_id] - 1;
+            history <= History'({history, taken});
+          end
+          if (branch_type != NoBranch && taken) begin
+            btb_valid[btb_index_id] <= 1'b1;
+            btb_cond[btb_index_id] <= branch_type == CondBranch;
+            btb_tag[btb_index_id] <= update_pc[ADDR_SIZE-1-:Tag];
+            btb_target[btb_index_id] <= target;
+          end
+        end
+      end
+    end
+  endgenerate
+
+endmodule
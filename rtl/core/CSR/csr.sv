@@ -2,6 +2,7 @@
 // Note: Never writes in CSR if a trap happened
 
 import csr_pkg::*;
+import instruction_pkg::*;
 
 module csr #(
     parameter integer DATA_SIZE = 64
@@ -20,6 +21,7 @@ module csr #(
     input logic [31:0] instruction,
     input logic [63:0] mtime,
     input logic [63:0] mtimecmp,
+    input logic [HpmCounters+2:3] hpm_events,
     output logic [DATA_SIZE-1:0] rd_data,
     output logic [DATA_SIZE-1:0] mepc,
     output logic [DATA_SIZE-1:0] sepc,
@@ -63,6 +65,12 @@ module csr #(
       mtval,
       stval;
 
+  // Counters
+  logic [63:0] mcycle, minstret;
+  logic [63:0] mhpmcounter[HpmCounters+2:3];
+  logic [HpmCounters+2:0] mcountinhibit;
+  logic retired;
+
   // MCAUSE Au
   // Exception Code
   logic [DATA_SIZE-1:0] cause, cause_async, cause_sync;
@@ -89,12 +97,24 @@ module csr #(
     end
   endfunction
 
+  // Writes of the 64-bit counters (RV32: low or high half)
+  function automatic logic [63:0] write_counter(input logic [63:0] counter, input logic high);
+    logic [63:0] data;
+    begin
+      data = 64'(wr_data);
+      if (DATA_SIZE == 64) return data;
+      return high ? {data[31:0], counter[31:0]} : {counter[63:32], data[31:0]};
+    end
+  endfunction
+
   // Logic
 
   // Control Logic (Mask Inputs)
   assign mret_  = (csr_op == CsrMret) & en & !_trap;
   assign sret_  = (csr_op == CsrSret) & en & !_trap;
-  assign wr_en_ = (csr_op inside {CsrRW, CsrRS, CsrRC}) & en & !_trap;
+  // CSRRS/CSRRC with rs1 = x0 (or uimm = 0) don't write
+  assign wr_en_ = ((csr_op == CsrRW) || (csr_op inside {CsrRS, CsrRC} && |instruction[19:15])) &
+                  en & !_trap;
 
   // Exceptions
   assign illegal_instruction = (csr_op == CsrIllegalInstruction) ||
@@ -104,17 +124,19 @@ module csr #(
   // XSTATUS
   logic sie, mie, spie, mpie, spp;
   privilege_mode_t mpp;
-  assign mstatus = '{
-          SIE: sie,
-          MIE: mie,
-          SPIE: spie,
-          MPIE: mpie,
-          SPP: spp,
-          MPP + 1: mpp[1],
-          MPP: mpp,
-          default: 0
-      };
-  assign sstatus = '{SIE: sie, SPIE: spie, SPP: spp, default: 0};
+  always_comb begin
+    mstatus = '0;
+    mstatus[SIE] = sie;
+    mstatus[MIE] = mie;
+    mstatus[SPIE] = spie;
+    mstatus[MPIE] = mpie;
+    mstatus[SPP] = spp;
+    mstatus[MPP+:2] = mpp;
+    sstatus = '0;
+    sstatus[SIE] = sie;
+    sstatus[SPIE] = spie;
+    sstatus[SPP] = spp;
+  end
   always_ff @(posedge clock, posedge reset) begin
     if (reset) begin
       {mie, mpie} <= 0;
@@ -342,6 +364,48 @@ module csr #(
     else if (wr_en_ && (wr_addr == Stval)) stval <= wr_data;
   end
 
+  // MCOUNTINHIBIT: CY, IR and HPM3+
+  always_ff @(posedge clock, posedge reset) begin
+    if (reset) mcountinhibit <= 0;
+    else if (wr_en_ && (wr_addr == Mcountinhibit))
+      mcountinhibit <= {wr_data[HpmCounters+2:2], 1'b0, wr_data[0]};
+  end
+
+  // MCYCLE
+  always_ff @(posedge clock, posedge reset) begin
+    if (reset) mcycle <= 0;
+    else if (wr_en_ && (wr_addr == Mcycle)) mcycle <= write_counter(mcycle, 1'b0);
+    else if (wr_en_ && DATA_SIZE == 32 && (wr_addr == Mcycleh))
+      mcycle <= write_counter(mcycle, 1'b1);
+    else if (!mcountinhibit[0]) mcycle <= mcycle + 1;
+  end
+
+  // MINSTRET
+  // Instructions leaving WB without a trap (bubbles aren't counted)
+  assign retired = en && !_trap && !(instruction inside {0, {25'b0, Fence}});
+  always_ff @(posedge clock, posedge reset) begin
+    if (reset) minstret <= 0;
+    else if (wr_en_ && (wr_addr == Minstret)) minstret <= write_counter(minstret, 1'b0);
+    else if (wr_en_ && DATA_SIZE == 32 && (wr_addr == Minstreth))
+      minstret <= write_counter(minstret, 1'b1);
+    else if (retired && !mcountinhibit[2]) minstret <= minstret + 1;
+  end
+
+  // MHPMCOUNTER3+
+  genvar j;
+  generate
+    for (j = 3; j < HpmCounters + 3; j = j + 1) begin : gen_mhpmcounter
+      always_ff @(posedge clock, posedge reset) begin
+        if (reset) mhpmcounter[j] <= 0;
+        else if (wr_en_ && (wr_addr == Mhpmcounter3 + j - 3))
+          mhpmcounter[j] <= write_counter(mhpmcounter[j], 1'b0);
+        else if (wr_en_ && DATA_SIZE == 32 && (wr_addr == Mhpmcounter3h + j - 3))
+          mhpmcounter[j] <= write_counter(mhpmcounter[j], 1'b1);
+        else if (hpm_events[j] && !mcountinhibit[j]) mhpmcounter[j] <= mhpmcounter[j] + 1;
+      end
+    end
+  endgenerate
+
   // PRIV
   assign privilege_mode = priv;
   always @(posedge clock, posedge reset) begin
@@ -379,14 +443,28 @@ module csr #(
       Marchid: rd_data = marchid;
       Mimpid: rd_data = mimpid;
       Mhartid: rd_data = mhartid;
+      Mcountinhibit: rd_data = DATA_SIZE'(mcountinhibit);
+      Mcycle: rd_data = mcycle[DATA_SIZE-1:0];
+      Minstret: rd_data = minstret[DATA_SIZE-1:0];
+      Mcycleh: rd_data = DATA_SIZE'(mcycle >> 32);
+      Minstreth: rd_data = DATA_SIZE'(minstret >> 32);
       default: rd_data = 0;
     endcase
+    for (int k = 3; k < HpmCounters + 3; k++) begin
+      if (rd_addr == Mhpmevent3 + k - 3) rd_data = k;
+      if (rd_addr == Mhpmcounter3 + k - 3) rd_data = mhpmcounter[k][DATA_SIZE-1:0];
+      if (rd_addr == Mhpmcounter3h + k - 3) rd_data = DATA_SIZE'(mhpmcounter[k] >> 32);
+    end
   end
 
   assign addr_exception = !(wr_addr inside {Sstatus, Sie, Stvec, Sscratch, Sepc, Scause, Stval, Sip,
                                             Mstatus, Misa, Medeleg, Mideleg, Mie, Mtvec, Mscratch,
                                             Mepc, Mcause, Mtval, Mip, Mvendorid, Marchid, Mimpid,
-                                            Mhartid});
+                                            Mhartid, Mcountinhibit, Mcycle, Minstret,
+                                            [Mhpmevent3:Mhpmevent3+HpmCounters-1],
+                                            [Mhpmcounter3:Mhpmcounter3+HpmCounters-1]}) &&
+                          !(DATA_SIZE == 32 && wr_addr inside {Mcycleh, Minstreth,
+                                            [Mhpmcounter3h:Mhpmcounter3h+HpmCounters-1]});
 
   // Trap
   logic [5:0] interrupt_vector;  // If bit i is high, so interrupt 2*i + 1 happened
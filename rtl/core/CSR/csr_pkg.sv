@@ -58,17 +58,41 @@ package csr_pkg;
     Mideleg = 12'h303,
     Mie = 12'h304,
     Mtvec = 12'h305,
+    Mcountinhibit = 12'h320,
+    Mhpmevent3 = 12'h323,
     Mscratch = 12'h340,
     Mepc = 12'h341,
     Mcause = 12'h342,
     Mtval = 12'h343,
     Mip = 12'h344,
+    Mcycle = 12'hB00,
+    Minstret = 12'hB02,
+    Mhpmcounter3 = 12'hB03,
+    Mcycleh = 12'hB80,
+    Minstreth = 12'hB82,
+    Mhpmcounter3h = 12'hB83,
     Mvendorid = 12'hF11,
     Marchid = 12'hF12,
     Mimpid = 12'hF13,
     Mhartid = 12'hF14
   } csr_addr_t;
 
+  // Events counted by mhpmcounter3 to mhpmcounter12 (mhpmeventN is hardwired to N)
+  typedef enum logic [4:0] {
+    HpmDataHazardStall = 5'd3,  // IF/ID stalled by a data hazard
+    HpmBranchMispredict = 5'd4,  // IF/ID flushed by a mispredicted branch/jump
+    HpmTrapFlush = 5'd5,  // Pipeline flushed by a trap or xRET
+    HpmMemoryStall = 5'd6,  // Pipeline waiting for the memory unit
+    HpmForwarding = 5'd7,  // Operands forwarded in ID/EX
+    HpmInstCacheMiss = 5'd8,
+    HpmDataCacheMiss = 5'd9,
+    HpmDataCacheWriteBack = 5'd10,
+    HpmBranch = 5'd11,  // Branches and jumps resolved in ID
+    HpmMulDivStall = 5'd12  // EX stalled by a multi-cycle mul/div
+  } hpm_event_t;
+
+  localparam integer HpmCounters = 10;
+
   function automatic privilege_mode_t gen_random_privilege_mode();
     unique case($urandom()%3)
       0: return User;
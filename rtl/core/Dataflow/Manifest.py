@@ -6,9 +6,11 @@ files = [
 modules = {
     "local": [
         "../Adder",
+        "../BranchPredictor",
         "../CSR",
         "../ControlUnit",
         "../ImmediateExtender",
+        "../MulDivUnit",
         "../RegisterFile",
         "../ALU",
         "../../../utils/components"
@@ -8,7 +8,14 @@ import forwarding_unit_pkg::*;
 import control_unit_pkg::*;
 
 module dataflow #(
-    parameter integer DATA_SIZE = 32
+    parameter integer DATA_SIZE = 32,
+    // Preditor de desvios (ver branch_predictor.sv); BTB_ENTRIES = 0 o desliga
+    parameter integer BTB_ENTRIES = 16,
+    parameter integer BHT_ENTRIES = 64,
+    parameter integer HISTORY_SIZE = 0,
+    // Latências da extensão M (ver mul_div_unit.sv); 0 = combinacional
+    parameter integer MUL_LATENCY = 2,
+    parameter integer DIV_RADIX = 4
 ) (
     // Common
     input wire clock,
@@ -51,6 +58,10 @@ module dataflow #(
     input wire [DATA_SIZE-1:0] msip,
     input wire [63:0] mtime,
     input wire [63:0] mtimecmp,
+    // Performance counter events from the caches
+    input logic inst_cache_miss,
+    input logic data_cache_miss,
+    input logic data_cache_write_back,
     // To Control Unit
     output opcode_t opcode,
     output wire [2:0] funct3,
@@ -108,7 +119,8 @@ module dataflow #(
     output logic mem_rd_en_ex,
     output logic mem_rd_en_mem,
     output logic rd_complete_ex,
-    output logic store_id
+    output logic store_id,
+    output logic muldiv_busy
 );
 
   // Pipeline registers
@@ -129,6 +141,9 @@ module dataflow #(
   wire             [DATA_SIZE-1:0] aluA;
   wire             [DATA_SIZE-1:0] aluB;
   wire             [DATA_SIZE-1:0] aluY;
+  wire             [DATA_SIZE-1:0] alu_out;
+  wire             [DATA_SIZE-1:0] muldiv_out;
+  wire                             muldiv_op;
   wire             [DATA_SIZE-1:0] muxaluY_out;  // aluY or sign_extended(aluY[31:0])
   // Somador PC + 4
   wire             [DATA_SIZE-1:0] pc_plus_4;
@@ -154,6 +169,14 @@ module dataflow #(
   logic            [DATA_SIZE-1:0] csr_wr_data;
   // Branch Decoder Unit
   pc_src_t                         _pc_src;
+  // Branch Predictor
+  logic                            predicted_taken;
+  wire             [DATA_SIZE-1:0] predicted_target;
+  wire             [DATA_SIZE-1:0] predicted_pc;
+  wire             [DATA_SIZE-1:0] branch_target;
+  wire                             mispredict;
+  // Performance counters
+  logic            [HpmCounters+2:3] hpm_events;
 
   // IF stage
   always_ff @(posedge clock iff (~stall_id && ~mem_busy) or posedge reset) begin
@@ -163,6 +186,7 @@ module dataflow #(
     end else begin
       if_id_reg.pc <= pc;
       if_id_reg.pc_plus_4 <= pc_plus_4;
+      if_id_reg.predicted_pc <= predicted_pc;
       if_id_reg.inst <= inst;
     end
   end
@@ -176,20 +200,32 @@ module dataflow #(
       .c_out(),
       .S(pc_plus_4)
   );
+  // Preditor de desvios: o próximo PC é previsto em IF e corrigido em ID
+  branch_predictor #(
+      .ADDR_SIZE(DATA_SIZE),
+      .BTB_ENTRIES(BTB_ENTRIES),
+      .BHT_ENTRIES(BHT_ENTRIES),
+      .HISTORY_SIZE(HISTORY_SIZE)
+  ) branch_predictor_inst (
+      .clock,
+      .reset,
+      .pc,
+      .fetch_en(~stall_if && ~mem_busy),
+      .predicted_taken,
+      .predicted_target,
+      .update_en(~stall_id && ~mem_busy),
+      .branch_type,
+      .taken(_pc_src == PcOrReadDataPlusImm),
+      .update_pc(if_id_reg.pc),
+      .target(pc_plus_immediate)
+  );
+  assign predicted_pc = predicted_taken ? predicted_target : pc_plus_4;
   always_comb begin
     if(_trap) new_pc = trap_addr;
     else if(mem_wb_reg.csr_op == CsrMret) new_pc = mepc;
     else if(mem_wb_reg.csr_op == CsrSret) new_pc = sepc;
-    else begin
-      unique case (_pc_src)
-        PcOrReadDataPlusImm: begin
-          new_pc = pc_plus_immediate;
-        end
-        default: begin // PcPlus4
-          new_pc = pc_plus_4;
-        end
-      endcase
-    end
+    else if(mispredict) new_pc = branch_target;
+    else new_pc = predicted_pc;
   end
   register_d #(
       .N(DATA_SIZE),
@@ -338,6 +374,7 @@ module dataflow #(
       .msip(|msip),
       .mtime(mtime),
       .mtimecmp(mtimecmp),
+      .hpm_events(hpm_events),
       .trap_addr(trap_addr),
       .trap(_trap),
       .exception(exception),
@@ -366,7 +403,12 @@ module dataflow #(
       .read_data_2(forwarded_rs2_id),
       .pc_src(_pc_src)
   );
-  assign pc_src = _pc_src;
+  // A predição feita em IF é comparada com o desvio resolvido
+  assign branch_target = (_pc_src == PcOrReadDataPlusImm) ? pc_plus_immediate :
+                         if_id_reg.pc_plus_4;
+  assign mispredict = branch_target != if_id_reg.predicted_pc;
+  // Hazard Unit: IF/ID is only flushed when the next PC was mispredicted
+  assign pc_src = mispredict ? PcOrReadDataPlusImm : PcPlus4;
   // ID stage
 
 
@@ -483,17 +525,37 @@ endgenerate
   assign muxaluY_out[31:0] = aluY[31:0];
 
   alu #(
-      .N(DATA_SIZE)
+      .N(DATA_SIZE),
+      .MULDIV(0)
   ) alu (
       .A(aluA),
       .B(aluB),
       .alu_op(id_ex_reg.alu_op),
-      .Y(aluY),
+      .Y(alu_out),
       .zero(),
       .negative(),
       .carry_out(),
       .overflow()
   );
+  // Extensão M: para EX (via Hazard Unit) enquanto o resultado não fica pronto
+  assign muldiv_op = id_ex_reg.alu_op inside {Mul, MulHigh, MulHighSignedUnsigned,
+                                              MulHighUnsigned, Div, DivUnsigned, Rem, RemUnsigned};
+  mul_div_unit #(
+      .N(DATA_SIZE),
+      .MUL_LATENCY(MUL_LATENCY),
+      .DIV_RADIX(DIV_RADIX)
+  ) mul_div_unit_inst (
+      .clock,
+      .reset,
+      .en(muldiv_op),
+      .advance(~stall_ex && ~mem_busy),
+      .A(aluA),
+      .B(aluB),
+      .alu_op(id_ex_reg.alu_op),
+      .Y(muldiv_out),
+      .busy(muldiv_busy)
+  );
+  assign aluY = muldiv_op ? muldiv_out : alu_out;
   // EX stage
 
 
@@ -590,4 +652,22 @@ endgenerate
   assign mem_rd_en_mem = ex_mem_reg.mem_read_enable;
   assign store_id = mem_wr_en;
 
+  // Performance counter events
+  always_comb begin : hpm_events_logic
+    hpm_events = '0;
+    hpm_events[HpmDataHazardStall] = stall_id && !muldiv_busy && !mem_busy;
+    hpm_events[HpmBranchMispredict] = mispredict && !stall_id && !mem_busy;
+    hpm_events[HpmTrapFlush] = (flush_all || interrupt) && !mem_busy;
+    hpm_events[HpmMemoryStall] = mem_busy;
+    hpm_events[HpmForwarding] = !mem_busy &&
+        ((!stall_id && (forward_rs1_id != NoForwarding || forward_rs2_id != NoForwarding)) ||
+        forward_rs1_ex != NoForwarding || forward_rs2_ex != NoForwarding ||
+        forward_rs2_mem != NoForwarding);
+    hpm_events[HpmInstCacheMiss] = inst_cache_miss;
+    hpm_events[HpmDataCacheMiss] = data_cache_miss;
+    hpm_events[HpmDataCacheWriteBack] = data_cache_write_back;
+    hpm_events[HpmBranch] = (branch_type != NoBranch) && !stall_id && !mem_busy;
+    hpm_events[HpmMulDivStall] = muldiv_busy && !mem_busy;
+  end : hpm_events_logic
+
 endmodule
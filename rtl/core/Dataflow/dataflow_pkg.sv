@@ -17,6 +17,7 @@ package dataflow_pkg;
   typedef struct packed {
     logic [DataSize-1:0] pc;
     logic [DataSize-1:0] pc_plus_4;
+    logic [DataSize-1:0] predicted_pc;
     instruction_t inst;
   } if_id_t;
 
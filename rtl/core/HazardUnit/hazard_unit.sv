@@ -17,6 +17,7 @@ module hazard_unit (
     input logic mem_rd_en_mem,
     input logic rd_complete_ex,
     input logic store_id,
+    input logic muldiv_busy,
     output logic stall_if,
     output logic stall_id,
     output logic stall_ex,
@@ -32,8 +33,12 @@ module hazard_unit (
 
   logic flush_id_pc;
   logic flush_ex_type;
+  logic ex_busy;
 
   assign flush_id_pc = (pc_src != PcPlus4);
+  // Mul/div de vários ciclos em EX: IF, ID e EX parados e bolha em MEM
+  // (um trap descarta a instrução; uma interrupção ainda desvia o PC)
+  assign ex_busy = muldiv_busy && !flush_all;
 
   always_comb begin : flushes_and_stalls_proc
     stall_if_type = 1'b0;
@@ -72,12 +77,12 @@ module hazard_unit (
 
   assign flush_id = flush_id_pc | flush_all | interrupt;
   assign flush_ex = flush_ex_type | flush_all;
-  assign flush_mem = flush_all;
+  assign flush_mem = flush_all | ex_busy;
   assign flush_wb = flush_all;
 
-  assign stall_if = stall_if_type;
-  assign stall_id = stall_id_type;
-  assign stall_ex = interrupt;
+  assign stall_if = stall_if_type | (ex_busy & ~interrupt);
+  assign stall_id = stall_id_type | (ex_busy & ~interrupt);
+  assign stall_ex = interrupt | ex_busy;
   assign stall_mem = interrupt;
   assign stall_wb = interrupt;
 
@@ -0,0 +1,9 @@
+files = [
+    "mul_div_unit.sv"
+]
+
+modules = {
+    "local": [
+        "../ALU"
+    ],
+}
@@ -0,0 +1,178 @@
+
+import alu_pkg::*;
+
+module mul_div_unit #(
+    parameter integer N = 32,
+    // Ciclos de EX ocupados pela multiplicação: registrador dos operandos mais
+    // MUL_LATENCY-1 registradores do produto (DSP); 0 = combinacional
+    parameter integer MUL_LATENCY = 2,
+    // Divisão iterativa com log2(DIV_RADIX) bits do quociente por ciclo
+    // (ceil(N/log2(DIV_RADIX)) + 1 ciclos, DIV_RADIX potência de 2); 0 = combinacional
+    parameter integer DIV_RADIX = 4
+) (
+    /* Sinais do sistema */
+    input logic clock,
+    input logic reset,
+    /* //// */
+
+    /* Estágio EX */
+    input logic en,  // Instrução da extensão M em EX
+    input logic advance,  // O registrador ID/EX é escrito: a instrução deixa EX
+    input logic [N-1:0] A,
+    input logic [N-1:0] B,
+    input alu_op_t alu_op,
+    output logic [N-1:0] Y,
+    output logic busy  // EX deve ser parado pela Hazard Unit
+    /* //// */
+);
+
+  localparam integer DivBits = DIV_RADIX <= 2 ? 1 : $clog2(DIV_RADIX);
+  localparam integer DivSteps = (N + DivBits - 1) / DivBits;
+  // O dividendo é estendido com zeros até DivSteps*DivBits bits: os passos
+  // extras só calculam os bits mais significativos (zero) do quociente
+  localparam integer DivWidth = DivSteps * DivBits;
+  localparam integer DivCycles = DivSteps + 1;
+  localparam integer Cycles = MUL_LATENCY > DivCycles ? MUL_LATENCY : DivCycles;
+  localparam integer Count = Cycles <= 2 ? 1 : $clog2(Cycles);
+  localparam integer MulStages = MUL_LATENCY <= 1 ? 1 : MUL_LATENCY - 1;
+
+  if (DIV_RADIX != 0 && (DIV_RADIX < 2 || (DIV_RADIX & (DIV_RADIX - 1)) != 0))
+  begin : gen_radix_check
+    $error("mul_div_unit: DIV_RADIX (%0d) must be 0 or a power of 2", DIV_RADIX);
+  end
+
+  logic is_div, multi_cycle, start, overflow;
+  logic running, done;
+  logic [Count-1:0] count;
+  logic [N-1:0] comb_y, mul_y, div_y;
+
+  assign is_div = alu_op inside {Div, DivUnsigned, Rem, RemUnsigned};
+  assign multi_cycle = is_div ? DIV_RADIX != 0 : MUL_LATENCY != 0;
+  assign start = en && multi_cycle && !running && !done && !advance;
+
+  // Controle: a instrução fica em EX até o resultado estar pronto
+  always_ff @(posedge clock or posedge reset) begin
+    if (reset) begin
+      running <= 1'b0;
+      done <= 1'b0;
+      count <= '0;
+    end else if (advance) begin
+      running <= 1'b0;
+      done <= 1'b0;
+    end else if (start) begin
+      if ((is_div ? DivCycles : MUL_LATENCY) == 1) begin
+        done <= 1'b1;
+      end else begin
+        running <= 1'b1;
+        count <= Count'((is_div ? DivCycles : MUL_LATENCY) - 2);
+      end
+    end else if (running) begin
+      if (count == 0) begin
+        running <= 1'b0;
+        done <= 1'b1;
+      end else begin
+        count <= count - 1;
+      end
+    end
+  end
+
+  assign busy = en && multi_cycle && !done;
+
+  // Operações combinacionais (como na ALU)
+  assign overflow = A == {1'b1, {N - 1{1'b0}}} && B == '1;
+
+  always_comb begin
+    unique case (alu_op)
+      MulHigh: comb_y = N'(($signed({{N{A[N-1]}}, A}) * $signed({{N{B[N-1]}}, B})) >> N);
+      MulHighSignedUnsigned: comb_y = N'(($signed({{N{A[N-1]}}, A}) * {{N{1'b0}}, B}) >> N);
+      MulHighUnsigned: comb_y = N'(({{N{1'b0}}, A} * {{N{1'b0}}, B}) >> N);
+      // Divisão por zero e overflow (MIN/-1) com os resultados da especificação
+      Div: comb_y = B == '0 ? '1 : overflow ? A : N'($signed(A) / $signed(B));
+      DivUnsigned: comb_y = B == '0 ? '1 : A / B;
+      Rem: comb_y = B == '0 ? A : overflow ? '0 : N'($signed(A) % $signed(B));
+      RemUnsigned: comb_y = B == '0 ? A : A % B;
+      default: comb_y = A * B;  // Mul
+    endcase
+  end
+
+  // Multiplicador com registradores na entrada e MUL_LATENCY-1 na saída
+  generate
+    if (MUL_LATENCY != 0) begin : gen_mul_pipeline
+      logic signed [N:0] mul_a, mul_b;
+      logic [2*N+1:0] product[MulStages];
+      alu_op_t mul_op;
+
+      always_ff @(posedge clock) begin
+        if (start && !is_div) begin
+          mul_a <= {alu_op inside {MulHigh, MulHighSignedUnsigned} & A[N-1], A};
+          mul_b <= {alu_op == MulHigh & B[N-1], B};
+          mul_op <= alu_op;
+        end
+      end
+
+      if (MUL_LATENCY == 1) begin : gen_mul_comb_product
+        assign product[0] = mul_a * mul_b;
+      end else begin : gen_mul_reg_product
+        always_ff @(posedge clock) begin
+          product[0] <= mul_a * mul_b;
+          for (int i = 1; i < MulStages; i++) product[i] <= product[i-1];
+        end
+      end
+
+      assign mul_y = mul_op == Mul ? product[MulStages-1][N-1:0] :
+                                     product[MulStages-1][2*N-1:N];
+    end else begin : gen_no_mul_pipeline
+      assign mul_y = '0;
+    end
+  endgenerate
+
+  // Divisor iterativo (restoring), DivBits bits do quociente por ciclo
+  generate
+    if (DIV_RADIX != 0) begin : gen_div_iterative
+      logic [DivWidth-1:0] quotient, next_quotient;
+      logic [N-1:0] dividend, remainder, divisor, next_remainder;
+      logic negative_quotient, negative_remainder, divisor_zero, remainder_op;
+      logic [N-1:0] div_result;
+      logic [N:0] shifted, difference;
+
+      assign dividend = alu_op inside {Div, Rem} && A[N-1] ? -A : A;
+
+      always_comb begin : div_step_proc
+        next_quotient = quotient;
+        next_remainder = remainder;
+        for (int i = 0; i < DivBits; i++) begin
+          shifted = {next_remainder, next_quotient[DivWidth-1]};
+          difference = shifted - {1'b0, divisor};
+          next_quotient = {next_quotient[DivWidth-2:0], !difference[N]};
+          next_remainder = difference[N] ? shifted[N-1:0] : difference[N-1:0];
+        end
+      end : div_step_proc
+
+      always_ff @(posedge clock) begin
+        if (start && is_div) begin
+          // Divide os módulos e corrige os sinais no final
+          quotient <= DivWidth'(dividend);
+          divisor <= alu_op inside {Div, Rem} && B[N-1] ? -B : B;
+          remainder <= '0;
+          negative_quotient <= alu_op inside {Div, Rem} && (A[N-1] ^ B[N-1]);
+          negative_remainder <= alu_op inside {Div, Rem} && A[N-1];
+          divisor_zero <= B == '0;
+          remainder_op <= alu_op inside {Rem, RemUnsigned};
+        end else if (running) begin
+          quotient <= next_quotient;
+          remainder <= next_remainder;
+        end
+      end
+
+      // Divisão por zero: quociente -1 e resto igual ao dividendo
+      assign div_result = remainder_op ? remainder : (divisor_zero ? '1 : quotient[N-1:0]);
+      assign div_y = (remainder_op ? negative_remainder : negative_quotient && !divisor_zero) ?
+                     -div_result : div_result;
+    end else begin : gen_no_div_iterative
+      assign div_y = '0;
+    end
+  endgenerate
+
+  assign Y = !multi_cycle ? comb_y : (is_div ? div_y : mul_y);
+
+endmodule
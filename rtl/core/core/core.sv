@@ -1,6 +1,13 @@
 
 module core #(
-    parameter integer DATA_SIZE = 32
+    parameter integer DATA_SIZE = 32,
+    // Branch predictor (BTB_ENTRIES = 0 disables it, HISTORY_SIZE > 0 selects gshare)
+    parameter integer BTB_ENTRIES = 16,
+    parameter integer BHT_ENTRIES = 64,
+    parameter integer HISTORY_SIZE = 0,
+    // M extension latencies (0: combinational, see mul_div_unit.sv)
+    parameter integer MUL_LATENCY = 2,
+    parameter integer DIV_RADIX = 4
 ) (
     // Common
     input logic clock,
@@ -12,7 +19,11 @@ module core #(
     input logic external_interrupt,
     input logic [DATA_SIZE-1:0] msip,
     input logic [63:0] mtime,
-    input logic [63:0] mtimecmp
+    input logic [63:0] mtimecmp,
+    // Performance counter events from the caches
+    input logic inst_cache_miss,
+    input logic data_cache_miss,
+    input logic data_cache_write_back
 );
 
   ///////////////////////////////////
@@ -122,6 +133,7 @@ module core #(
   logic mem_rd_en_ex;
   logic mem_rd_en_mem;
   logic store_id;
+  logic muldiv_busy;
   // Others
   hazard_t hazard_type;
   rs_used_t rs_used;
@@ -130,7 +142,12 @@ module core #(
   /////////// Dataflow //////////////
   ///////////////////////////////////
   dataflow #(
-    .DATA_SIZE(DATA_SIZE)
+    .DATA_SIZE(DATA_SIZE),
+    .BTB_ENTRIES(BTB_ENTRIES),
+    .BHT_ENTRIES(BHT_ENTRIES),
+    .HISTORY_SIZE(HISTORY_SIZE),
+    .MUL_LATENCY(MUL_LATENCY),
+    .DIV_RADIX(DIV_RADIX)
   ) data_flow (
     .clock,
     .reset,
@@ -165,6 +182,9 @@ module core #(
     .msip,
     .mtime,
     .mtimecmp,
+    .inst_cache_miss,
+    .data_cache_miss,
+    .data_cache_write_back,
     .opcode,
     .funct3,
     .funct7,
@@ -211,7 +231,8 @@ module core #(
     .reg_we_ex,
     .mem_rd_en_ex,
     .mem_rd_en_mem,
-    .store_id
+    .store_id,
+    .muldiv_busy
   );
 
   ///////////////////////////////////
@@ -281,11 +302,15 @@ module core #(
   assign wish_proc0.stb = wish_proc0.cyc;
   assign wish_proc0.we = 1'b0;
   assign wish_proc0.tgd = 1'b0;
+  assign wish_proc0.cti = wishbone_pkg::Classic;
+  assign wish_proc0.bte = wishbone_pkg::LinearBurst;
   assign wish_proc0.addr = inst_mem_addr;
   assign wish_proc0.sel = 4'hF;
   assign wish_proc0.dat_o_p = '0;
   assign wish_proc1.stb = wish_proc1.cyc;
   assign wish_proc1.tgd = signed_en;
+  assign wish_proc1.cti = wishbone_pkg::Classic;
+  assign wish_proc1.bte = wishbone_pkg::LinearBurst;
   assign wish_proc1.addr = data_mem_addr;
   assign wish_proc1.sel = byte_en;
   assign wish_proc1.dat_o_p = wr_data;
@@ -1,25 +1,47 @@
 
 module cache #(
     parameter integer CACHE_SIZE = 16384,
-    parameter integer SET_SIZE = 2
+    parameter integer SET_SIZE = 2,
+    parameter cache_pkg::replacement_policy_t REPLACEMENT_POLICY = cache_pkg::Lru,
+    // 1: write buffer e hit-under-miss para stores (cache de dados)
+    parameter integer NON_BLOCKING = 0,
+    // 1: prefetch do bloco seguinte a cada miss (cache de instruções; ignorado se NON_BLOCKING)
+    parameter integer PREFETCH = 0
 ) (
     wishbone_if.secondary wb_if_ctrl,
-    wishbone_if.primary wb_if_mem
+    wishbone_if.primary wb_if_mem,
+    // Performance counter events
+    output logic miss,
+    output logic write_back,
+    // Access counters
+    output logic [31:0] hit_count,
+    output logic [31:0] miss_count,
+    output logic [31:0] write_back_count,
+    // Blocos do prefetch usados por um miss e descartados sem uso
+    output logic [31:0] prefetch_useful_count,
+    output logic [31:0] prefetch_useless_count
 );
 
-  localparam integer BlockSize = $size(wb_if_mem.dat_i_s);
+  localparam integer BlockSize = $size(wb_if_mem.dat_i_p);
   localparam integer DataSize = $size(wb_if_ctrl.dat_i_s);
   localparam integer AddrSize = $size(wb_if_ctrl.addr);
   localparam integer ByteSize = DataSize/$size(wb_if_ctrl.sel);
   localparam integer SelSize = $size(wb_if_mem.sel);
+  localparam integer Prefetch = NON_BLOCKING ? 0 : PREFETCH;
 
   logic hit, dirty, ctrl_wr_en_d, sample_ctrl_inputs, set_valid, set_tag, set_data, set_dirty,
         random_gen_en;
-  logic mem_rd_en, mem_wr_en, ctrl_rd_en, ctrl_wr_en;
+  logic miss_index_match, use_miss, sample_miss, load_write_buffer;
+  logic next_block_cached, prefetch_match, prefetch_victim_match, start_prefetch, prefetch_rd,
+        load_prefetch, use_prefetch;
+  logic mem_rd_en, mem_wr_en, ctrl_rd_en, ctrl_wr_en, mem_burst, mem_burst_end;
 
   // Assume that both clocks and reset are equal
   cache_control #(
-    .BYTE_NUM(SelSize)
+    .BYTE_NUM(SelSize),
+    .COUNTER_SIZE(32),
+    .NON_BLOCKING(NON_BLOCKING),
+    .PREFETCH(Prefetch)
   ) control (
       .clock(wb_if_ctrl.clock),
       .reset(wb_if_ctrl.reset),
@@ -27,6 +49,8 @@ module cache #(
       .mem_rd_en(mem_rd_en),
       .mem_wr_en(mem_wr_en),
       .mem_sel(wb_if_mem.sel),
+      .mem_burst,
+      .mem_burst_end,
       .ctrl_rd_en(ctrl_rd_en),
       .ctrl_wr_en(ctrl_wr_en),
       .ctrl_ack(wb_if_ctrl.ack),
@@ -38,7 +62,25 @@ module cache #(
       .set_tag,
       .set_data,
       .set_dirty,
-      .random_gen_en
+      .random_gen_en,
+      .miss_index_match,
+      .use_miss,
+      .sample_miss,
+      .load_write_buffer,
+      .next_block_cached,
+      .prefetch_match,
+      .prefetch_victim_match,
+      .start_prefetch,
+      .prefetch_rd,
+      .load_prefetch,
+      .use_prefetch,
+      .miss,
+      .write_back,
+      .hit_count,
+      .miss_count,
+      .write_back_count,
+      .prefetch_useful_count,
+      .prefetch_useless_count
   );
 
   cache_path #(
@@ -47,7 +89,10 @@ module cache #(
       .BLOCK_SIZE(BlockSize),
       .ADDR_SIZE (AddrSize),
       .DATA_SIZE (DataSize),
-      .BYTE_SIZE (ByteSize)
+      .BYTE_SIZE (ByteSize),
+      .REPLACEMENT_POLICY(REPLACEMENT_POLICY),
+      .NON_BLOCKING(NON_BLOCKING),
+      .PREFETCH(Prefetch)
   ) path (
       .clock(wb_if_ctrl.clock),
       .reset(wb_if_ctrl.reset),
@@ -69,7 +114,18 @@ module cache #(
       .set_tag,
       .set_data,
       .set_dirty,
-      .random_gen_en
+      .random_gen_en,
+      .use_miss,
+      .sample_miss,
+      .load_write_buffer,
+      .miss_index_match,
+      .start_prefetch,
+      .prefetch_rd,
+      .load_prefetch,
+      .use_prefetch,
+      .next_block_cached,
+      .prefetch_match,
+      .prefetch_victim_match
   );
 
   always_comb begin
@@ -80,5 +136,9 @@ module cache #(
   assign wb_if_mem.cyc = mem_rd_en | mem_wr_en;
   assign wb_if_mem.stb = mem_rd_en | mem_wr_en;
   assign wb_if_mem.we = mem_wr_en;
+  // A leitura do prefetch segue a do bloco do miss em um burst incremental
+  assign wb_if_mem.cti = mem_burst ? wishbone_pkg::IncrementingBurst :
+                         (mem_burst_end ? wishbone_pkg::EndOfBurst : wishbone_pkg::Classic);
+  assign wb_if_mem.bte = wishbone_pkg::LinearBurst;
 
 endmodule
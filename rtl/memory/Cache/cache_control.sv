@@ -1,6 +1,12 @@
 
 module cache_control #(
-    parameter integer BYTE_NUM = 8
+    parameter integer BYTE_NUM = 8,
+    parameter integer COUNTER_SIZE = 32,
+    // 1: write buffer para o bloco sujo substituído e stores com miss respondidos
+    // imediatamente (hit-under-miss), com o bloco alocado em segundo plano
+    parameter integer NON_BLOCKING = 0,
+    // 1: o bloco seguinte ao de cada miss é lido para um buffer de prefetch (cache bloqueante)
+    parameter integer PREFETCH = 0
 ) (
     /* Sinais do sistema */
     input logic clock,
@@ -12,6 +18,8 @@ module cache_control #(
     output logic mem_rd_en,
     output logic mem_wr_en,
     output logic [BYTE_NUM-1:0] mem_sel,
+    output logic mem_burst,  // A leitura do bloco continua com a do prefetch (burst)
+    output logic mem_burst_end,  // Leitura do prefetch: último beat do burst
     /* //// */
 
     /* Interface com o controlador de memória */
@@ -29,7 +37,28 @@ module cache_control #(
     output logic set_tag,
     output logic set_data,
     output logic set_dirty,
-    output logic random_gen_en
+    output logic random_gen_en,
+    input  logic miss_index_match,  // O pedido acessa o conjunto do miss pendente
+    output logic use_miss,  // O Fluxo de Dados usa o pedido do miss pendente
+    output logic sample_miss,
+    output logic load_write_buffer,
+    input  logic next_block_cached,  // O bloco seguinte ao do pedido já está na cache
+    input  logic prefetch_match,  // O buffer de prefetch contém o bloco do miss
+    input  logic prefetch_victim_match,  // O buffer de prefetch contém o bloco substituído
+    output logic start_prefetch,
+    output logic prefetch_rd,
+    output logic load_prefetch,
+    output logic use_prefetch,
+    /* //// */
+
+    /* Eventos de desempenho */
+    output logic miss,
+    output logic write_back,
+    output logic [COUNTER_SIZE-1:0] hit_count,
+    output logic [COUNTER_SIZE-1:0] miss_count,
+    output logic [COUNTER_SIZE-1:0] write_back_count,
+    output logic [COUNTER_SIZE-1:0] prefetch_useful_count,
+    output logic [COUNTER_SIZE-1:0] prefetch_useless_count
     /* //// */
 
 );
@@ -37,50 +66,96 @@ module cache_control #(
   import cache_pkg::*;
 
   cache_state_t current_state, next_state;
+  memory_state_t memory_state, memory_next_state;
+  logic fill_start, fill_pending, write_buffer_valid, wait_memory;
+  logic hit_set_valid, hit_set_tag, hit_set_data, hit_set_dirty;
+  logic fill_set_valid, fill_set_tag, fill_set_data, fill_set_dirty;
+  logic ctrl_mem_rd_en, ctrl_mem_wr_en, fill_mem_rd_en, drain_mem_wr_en;
+  logic prefetch_valid, prefetch_busy;
 
   always_ff @(posedge clock, posedge reset) begin
     if (reset) current_state <= Idle;
     else current_state <= next_state;
   end
 
+  // Um novo miss espera o fim do miss pendente e o esvaziamento do write buffer
+  assign wait_memory = NON_BLOCKING && (fill_pending || write_buffer_valid);
+
   always_comb begin
-    mem_rd_en = 1'b0;
-    mem_wr_en = 1'b0;
+    ctrl_mem_rd_en = 1'b0;
+    ctrl_mem_wr_en = 1'b0;
     ctrl_ack = 1'b0;
     sample_ctrl_inputs = 1'b0;
-    set_valid = 1'b0;
-    set_tag = 1'b0;
-    set_data = 1'b0;
-    set_dirty = 1'b0;
+    hit_set_valid = 1'b0;
+    hit_set_tag = 1'b0;
+    hit_set_data = 1'b0;
+    hit_set_dirty = 1'b0;
     random_gen_en = 1'b0;
+    sample_miss = 1'b0;
+    load_write_buffer = 1'b0;
+    fill_start = 1'b0;
+    start_prefetch = 1'b0;
+    use_prefetch = 1'b0;
+    mem_burst = 1'b0;
+    miss = 1'b0;
     next_state = Idle;
     unique case (current_state)
       CompareTag: begin
-        if(hit) begin
-          set_valid = 1'b1;
-          set_tag = 1'b1;
-          set_dirty = ctrl_wr_en_d;
-          set_data = ctrl_wr_en_d;
+        if(NON_BLOCKING && (use_miss || (fill_pending && miss_index_match))) begin
+          // O Fluxo de Dados está ocupado com o bloco do miss pendente
+          next_state = CompareTag;
+        end else if(hit) begin
+          hit_set_valid = 1'b1;
+          hit_set_tag = 1'b1;
+          hit_set_dirty = ctrl_wr_en_d;
+          hit_set_data = ctrl_wr_en_d;
           ctrl_ack = 1'b1;
-        end else if(dirty) begin
-          next_state = WriteBack;
+        end else if(wait_memory) begin
+          next_state = CompareTag;
+        end else if(NON_BLOCKING) begin
+          // O bloco sujo vai para o write buffer e a alocação começa em seguida
+          miss = 1'b1;
+          sample_miss = 1'b1;
+          load_write_buffer = dirty;
+          fill_start = 1'b1;
+          ctrl_ack = ctrl_wr_en_d;
+          next_state = ctrl_wr_en_d ? Idle : Allocate;
         end else begin
-          next_state = Allocate;
+          miss = 1'b1;
+          next_state = dirty ? WriteBack : Allocate;
         end
       end
       Allocate: begin
-        mem_rd_en = 1'b1;
-        set_valid = mem_ack;
-        set_tag = mem_ack;
-        set_data = mem_ack;
-        next_state = mem_ack ? CompareTag : Allocate;
+        if(NON_BLOCKING) begin
+          // Load com miss: espera o preenchimento em segundo plano
+          next_state = fill_pending && !(memory_state == Fill && mem_ack) ? Allocate : CompareTag;
+        end else if(prefetch_busy) begin
+          // A leitura do prefetch em andamento termina antes (pode ser o próprio bloco)
+          next_state = Allocate;
+        end else if(prefetch_valid && prefetch_match) begin
+          // Bloco alocado a partir do buffer de prefetch, sem acessar a memória
+          use_prefetch = 1'b1;
+          hit_set_valid = 1'b1;
+          hit_set_tag = 1'b1;
+          hit_set_data = 1'b1;
+          start_prefetch = PREFETCH && !next_block_cached;
+          next_state = CompareTag;
+        end else begin
+          ctrl_mem_rd_en = 1'b1;
+          hit_set_valid = mem_ack;
+          hit_set_tag = mem_ack;
+          hit_set_data = mem_ack;
+          mem_burst = PREFETCH && !next_block_cached;
+          start_prefetch = mem_burst && mem_ack;
+          next_state = mem_ack ? CompareTag : Allocate;
+        end
       end
       WriteBack: begin
-        mem_wr_en = 1'b1;
-        next_state = mem_ack ? Allocate : WriteBack;
+        ctrl_mem_wr_en = !prefetch_busy;
+        next_state = ctrl_mem_wr_en && mem_ack ? Allocate : WriteBack;
       end
       default: begin // Idle
-        random_gen_en = 1'b1;
+        random_gen_en = !fill_pending;
         if(ctrl_rd_en || ctrl_wr_en) begin
           sample_ctrl_inputs = 1'b1;
           next_state = CompareTag;
@@ -89,6 +164,143 @@ module cache_control #(
     endcase
   end
 
+  // Lado da memória (NON_BLOCKING)
+  generate
+    if(NON_BLOCKING) begin: gen_memory_fsm
+      logic fill_store;
+
+      always_ff @(posedge clock, posedge reset) begin
+        if (reset) begin
+          memory_state <= MemoryIdle;
+          write_buffer_valid <= 1'b0;
+          fill_store <= 1'b0;
+        end else begin
+          memory_state <= memory_next_state;
+          if(load_write_buffer) write_buffer_valid <= 1'b1;
+          else if(memory_state == Drain && mem_ack) write_buffer_valid <= 1'b0;
+          if(fill_start) fill_store <= ctrl_wr_en_d;
+        end
+      end
+
+      always_comb begin
+        fill_mem_rd_en = 1'b0;
+        drain_mem_wr_en = 1'b0;
+        use_miss = 1'b0;
+        fill_set_valid = 1'b0;
+        fill_set_tag = 1'b0;
+        fill_set_data = 1'b0;
+        fill_set_dirty = 1'b0;
+        memory_next_state = MemoryIdle;
+        unique case (memory_state)
+          Fill: begin
+            fill_mem_rd_en = 1'b1;
+            use_miss = mem_ack;
+            fill_set_valid = mem_ack;
+            fill_set_tag = mem_ack;
+            fill_set_data = mem_ack;
+            memory_next_state = !mem_ack ? Fill : (fill_store ? Merge : MemoryIdle);
+          end
+          Merge: begin
+            use_miss = 1'b1;
+            fill_set_valid = 1'b1;
+            fill_set_tag = 1'b1;
+            fill_set_data = 1'b1;
+            fill_set_dirty = 1'b1;
+          end
+          Drain: begin
+            drain_mem_wr_en = 1'b1;
+            memory_next_state = mem_ack ? MemoryIdle : Drain;
+          end
+          default: begin  // MemoryIdle
+            // O preenchimento tem prioridade: o bloco no write buffer é escrito depois dele
+            if(fill_start) memory_next_state = Fill;
+            else if(write_buffer_valid) memory_next_state = Drain;
+          end
+        endcase
+      end
+
+      assign fill_pending = memory_state inside {Fill, Merge};
+    end else begin: gen_no_memory_fsm
+      assign memory_state = MemoryIdle;
+      assign memory_next_state = MemoryIdle;
+      assign write_buffer_valid = 1'b0;
+      assign fill_pending = 1'b0;
+      assign use_miss = 1'b0;
+      assign {fill_mem_rd_en, drain_mem_wr_en} = '0;
+      assign {fill_set_valid, fill_set_tag, fill_set_data, fill_set_dirty} = '0;
+    end
+  endgenerate
+
+  // Prefetch do próximo bloco: lido em segundo plano depois da alocação de um bloco e usado
+  // pelo próximo miss, se for o mesmo bloco
+  generate
+    if(PREFETCH) begin: gen_prefetch
+      logic prefetch_burst;
+
+      always_ff @(posedge clock, posedge reset) begin
+        if (reset) begin
+          prefetch_valid <= 1'b0;
+          prefetch_busy <= 1'b0;
+          prefetch_burst <= 1'b0;
+          prefetch_useful_count <= '0;
+          prefetch_useless_count <= '0;
+        end else begin
+          if (start_prefetch) begin
+            prefetch_busy <= 1'b1;
+            prefetch_burst <= mem_burst;
+          end else if (load_prefetch) prefetch_busy <= 1'b0;
+          // O bloco substituído pode ter sido modificado depois do prefetch
+          if (load_prefetch) prefetch_valid <= 1'b1;
+          else if (start_prefetch || use_prefetch ||
+                  (ctrl_mem_wr_en && mem_ack && prefetch_victim_match)) prefetch_valid <= 1'b0;
+          if (use_prefetch) prefetch_useful_count <= prefetch_useful_count + 1;
+          else if (prefetch_valid && (start_prefetch ||
+                  (ctrl_mem_wr_en && mem_ack && prefetch_victim_match)))
+            prefetch_useless_count <= prefetch_useless_count + 1;
+        end
+      end
+
+      assign prefetch_rd = prefetch_busy;
+      assign load_prefetch = prefetch_busy && mem_ack;
+      assign mem_burst_end = prefetch_busy && prefetch_burst;
+    end else begin: gen_no_prefetch
+      assign {prefetch_valid, prefetch_busy, prefetch_rd, load_prefetch, mem_burst_end} = '0;
+      assign prefetch_useful_count = '0;
+      assign prefetch_useless_count = '0;
+    end
+  endgenerate
+
+  assign mem_rd_en = ctrl_mem_rd_en | fill_mem_rd_en | prefetch_rd;
+  assign mem_wr_en = ctrl_mem_wr_en | drain_mem_wr_en;
+  assign set_valid = hit_set_valid | fill_set_valid;
+  assign set_tag = hit_set_tag | fill_set_tag;
+  assign set_data = hit_set_data | fill_set_data;
+  assign set_dirty = hit_set_dirty | fill_set_dirty;
+
   assign mem_sel = '1;
 
+  // Pulsos de um ciclo por acesso com miss (e write back do bloco sujo)
+  assign write_back = miss && dirty;
+
+  // Contadores de acessos: o hit após a alocação do bloco não é contado
+  logic allocated;
+
+  always_ff @(posedge clock, posedge reset) begin
+    if (reset) allocated <= 1'b0;
+    else if (current_state == Allocate) allocated <= 1'b1;
+    else if (current_state == Idle) allocated <= 1'b0;
+  end
+
+  always_ff @(posedge clock, posedge reset) begin
+    if (reset) begin
+      hit_count <= '0;
+      miss_count <= '0;
+      write_back_count <= '0;
+    end else begin
+      if (ctrl_ack && hit && !allocated) hit_count <= hit_count + 1;
+      if (miss) miss_count <= miss_count + 1;
+      if (write_back) write_back_count <= write_back_count + 1;
+    end
+  end
+
 endmodule
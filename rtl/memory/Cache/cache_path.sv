@@ -5,7 +5,10 @@ module cache_path #(
     parameter integer BLOCK_SIZE = 128,
     parameter integer ADDR_SIZE  = 32,
     parameter integer DATA_SIZE  = 32,
-    parameter integer BYTE_SIZE  = 8
+    parameter integer BYTE_SIZE  = 8,
+    parameter cache_pkg::replacement_policy_t REPLACEMENT_POLICY = cache_pkg::Lru,
+    parameter integer NON_BLOCKING = 0,
+    parameter integer PREFETCH = 0
 ) (
     /* Sinais do sistema */
     input logic reset,
@@ -35,6 +38,17 @@ module cache_path #(
     input  logic set_dirty,
     input  logic mem_addr_src,
     input  logic random_gen_en,
+    input  logic use_miss,
+    input  logic sample_miss,
+    input  logic load_write_buffer,
+    output logic miss_index_match,
+    input  logic start_prefetch,
+    input  logic prefetch_rd,
+    input  logic load_prefetch,
+    input  logic use_prefetch,
+    output logic next_block_cached,
+    output logic prefetch_match,
+    output logic prefetch_victim_match,
     output logic ctrl_wr_en_d,
     output logic hit,
     output logic dirty
@@ -56,9 +70,12 @@ module cache_path #(
 
   logic [Depth-1:0] [SET_SIZE-1:0] tag_comparison;
 
-  logic [ADDR_SIZE-1:0] ctrl_addr_d;
-  logic [DATA_SIZE-1:0] ctrl_wr_data_d, shifted_wr_data, shifted_rd_data;
-  logic [ByteNum-1:0] ctrl_sel_d, shifted_ctrl_sel;
+  logic [ADDR_SIZE-1:0] ctrl_addr_d, miss_addr_d, request_addr;
+  logic [DATA_SIZE-1:0] ctrl_wr_data_d, miss_wr_data_d, request_wr_data;
+  logic [DATA_SIZE-1:0] shifted_wr_data, shifted_rd_data;
+  logic [ByteNum-1:0] ctrl_sel_d, miss_sel_d, request_sel, shifted_ctrl_sel;
+  logic [ADDR_SIZE-1:0] victim_addr, fill_addr, next_block_addr, prefetch_addr;
+  logic [BLOCK_SIZE-1:0] fill_data, prefetch_data;
   logic [DataOffset-1:0] ctrl_shift_sel;
   logic [DataOffset:0] extended_bits;
   logic ctrl_rd_signed_d;
@@ -69,7 +86,7 @@ module cache_path #(
 
   logic [BlockOffset-1:0] block_offset;
 
-  logic [SetOffset-1:0] set_index, set_index_encoded, set_index_random;
+  logic [SetOffset-1:0] set_index, set_index_encoded, set_index_random, set_index_victim;
 
   logic [Index-1:0] index;
 
@@ -77,10 +94,10 @@ module cache_path #(
 
   genvar i, j;
 
-  assign data_offset = ctrl_addr_d[DataOffset-1:0];
-  assign block_offset = ctrl_addr_d[Offset-1:DataOffset];
-  assign index = Depth == 1 ? 0 : ctrl_addr_d[Index+Offset-1:Offset];
-  assign tag = ctrl_addr_d[ADDR_SIZE-1:(Depth == 1 ? Offset : Index+Offset)];
+  assign data_offset = request_addr[DataOffset-1:0];
+  assign block_offset = request_addr[Offset-1:DataOffset];
+  assign index = Depth == 1 ? 0 : request_addr[Index+Offset-1:Offset];
+  assign tag = request_addr[ADDR_SIZE-1:(Depth == 1 ? Offset : Index+Offset)];
 
   // buffering signals coming from the Controller
   always_ff @(posedge clock iff sample_ctrl_inputs) begin
@@ -91,6 +108,28 @@ module cache_path #(
     ctrl_rd_signed_d <= ctrl_rd_signed;
   end
 
+  // Pedido que causou o miss pendente: o bloco é alocado (e o store escrito nele) enquanto
+  // outros pedidos são atendidos
+  generate
+    if(NON_BLOCKING) begin: gen_miss_registers
+      always_ff @(posedge clock iff sample_miss) begin
+        miss_addr_d <= ctrl_addr_d;
+        miss_wr_data_d <= ctrl_wr_data_d;
+        miss_sel_d <= ctrl_sel_d;
+      end
+    end else begin: gen_no_miss_registers
+      assign miss_addr_d = ctrl_addr_d;
+      assign miss_wr_data_d = ctrl_wr_data_d;
+      assign miss_sel_d = ctrl_sel_d;
+    end
+  endgenerate
+
+  assign request_addr = use_miss ? miss_addr_d : ctrl_addr_d;
+  assign request_wr_data = use_miss ? miss_wr_data_d : ctrl_wr_data_d;
+  assign request_sel = use_miss ? miss_sel_d : ctrl_sel_d;
+  assign miss_index_match = Depth == 1 || (miss_addr_d[Index+Offset-1:Offset] ==
+                                            ctrl_addr_d[Index+Offset-1:Offset]);
+
   // Cache Registers
   always_ff @(posedge clock, posedge reset) begin
     if (reset) cache_valid <= 'b0;
@@ -113,7 +152,7 @@ module cache_path #(
         if(shifted_ctrl_sel[i])
           cache_data[index][set_index][(block_offset*DATA_SIZE+i*BYTE_SIZE)+:BYTE_SIZE] <=
                                     shifted_wr_data[(i*BYTE_SIZE)+:BYTE_SIZE];
-    end else cache_data[index][set_index] <= mem_rd_data;
+    end else cache_data[index][set_index] <= fill_data;
   end
 
   // Comparisons
@@ -131,7 +170,8 @@ module cache_path #(
       priority_encoder #(
         .N(SET_SIZE)
       ) set_encoder (
-        .A(tag_comparison[index]),
+        // Vias inválidas com a mesma tag (após o reset) não contam: a alocação usa a vítima
+        .A(tag_comparison[index] & cache_valid[index]),
         .Y(set_index_encoded)
       );
 
@@ -154,13 +194,91 @@ module cache_path #(
     end
   endgenerate
 
-  assign set_index = SET_SIZE == 1 ? 0 : (|tag_comparison[index]) ?
-                          set_index_encoded : set_index_random;
+  assign set_index = SET_SIZE == 1 ? 0 : hit ? set_index_encoded : set_index_victim;
+
+  // Replacement Policy
+  // set_valid é ativado tanto no hit (hit = 1) quanto no fim da alocação do bloco (hit = 0),
+  // sempre na via set_index
+  generate
+    // A árvore do pseudo-LRU e o contador do FIFO cobrem 2**SetOffset vias
+    if((REPLACEMENT_POLICY == cache_pkg::PseudoLru || REPLACEMENT_POLICY == cache_pkg::Fifo) &&
+       (SET_SIZE & (SET_SIZE - 1)) != 0) begin: gen_set_size_check
+      $error("cache_path: SET_SIZE (%0d) must be a power of 2 with the %s policy", SET_SIZE,
+             REPLACEMENT_POLICY == cache_pkg::Fifo ? "FIFO" : "pseudo-LRU");
+    end
+
+    if(SET_SIZE == 1 || REPLACEMENT_POLICY == cache_pkg::Random) begin: gen_random_policy
+      assign set_index_victim = set_index_random;
+    end
+    else if(REPLACEMENT_POLICY == cache_pkg::Lru) begin: gen_lru_policy
+      // Idade de cada via: 0 = mais recente, SET_SIZE-1 = vítima
+      logic [Depth-1:0] [SET_SIZE-1:0] [SetOffset-1:0] lru_age;
+
+      always_ff @(posedge clock, posedge reset) begin
+        if (reset) begin
+          for(int k = 0; k < Depth; k++)
+            for(int w = 0; w < SET_SIZE; w++) lru_age[k][w] <= SetOffset'(w);
+        end else if(set_valid) begin
+          // Vias mais recentes que a acessada envelhecem
+          for(int w = 0; w < SET_SIZE; w++)
+            if(lru_age[index][w] < lru_age[index][set_index])
+              lru_age[index][w] <= lru_age[index][w] + 1;
+          lru_age[index][set_index] <= '0;
+        end
+      end
+
+      always_comb begin
+        set_index_victim = '0;
+        for(int w = 0; w < SET_SIZE; w++)
+          if(lru_age[index][w] == SetOffset'(SET_SIZE-1)) set_index_victim = SetOffset'(w);
+      end
+    end
+    else if(REPLACEMENT_POLICY == cache_pkg::PseudoLru) begin: gen_plru_policy
+      // Árvore binária: nó n (1 a SET_SIZE-1) tem filhos 2n e 2n+1; bit 0 aponta para a esquerda
+      logic [Depth-1:0] [SET_SIZE-1:0] plru_tree;
+      logic [SET_SIZE-1:0] plru_next;
+      logic [SetOffset:0] node_access, node_victim;
+
+      // Os nós no caminho até a via acessada passam a apontar para o lado oposto
+      always_comb begin : plru_next_proc
+        plru_next = plru_tree[index];
+        node_access = SET_SIZE + set_index;
+        for(int l = 0; l < SetOffset; l++) begin
+          plru_next[node_access[SetOffset:1]] = !node_access[0];
+          node_access = node_access >> 1;
+        end
+      end : plru_next_proc
+
+      always_ff @(posedge clock, posedge reset) begin
+        if (reset) plru_tree <= '0;
+        else if(set_valid) plru_tree[index] <= plru_next;
+      end
+
+      // A vítima é a folha alcançada seguindo os bits a partir da raiz
+      always_comb begin : plru_victim_proc
+        node_victim = 1;
+        for(int l = 0; l < SetOffset; l++)
+          node_victim = {node_victim[SetOffset-1:0], plru_tree[index][node_victim]};
+        set_index_victim = node_victim[SetOffset-1:0];
+      end : plru_victim_proc
+    end
+    else begin: gen_fifo_policy
+      // Próxima via a ser substituída em cada conjunto
+      logic [Depth-1:0] [SetOffset-1:0] fifo_next;
+
+      always_ff @(posedge clock, posedge reset) begin
+        if (reset) fifo_next <= '0;
+        else if(set_valid && !hit) fifo_next[index] <= fifo_next[index] + 1;
+      end
+
+      assign set_index_victim = fifo_next[index];
+    end
+  endgenerate
 
   // Controller Write data logic
   generate
     for(i = 0; i < DataOffset; i++) begin: gen_ctrl_rd_sel
-      assign ctrl_shift_sel[i] = data_offset[i] & ~ctrl_sel_d[2**(2**i)-1];
+      assign ctrl_shift_sel[i] = data_offset[i] & ~request_sel[2**(2**i)-1];
     end
   endgenerate
 
@@ -168,7 +286,7 @@ module cache_path #(
       .XLEN(ByteNum),
       .YLEN(BYTE_SIZE)
   ) wr_shifter (
-      .in_data(ctrl_wr_data_d),
+      .in_data(request_wr_data),
       .shamt(ctrl_shift_sel),
       .out_data(shifted_wr_data)
   );
@@ -177,7 +295,7 @@ module cache_path #(
       .XLEN(ByteNum),
       .YLEN(1)
   ) sel_shifter (
-      .in_data(ctrl_sel_d),
+      .in_data(request_sel),
       .shamt(ctrl_shift_sel),
       .out_data(shifted_ctrl_sel)
   );
@@ -209,11 +327,63 @@ module cache_path #(
     end
   endgenerate
   // Memory
-  assign mem_addr = mem_addr_src ? (Depth == 1 ? {cache_tag[0][set_index_random], {Offset{1'b0}}} :
-                                    {cache_tag[index][set_index_random], index, {Offset{1'b0}}}) :
-                                   {ctrl_addr_d[ADDR_SIZE-1:Offset], {Offset{1'b0}}};
-  assign mem_wr_data = cache_data[index][set_index_random];
+  assign victim_addr = Depth == 1 ? {cache_tag[0][set_index_victim], {Offset{1'b0}}} :
+                                    {cache_tag[index][set_index_victim], index, {Offset{1'b0}}};
+  assign fill_addr = {miss_addr_d[ADDR_SIZE-1:Offset], {Offset{1'b0}}};
+
+  // Write buffer: o bloco sujo substituído é escrito na memória depois da alocação
+  generate
+    if(NON_BLOCKING) begin: gen_write_buffer
+      logic [ADDR_SIZE-1:0] write_buffer_addr;
+      logic [BLOCK_SIZE-1:0] write_buffer_data;
+
+      always_ff @(posedge clock iff load_write_buffer) begin
+        write_buffer_addr <= victim_addr;
+        write_buffer_data <= cache_data[index][set_index_victim];
+      end
+
+      assign mem_addr = mem_addr_src ? write_buffer_addr : fill_addr;
+      assign mem_wr_data = write_buffer_data;
+    end else begin: gen_no_write_buffer
+      assign mem_addr = mem_addr_src ? victim_addr : (prefetch_rd ? prefetch_addr : fill_addr);
+      assign mem_wr_data = cache_data[index][set_index_victim];
+    end
+  endgenerate
+
+  // Buffer de prefetch: bloco seguinte ao último bloco alocado
+  assign next_block_addr = {request_addr[ADDR_SIZE-1:Offset] + 1'b1, {Offset{1'b0}}};
+
+  generate
+    if(PREFETCH) begin: gen_prefetch_buffer
+      logic [Index-1:0] next_index;
+      logic [Tag-1:0] next_tag;
+
+      always_ff @(posedge clock iff start_prefetch) prefetch_addr <= next_block_addr;
+
+      always_ff @(posedge clock iff load_prefetch) prefetch_data <= mem_rd_data;
+
+      // Não há prefetch de um bloco que já está na cache
+      assign next_index = Depth == 1 ? 0 : next_block_addr[Index+Offset-1:Offset];
+      assign next_tag = next_block_addr[ADDR_SIZE-1:(Depth == 1 ? Offset : Index+Offset)];
+      always_comb begin
+        next_block_cached = 1'b0;
+        for(int w = 0; w < SET_SIZE; w++)
+          if(cache_valid[next_index][w] && cache_tag[next_index][w] == next_tag)
+            next_block_cached = 1'b1;
+      end
+
+      assign prefetch_match = prefetch_addr[ADDR_SIZE-1:Offset] == fill_addr[ADDR_SIZE-1:Offset];
+      assign prefetch_victim_match = prefetch_addr[ADDR_SIZE-1:Offset] ==
+                                     victim_addr[ADDR_SIZE-1:Offset];
+      assign fill_data = use_prefetch ? prefetch_data : mem_rd_data;
+    end else begin: gen_no_prefetch_buffer
+      assign prefetch_addr = '0;
+      assign prefetch_data = '0;
+      assign {next_block_cached, prefetch_match, prefetch_victim_match} = '0;
+      assign fill_data = mem_rd_data;
+    end
+  endgenerate
   // Control Unit
   assign hit = cache_valid[index][set_index_encoded] & tag_comparison[index][set_index_encoded];
-  assign dirty = cache_dirty[index][set_index_random];
+  assign dirty = cache_dirty[index][set_index_victim];
 endmodule
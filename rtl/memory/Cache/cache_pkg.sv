@@ -8,4 +8,21 @@ package cache_pkg;
     WriteBack
   } cache_state_t;
 
+  // Lado da memória da cache não bloqueante: preenchimento do bloco de um miss e esvaziamento
+  // do write buffer, em paralelo com os hits
+  typedef enum logic [1:0] {
+    MemoryIdle,
+    Fill,
+    Merge,  // Escrita do store que causou o miss no bloco recém-alocado
+    Drain
+  } memory_state_t;
+
+  // Escolha do bloco substituído em um miss
+  typedef enum logic [1:0] {
+    Random,  // Contador incrementado enquanto a cache está ociosa
+    Lru,  // LRU verdadeiro (idade de cada via), para poucas vias
+    PseudoLru,  // Árvore PLRU (SET_SIZE-1 bits por conjunto)
+    Fifo  // Vias substituídas em ordem de alocação
+  } replacement_policy_t;
+
 endpackage
@@ -1,4 +1,6 @@
 files = [
+    "dma_arbiter.sv",
+    "memory_arbiter.sv",
     "memory_controller.sv"
 ]
 
@@ -0,0 +1,63 @@
+// Compartilha a porta de dados do núcleo com um DMA (acessos simples, sem burst): o núcleo (0)
+// espera enquanto o DMA (1) tem o barramento
+module dma_arbiter #(
+    parameter integer DATA_SIZE = 32,
+    parameter integer BYTE_SIZE = 8
+) (
+    /* Núcleo e memória */
+    wishbone_if.secondary wish_s_proc,
+    wishbone_if.primary   wish_p_mem,
+    /* //// */
+
+    /* DMA */
+    input  logic        dma_cyc,
+    input  logic        dma_we,
+    input  logic [31:0] dma_addr,
+    input  logic [ 3:0] dma_sel,
+    input  logic [31:0] dma_wr_data,
+    output logic        dma_ack,
+    output logic [31:0] dma_rd_data
+    /* //// */
+);
+
+  logic [1:0] grant;
+
+  memory_arbiter arbiter (
+      .clock(wish_p_mem.clock),
+      .reset(wish_p_mem.reset),
+      .request({dma_cyc, wish_s_proc.cyc & wish_s_proc.stb}),
+      .grant,
+      .ack(wish_p_mem.ack),
+      .burst(1'b0)
+  );
+
+  always_comb begin
+    if (grant[1]) begin
+      wish_p_mem.cyc = dma_cyc;
+      wish_p_mem.stb = dma_cyc;
+      wish_p_mem.we = dma_we;
+      wish_p_mem.addr = dma_addr;
+      wish_p_mem.sel = (DATA_SIZE / BYTE_SIZE)'(dma_sel);
+      wish_p_mem.tgd = 1'b0;
+      wish_p_mem.cti = 3'b000;
+      wish_p_mem.bte = 2'b00;
+      wish_p_mem.dat_o_p = DATA_SIZE'(dma_wr_data);
+    end else begin
+      wish_p_mem.cyc = wish_s_proc.cyc;
+      wish_p_mem.stb = wish_s_proc.stb;
+      wish_p_mem.we = wish_s_proc.we;
+      wish_p_mem.addr = wish_s_proc.addr;
+      wish_p_mem.sel = wish_s_proc.sel;
+      wish_p_mem.tgd = wish_s_proc.tgd;
+      wish_p_mem.cti = wish_s_proc.cti;
+      wish_p_mem.bte = wish_s_proc.bte;
+      wish_p_mem.dat_o_p = wish_s_proc.dat_i_s;
+    end
+  end
+
+  assign wish_s_proc.ack = wish_p_mem.ack & !grant[1];
+  assign wish_s_proc.dat_o_s = wish_p_mem.dat_i_p;
+  assign dma_ack = wish_p_mem.ack & grant[1];
+  assign dma_rd_data = wish_p_mem.dat_i_p[31:0];
+
+endmodule
@@ -0,0 +1,43 @@
+module memory_arbiter (
+    /* Sinais do sistema */
+    input logic clock,
+    input logic reset,
+    /* //// */
+
+    /* Pedidos das caches de instruções (0) e de dados (1) a um secundário */
+    input  logic [1:0] request,
+    output logic [1:0] grant,
+    /* //// */
+
+    /* Secundário */
+    input logic ack,
+    input logic burst  // cti do beat atual: o burst continua no próximo ciclo
+    /* //// */
+);
+
+  logic locked, last;
+
+  // O secundário fica com o mesmo primário até o fim do ciclo (ou do burst); na disputa, o
+  // primário que não foi atendido por último tem prioridade
+  always_comb begin
+    grant = '0;
+    if (locked) grant[last] = 1'b1;
+    else if (request[1] && (!request[0] || !last)) grant[1] = 1'b1;
+    else if (request[0]) grant[0] = 1'b1;
+  end
+
+  always_ff @(posedge clock, posedge reset) begin
+    if (reset) begin
+      locked <= 1'b0;
+      last <= 1'b0;
+    end else if (|(grant & request)) begin
+      last <= grant[1];
+      if (ack && burst) locked <= 1'b1;
+      else if (ack) locked <= 1'b0;
+      else locked <= 1'b1;
+    end else begin
+      locked <= 1'b0;
+    end
+  end
+
+endmodule
@@ -21,14 +21,24 @@ module memory_controller #(
     wishbone_if.primary   wish_p_csr
 );
 
+  import wishbone_pkg::*;
+
   // Auxiliary
-  logic sel_rom, sel_ram, sel_cache_inst, sel_cache_data, sel_uart, sel_csr;
+  logic sel_cache_inst, sel_cache_data, sel_uart, sel_csr;
+  logic [1:0] rom_request, ram_request, rom_grant, ram_grant;
 
-  assign sel_rom = ((wish_s_cache_data.addr & ROM_ADDR_MASK) == ROM_ADDR)
+  // Crossbar: as caches de instruções (0) e de dados (1) acessam a ROM e a RAM ao mesmo tempo
+  // se forem secundários diferentes; cada secundário tem um árbitro
+  assign rom_request[0] = ((wish_s_cache_inst.addr & ROM_ADDR_MASK) == ROM_ADDR)
+                                              & wish_s_cache_inst.cyc & wish_s_cache_inst.stb;
+  assign ram_request[0] = ((wish_s_cache_inst.addr & RAM_ADDR_MASK) == RAM_ADDR)
+                                              & wish_s_cache_inst.cyc & wish_s_cache_inst.stb;
+  assign rom_request[1] = ((wish_s_cache_data.addr & ROM_ADDR_MASK) == ROM_ADDR)
                                               & wish_s_cache_data.cyc & wish_s_cache_data.stb;
-  assign sel_ram = ((wish_s_cache_data.addr & RAM_ADDR_MASK) == RAM_ADDR)
+  assign ram_request[1] = ((wish_s_cache_data.addr & RAM_ADDR_MASK) == RAM_ADDR)
                                               & wish_s_cache_data.cyc & wish_s_cache_data.stb;
-  assign sel_cache_inst = ((wish_s_proc0.addr & ROM_ADDR_MASK) == ROM_ADDR)
+  assign sel_cache_inst = (((wish_s_proc0.addr & ROM_ADDR_MASK) == ROM_ADDR) ||
+                          ((wish_s_proc0.addr & RAM_ADDR_MASK) == RAM_ADDR))
                                               & wish_s_proc0.cyc & wish_s_proc0.stb;
   assign sel_cache_data = (((wish_s_proc1.addr & ROM_ADDR_MASK) == ROM_ADDR) ||
                           ((wish_s_proc1.addr & RAM_ADDR_MASK) == RAM_ADDR))
@@ -38,22 +48,44 @@ module memory_controller #(
   assign sel_csr = ((wish_s_proc1.addr & CSR_ADDR_MASK) == CSR_ADDR)
                                               & wish_s_proc1.cyc & wish_s_proc1.stb;
 
+  memory_arbiter rom_arbiter (
+      .clock(wish_p_rom.clock),
+      .reset(wish_p_rom.reset),
+      .request(rom_request),
+      .grant(rom_grant),
+      .ack(wish_p_rom.ack),
+      .burst(wish_p_rom.cti == IncrementingBurst)
+  );
+
+  memory_arbiter ram_arbiter (
+      .clock(wish_p_ram.clock),
+      .reset(wish_p_ram.reset),
+      .request(ram_request),
+      .grant(ram_grant),
+      .ack(wish_p_ram.ack),
+      .burst(wish_p_ram.cti == IncrementingBurst)
+  );
+
   // Connect primary modport
-  assign wish_p_rom.cyc = sel_rom ? wish_s_cache_data.cyc : wish_s_cache_inst.cyc;
-  assign wish_p_rom.stb = sel_rom ? wish_s_cache_data.stb : wish_s_cache_inst.stb;
-  assign wish_p_rom.we = sel_rom ? wish_s_cache_data.we : wish_s_cache_inst.we;
-  assign wish_p_rom.tgd = sel_rom ? wish_s_cache_data.tgd : wish_s_cache_inst.tgd;
-  assign wish_p_rom.sel = sel_rom ? wish_s_cache_data.sel : wish_s_cache_inst.sel;
-  assign wish_p_rom.addr = sel_rom ? wish_s_cache_data.addr : wish_s_cache_inst.addr;
-  assign wish_p_rom.dat_o_p = sel_rom ? wish_s_cache_data.dat_i_s : wish_s_cache_inst.dat_i_s;
-
-  assign wish_p_ram.cyc = sel_ram;
-  assign wish_p_ram.stb = sel_ram;
-  assign wish_p_ram.we = wish_s_cache_data.we;
-  assign wish_p_ram.tgd = wish_s_cache_data.tgd;
-  assign wish_p_ram.sel = wish_s_cache_data.sel;
-  assign wish_p_ram.addr = wish_s_cache_data.addr;
-  assign wish_p_ram.dat_o_p = wish_s_cache_data.dat_i_s;
+  assign wish_p_rom.cyc = |(rom_grant & rom_request);
+  assign wish_p_rom.stb = |(rom_grant & rom_request);
+  assign wish_p_rom.we = rom_grant[1] ? wish_s_cache_data.we : wish_s_cache_inst.we;
+  assign wish_p_rom.tgd = rom_grant[1] ? wish_s_cache_data.tgd : wish_s_cache_inst.tgd;
+  assign wish_p_rom.sel = rom_grant[1] ? wish_s_cache_data.sel : wish_s_cache_inst.sel;
+  assign wish_p_rom.cti = rom_grant[1] ? wish_s_cache_data.cti : wish_s_cache_inst.cti;
+  assign wish_p_rom.bte = rom_grant[1] ? wish_s_cache_data.bte : wish_s_cache_inst.bte;
+  assign wish_p_rom.addr = rom_grant[1] ? wish_s_cache_data.addr : wish_s_cache_inst.addr;
+  assign wish_p_rom.dat_o_p = rom_grant[1] ? wish_s_cache_data.dat_i_s : wish_s_cache_inst.dat_i_s;
+
+  assign wish_p_ram.cyc = |(ram_grant & ram_request);
+  assign wish_p_ram.stb = |(ram_grant & ram_request);
+  assign wish_p_ram.we = ram_grant[1] ? wish_s_cache_data.we : wish_s_cache_inst.we;
+  assign wish_p_ram.tgd = ram_grant[1] ? wish_s_cache_data.tgd : wish_s_cache_inst.tgd;
+  assign wish_p_ram.sel = ram_grant[1] ? wish_s_cache_data.sel : wish_s_cache_inst.sel;
+  assign wish_p_ram.cti = ram_grant[1] ? wish_s_cache_data.cti : wish_s_cache_inst.cti;
+  assign wish_p_ram.bte = ram_grant[1] ? wish_s_cache_data.bte : wish_s_cache_inst.bte;
+  assign wish_p_ram.addr = ram_grant[1] ? wish_s_cache_data.addr : wish_s_cache_inst.addr;
+  assign wish_p_ram.dat_o_p = ram_grant[1] ? wish_s_cache_data.dat_i_s : wish_s_cache_inst.dat_i_s;
 
   assign wish_p_cache_inst.cyc = sel_cache_inst;
   assign wish_p_cache_inst.stb = sel_cache_inst;
@@ -88,11 +120,15 @@ module memory_controller #(
   assign wish_p_csr.dat_o_p = wish_s_proc1.dat_i_s;
 
   // Connect secondary modport
-  assign wish_s_cache_inst.ack = wish_p_rom.ack & !sel_rom;
-  assign wish_s_cache_inst.dat_o_s = wish_p_rom.dat_i_p;
+  assign wish_s_cache_inst.ack = (rom_grant[0] & rom_request[0] & wish_p_rom.ack) |
+                                 (ram_grant[0] & ram_request[0] & wish_p_ram.ack);
+  assign wish_s_cache_inst.dat_o_s = ram_grant[0] & ram_request[0] ? wish_p_ram.dat_i_p :
+                                                                     wish_p_rom.dat_i_p;
 
-  assign wish_s_cache_data.ack = sel_rom ? wish_p_rom.ack : wish_p_ram.ack;
-  assign wish_s_cache_data.dat_o_s = sel_rom ? wish_p_rom.dat_i_p : wish_p_ram.dat_i_p;
+  assign wish_s_cache_data.ack = (rom_grant[1] & rom_request[1] & wish_p_rom.ack) |
+                                 (ram_grant[1] & ram_request[1] & wish_p_ram.ack);
+  assign wish_s_cache_data.dat_o_s = ram_grant[1] & ram_request[1] ? wish_p_ram.dat_i_p :
+                                                                     wish_p_rom.dat_i_p;
 
   assign wish_s_proc0.ack = wish_p_cache_inst.ack;
   assign wish_s_proc0.dat_o_s = wish_p_cache_inst.dat_i_p;
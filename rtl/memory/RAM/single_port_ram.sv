@@ -6,11 +6,14 @@ module single_port_ram #(
   wishbone_if.secondary wb_if_s
 );
 
+  import wishbone_pkg::*;
+
   localparam integer DataSize = $size(wb_if_s.dat_i_s);
   localparam integer ByteSize = DataSize/$size(wb_if_s.sel);
   localparam integer AddrSize = $size(wb_if_s.addr);
 
   logic [$clog2(BUSY_CYCLES):0] busy_flag = 0;
+  logic next_beat;
 
   function automatic logic [AddrSize-1:0] offset_and_truncate_address(input reg [DataSize-1:0] addr,
                                                                       input integer offset);
@@ -19,7 +22,40 @@ module single_port_ram #(
 
   reg [ByteSize-1:0] ram[$unsigned(2**AddrSize-1):0];
 
+  // synthesis translate_off
+  // Imagens .hex (uma palavra de DataSize bits por linha, $readmemh) e .bin (binário cru, com o
+  // byte 0 no endereço 0) carregam mais rápido que os MIFs de um byte por linha
+  function automatic bit word_image(input string file_name);
+    string extension = file_name.substr(file_name.len() - 4, file_name.len() - 1);
+    return extension == ".hex" || extension == ".bin";
+  endfunction
+
+  task automatic load_image(input string file_name);
+    logic [DataSize-1:0] words[(2**AddrSize)/(DataSize/ByteSize)];
+    int fd;
+    if (file_name.substr(file_name.len() - 4, file_name.len() - 1) == ".bin") begin
+      fd = $fopen(file_name, "rb");
+      if (fd == 0) $error("Can't open RAM image %s", file_name);
+      void'($fread(ram, fd));
+      $fclose(fd);
+    end else begin
+      $readmemh(file_name, words);
+      foreach (words[i])
+        for (int j = 0; j < DataSize / ByteSize; j++)
+          ram[(DataSize/ByteSize)*i+j] = words[i][ByteSize*j+:ByteSize];
+    end
+  endtask
+  // synthesis translate_on
+
+  // Em simulação, +RAM_INIT_FILE=<arquivo> troca a imagem sem recompilar
   initial begin
+    // synthesis translate_off
+    string init_file;
+    if (!$value$plusargs("RAM_INIT_FILE=%s", init_file)) init_file = RAM_INIT_FILE;
+    if (word_image(init_file)) load_image(init_file);
+    else if (init_file != RAM_INIT_FILE) $readmemb(init_file, ram);
+    else
+    // synthesis translate_on
     $readmemb(RAM_INIT_FILE, ram);
   end
 
@@ -32,11 +68,16 @@ module single_port_ram #(
     end
   end
 
+  // Burst incremental com registered feedback: o próximo beat é respondido no ciclo seguinte,
+  // então a leitura registrada já usa o endereço seguinte (bursts lineares)
+  assign next_beat = wb_if_s.ack && wb_if_s.cyc && wb_if_s.stb &&
+                     wb_if_s.cti == IncrementingBurst && wb_if_s.bte == LinearBurst;
+
   always @(posedge wb_if_s.clock) begin
     for (int j = 0; j < DataSize / ByteSize; j = j + 1) begin
       if (wb_if_s.stb && wb_if_s.cyc && wb_if_s.sel[j]) begin
         wb_if_s.dat_o_s[(j+1)*ByteSize-1-:ByteSize] <=
-          ram[offset_and_truncate_address(wb_if_s.addr, j)];
+          ram[offset_and_truncate_address(wb_if_s.addr, next_beat ? j + DataSize / ByteSize : j)];
       end else begin
         if (wb_if_s.stb && wb_if_s.cyc && wb_if_s.sel[j] && wb_if_s.we) begin
           wb_if_s.dat_o_s[(j+1)*ByteSize-1-:ByteSize] <=
@@ -50,11 +91,14 @@ module single_port_ram #(
 
   always @(posedge wb_if_s.clock) begin : wishbone_ack
     wb_if_s.ack <= 1'b0;
-    if (busy_flag) begin
+    if (next_beat) begin
+      wb_if_s.ack <= 1'b1;
+      busy_flag <= 1'b0;
+    end else if (busy_flag) begin
       busy_flag <= busy_flag + 1;
       if(busy_flag === BUSY_CYCLES) wb_if_s.ack <= 1'b1;
       else if(busy_flag === BUSY_CYCLES + 1) busy_flag <= 1'b0;
-    end else if (wb_if_s.cyc && wb_if_s.stb) begin
+    end else if (wb_if_s.cyc && wb_if_s.stb && !wb_if_s.ack) begin
       busy_flag <= 1'b1;
     end
   end
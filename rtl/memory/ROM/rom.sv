@@ -6,41 +6,74 @@ module rom #(
   wishbone_if.secondary wb_if_s
 );
 
+  import wishbone_pkg::*;
+
   localparam integer DataSize = $size(wb_if_s.dat_i_s);
   localparam integer ByteSize = DataSize/$size(wb_if_s.sel);
   localparam integer Offset = DataSize/ByteSize;
   localparam integer AddrSize = $size(wb_if_s.addr);
 
   logic [$clog2(BUSY_CYCLES):0] busy_flag = 0;
-  logic [ByteSize- 1:0] memory[2**AddrSize- 1:0];
-  logic [(2**AddrSize)/Offset- 1:0] [DataSize-1:0] memory_packed;
+  logic [ByteSize-1:0] memory[2**AddrSize];
 
-  // variáveis de iteração
-  genvar i;
+  // synthesis translate_off
+  // Imagens .hex (uma palavra de DataSize bits por linha, $readmemh) e .bin (binário cru, com o
+  // byte 0 no endereço 0) carregam mais rápido que os MIFs de um byte por linha
+  function automatic bit word_image(input string file_name);
+    string extension = file_name.substr(file_name.len() - 4, file_name.len() - 1);
+    return extension == ".hex" || extension == ".bin";
+  endfunction
+
+  task automatic load_image(input string file_name);
+    logic [DataSize-1:0] words[(2**AddrSize)/Offset];
+    int fd;
+    if (file_name.substr(file_name.len() - 4, file_name.len() - 1) == ".bin") begin
+      fd = $fopen(file_name, "rb");
+      if (fd == 0) $error("Can't open ROM image %s", file_name);
+      void'($fread(memory, fd));
+      $fclose(fd);
+    end else begin
+      $readmemh(file_name, words);
+      foreach (words[i])
+        for (int j = 0; j < Offset; j++) memory[Offset*i+j] = words[i][ByteSize*j+:ByteSize];
+    end
+  endtask
+  // synthesis translate_on
 
   // inicializando a memória
+  // Em simulação, +ROM_INIT_FILE=<arquivo> troca o programa sem recompilar
   initial begin
+    // synthesis translate_off
+    string init_file;
+    if (!$value$plusargs("ROM_INIT_FILE=%s", init_file)) init_file = ROM_INIT_FILE;
+    if (word_image(init_file)) load_image(init_file);
+    else if (init_file != ROM_INIT_FILE) $readmemb(init_file, memory);
+    else
+    // synthesis translate_on
     $readmemb(ROM_INIT_FILE, memory);
   end
 
-  // Particionando a memória de acordo com os offsets
+  // Leitura da ROM: os Offset bytes da palavra endereçada
+  genvar i;
   generate
-    for (i = 0; i < 2 ** AddrSize; i = i + 1) begin : g_mem_packed
-      assign memory_packed[i/Offset][ByteSize*(i%Offset)+:ByteSize]
-            = memory[i];
+    for (i = 0; i < Offset; i++) begin : g_read_bytes
+      assign wb_if_s.dat_o_s[ByteSize*i+:ByteSize] =
+                memory[wb_if_s.addr[AddrSize-1:$clog2(Offset)]*Offset+i];
     end
   endgenerate
 
-  // Leitura da ROM
-  assign wb_if_s.dat_o_s = memory_packed[wb_if_s.addr[AddrSize-1:$clog2(Offset)]];
-
+  // Burst incremental com registered feedback: depois do primeiro, cada beat é respondido no
+  // ciclo seguinte ao anterior (a leitura é combinacional, então o bte não importa)
   always @(posedge wb_if_s.clock) begin : wishbone_ack
     wb_if_s.ack <= 1'b0;
-    if (busy_flag) begin
+    if (wb_if_s.ack && wb_if_s.cyc && wb_if_s.stb && wb_if_s.cti == IncrementingBurst) begin
+      wb_if_s.ack <= 1'b1;
+      busy_flag <= 1'b0;
+    end else if (busy_flag) begin
       busy_flag <= busy_flag + 1;
       if(busy_flag === BUSY_CYCLES) wb_if_s.ack <= 1'b1;
       else if(busy_flag === BUSY_CYCLES + 1) busy_flag <= 1'b0;
-    end else if (wb_if_s.cyc && wb_if_s.stb) begin
+    end else if (wb_if_s.cyc && wb_if_s.stb && !wb_if_s.ack) begin
       busy_flag <= 1'b1;
     end
   end
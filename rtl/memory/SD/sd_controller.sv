@@ -2,9 +2,13 @@
 import sd_controller_pkg::*;
 import sd_receiver_pkg::*;
 import sd_sender_pkg::*;
+import wishbone_pkg::IncrementingBurst;
 
 module sd_controller #(
-  parameter integer SDSC = 0
+  parameter integer SDSC = 0,
+  // Divisores do clock do SPI (sck = clock / DIV) durante e depois da inicialização
+  parameter integer INIT_CLOCK_DIV = 1,
+  parameter integer CLOCK_DIV = 1
 )(
     // Wishbone
     wishbone_if.secondary wb_if_s,
@@ -37,6 +41,16 @@ module sd_controller #(
 
   wire wr_en = wb_if_s.cyc & wb_if_s.stb & wb_if_s.we;
   wire rd_en = wb_if_s.cyc & wb_if_s.stb & ~wb_if_s.we;
+  // Burst incremental: um bloco por beat, com CMD18/CMD25 em vez de CMD17/CMD24
+  wire burst = wb_if_s.cti == IncrementingBurst;
+  reg multi_block;
+
+  localparam integer MaxClockDiv = INIT_CLOCK_DIV > CLOCK_DIV ? INIT_CLOCK_DIV : CLOCK_DIV;
+  localparam integer ClockDivSize = $clog2(MaxClockDiv + 1);
+  reg [ClockDivSize-1:0] clock_counter;
+  reg initialized;
+  wire [ClockDivSize-1:0] clock_div;
+  wire tick;
 
   reg [31:0] addr_reg;
   reg [4095:0] write_data_reg;
@@ -64,6 +78,7 @@ module sd_controller #(
   sd_sender sender (
       .clock(wb_if_s.clock),
       .reset(wb_if_s.reset),
+      .tick(tick),
       .cmd_index(cmd_index),
       .argument(argument),
       .cmd_or_data(cmd_or_data),
@@ -78,7 +93,9 @@ module sd_controller #(
   sd_receiver receiver (
       .clock(wb_if_s.clock),
       .reset(wb_if_s.reset),
-      .response_type((state != CheckCmd17) ? response_type : new_response_type),
+      .tick(tick),
+      .response_type(((state != CheckCmd17) && (state != ReadNextBlock)) ?
+                     response_type : new_response_type),
       .received_data(received_data),
       .ready(receiver_ready),
       .valid(receiver_valid),
@@ -122,33 +139,35 @@ module sd_controller #(
       check_read_db <= 8'b11110000;
       check_error_token_db <= 8'b10101010;
     end else begin
-      cs    <= new_cs;
-      state <= new_state;
-      if (state_return_en) state_return <= new_state_return;
-      else state_return <= state_return;
-      if (response_type_en) response_type <= new_response_type;
-      else response_type <= response_type;
       if (ack) ack <= 1'b0;
-      else if (new_ack) ack <= 1'b1;
+      else if (new_ack & tick) ack <= 1'b1;
       else ack <= ack;
-      if (check_cmd_0_db_en) check_cmd_0_db <= received_data[7:0];
-      if (check_cmd_8_db_en) check_cmd_8_db <= received_data[39:32];
-      if (check_cmd_55_db_en) check_cmd_55_db <= received_data[7:0];
-      if (check_cmd_59_db_en) check_cmd_59_db <= received_data[7:0];
-      if (check_acmd_41_db_en) check_acmd_41_db <= received_data[7:0];
-      if (check_cmd_16_db_en) check_cmd_16_db <= received_data[7:0];
-      if (check_cmd_24_db_en) check_cmd_24_db <= received_data[7:0];
-      else if (clear_db) check_cmd_24_db <= 8'd24;
-      if (check_write_db_en) check_write_db <= received_data[7:0];
-      else if (clear_db) check_write_db <= 8'd10;
-      if (check_cmd_13_db_en) check_cmd_13_db <= received_data[15:0];
-      else if (clear_db) check_cmd_13_db <= 16'd13;
-      if (check_cmd_17_db_en) check_cmd_17_db <= received_data[7:0];
-      else if (clear_db) check_cmd_17_db <= 8'd17;
-      if (check_read_db_en) check_read_db <= {7'b0, crc_error};
-      else if (clear_db) check_read_db <= 8'b11110000;
-      if (check_error_token_db_en) check_error_token_db <= received_data[7:0];
-      else if (clear_db) check_error_token_db <= 8'b10101010;
+      if (tick) begin
+        cs    <= new_cs;
+        state <= new_state;
+        if (state_return_en) state_return <= new_state_return;
+        else state_return <= state_return;
+        if (response_type_en) response_type <= new_response_type;
+        else response_type <= response_type;
+        if (check_cmd_0_db_en) check_cmd_0_db <= received_data[7:0];
+        if (check_cmd_8_db_en) check_cmd_8_db <= received_data[39:32];
+        if (check_cmd_55_db_en) check_cmd_55_db <= received_data[7:0];
+        if (check_cmd_59_db_en) check_cmd_59_db <= received_data[7:0];
+        if (check_acmd_41_db_en) check_acmd_41_db <= received_data[7:0];
+        if (check_cmd_16_db_en) check_cmd_16_db <= received_data[7:0];
+        if (check_cmd_24_db_en) check_cmd_24_db <= received_data[7:0];
+        else if (clear_db) check_cmd_24_db <= 8'd24;
+        if (check_write_db_en) check_write_db <= received_data[7:0];
+        else if (clear_db) check_write_db <= 8'd10;
+        if (check_cmd_13_db_en) check_cmd_13_db <= received_data[15:0];
+        else if (clear_db) check_cmd_13_db <= 16'd13;
+        if (check_cmd_17_db_en) check_cmd_17_db <= received_data[7:0];
+        else if (clear_db) check_cmd_17_db <= 8'd17;
+        if (check_read_db_en) check_read_db <= {7'b0, crc_error};
+        else if (clear_db) check_read_db <= 8'b11110000;
+        if (check_error_token_db_en) check_error_token_db <= received_data[7:0];
+        else if (clear_db) check_error_token_db <= 8'b10101010;
+      end
     end
   end
 
@@ -334,9 +353,11 @@ module sd_controller #(
         if (~miso) begin
           new_state = state;
         end else if (wr_en) begin
-          new_state = SendCmd24;
+          if (burst) new_state = SendCmd25;
+          else new_state = SendCmd24;
         end else if (rd_en) begin
-          new_state = SendCmd17;
+          if (burst) new_state = SendCmd18;
+          else new_state = SendCmd17;
         end else new_state = state;
       end
 
@@ -354,10 +375,24 @@ module sd_controller #(
         else new_state = state;
       end
 
-      CheckCmd24: begin  // Checa R1 do CMD24
+      SendCmd25: begin  // Escrita de vários blocos: um por beat do burst
+        clear_db = 1'b1;
+        cmd_index = Cmd25;
+        argument = cmd_argument_t'(addr_reg);
+        new_response_type = R1;
+        response_type_en = 1'b1;
+        new_state_return = CheckCmd24;
+        state_return_en = 1'b1;
+        sender_valid = 1'b1;
+        new_cs = 1'b0;
+        if (~sender_ready) new_state = WaitSendCmd;
+        else new_state = state;
+      end
+
+      CheckCmd24: begin  // Checa R1 do CMD24/CMD25
         check_cmd_24_db_en = 1'b1;
         new_cs = 1'b0;
-        cmd_or_data = Data;
+        cmd_or_data = multi_block ? MultiData : Data;
         new_response_type = DataToken;
         response_type_en = 1'b1;
         new_state_return = CheckWrite;
@@ -371,7 +406,41 @@ module sd_controller #(
         check_write_db_en = 1'b1;
         new_cs = 1'b0;
         new_ack = 1'b1;
-        new_state = SendCmd13;
+        if (!multi_block) new_state = SendCmd13;
+        else if (burst) new_state = WriteNextBlock;
+        else new_state = SendStopToken;
+      end
+
+      WriteNextBlock: begin  // Espera o próximo beat do burst de escrita
+        new_cs = 1'b0;
+        if (ack) new_state = state;
+        else if (wr_en) new_state = SendBlock;
+        else if (~wb_if_s.cyc) new_state = SendStopToken;  // Burst abortado
+        else new_state = state;
+      end
+
+      SendBlock: begin  // Envia o próximo bloco do CMD25
+        new_cs = 1'b0;
+        cmd_or_data = MultiData;
+        new_response_type = DataToken;
+        response_type_en = 1'b1;
+        new_state_return = CheckWrite;
+        state_return_en = 1'b1;
+        sender_valid = 1'b1;
+        if (~sender_ready) new_state = WaitSendCmd;
+        else new_state = state;
+      end
+
+      SendStopToken: begin  // Encerra o CMD25 e espera o cartão terminar de gravar
+        new_cs = 1'b0;
+        cmd_or_data = StopToken;
+        new_response_type = Busy;
+        response_type_en = 1'b1;
+        new_state_return = SendCmd13;
+        state_return_en = 1'b1;
+        sender_valid = 1'b1;
+        if (~sender_ready) new_state = WaitSendCmd;
+        else new_state = state;
       end
 
       SendCmd13: begin
@@ -404,7 +473,21 @@ module sd_controller #(
         else new_state = state;
       end
 
-      CheckCmd17: begin  // Checa R1 do CMD17
+      SendCmd18: begin  // Leitura de vários blocos: um por beat do burst
+        clear_db = 1'b1;
+        cmd_index = Cmd18;
+        argument = cmd_argument_t'(addr_reg);
+        new_response_type = R1;
+        response_type_en = 1'b1;
+        new_state_return = CheckCmd17;
+        state_return_en = 1'b1;
+        sender_valid = 1'b1;
+        new_cs = 1'b0;
+        if (~sender_ready) new_state = WaitSendCmd;
+        else new_state = state;
+      end
+
+      CheckCmd17: begin  // Checa R1 do CMD17/CMD18
         check_cmd_17_db_en = 1'b1;
         sck_en = 1'b0;
         new_cs = 1'b0;
@@ -427,7 +510,39 @@ module sd_controller #(
         check_read_db_en = 1'b1;
         new_cs = 1'b0;
         new_ack = 1'b1;
-        new_state = Final;
+        if (!multi_block) new_state = Final;
+        else if (burst) new_state = ReadNextBlock;
+        else new_state = SendCmd12;
+      end
+
+      // Espera o próximo beat do burst com o clock do SPI parado, o que pausa o envio de blocos
+      // pelo cartão
+      ReadNextBlock: begin
+        sck_en = 1'b0;
+        new_cs = 1'b0;
+        if (ack) new_state = state;
+        else if (rd_en) begin
+          new_response_type = DataBlock;
+          new_state_return = CheckRead;
+          response_type_en = 1'b1;
+          state_return_en = 1'b1;
+          receiver_valid = 1'b1;
+          if (~receiver_ready) new_state = WaitReceiveCmd;
+          else new_state = state;
+        end else if (~wb_if_s.cyc) new_state = SendCmd12;  // Burst abortado
+        else new_state = state;
+      end
+
+      SendCmd12: begin  // Encerra o CMD18 (R1b)
+        cmd_index = Cmd12;
+        new_response_type = R1b;
+        response_type_en = 1'b1;
+        new_state_return = sd_controller_pkg::Idle;
+        state_return_en = 1'b1;
+        sender_valid = 1'b1;
+        new_cs = 1'b0;
+        if (~sender_ready) new_state = WaitSendCmd;
+        else new_state = state;
       end
 
       CheckErrorToken: begin
@@ -450,12 +565,34 @@ module sd_controller #(
     if (wb_if_s.reset) begin
       addr_reg <= 32'h0;
       write_data_reg <= 4096'h0;
-    end else if ((state == sd_controller_pkg::Idle) & (rd_en | wr_en)) begin
+      multi_block <= 1'b0;
+    end else if (tick & (state == sd_controller_pkg::Idle) & (rd_en | wr_en)) begin
       addr_reg <= wb_if_s.addr;
       write_data_reg <= wb_if_s.dat_i_s;
+      multi_block <= (new_state == SendCmd18) | (new_state == SendCmd25);
+    end else if (tick & (state == WriteNextBlock) & ~ack & wr_en) begin
+      write_data_reg <= wb_if_s.dat_i_s;
     end else begin
       addr_reg <= addr_reg;
       write_data_reg <= write_data_reg;
+      multi_block <= multi_block;
+    end
+  end
+
+  // Clock do SPI: o controlador avança um bit por tick, a cada clock_div ciclos. A inicialização
+  // deve ser feita a no máximo 400 kHz; depois dela o clock pode subir para até 25 MHz
+  assign clock_div = initialized ? CLOCK_DIV : INIT_CLOCK_DIV;
+  assign tick = clock_counter == clock_div - 1'b1;
+
+  always_ff @(posedge wb_if_s.clock, posedge wb_if_s.reset) begin
+    if (wb_if_s.reset) begin
+      clock_counter <= '0;
+      initialized <= 1'b0;
+    end else if (tick) begin
+      clock_counter <= '0;
+      if (new_state == sd_controller_pkg::Idle) initialized <= 1'b1;
+    end else begin
+      clock_counter <= clock_counter + 1'b1;
     end
   end
 
@@ -465,6 +602,7 @@ module sd_controller #(
   assign wb_if_s.dat_o_s = received_data;
   assign wb_if_s.ack = ack;
 
-  assign sck   = sck_en & ~wb_if_s.clock;
+  // Subida do sck no meio do bit (com clock_div == 1, na descida do clock)
+  assign sck = sck_en & (clock_div == 1 ? ~wb_if_s.clock : {clock_counter, 1'b0} >= clock_div);
 
 endmodule
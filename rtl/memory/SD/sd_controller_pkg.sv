@@ -1,7 +1,7 @@
 
 package sd_controller_pkg;
 
-  typedef enum logic [4:0] {
+  typedef enum logic [5:0] {
     InitBegin,
     WaitSendCmd,
     WaitReceiveCmd,
@@ -27,16 +27,26 @@ package sd_controller_pkg;
     SendCmd13,
     CheckCmd13,
     CheckErrorToken,
-    Final
+    Final,
+    SendCmd18,
+    ReadNextBlock,
+    SendCmd12,
+    SendCmd25,
+    WriteNextBlock,
+    SendBlock,
+    SendStopToken
   } sd_controller_fsm_t;
 
   typedef enum logic [5:0] {
     Cmd0 = 6'd00,
     Cmd8 = 6'd08,
+    Cmd12 = 6'd12,
     Cmd13 = 6'd13,
     Cmd16 = 6'd16,
     Cmd17 = 6'd17,
+    Cmd18 = 6'd18,
     Cmd24 = 6'd24,
+    Cmd25 = 6'd25,
     Cmd41 = 6'd41,
     Cmd55 = 6'd55,
     Cmd59 = 6'd59
@@ -5,6 +5,7 @@ module sd_receiver (
     // Comum
     input wire clock,
     input wire reset,
+    input wire tick,  // Um bit do SPI por tick
 
     // Controlador
     input sd_receiver_response_t response_type,
@@ -22,6 +23,7 @@ module sd_receiver (
   reg _ready;
 
   sd_receiver_response_size_t transmission_size;  // R1: 7, R3 e R7: 39, Data: 4112
+  wire wait_busy;  // Resposta seguida de busy
   wire [12:0] bits_received;
   wire [4095:0] data_received;
   reg [15:0] crc16;
@@ -41,11 +43,11 @@ module sd_receiver (
       .init_value(4113)
   ) bit_counter (
       .clock(clock),
-      .load(init_transmission),  // Carrega a cada nova transmissão
+      .load(init_transmission & tick),  // Carrega a cada nova transmissão
       .load_value(transmission_size),
       .reset(reset),
       .inc_enable(1'b0),
-      .dec_enable(receiving),
+      .dec_enable(receiving & tick),
       .value(bits_received)
   );
 
@@ -56,6 +58,8 @@ module sd_receiver (
       DataToken: transmission_size = R1OrDataTokenSize;
       DataBlock: transmission_size = DataBlockSize;
       R2: transmission_size = R2Size;
+      R1b: transmission_size = R1OrDataTokenSize;
+      Busy: transmission_size = R1OrDataTokenSize;  // Ignora o byte antes do busy
       default: transmission_size = R2Size;
     endcase
   end
@@ -68,7 +72,7 @@ module sd_receiver (
       .clock(clock),
       .reset(reset),
       // Paro o reg antes dele pegar o CRC16
-      .enable(receiving && !((response_type == DataBlock) && bits_received <= 16)),
+      .enable(tick && receiving && !((response_type == DataBlock) && bits_received <= 16)),
       .D({data_received[4094:0], miso}),
       .Q(data_received)
   );
@@ -77,7 +81,7 @@ module sd_receiver (
   always_ff @(posedge clock) begin
     if (reset | init_transmission) begin
       crc16 <= 16'b0;
-    end else if (receiving) begin
+    end else if (receiving && tick) begin
       crc16[0] <= crc16[15] ^ miso;
       crc16[4:1] <= crc16[3:0];
       crc16[5] <= crc16[4] ^ crc16[15] ^ miso;
@@ -90,7 +94,7 @@ module sd_receiver (
   // FSM
   always_ff @(posedge clock, posedge reset) begin
     if (reset) state <= sd_receiver_pkg::Idle;
-    else state <= new_state;
+    else if (tick) state <= new_state;
   end
 
   task automatic reset_signals;
@@ -111,7 +115,8 @@ module sd_receiver (
         _ready = 1'b1;
         end_transmission = 1'b1;
         if (valid) begin
-          if (~miso) begin
+          // Busy não tem start bit: só espera um byte antes de checar o busy
+          if (~miso || response_type == Busy) begin
             init_transmission = 1'b1;
             receiving = 1'b1;
             new_state = Receiving;
@@ -130,7 +135,7 @@ module sd_receiver (
       Receiving: begin
         if (bits_received == 13'b0) begin
           end_transmission = 1'b1;
-          if (response_type == DataToken) new_state = WaitBusy;
+          if (wait_busy) new_state = WaitBusy;
           else new_state = sd_receiver_pkg::Idle;
         end else begin
           receiving = 1'b1;
@@ -150,6 +155,8 @@ module sd_receiver (
     endcase
   end
 
+  assign wait_busy = response_type == DataToken || response_type == R1b || response_type == Busy;
+
   // Saídas
   assign crc_error  = end_transmission && ((response_type == DataBlock) && (crc16 != 0));
   assign ready = _ready;
@@ -13,7 +13,9 @@ package sd_receiver_pkg;
     R3OrR7,
     DataToken,
     DataBlock,
-    R2
+    R2,
+    R1b,  // R1 seguido de busy (CMD12)
+    Busy  // Apenas busy, após o stop token do CMD25
   } sd_receiver_response_t;
 
   typedef enum logic [12:0] {
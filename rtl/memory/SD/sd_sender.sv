@@ -5,11 +5,12 @@ import sd_controller_pkg::cmd_index_t;
 module sd_sender (
     input wire clock,
     input wire reset,
+    input wire tick,  // Um bit do SPI por tick
 
     // interface com o controlador
     input cmd_index_t cmd_index,
     input wire [31:0] argument,
-    input sd_sender_chunk_t cmd_or_data,  // 0: cmd; 1: data
+    input sd_sender_chunk_t cmd_or_data,
     output wire ready,
     input wire valid,
     input wire [4095:0] data,
@@ -21,28 +22,57 @@ module sd_sender (
     output reg [15:0] crc16_db
 );
 
-  reg cmd_or_data_reg;
+  sd_sender_chunk_t cmd_or_data_reg;
   reg _ready;
   wire _mosi;
 
   wire [12:0] bits_sent;
   wire [4103:0] cmd_reg;
+  reg [12:0] chunk_size;
+  reg [4103:0] chunk;
+  wire data_chunk;
 
   sd_sender_fsm_t state, new_state;
   reg sending;
 
   reg [15:0] crc16_db_;
 
+  // Blocos de dados: start token + 4096 bits + CRC16; stop token: só o token
+  always_comb begin
+    unique case (cmd_or_data)
+      Cmd: begin
+        chunk_size = 13'd48;
+        chunk = {1'b0, 1'b1, cmd_index, argument, {4064{1'b1}}};
+      end
+      Data: begin
+        chunk_size = 13'd4120;
+        chunk = {8'hFE, data};
+      end
+      MultiData: begin
+        chunk_size = 13'd4120;
+        chunk = {8'hFC, data};
+      end
+      StopToken: begin
+        chunk_size = 13'd8;
+        chunk = {8'hFD, {4096{1'b1}}};
+      end
+      default: begin
+        chunk_size = 13'd48;
+        chunk = {4104{1'b1}};
+      end
+    endcase
+  end
+
   sync_parallel_counter #(
       .size(13),
       .init_value(0)
   ) bit_counter (
       .clock(clock),
-      .load(_ready & valid),
-      .load_value(cmd_or_data ? 13'd4120 : 13'd48),
+      .load(_ready & valid & tick),
+      .load_value(chunk_size),
       .reset(reset),
       .inc_enable(1'b0),
-      .dec_enable(sending),
+      .dec_enable(sending & tick),
       .value(bits_sent)
   );
 
@@ -52,19 +82,16 @@ module sd_sender (
   ) reg_cmd (
       .clock(clock),
       .reset(reset),
-      .enable((_ready & valid) | sending),
-      .D((~sending) ?
-            (cmd_or_data ?
-                {8'hFE, data} : {1'b0, 1'b1, cmd_index, argument, {4064{1'b1}}})
-            : {cmd_reg[4102:0], 1'b1}),
+      .enable(((_ready & valid) | sending) & tick),
+      .D((~sending) ? chunk : {cmd_reg[4102:0], 1'b1}),
       .Q(cmd_reg)
   );
 
   always_ff @(posedge clock, posedge reset) begin
     if (reset) begin
-      state <= Idle;
-      cmd_or_data_reg <= 1'b0;
-    end else begin
+      state <= sd_sender_pkg::Idle;
+      cmd_or_data_reg <= Cmd;
+    end else if (tick) begin
       state <= new_state;
       cmd_or_data_reg <= (valid & _ready) ? cmd_or_data : cmd_or_data_reg;
     end
@@ -81,7 +108,7 @@ module sd_sender (
     reset_signals;
 
     case (state)
-      Idle: begin
+      sd_sender_pkg::Idle: begin
         _ready = 1'b1;
         if (valid) begin
           new_state = Sending;
@@ -90,26 +117,29 @@ module sd_sender (
 
       Sending: begin
         sending = |bits_sent;
-        if (bits_sent == 0) new_state = Idle;
+        if (bits_sent == 0) new_state = sd_sender_pkg::Idle;
         else new_state = state;
       end
 
       default: begin
-        new_state = Idle;
+        new_state = sd_sender_pkg::Idle;
       end
     endcase
   end
 
   wire [6:0] crc7;
   reg [15:0] crc16;
-  // CRC generate is complete
+  assign data_chunk = cmd_or_data_reg == Data || cmd_or_data_reg == MultiData;
+  // CRC generate is complete (o stop token não tem CRC)
   wire crc_complete =
-    cmd_or_data_reg ? (bits_sent <= 13'd16 && sending) : (bits_sent <= 13'd8 && sending);
+    data_chunk ? (bits_sent <= 13'd16 && sending) :
+    cmd_or_data_reg == Cmd && (bits_sent <= 13'd8 && sending);
 
   // CRC16 com LFSR
   always_ff @(posedge clock) begin
-    // Limpa quando enviar o start token
-    if (bits_sent == 13'd4113) begin
+    if (!tick) begin
+      crc16 <= crc16;
+    end else if (bits_sent == 13'd4113) begin  // Limpa quando enviar o start token
       crc16 <= 16'b0;
     end else if (!crc_complete) begin  // Calcular CRC
       crc16[0] <= crc16[15] ^ _mosi;
@@ -134,7 +164,7 @@ module sd_sender (
         ) crc_reg_0 (
             .clock(clock),
             .reset(_ready & valid),
-            .enable(1'b1),
+            .enable(tick),
             // Quando o CRC está completo, realiza-se shift
             .D(crc_complete ? 1'b1 : crc7[6] ^ _mosi),
             .Q(crc7[0])
@@ -146,7 +176,7 @@ module sd_sender (
         ) crc_reg_3 (
             .clock(clock),
             .reset(_ready & valid),
-            .enable(1'b1),
+            .enable(tick),
             // Quando o CRC está completo, realiza-se shift
             .D(crc_complete ? crc7[2] : crc7[6] ^ _mosi ^ crc7[2]),
             .Q(crc7[3])
@@ -158,7 +188,7 @@ module sd_sender (
         ) crc_reg (
             .clock(clock),
             .reset(_ready & valid),
-            .enable(1'b1),
+            .enable(tick),
             .D(crc7[i-1]),  // Sempre faz shift
             .Q(crc7[i])
         );
@@ -167,7 +197,7 @@ module sd_sender (
   endgenerate
 
   assign ready = _ready;
-  assign _mosi = crc_complete ? (cmd_or_data_reg ? crc16[15] : crc7[6]) : cmd_reg[4103];
+  assign _mosi = crc_complete ? (data_chunk ? crc16[15] : crc7[6]) : cmd_reg[4103];
   assign mosi  = _mosi;
 
   assign sender_state_db = state;
@@ -176,7 +206,7 @@ module sd_sender (
     if (reset) begin
       crc16_db_ <= 16'b0;
     end else begin
-      if (cmd_or_data_reg && crc_complete && (bits_sent == 13'd16)) begin
+      if (tick && data_chunk && crc_complete && (bits_sent == 13'd16)) begin
         crc16_db_ <= crc16;
       end else begin
         crc16_db_ <= crc16_db_;
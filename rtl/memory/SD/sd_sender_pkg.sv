@@ -6,9 +6,11 @@ package sd_sender_pkg;
     Sending
   } sd_sender_fsm_t;
 
-  typedef enum logic {
+  typedef enum logic [1:0] {
     Cmd,
-    Data
+    Data,  // Bloco do CMD24 (start token 0xFE)
+    MultiData,  // Bloco do CMD25 (start token 0xFC)
+    StopToken  // Fim do CMD25 (stop token 0xFD)
   } sd_sender_chunk_t;
 
 endpackage
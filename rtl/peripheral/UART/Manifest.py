@@ -7,6 +7,7 @@ files = [
     "uart_bank.sv",
     "uart_fsm.sv",
     "uart_phy.sv",
+    "uart_dma.sv",
     "uart.sv"
 ]
 
@@ -24,6 +24,8 @@ module fifo #(
 
   // fifo
   reg [DATA_SIZE-1:0] fifo_memory[DEPTH-1:0];
+  reg [DATA_SIZE-1:0] _rd_data;
+  wire [$clog2(DEPTH)-1:0] next_rd_reg;
 
   // Sinais intermediários
   wire _full;
@@ -33,9 +35,10 @@ module fifo #(
 
   // Contadores
   // Leitura não é permitido quando estiver vazio
+  // Começa em DEPTH-1 (-1'b1 seria estendido para 1 no parâmetro de $clog2(DEPTH) bits)
   sync_parallel_counter #(
       .size($clog2(DEPTH)),
-      .init_value(-1'b1)
+      .init_value({$clog2(DEPTH) {1'b1}})
   ) rd_pointer (
       .clock(clock),
       .reset(reset),
@@ -78,8 +81,15 @@ module fifo #(
     if (wr_en == 1'b1 && _full == 1'b0) fifo_memory[wr_reg] <= wr_data;
   end
 
-  // Leitura da fifo
-  assign rd_data = fifo_memory[rd_reg];
+  // Leitura da fifo: registrada, para que FIFOs grandes sejam mapeadas em block RAM
+  // (o dado lido fica disponível no ciclo seguinte ao rd_en, como antes)
+  assign next_rd_reg = rd_reg + 1'b1;
+
+  always_ff @(posedge clock) begin
+    if (rd_en == 1'b1 && _empty == 1'b0) _rd_data <= fifo_memory[next_rd_reg];
+  end
+
+  assign rd_data = _rd_data;
 
   // Saídas de Controle
   assign _empty = (watermark_reg == 0);  // vazio, caso watermark_reg = 0
@@ -1,13 +1,22 @@
 
 module uart #(
     parameter integer LITEX_ARCH = 0,  // 0: SiFive, 1: Litex
-    parameter integer FIFO_DEPTH = 8,
-    parameter integer CLOCK_FREQ_HZ = 10000000
+    parameter integer FIFO_DEPTH = 8,  // até 65536 (FIFOs grandes são mapeadas em block RAM)
+    parameter integer CLOCK_FREQ_HZ = 10000000,
+    parameter integer DMA = 0  // 1: canais de DMA entre a memória e as FIFOs (apenas SiFive)
 ) (
     wishbone_if.secondary wb_if_s,
     input wire rxd,  // dado serial
     output wire txd,  // dado de transmissão
     output wire interrupt,
+    // DMA: acessos de um byte à memória (ignorados se DMA = 0)
+    output wire dma_cyc,
+    output wire dma_we,
+    output wire [31:0] dma_addr,
+    output wire [3:0] dma_sel,
+    output wire [31:0] dma_wr_data,
+    input wire dma_ack,
+    input wire [31:0] dma_rd_data,
     output wire [15:0] div_db,
     output wire rx_pending_db,
     output wire tx_pending_db,
@@ -23,7 +32,7 @@ module uart #(
     output wire tx_fifo_full_db,
     output wire [7:0] txdata_db,
     output wire [2:0] present_state_db,
-    output wire [2:0] addr_db,
+    output wire [3:0] addr_db,
     output wire [31:0] wr_data_db,
     output wire rx_data_valid_db,
     output wire tx_data_valid_db,
@@ -34,10 +43,12 @@ module uart #(
     output wire rx_status_db
 );
 
+  localparam integer Dma = LITEX_ARCH ? 0 : DMA;
+
   // Internal interface signals
   wire                          rd_en;
   wire                          wr_en;
-  wire [                   2:0] _addr;
+  wire [                   3:0] _addr;
   wire [                  31:0] _wr_data;
 
   // Component's signals
@@ -48,15 +59,27 @@ module uart #(
   wire [                  15:0] div;
   wire [$clog2(FIFO_DEPTH)-1:0] txcnt;
   wire [$clog2(FIFO_DEPTH)-1:0] rxcnt;
-  wire [                   7:0] tx_fifo_wr_data;
+  wire [                   7:0] bank_tx_fifo_wr_data;
   // FSM
   wire                          op;
   wire                          bank_rd_en;
   wire                          bank_wr_en;
   wire                          rxdata_wr_en;
+  wire                          fsm_tx_fifo_wr_en;
+  wire                          fsm_rx_fifo_rd_en;
+  // DMA
+  wire [                  31:0] tx_dma_addr;
+  wire [                  31:0] tx_dma_length;
+  wire [                  31:0] rx_dma_addr;
+  wire [                  31:0] rx_dma_length;
+  wire                          dma_tx_fifo_wr_en;
+  wire [                   7:0] dma_tx_fifo_wr_data;
+  wire                          dma_rx_fifo_rd_en;
+  // PHY
   wire                          tx_fifo_wr_en;
+  wire [                   7:0] tx_fifo_wr_data;
   wire                          rx_fifo_rd_en;
-  // PHY
+  wire                          rx_fifo_push;
   wire [                   7:0] rx_fifo_rd_data;
   wire                          tx_fifo_full;
   wire                          rx_fifo_full;
@@ -72,13 +95,13 @@ module uart #(
 
   // Bufferizando entradas
   register_d #(
-      .N(3),
+      .N(4),
       .reset_value(0)
   ) addr_reg (
       .clock(wb_if_s.clock),
       .reset(wb_if_s.reset),
       .enable((rd_en | wr_en) && !op),
-      .D(wb_if_s.addr[4:2]),
+      .D(wb_if_s.addr[5:2]),
       .Q(_addr)
   );
 
@@ -97,7 +120,8 @@ module uart #(
   uart_bank #(
       .LITEX_ARCH(LITEX_ARCH),
       .FIFO_DEPTH(FIFO_DEPTH),
-      .CLOCK_FREQ_HZ(CLOCK_FREQ_HZ)
+      .CLOCK_FREQ_HZ(CLOCK_FREQ_HZ),
+      .DMA(Dma)
   ) bank (
       // COMMON
       .clock(wb_if_s.clock),
@@ -127,14 +151,20 @@ module uart #(
       .div(div),
       .txcnt(txcnt),
       .rxcnt(rxcnt),
-      .tx_fifo_wr_data(tx_fifo_wr_data),
+      .tx_fifo_wr_data(bank_tx_fifo_wr_data),
       .rx_fifo_rd_data(rx_fifo_rd_data),
       .tx_fifo_full(tx_fifo_full),
       .rx_fifo_full(rx_fifo_full),
       .tx_fifo_empty(tx_fifo_empty),
       .rx_fifo_empty(rx_fifo_empty),
       .tx_fifo_less_than_watermark(tx_fifo_less_than_watermark),
-      .rx_fifo_greater_than_watermark(rx_fifo_greater_than_watermark)
+      .rx_fifo_greater_than_watermark(rx_fifo_greater_than_watermark),
+      .rx_fifo_access(rx_fifo_push | rx_fifo_rd_en),
+      // DMA
+      .tx_dma_addr(tx_dma_addr),
+      .tx_dma_length(tx_dma_length),
+      .rx_dma_addr(rx_dma_addr),
+      .rx_dma_length(rx_dma_length)
   );
 
   // FSM
@@ -156,10 +186,56 @@ module uart #(
       // DEBUG
       .present_state_db(present_state_db),
       // PHY
-      .tx_fifo_wr_en(tx_fifo_wr_en),
-      .rx_fifo_rd_en(rx_fifo_rd_en)
+      .tx_fifo_wr_en(fsm_tx_fifo_wr_en),
+      .rx_fifo_rd_en(fsm_rx_fifo_rd_en)
   );
 
+  // DMA
+  generate
+    if (Dma) begin : gen_dma
+      uart_dma dma (
+          // COMMON
+          .clock(wb_if_s.clock),
+          .reset(wb_if_s.reset),
+          .addr(_addr),
+          .wr_data(_wr_data),
+          // FSM
+          .bank_wr_en(bank_wr_en),
+          // BANK
+          .tx_dma_addr(tx_dma_addr),
+          .tx_dma_length(tx_dma_length),
+          .rx_dma_addr(rx_dma_addr),
+          .rx_dma_length(rx_dma_length),
+          // PHY
+          .tx_fifo_wr_en(dma_tx_fifo_wr_en),
+          .tx_fifo_wr_data(dma_tx_fifo_wr_data),
+          .tx_fifo_full(tx_fifo_full),
+          .tx_fifo_busy(fsm_tx_fifo_wr_en),
+          .rx_fifo_rd_en(dma_rx_fifo_rd_en),
+          .rx_fifo_rd_data(rx_fifo_rd_data),
+          .rx_fifo_empty(rx_fifo_empty),
+          .rx_fifo_busy(fsm_rx_fifo_rd_en),
+          // BUS
+          .bus_cyc(dma_cyc),
+          .bus_we(dma_we),
+          .bus_addr(dma_addr),
+          .bus_sel(dma_sel),
+          .bus_wr_data(dma_wr_data),
+          .bus_ack(dma_ack),
+          .bus_rd_data(dma_rd_data)
+      );
+    end else begin : gen_no_dma
+      assign {tx_dma_addr, tx_dma_length, rx_dma_addr, rx_dma_length} = '0;
+      assign {dma_tx_fifo_wr_en, dma_tx_fifo_wr_data, dma_rx_fifo_rd_en} = '0;
+      assign {dma_cyc, dma_we, dma_addr, dma_sel, dma_wr_data} = '0;
+    end
+  endgenerate
+
+  // As FIFOs são compartilhadas pela FSM e pelo DMA, que só as acessa quando a FSM não acessa
+  assign tx_fifo_wr_en = fsm_tx_fifo_wr_en | dma_tx_fifo_wr_en;
+  assign tx_fifo_wr_data = fsm_tx_fifo_wr_en ? bank_tx_fifo_wr_data : dma_tx_fifo_wr_data;
+  assign rx_fifo_rd_en = fsm_rx_fifo_rd_en | dma_rx_fifo_rd_en;
+
   // PHY
   uart_phy #(
       .FIFO_DEPTH(FIFO_DEPTH)
@@ -185,6 +261,7 @@ module uart #(
       // FSM
       .tx_fifo_wr_en(tx_fifo_wr_en),
       .rx_fifo_rd_en(rx_fifo_rd_en),
+      .rx_fifo_push(rx_fifo_push),
       // DEBUG
       .rx_data_valid_db(rx_data_valid_db),
       .tx_data_valid_db(tx_data_valid_db),
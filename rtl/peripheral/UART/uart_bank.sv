@@ -2,12 +2,13 @@
 module uart_bank #(
     parameter integer LITEX_ARCH = 0,
     parameter integer FIFO_DEPTH = 8,
-    parameter integer CLOCK_FREQ_HZ = 10000000
+    parameter integer CLOCK_FREQ_HZ = 10000000,
+    parameter integer DMA = 0
 ) (
     // COMMON
     input  wire                          clock,
     input  wire                          reset,
-    input  wire [                   2:0] addr,
+    input  wire [                   3:0] addr,
     input  wire [                  31:0] wr_data,
     output wire [                  31:0] rd_data,
     output wire                          interrupt,
@@ -30,6 +31,12 @@ module uart_bank #(
     input  wire                          rx_fifo_empty,
     input  wire                          tx_fifo_less_than_watermark,
     input  wire                          rx_fifo_greater_than_watermark,
+    input  wire                          rx_fifo_access,
+    // DMA
+    input  wire [                  31:0] tx_dma_addr,
+    input  wire [                  31:0] tx_dma_length,
+    input  wire [                  31:0] rx_dma_addr,
+    input  wire [                  31:0] rx_dma_length,
   // DEBUG
     output wire                          tx_pending_db,
     output wire                          rx_pending_db,
@@ -45,6 +52,7 @@ module uart_bank #(
   import uart_pkg::*;
 
   localparam integer DivInit = CLOCK_FREQ_HZ / (115200) - 1;
+  localparam integer CountSize = $clog2(FIFO_DEPTH);
 
   // Transmit Data Register
   wire [7:0] _txdata;
@@ -53,10 +61,10 @@ module uart_bank #(
   // Transmit Control Register
   wire _txen;
   wire _nstop;
-  wire [2:0] _txcnt;
+  wire [CountSize-1:0] _txcnt;
   // Receive Control Register
   wire _rxen;
-  wire [2:0] _rxcnt;
+  wire [CountSize-1:0] _rxcnt;
   // Receive Empty Register
   wire _rx_fifo_empty;
   // Interrupt Status Register
@@ -65,13 +73,18 @@ module uart_bank #(
   // Interrupt Pending Register
   wire tx_pending;
   wire rx_pending;
+  wire [4:0] pending;  // uart_irq_t
   // Interrupt Enable Register
   wire tx_pending_en;
   wire rx_pending_en;
+  wire [4:0] pending_en;
   // Baud Rate Divisor Register
   wire [15:0] _div;
+  // Receive Timeout Register
+  wire [15:0] _rx_timeout;
+  wire rx_timeout_pending;
 
-  function automatic addr_en(input integer litex_arch, input reg [2:0] addr,
+  function automatic addr_en(input integer litex_arch, input reg [3:0] addr,
                              input uart_addr_t addr_type);
     begin
       unique case (addr_type)
@@ -88,6 +101,7 @@ module uart_bank #(
         TxControl: addr_en = litex_arch ? 1'b0 : (addr == SiFiveTxControl);
         RxControl: addr_en = litex_arch ? 1'b0 : (addr == SiFiveRxControl);
         ClockDiv: addr_en = litex_arch ? 1'b0 : (addr == SiFiveClockDiv);
+        RxTimeout: addr_en = litex_arch ? 1'b0 : (addr == SiFiveRxTimeout);
         default: addr_en = 1'b0;  // Reserved
       endcase
     end
@@ -118,15 +132,16 @@ module uart_bank #(
   );
   // Interrupt Enable Register
   register_d #(
-      .N(2),
+      .N(5),
       .reset_value(0)
   ) interrupt_enable_register (
       .clock(clock),
       .reset(reset),
       .enable(bank_wr_en & addr_en(LITEX_ARCH, addr, InterruptEn)),
-      .D(wr_data[1:0]),
-      .Q({rx_pending_en, tx_pending_en})
+      .D(wr_data[4:0]),
+      .Q(pending_en)
   );
+  assign {rx_pending_en, tx_pending_en} = pending_en[1:0];
   // Obter empty antes da leitura ser feita
   generate
     if (LITEX_ARCH) begin : gen_litex_regs
@@ -148,9 +163,10 @@ module uart_bank #(
       assign tx_status = ~tx_fifo_full;
       assign rx_status = ~rx_fifo_empty;
       assign _rx_fifo_empty = rx_fifo_empty;
-      assign {_txcnt, _nstop, _txen} = 5'h01;
-      assign {_rxcnt, _rxen} = 4'h1;
+      assign {_txcnt, _nstop, _txen} = {{CountSize{1'b0}}, 2'b01};
+      assign {_rxcnt, _rxen} = {{CountSize{1'b0}}, 1'b1};
       assign _div = DivInit;
+      assign {_rx_timeout, rx_timeout_pending} = '0;
     end else begin : gen_sifive_regs
       register_d #(
           .N(1),
@@ -164,24 +180,24 @@ module uart_bank #(
       );
       // Transmit Control Register
       register_d #(
-          .N(5),
+          .N(CountSize + 2),
           .reset_value(0)
       ) transmit_control_register (
           .clock(clock),
           .reset(reset),
           .enable(bank_wr_en & addr_en(LITEX_ARCH, addr, TxControl)),
-          .D({wr_data[18:16], wr_data[1:0]}),
+          .D({wr_data[16+:CountSize], wr_data[1:0]}),
           .Q({_txcnt, _nstop, _txen})
       );
       // Receive Control Register
       register_d #(
-          .N(4),
+          .N(CountSize + 1),
           .reset_value(0)
       ) receive_control_register (
           .clock(clock),
           .reset(reset),
           .enable(bank_wr_en & addr_en(LITEX_ARCH, addr, RxControl)),
-          .D({wr_data[18:16], wr_data[0]}),
+          .D({wr_data[16+:CountSize], wr_data[0]}),
           .Q({_rxcnt, _rxen})
       );
       // Interrupt Pending Register
@@ -198,6 +214,41 @@ module uart_bank #(
           .D(wr_data[15:0]),
           .Q(_div)
       );
+      // Receive Timeout Register: tempos de bit sem acesso à FIFO de RX, com ela não vazia, até
+      // o pedido de interrupção (0 desabilita)
+      register_d #(
+          .N(16),
+          .reset_value(0)
+      ) receive_timeout_register (
+          .clock(clock),
+          .reset(reset),
+          .enable(bank_wr_en & addr_en(LITEX_ARCH, addr, RxTimeout)),
+          .D(wr_data[15:0]),
+          .Q(_rx_timeout)
+      );
+      reg [15:0] bit_counter, idle_bits;
+      reg _rx_timeout_pending;
+      // O pedido fica ativo até o próximo byte recebido ou lido
+      always_ff @(posedge clock, posedge reset) begin
+        if (reset) begin
+          bit_counter <= '0;
+          idle_bits <= '0;
+          _rx_timeout_pending <= 1'b0;
+        end else if (rx_fifo_empty || rx_fifo_access || _rx_timeout == '0) begin
+          bit_counter <= '0;
+          idle_bits <= '0;
+          _rx_timeout_pending <= 1'b0;
+        end else if (!_rx_timeout_pending) begin
+          if (bit_counter == _div) begin
+            bit_counter <= '0;
+            idle_bits <= idle_bits + 1'b1;
+            if (idle_bits + 1'b1 == _rx_timeout) _rx_timeout_pending <= 1'b1;
+          end else begin
+            bit_counter <= bit_counter + 1'b1;
+          end
+        end
+      end
+      assign rx_timeout_pending = _rx_timeout_pending;
       assign {rx_status, tx_status} = 2'b00;
     end
   endgenerate
@@ -219,21 +270,26 @@ module uart_bank #(
             {31'b0, tx_fifo_full},
             {24'b0, _rxdata}
           }),
-          .S(addr),
+          .S(addr[2:0]),
           .Y(rd_data)
       );
     end else begin : gen_sifive_rd_data
       gen_mux #(
           .size(32),
-          .N(3)
+          .N(4)
       ) read_mux (
           .A({
-            32'b0,
+            {4{32'b0}},
+            rx_dma_length,
+            rx_dma_addr,
+            tx_dma_length,
+            tx_dma_addr,
+            {16'b0, _rx_timeout},
             {16'b0, _div},
-            {30'b0, rx_pending, tx_pending},
-            {30'b0, rx_pending_en, tx_pending_en},
-            {13'b0, _rxcnt, 15'b0, _rxen},
-            {13'b0, _txcnt, 14'b0, _nstop, _txen},
+            {27'b0, pending},
+            {27'b0, pending_en},
+            {{(16 - CountSize) {1'b0}}, _rxcnt, 15'b0, _rxen},
+            {{(16 - CountSize) {1'b0}}, _txcnt, 14'b0, _nstop, _txen},
             {_rx_fifo_empty, 23'b0, _rxdata},
             {tx_fifo_full, 23'b0, _txdata}
           }),
@@ -250,7 +306,15 @@ module uart_bank #(
   assign rxen = _rxen;
   assign rxcnt = _rxcnt;
   assign div = _div;
-  assign interrupt = (tx_pending & tx_pending_en) | (rx_pending & rx_pending_en);
+  // Pedidos de interrupção (uart_irq_t); os canais de DMA pedem enquanto estão parados
+  assign pending = {
+    DMA != 0 && rx_dma_length == '0,
+    DMA != 0 && tx_dma_length == '0,
+    rx_timeout_pending,
+    rx_pending,
+    tx_pending
+  };
+  assign interrupt = |(pending & pending_en);
 
   assign rx_pending_db = rx_pending;
   assign tx_pending_db = tx_pending;
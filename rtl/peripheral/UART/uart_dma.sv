@@ -0,0 +1,155 @@
+
+module uart_dma (
+    // COMMON
+    input  wire        clock,
+    input  wire        reset,
+    input  wire [ 3:0] addr,
+    input  wire [31:0] wr_data,
+    // FSM
+    input  wire        bank_wr_en,
+    // BANK
+    output wire [31:0] tx_dma_addr,
+    output wire [31:0] tx_dma_length,
+    output wire [31:0] rx_dma_addr,
+    output wire [31:0] rx_dma_length,
+    // PHY
+    output wire        tx_fifo_wr_en,
+    output wire [ 7:0] tx_fifo_wr_data,
+    input  wire        tx_fifo_full,
+    input  wire        tx_fifo_busy,     // escrita da FSM na FIFO de TX neste ciclo
+    output wire        rx_fifo_rd_en,
+    input  wire [ 7:0] rx_fifo_rd_data,
+    input  wire        rx_fifo_empty,
+    input  wire        rx_fifo_busy,     // leitura da FSM na FIFO de RX neste ciclo
+    // BUS
+    output wire        bus_cyc,
+    output wire        bus_we,
+    output wire [31:0] bus_addr,
+    output wire [ 3:0] bus_sel,
+    output wire [31:0] bus_wr_data,
+    input  wire        bus_ack,
+    input  wire [31:0] bus_rd_data
+);
+
+  import uart_pkg::*;
+
+  // Canal de transmissão: memória -> FIFO de TX
+  uart_dma_t tx_state;
+  reg [31:0] tx_address, tx_length;
+  reg [7:0] tx_data;
+  wire tx_request, tx_ack, tx_push;
+  // Canal de recepção: FIFO de RX -> memória
+  uart_dma_t rx_state;
+  reg [31:0] rx_address, rx_length;
+  reg [7:0] rx_data;
+  wire rx_request, rx_ack, rx_pop;
+  // Barramento
+  reg bus_locked, rx_owner;
+  wire rx_grant;
+
+  // Escrever o tamanho de um canal parado inicia a transferência; o registrador de tamanho
+  // conta os bytes que faltam e o de endereço aponta para o próximo byte. Escritas nos dois
+  // registradores durante a transferência são ignoradas
+  assign tx_request = tx_state == DmaBus;
+  assign tx_push = tx_state == DmaFifo && !tx_fifo_full && !tx_fifo_busy;
+
+  always_ff @(posedge clock, posedge reset) begin
+    if (reset) begin
+      tx_state   <= DmaIdle;
+      tx_address <= '0;
+      tx_length  <= '0;
+    end else begin
+      if (bank_wr_en && addr == SiFiveTxDmaAddr && tx_state == DmaIdle) tx_address <= wr_data;
+      if (bank_wr_en && addr == SiFiveTxDmaLength && tx_state == DmaIdle) tx_length <= wr_data;
+      unique case (tx_state)
+        DmaIdle: begin
+          if (tx_length != '0) tx_state <= DmaBus;
+        end
+        DmaBus: begin
+          if (tx_ack) tx_state <= DmaFifo;
+        end
+        DmaFifo: begin
+          if (tx_push) begin
+            tx_address <= tx_address + 1'b1;
+            tx_length  <= tx_length - 1'b1;
+            tx_state   <= tx_length == 32'd1 ? DmaIdle : DmaBus;
+          end
+        end
+        default: tx_state <= DmaIdle;
+      endcase
+    end
+  end
+
+  always_ff @(posedge clock) begin
+    if (tx_ack) tx_data <= bus_rd_data[7:0];
+  end
+
+  assign rx_request = rx_state == DmaBus;
+  assign rx_pop = rx_state == DmaFifo && !rx_fifo_empty && !rx_fifo_busy;
+
+  always_ff @(posedge clock, posedge reset) begin
+    if (reset) begin
+      rx_state   <= DmaIdle;
+      rx_address <= '0;
+      rx_length  <= '0;
+    end else begin
+      if (bank_wr_en && addr == SiFiveRxDmaAddr && rx_state == DmaIdle) rx_address <= wr_data;
+      if (bank_wr_en && addr == SiFiveRxDmaLength && rx_state == DmaIdle) rx_length <= wr_data;
+      unique case (rx_state)
+        DmaIdle: begin
+          if (rx_length != '0) rx_state <= DmaFifo;
+        end
+        DmaFifo: begin
+          if (rx_pop) rx_state <= DmaLatch;
+        end
+        // O dado lido da FIFO fica disponível no ciclo seguinte ao rd_en
+        DmaLatch: rx_state <= DmaBus;
+        DmaBus: begin
+          if (rx_ack) begin
+            rx_address <= rx_address + 1'b1;
+            rx_length  <= rx_length - 1'b1;
+            rx_state   <= rx_length == 32'd1 ? DmaIdle : DmaFifo;
+          end
+        end
+        default: rx_state <= DmaIdle;
+      endcase
+    end
+  end
+
+  always_ff @(posedge clock) begin
+    if (rx_state == DmaLatch) rx_data <= rx_fifo_rd_data;
+  end
+
+  // Um canal por vez no barramento, até o ack; na disputa, alterna entre os canais
+  assign rx_grant = bus_locked ? rx_owner : rx_request && (!tx_request || !rx_owner);
+
+  always_ff @(posedge clock, posedge reset) begin
+    if (reset) begin
+      bus_locked <= 1'b0;
+      rx_owner   <= 1'b0;
+    end else if (bus_cyc) begin
+      bus_locked <= !bus_ack;
+      rx_owner   <= rx_grant;
+    end
+  end
+
+  assign tx_ack = bus_ack && !rx_grant;
+  assign rx_ack = bus_ack && rx_grant;
+
+  // Acessos de um byte, com o dado nos bits menos significativos (como os da cache de dados)
+  assign bus_cyc = rx_grant ? rx_request : tx_request;
+  assign bus_we = rx_grant;
+  assign bus_addr = rx_grant ? rx_address : tx_address;
+  assign bus_sel = 4'b0001;
+  assign bus_wr_data = {24'b0, rx_data};
+
+  // Saídas
+  assign tx_dma_addr = tx_address;
+  assign tx_dma_length = tx_length;
+  assign rx_dma_addr = rx_address;
+  assign rx_dma_length = rx_length;
+  assign tx_fifo_wr_en = tx_push;
+  assign tx_fifo_wr_data = tx_data;
+  assign rx_fifo_rd_en = rx_pop;
+
+endmodule
@@ -7,7 +7,7 @@ module uart_fsm #(
     input wire reset,
     input wire rd_en,
     input wire wr_en,
-    input wire [2:0] addr,
+    input wire [3:0] addr,
     output reg op,
     output reg ack,
     // BANK
@@ -29,13 +29,13 @@ module uart_fsm #(
   // FSM
   uart_fsm_t present_state, next_state;  // Estado da transmissão
 
-  function automatic is_txdata_addr(input integer litex_arch, input reg [2:0] addr);
+  function automatic is_txdata_addr(input integer litex_arch, input reg [3:0] addr);
     begin
       is_txdata_addr = litex_arch ? (addr == LitexData) : (addr == SiFiveTxData);
     end
   endfunction
 
-  function automatic is_rxdata_addr(input integer litex_arch, input reg [2:0] addr);
+  function automatic is_rxdata_addr(input integer litex_arch, input reg [3:0] addr);
     begin
       is_rxdata_addr = litex_arch ? (addr == LitexData) : (addr == SiFiveRxData);
     end
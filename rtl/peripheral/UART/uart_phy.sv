@@ -22,6 +22,7 @@ module uart_phy #(
     // FSM
     input  wire                          tx_fifo_wr_en,
     input  wire                          rx_fifo_rd_en,
+    output wire                          rx_fifo_push,  // byte recebido escrito na FIFO
     // SERIAL
     output wire                          txd,
     input  wire                          rxd,
@@ -144,6 +145,8 @@ module uart_phy #(
     end
   end
 
+  assign rx_fifo_push = rx_fifo_wr_en & ~rx_fifo_full_;
+
   // Para evitar múltiplas escritas por ciclo de clock da UART
   // Detecto a borda de subida do rx_data_valid
   always_ff @(posedge clock) begin
@@ -21,7 +21,8 @@ package uart_pkg;
     Status,
     TxControl,
     RxControl,
-    ClockDiv
+    ClockDiv,
+    RxTimeout
   } uart_addr_t;
 
   typedef enum logic [2:0] {
@@ -35,14 +36,36 @@ package uart_pkg;
     LitexRxFull
   } uart_litex_addr_t;
 
-  typedef enum logic [2:0] {
+  typedef enum logic [3:0] {
     SiFiveTxData,
     SiFiveRxData,
     SiFiveTxControl,
     SiFiveRxControl,
     SiFiveInterruptEn,
     SiFivePending,
-    SiFiveClockDiv
+    SiFiveClockDiv,
+    SiFiveRxTimeout,
+    SiFiveTxDmaAddr,
+    SiFiveTxDmaLength,
+    SiFiveRxDmaAddr,
+    SiFiveRxDmaLength
   } uart_sifive_addr_t;
 
+  // Bits dos registradores ie e ip
+  typedef enum logic [2:0] {
+    TxWatermarkIrq,
+    RxWatermarkIrq,
+    RxTimeoutIrq,
+    TxDmaIrq,
+    RxDmaIrq
+  } uart_irq_t;
+
+  // Estado de um canal de DMA
+  typedef enum logic [1:0] {
+    DmaIdle,
+    DmaBus,
+    DmaFifo,
+    DmaLatch
+  } uart_dma_t;
+
 endpackage
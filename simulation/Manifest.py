@@ -1,15 +1,25 @@
 
 action = "simulation"
 sim_tool = "modelsim"
+# modelsim or verilator (hdlmake only resolves the sources for Verilator:
+# run "hdlmake; make sim_pre_cmd sim_post_cmd")
+simulator = "modelsim"
 sim_top = "RV32I_uart_tb"
 use_mif = True
 gui_mode = True
 mif_name = "../uart_test.mif"
-rom_mif_path = "./MIFs/memory/ROM/core/" + mif_name
-ram_mif_path = "./MIFs/memory/RAM/core.mif"
+sim_dir = "."
+rom_mif_path = sim_dir + "/MIFs/memory/ROM/core/" + mif_name
+ram_mif_path = sim_dir + "/MIFs/memory/RAM/core.mif"
 lista_de_extensoes = []
 board_list = ["LITEX", "NEXYS4"]
-vsim_args = " -do vsim_gui.do -voptargs=+acc " if gui_mode else " -c -do vsim_tcl.do "
+# Triggered wave window of core_tb instead of the whole design with +acc: the
+# simulation runs optimized and writes only the cycles around the trigger
+# (e.g. "+WAVE=wave.vcd +WAVE_PC=1a4", see testbench/core/WaveWindow)
+wave_window = ""
+vsim_args = (" -do " + sim_dir + "/vsim_gui.do -voptargs=+acc "
+             if gui_mode and not wave_window
+             else " -c -do " + sim_dir + "/vsim_tcl.do ")
 
 # gerar arquivo de extensões
 extension_file = open("extensions.vh", 'w')
@@ -29,15 +39,23 @@ if use_mif:  # if the testbench needs a mif file
     sim_pre_cmd = ("ln -fs " + rom_mif_path + " ./ROM.mif" + "; "
                    "ln -fs " + ram_mif_path + " ./RAM.mif")
 
+if simulator == "verilator":
+    sim_command = ("python3 " + sim_dir + "/auto_test/verilator_sim.py " +
+                   sim_top)
+else:
+    sim_command = "vsim" + vsim_args + sim_top
+if wave_window:
+    sim_command += " " + wave_window
+
 if use_mif:
-    sim_post_cmd = ("vsim" + vsim_args + sim_top + "; "
+    sim_post_cmd = (sim_command + "; "
                     "rm " + " ./ROM.mif" + "; "
                     "rm " + " ./RAM.mif")
 else:
-    sim_post_cmd = "vsim" + vsim_args + sim_top
+    sim_post_cmd = sim_command
 
 modules = {
     "local": [
-        "../testbench/"
+        sim_dir + "/../testbench/"
     ],
 }
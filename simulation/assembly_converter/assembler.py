@@ -0,0 +1,323 @@
+import argparse
+import os
+import re
+import sys
+from isa import instructions, registers, csrs, fence_bits
+
+# Tradução de pseudoinstruções
+
+
+def li(operands):
+    value = int(operands[1], 0)
+    if -2048 <= value < 2048:
+        return ["addi " + operands[0] + ",x0," + operands[1]]
+    # lui + addi for values that don't fit in 12 bits
+    if not -2**31 <= value < 2**31 - 2048:
+        raise ValueError(f"li immediate {value} out of range")
+    upper = ((value + 0x800) >> 12) & 0xFFFFF
+    lower = value - (((value + 0x800) >> 12) << 12)
+    return ["lui " + operands[0] + "," + str(upper),
+            "addi " + operands[0] + "," + operands[0] + "," + str(lower)]
+
+
+def mv(operands):
+    return ["addi " + operands[0] + "," + operands[1] + ",0"]
+
+
+def sextw(operands):
+    return ["addiw " + operands[0] + "," + operands[1] + ",0"]
+
+
+def jr(operands):
+    return ["jalr x0,0(" + operands[0] + ")"]
+
+
+def j(operands):
+    return ["jal x0," + operands[0]]
+###############################
+
+
+pseudoinstructions = {
+    "li": li,
+    "mv": mv,
+    "sext.w": sextw,
+    "jr": jr,
+    "j": j
+}
+
+label_regex = re.compile(r"^([A-Za-z_.$][\w.$]*):")
+memory_regex = re.compile(r"^(.*)\((\w+)\)$")
+# Listings written by web_scrapper2.py ("<instr> // <word>") and
+# disassembler.py ("<instr> // <address>: <word>")
+# (a line with only "// <word>" holds a word that couldn't be disassembled)
+listing_regex = re.compile(r"//\s*(?:[0-9A-Fa-f]+:\s*)?([0-9A-Fa-f]{8})\s*$")
+
+
+def parse_register(token: str) -> int:
+    if token not in registers:
+        raise ValueError(f"invalid register '{token}'")
+    return registers[token]
+
+
+def parse_immediate(token: str, labels: dict[str, int],
+                    address: int | None = None) -> int:
+    # Labels are converted to pc-relative offsets when address is given
+    if token in labels:
+        return labels[token] - (address if address is not None else 0)
+    try:
+        return int(token, 0)
+    except ValueError:
+        raise ValueError(f"invalid immediate '{token}'") from None
+
+
+def check_range(value: int, bits: int, signed: bool = True) -> int:
+    low, high = (-2**(bits - 1), 2**(bits - 1)) if signed else (0, 2**bits)
+    if not low <= value < high:
+        raise ValueError(f"immediate {value} doesn't fit in {bits} bits")
+    return value & (2**bits - 1)
+
+
+def parse_imm12(token: str, labels: dict[str, int]) -> int:
+    imm = parse_immediate(token, labels)
+    if 2048 <= imm < 4096:
+        imm -= 4096  # 12-bit pattern, e.g. ori t0,x0,0b100000000000
+    return check_range(imm, 12)
+
+
+def parse_memory(token: str, labels: dict[str, int]) -> tuple[int, int]:
+    # imm(rs1)
+    match = memory_regex.match(token)
+    if match is None:
+        raise ValueError(f"invalid memory operand '{token}'")
+    offset = match.group(1).strip() or "0"
+    return parse_imm12(offset, labels), parse_register(match.group(2))
+
+
+def check_operands(operands: list[str], number: int) -> None:
+    if len(operands) != number:
+        raise ValueError(f"expected {number} operands, got {len(operands)}")
+
+
+def encode(mnemonic: str, operands: list[str], address: int,
+           labels: dict[str, int], rv64: bool) -> int:
+    if mnemonic not in instructions:
+        raise ValueError(f"unknown instruction '{mnemonic}'")
+    inst = instructions[mnemonic]
+    if inst.rv64 and not rv64:
+        raise ValueError(f"'{mnemonic}' is only available on RV64I")
+    opcode, funct3, funct7 = inst.opcode, inst.funct3, inst.funct7
+
+    match inst.fmt:
+        case "R":
+            check_operands(operands, 3)
+            rd, rs1, rs2 = (parse_register(token) for token in operands)
+            return (funct7 << 25 | rs2 << 20 | rs1 << 15 | funct3 << 12 |
+                    rd << 7 | opcode)
+        case "I":
+            check_operands(operands, 3)
+            rd, rs1 = parse_register(operands[0]), parse_register(operands[1])
+            imm = parse_imm12(operands[2], labels)
+            return imm << 20 | rs1 << 15 | funct3 << 12 | rd << 7 | opcode
+        case "SH":
+            check_operands(operands, 3)
+            rd, rs1 = parse_register(operands[0]), parse_register(operands[1])
+            # 6-bit shamt only for RV64I non-word shifts
+            shamt_size = 6 if rv64 and opcode == 0b0010011 else 5
+            shamt = check_range(parse_immediate(operands[2], labels),
+                                shamt_size, False)
+            return ((funct7 << 5 | shamt) << 20 | rs1 << 15 | funct3 << 12 |
+                    rd << 7 | opcode)
+        case "L" | "JALR":
+            if inst.fmt == "JALR" and len(operands) == 1:
+                operands = ["x1", "0(" + operands[0] + ")"]  # jalr rs1
+            elif inst.fmt == "JALR" and len(operands) == 3:
+                operands = [operands[0], operands[2] + "(" + operands[1] + ")"]
+            check_operands(operands, 2)
+            rd = parse_register(operands[0])
+            imm, rs1 = parse_memory(operands[1], labels)
+            return imm << 20 | rs1 << 15 | funct3 << 12 | rd << 7 | opcode
+        case "S":
+            check_operands(operands, 2)
+            rs2 = parse_register(operands[0])
+            imm, rs1 = parse_memory(operands[1], labels)
+            return ((imm >> 5) << 25 | rs2 << 20 | rs1 << 15 | funct3 << 12 |
+                    (imm & 0x1F) << 7 | opcode)
+        case "B":
+            check_operands(operands, 3)
+            rs1, rs2 = parse_register(operands[0]), parse_register(operands[1])
+            offset = parse_immediate(operands[2], labels, address)
+            if offset % 2:
+                raise ValueError(f"misaligned branch offset {offset}")
+            imm = check_range(offset, 13)
+            return ((imm >> 12 & 1) << 31 | (imm >> 5 & 0x3F) << 25 |
+                    rs2 << 20 | rs1 << 15 | funct3 << 12 |
+                    (imm >> 1 & 0xF) << 8 | (imm >> 11 & 1) << 7 | opcode)
+        case "U":
+            check_operands(operands, 2)
+            rd = parse_register(operands[0])
+            imm = parse_immediate(operands[1], labels)
+            # Negative values are taken as the signed upper immediate
+            if not -2**19 <= imm < 2**20:
+                raise ValueError(f"immediate {imm} doesn't fit in 20 bits")
+            return (imm & 0xFFFFF) << 12 | rd << 7 | opcode
+        case "J":
+            if len(operands) == 1:
+                operands = ["x1", operands[0]]  # jal offset
+            check_operands(operands, 2)
+            rd = parse_register(operands[0])
+            offset = parse_immediate(operands[1], labels, address)
+            if offset % 2:
+                raise ValueError(f"misaligned jump offset {offset}")
+            imm = check_range(offset, 21)
+            return ((imm >> 20 & 1) << 31 | (imm >> 1 & 0x3FF) << 21 |
+                    (imm >> 11 & 1) << 20 | (imm >> 12 & 0xFF) << 12 |
+                    rd << 7 | opcode)
+        case "CSR" | "CSRI":
+            check_operands(operands, 3)
+            rd = parse_register(operands[0])
+            csr = (csrs[operands[1]] if operands[1] in csrs else
+                   check_range(parse_immediate(operands[1], labels), 12,
+                               False))
+            if inst.fmt == "CSR":
+                rs1 = parse_register(operands[2])
+            else:
+                rs1 = check_range(parse_immediate(operands[2], labels), 5,
+                                  False)
+            return csr << 20 | rs1 << 15 | funct3 << 12 | rd << 7 | opcode
+        case "FENCE":
+            if len(operands) == 0:
+                operands = ["iorw", "iorw"]
+            check_operands(operands, 2)
+            pred, succ = 0, 0
+            for bit in operands[0]:
+                pred |= fence_bits[bit]
+            for bit in operands[1]:
+                succ |= fence_bits[bit]
+            return pred << 24 | succ << 20 | funct3 << 12 | opcode
+        case _:  # SYS
+            check_operands(operands, 0)
+            return funct7 << 20 | funct3 << 12 | opcode
+
+
+def split_line(line: str) -> tuple[str, list[str]]:
+    # Removes comments and returns the mnemonic and its operands
+    code = re.split(r";|#|//", line, maxsplit=1)[0].strip()
+    if len(code) == 0:
+        return "", []
+    fields = code.split(None, 1)
+    operands = []
+    if len(fields) == 2:
+        operands = [operand.strip() for operand in fields[1].split(",")]
+    return fields[0].lower(), operands
+
+
+def read_program(file_path: str) -> tuple[list[tuple[int, str, str, list[str],
+                                                     str | None]],
+                                          dict[str, int]]:
+    # First pass: expand pseudoinstructions and find the label addresses
+    program, labels = [], {}
+    address = 0
+    with open(file_path, 'r') as file:
+        for line_number, line in enumerate(file, 1):
+            line = line.strip()
+            listing = listing_regex.fullmatch(line)
+            if listing is not None:
+                # Listing word the disassembler couldn't decode
+                program.append((line_number, line, ".word",
+                                ["0x" + listing.group(1)], None))
+                address += 4
+                continue
+            if len(line) == 0 or line[0] in [';', '#', '/']:
+                continue
+            match = label_regex.match(line)
+            while match is not None:
+                labels[match.group(1)] = address
+                line = line[match.end():].strip()
+                match = label_regex.match(line)
+            mnemonic, operands = split_line(line)
+            if mnemonic == "":
+                continue
+            listing = listing_regex.search(line)
+            listing_word = listing.group(1) if listing is not None else None
+            if mnemonic in pseudoinstructions:
+                try:
+                    expanded = pseudoinstructions[mnemonic](operands)
+                except (IndexError, ValueError):
+                    raise ValueError(f"{file_path}:{line_number}: invalid "
+                                     f"operands for '{mnemonic}'") from None
+                for text in expanded:
+                    program.append((line_number, text, *split_line(text),
+                                    None))
+                    address += 4
+            else:
+                program.append((line_number, line, mnemonic, operands,
+                                listing_word))
+                address += 4
+    return program, labels
+
+
+def assemble(file_path: str, rv64: bool = True) -> list[tuple[int, str]]:
+    # Returns (machine word, annotation) for each instruction
+    program, labels = read_program(file_path)
+    words, errors = [], []
+    for i, (line_number, text, mnemonic, operands, listing_word) in \
+            enumerate(program):
+        try:
+            if listing_word is not None:
+                # The word of a disassembled listing is kept as it is: the
+                # text may be data or a word the disassembler got wrong
+                word = int(listing_word, 16)
+            elif mnemonic == ".word":
+                check_operands(operands, 1)
+                word = parse_immediate(operands[0], labels) & 0xFFFFFFFF
+            else:
+                word = encode(mnemonic, operands, 4*i, labels, rv64)
+        except ValueError as error:
+            errors.append(f"{file_path}:{line_number}: {error}")
+            continue
+        words.append((word, text))
+    if len(errors) != 0:
+        raise ValueError("\n".join(errors))
+    return words
+
+
+def write_mif(file_path: str, words: list[tuple[int, str]]) -> None:
+    # Byte-per-line (little endian) MIF, annotated with the instruction
+    lines = []
+    for word, text in words:
+        lines.append(f"{word & 0xFF:08b} // {text}\n")
+        lines.append(f"{word >> 8 & 0xFF:08b}\n")
+        lines.append(f"{word >> 16 & 0xFF:08b}\n")
+        lines.append(f"{word >> 24 & 0xFF:08b}\n")
+    with open(file_path, 'w') as file:
+        file.writelines(lines)
+
+
+# MAIN
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assemble RISC-V programs "
+                                     "into byte-per-line MIFs")
+    parser.add_argument("files", nargs="+", help="assembly (.s) files")
+    parser.add_argument("-a", "--arch", choices=["RV32I", "RV64I"],
+                        default="RV64I", help="base ISA (default: RV64I)")
+    parser.add_argument("-o", "--output",
+                        help="output MIF (single file) or directory "
+                             "(default: <name>.mif next to the input)")
+    args = parser.parse_args()
+
+    failed = False
+    for file_path in args.files:
+        name = os.path.splitext(os.path.basename(file_path))[0] + ".mif"
+        if args.output is None:
+            output = os.path.join(os.path.dirname(file_path), name)
+        elif os.path.isdir(args.output) or len(args.files) > 1:
+            os.makedirs(args.output, exist_ok=True)
+            output = os.path.join(args.output, name)
+        else:
+            output = args.output
+        try:
+            write_mif(output, assemble(file_path, args.arch == "RV64I"))
+        except ValueError as error:
+            print(error, file=sys.stderr)
+            failed = True
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,43 @@
+; Integer arithmetic (Dhrystone-like): each iteration calls a function that
+; hashes a state with shifts, adds and logic ops, compares the result and
+; takes a branch that depends on the data. Only the low 32 bits reach the
+; compares, so RV32 and RV64 run the same path
+; iterations: 400
+addi s0,x0,400      ; iterations
+lui  a0,0x12345     ; state
+addi a0,a0,0x678
+addi s1,x0,0        ; checksum
+addi s2,x0,0        ; values with bit 3 set
+loop:
+jal  ra,step        ; a1 = step(a0)
+add  s1,s1,a1
+andi t0,a1,8
+beq  t0,x0,clear    ; data dependent branch
+addi s2,s2,1
+clear:
+addi s0,s0,-1
+bne  s0,x0,loop
+slli s2,s2,16
+xor  a0,s1,s2       ; result
+lui  t0,0x1001
+sw   a0,-4(t0)      ; FinalAddress (0x1000FFC): end of the benchmark
+end:
+jal  x0,end
+step:
+slli t0,a0,5
+add  a0,a0,t0       ; state * 33
+srli t1,a0,7
+andi t1,t1,0x7ff    ; bits 7 to 17
+xor  a0,a0,t1
+addi a0,a0,0x3c7
+andi t2,a0,0xff
+sltiu t3,t2,0x80    ; low byte < 128
+andi t4,a0,0x700
+srli t4,t4,8        ; bits 8 to 10
+sll  t5,t2,t4
+sub  t5,t5,t3
+or   t6,t5,t3
+xor  a1,t6,t1
+and  t2,a1,t2
+add  a1,a1,t2
+jalr x0,0(ra)
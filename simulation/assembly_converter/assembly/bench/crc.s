@@ -0,0 +1,38 @@
+; CRC-16/ARC (reflected polynomial 0xA001), one bit at a time, over a
+; 256-byte buffer. The branch on each bit depends on the data
+; iterations: 2
+lui  s0,0x1006      ; buffer (0x1006000)
+addi s1,s0,256      ; end of the buffer
+lui  s2,0xa
+addi s2,s2,1        ; polynomial (0xA001)
+addi t0,s0,0        ; fill with i * 7 + 3
+addi t1,x0,3
+fill:
+sb   t1,0(t0)
+addi t1,t1,7
+addi t0,t0,1
+bne  t0,s1,fill
+addi s3,x0,2        ; iterations
+addi a0,x0,0        ; crc
+iteration:
+addi t0,s0,0
+byte:
+lbu  t1,0(t0)
+xor  a0,a0,t1
+addi t2,x0,8        ; bits
+bit:
+andi t3,a0,1
+srli a0,a0,1
+beq  t3,x0,next
+xor  a0,a0,s2
+next:
+addi t2,t2,-1
+bne  t2,x0,bit
+addi t0,t0,1
+bne  t0,s1,byte
+addi s3,s3,-1
+bne  s3,x0,iteration
+lui  t0,0x1001
+sw   a0,-4(t0)      ; FinalAddress (0x1000FFC): end of the benchmark
+end:
+jal  x0,end
@@ -0,0 +1,45 @@
+; Linked list walk: builds a list of 64 nodes (next pointer and value) with
+; the nodes scattered over 512 bytes, then walks it adding up the values.
+; Every load depends on the previous one
+; iterations: 24
+lui  s0,0x1004      ; nodes (0x1004000)
+addi s1,x0,64       ; nodes
+addi t0,x0,0        ; node index
+addi t1,x0,0        ; slot of the node (index * 37 mod 64)
+build:
+slli t2,t1,3
+add  t2,t2,s0       ; node address
+addi t1,t1,37
+andi t1,t1,63       ; slot of the next node
+slli t3,t1,3
+add  t3,t3,s0       ; next node address
+addi t0,t0,1
+bne  t0,s1,link
+addi t3,x0,0        ; the last node ends the list
+link:
+sw   t3,0(t2)       ; next
+slli t4,t0,2
+add  t4,t4,t0
+xori t4,t4,0x55
+sw   t4,4(t2)       ; value
+bne  t0,s1,build
+addi s2,x0,24       ; iterations
+addi s3,x0,0        ; checksum
+walk:
+addi t0,s0,0        ; head (slot 0)
+node:
+lw   t1,4(t0)       ; value
+add  s3,s3,t1
+slli t2,s3,1
+srli t3,s3,31
+andi t3,t3,1
+or   s3,t2,t3       ; rotate
+lw   t0,0(t0)       ; next
+bne  t0,x0,node
+addi s2,s2,-1
+bne  s2,x0,walk
+addi a0,s3,0        ; result
+lui  t0,0x1001
+sw   a0,-4(t0)      ; FinalAddress (0x1000FFC): end of the benchmark
+end:
+jal  x0,end
@@ -0,0 +1,70 @@
+; 8x8 matrix multiply of 32-bit integers with mul (M extension), C = A * B,
+; with A[i][j] = i + 2j + 1 and B[i][j] = 3i - j. The checksum is the sum of
+; C modulo 65521 (remu)
+; iterations: 4
+lui  s0,0x1007      ; A (0x1007000)
+addi s1,s0,256      ; B
+addi s2,s1,256      ; C
+addi s3,x0,8        ; size
+addi t0,x0,0        ; i
+init_row:
+addi t1,x0,0        ; j
+init:
+slli t2,t0,3
+add  t2,t2,t1
+slli t2,t2,2        ; (i * 8 + j) * 4
+slli t3,t1,1
+add  t3,t3,t0
+addi t3,t3,1
+add  t4,t2,s0
+sw   t3,0(t4)       ; A[i][j]
+slli t3,t0,1
+add  t3,t3,t0
+sub  t3,t3,t1
+add  t4,t2,s1
+sw   t3,0(t4)       ; B[i][j]
+addi t1,t1,1
+bne  t1,s3,init
+addi t0,t0,1
+bne  t0,s3,init_row
+addi s4,x0,4        ; iterations
+addi s5,x0,0        ; checksum
+iteration:
+addi t0,x0,0        ; i
+row:
+addi t1,x0,0        ; j
+column:
+addi t2,x0,0        ; k
+addi a0,x0,0        ; C[i][j]
+slli a1,t0,5
+add  a1,a1,s0       ; &A[i][0]
+slli a2,t1,2
+add  a2,a2,s1       ; &B[0][j]
+dot:
+lw   a3,0(a1)
+lw   a4,0(a2)
+mul  a5,a3,a4
+add  a0,a0,a5
+addi a1,a1,4
+addi a2,a2,32
+addi t2,t2,1
+bne  t2,s3,dot
+slli a6,t0,3
+add  a6,a6,t1
+slli a6,a6,2
+add  a6,a6,s2
+sw   a0,0(a6)       ; C[i][j]
+add  s5,s5,a0
+addi t1,t1,1
+bne  t1,s3,column
+addi t0,t0,1
+bne  t0,s3,row
+addi s4,s4,-1
+bne  s4,x0,iteration
+lui  t0,0x10
+addi t0,t0,-15      ; 65521
+remu a0,s5,t0       ; result
+lui  t0,0x1001
+sw   a0,-4(t0)      ; FinalAddress (0x1000FFC): end of the benchmark
+end:
+jal  x0,end
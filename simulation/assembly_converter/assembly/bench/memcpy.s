@@ -0,0 +1,63 @@
+; memset and memcpy: fills a 512-byte buffer one word at a time, copies it
+; word by word to a second buffer and copies 128 bytes of it one byte at a
+; time to an unaligned destination, then adds up the copies
+; iterations: 8
+lui  s0,0x1002      ; source buffer (0x1002000)
+lui  s1,0x1003      ; destination buffer (0x1002A00)
+addi s1,s1,-0x600
+addi s2,s1,0x201    ; unaligned destination of the byte copy
+addi s3,x0,8        ; iterations
+addi s4,x0,0        ; checksum
+lui  s5,0x5a5a5     ; fill pattern
+addi s5,s5,0x5a5
+iteration:
+addi t0,s0,0        ; memset
+addi t1,s0,512
+memset:
+sw   s5,0(t0)
+sw   s5,4(t0)
+sw   s5,8(t0)
+sw   s5,12(t0)
+addi t0,t0,16
+bne  t0,t1,memset
+addi s5,s5,0x123    ; next pattern
+addi t0,s0,0        ; memcpy (words)
+addi t2,s1,0
+memcpy:
+lw   t3,0(t0)
+lw   t4,4(t0)
+sw   t3,0(t2)
+sw   t4,4(t2)
+addi t0,t0,8
+addi t2,t2,8
+bne  t0,t1,memcpy
+addi t0,s1,0        ; byte copy
+addi t1,s1,128
+addi t2,s2,0
+bytecopy:
+lbu  t3,0(t0)
+sb   t3,0(t2)
+addi t0,t0,1
+addi t2,t2,1
+bne  t0,t1,bytecopy
+addi t0,s1,0        ; checksum of both copies
+addi t1,s1,512
+sum:
+lw   t3,0(t0)
+add  s4,s4,t3
+addi t0,t0,4
+bne  t0,t1,sum
+addi t0,s2,0
+addi t1,s2,128
+bytesum:
+lbu  t3,0(t0)
+add  s4,s4,t3
+addi t0,t0,1
+bne  t0,t1,bytesum
+addi s3,s3,-1
+bne  s3,x0,iteration
+addi a0,s4,0        ; result
+lui  t0,0x1001
+sw   a0,-4(t0)      ; FinalAddress (0x1000FFC): end of the benchmark
+end:
+jal  x0,end
@@ -0,0 +1,67 @@
+; memset and memcpy (RV64 variant of memcpy.s): fills a 512-byte buffer one
+; doubleword at a time, copies it doubleword by doubleword to a second buffer
+; and copies 128 bytes of it one byte at a time to an unaligned destination,
+; then adds up the copies
+; iterations: 8
+lui  s0,0x1002      ; source buffer (0x1002000)
+lui  s1,0x1003      ; destination buffer (0x1002A00)
+addi s1,s1,-0x600
+addi s2,s1,0x201    ; unaligned destination of the byte copy
+addi s3,x0,8        ; iterations
+addi s4,x0,0        ; checksum
+lui  s5,0x5a5a5     ; fill pattern
+addi s5,s5,0x5a5
+slli t0,s5,32
+or   s5,s5,t0       ; 0x5a5a55a55a5a55a5
+iteration:
+addi t0,s0,0        ; memset
+addi t1,s0,512
+memset:
+sd   s5,0(t0)
+sd   s5,8(t0)
+sd   s5,16(t0)
+sd   s5,24(t0)
+addi t0,t0,32
+bne  t0,t1,memset
+addi s5,s5,0x123    ; next pattern
+addi t0,s0,0        ; memcpy (doublewords)
+addi t2,s1,0
+memcpy:
+ld   t3,0(t0)
+ld   t4,8(t0)
+sd   t3,0(t2)
+sd   t4,8(t2)
+addi t0,t0,16
+addi t2,t2,16
+bne  t0,t1,memcpy
+addi t0,s1,0        ; byte copy
+addi t1,s1,128
+addi t2,s2,0
+bytecopy:
+lbu  t3,0(t0)
+sb   t3,0(t2)
+addi t0,t0,1
+addi t2,t2,1
+bne  t0,t1,bytecopy
+addi t0,s1,0        ; checksum of both copies
+addi t1,s1,512
+sum:
+ld   t3,0(t0)
+add  s4,s4,t3
+addi t0,t0,8
+bne  t0,t1,sum
+addi t0,s2,0
+addi t1,s2,128
+bytesum:
+lbu  t3,0(t0)
+add  s4,s4,t3
+addi t0,t0,1
+bne  t0,t1,bytesum
+addi s3,s3,-1
+bne  s3,x0,iteration
+srli t0,s4,32
+xor  a0,s4,t0       ; result (both halves of the checksum)
+lui  t0,0x1001
+sw   a0,-4(t0)      ; FinalAddress (0x1000FFC): end of the benchmark
+end:
+jal  x0,end
@@ -0,0 +1,64 @@
+; Insertion sort of 64 16-bit values made by a shift-add generator, then a
+; pass that checks the order and folds the sorted array into a checksum
+; iterations: 4
+lui  s0,0x1005      ; array (0x1005000)
+addi s1,x0,64       ; elements
+addi s2,x0,4        ; iterations
+addi s3,x0,0        ; checksum
+lui  s4,0x10
+addi s4,s4,-1       ; 0xffff
+lui  s5,0x2468a     ; generator state
+addi s5,s5,0x13
+iteration:
+addi t0,x0,0        ; fill
+fill:
+slli t1,s5,3
+add  s5,s5,t1       ; state * 9
+addi s5,s5,0x2b
+srli t1,s5,5
+and  t1,t1,s4       ; bits 5 to 20
+slli t2,t0,2
+add  t2,t2,s0
+sw   t1,0(t2)
+addi t0,t0,1
+bne  t0,s1,fill
+addi t0,x0,1        ; insertion sort
+outer:
+slli t2,t0,2
+add  t2,t2,s0
+lw   t3,0(t2)       ; key
+inner:
+beq  t2,s0,insert
+lw   t4,-4(t2)
+bge  t3,t4,insert
+sw   t4,0(t2)       ; shift the larger element
+addi t2,t2,-4
+jal  x0,inner
+insert:
+sw   t3,0(t2)
+addi t0,t0,1
+bne  t0,s1,outer
+addi t0,s0,0        ; check and fold
+slli t1,s1,2
+add  t1,t1,s0
+addi t1,t1,-4
+lw   t3,0(t0)
+check:
+lw   t4,4(t0)
+bge  t4,t3,ordered
+addi s3,s3,0x400    ; out of order (never)
+ordered:
+slli t5,s3,3
+xor  s3,t5,s3
+add  s3,s3,t4
+and  s3,s3,s4
+addi t3,t4,0
+addi t0,t0,4
+bne  t0,t1,check
+addi s2,s2,-1
+bne  s2,x0,iteration
+addi a0,s3,0        ; result
+lui  t0,0x1001
+sw   a0,-4(t0)      ; FinalAddress (0x1000FFC): end of the benchmark
+end:
+jal  x0,end
@@ -0,0 +1,28 @@
+lui  sp,0x1000      ; ram base address (0x1000000 >> 12)
+lui  s0,0x10013     ; uart_0 base address (0x10013000 >> 12)
+addi x28,x0,1       ; rxen
+sw   x28,12(s0)     ; configuring receive control register
+sw   x28,8(s0)      ; configuring transmit control register (txen)
+addi s2,sp,256      ; receive buffer (RAM)
+addi s3,x0,64       ; amount of bytes
+sw   s2,40(s0)      ; rx dma address
+sw   s3,44(s0)      ; rx dma length: starts receiving
+sw   x0,32(s0)      ; tx dma address: the first bytes of this program
+sw   s3,36(s0)      ; tx dma length: starts transmitting
+wait:
+lw   x29,20(s0)     ; interrupt pending register
+andi x29,x29,16     ; rx dma idle
+beq  x29,x0,wait    ; wait for the last byte
+addi s1,x0,0        ; bytes sent
+or   x6,x0,x0       ; differences between the bytes sent and received
+compare:
+lw   x30,0(s1)      ; bytes sent
+lw   x31,0(s2)      ; bytes received
+xor  x30,x30,x31    ; 0 if the bytes were received unchanged
+or   x6,x6,x30      ; accumulates the differences
+addi s1,s1,4        ; next word
+addi s2,s2,4        ; next word
+bne  s1,s3,compare  ; loop until every word is compared
+sw   x6,0(sp)       ; stores result in RAM
+end:
+jal  x0,end         ; end
@@ -0,0 +1,27 @@
+lui  sp,0x1000      ; ram base address (0x1000000 >> 12)
+lui  s0,0x10013     ; uart_0 base address (0x10013000 >> 12)
+addi x28,x0,1       ; rxen
+sw   x28,12(s0)     ; configuring receive control register
+sw   x28,8(s0)      ; configuring transmit control register (txen)
+addi s1,x0,0        ; next byte sent: the first bytes of this program
+addi s2,x0,0        ; address of the next byte to be received
+addi s3,x0,64       ; amount of bytes
+or   x6,x0,x0       ; differences between the bytes sent and received
+send:
+beq  s1,s3,receive  ; every byte sent
+lw   x29,0(s0)      ; tx fifo full flag (bit 31)
+blt  x29,x0,receive ; if fifo full, try to receive
+lbu  x29,0(s1)      ; byte to be sent
+sw   x29,0(s0)      ; store byte in the tx fifo
+addi s1,s1,1        ; next byte
+receive:
+lw   x29,4(s0)      ; read rx fifo (bit 31: empty flag)
+blt  x29,x0,send    ; if fifo empty, try to send
+lbu  x30,0(s2)      ; byte sent
+xor  x30,x30,x29    ; 0 if the byte was received unchanged
+or   x6,x6,x30      ; accumulates the differences
+addi s2,s2,1        ; next byte
+bne  s2,s3,send     ; loop until every byte is received
+sw   x6,0(sp)       ; stores result in RAM
+end:
+jal  x0,end         ; end
@@ -148,7 +148,7 @@ slli t1,t0,12             ; MPP[1]
 slli t0,t0,11             ; MPP[0]
 csrrc x0,mstatus,t0       ; set MPP[0]
 csrrc x0,mstatus,t1       ; set MPP[1]
-csrrsi x0,mstatus,0b1010000
+csrrsi x0,mstatus,0b10000
 sret
 fence
 fence
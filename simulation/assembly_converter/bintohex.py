@@ -1,44 +1,276 @@
-def binary_to_hex(binary_str: str) -> str:
-    decimal_value = int(binary_str, 2)
-    hex_value = hex(decimal_value)[2:].upper().zfill(8)
-    return hex_value
+import argparse
+import os
+import struct
+import sys
+import numpy as np
 
+# Memory images are kept as a flat numpy uint8 buffer (byte 0 = address 0),
+# which can be read from and written to:
+# mif: byte-per-line binary (the format read by $readmemb in rom.sv/ram.sv)
+# hex: one hexadecimal word per line ($readmemh)
+# bin: raw binary
+# elf: PT_LOAD segments of an ELF executable (read only)
+formats = ["mif", "hex", "bin", "elf"]
 
-def mount_binary_line(broken_lines: list[str]) -> str:
-    return ''.join(broken_lines[::-1])
+# Byte value of each hexadecimal digit (255 = invalid)
+hex_digits = np.full(256, 255, dtype=np.uint8)
+for _i, _digit in enumerate(b"0123456789abcdef"):
+    hex_digits[_digit] = _i
+    hex_digits[ord(chr(_digit).upper())] = _i
+# Byte-per-line text of each byte value
+mif_lines = np.array([f"{i:08b}\n".encode() for i in range(256)], dtype="S9")
 
 
-def read_binary_from_file(file_path: str) -> list[str]:
-    binary_lines = []
-    broken_binary_lines = ["0", "0", "0", "0"]
-    i = 0
-    try:
-        with open(file_path, 'r') as file:
-            for line in file:
-                binary_line = line.strip()
-
-                # Ensure the line has exactly 8 binary digits
-                if len(binary_line) != 8 or not all(bit in '01' for bit in binary_line):
-                    print(f"Invalid input in the file. Line: {binary_line}")
-                    return None
-                broken_binary_lines[i] = binary_line
-                if i == 3:
-                    binary_lines.append(mount_binary_line(broken_binary_lines))
-                i = (i + 1) % 4
-    except FileNotFoundError:
-        print(f"File not found: {file_path}")
-        return None
+def split_lines(data: bytes) -> tuple[list[bytes], np.ndarray]:
+    # Lines without comments ("//") and their lengths
+    lines = data.splitlines()
+    if b"//" in data:
+        lines = [line.split(b"//", 1)[0] for line in lines]
+    lines = [line.strip() for line in lines]
+    return lines, np.fromiter(map(len, lines), dtype=np.int64,
+                              count=len(lines))
+
+
+def line_errors(line_indexes: np.ndarray, message: str,
+                lines: list[bytes]) -> list[tuple[int, str]]:
+    return [(i + 1, f"{message} '{lines[i].decode(errors='replace')}'")
+            for i in line_indexes]
+
+
+def raise_errors(file_path: str, errors: list[tuple[int, str]]) -> None:
+    # Every invalid line is reported at once
+    if len(errors) != 0:
+        raise ValueError("\n".join(f"{file_path}:{line}: {message}"
+                                   for line, message in sorted(errors)))
+
+
+def pad(image: np.ndarray, word_bytes: int) -> np.ndarray:
+    # Zero pads the image up to a whole word
+    padding = -len(image) % word_bytes
+    if padding == 0:
+        return image
+    return np.concatenate([image, np.zeros(padding, dtype=np.uint8)])
+
+
+def read_mif(file_path: str) -> np.ndarray:
+    with open(file_path, 'rb') as file:
+        data = file.read()
+    # Fast path: plain "bbbbbbbb\n" lines (as written by write_mif)
+    if len(data) % 9 == 0:
+        bits = np.frombuffer(data, dtype=np.uint8).reshape(-1, 9)
+        if ((bits[:, 8] == ord('\n')).all() and
+                (bits[:, :8] - ord('0') <= 1).all()):
+            return np.packbits(bits[:, :8] - ord('0'), axis=1).reshape(-1)
+    lines, lengths = split_lines(data)
+    errors = line_errors(np.flatnonzero((lengths != 8) & (lengths != 0)),
+                         "expected 8 binary digits, got", lines)
+    full = np.flatnonzero(lengths == 8)
+    bits = (np.frombuffer(b"".join(lines[i] for i in full), dtype=np.uint8)
+            .reshape(-1, 8) - ord('0'))
+    errors += line_errors(full[(bits > 1).any(axis=1)],
+                          "invalid binary digit in", lines)
+    raise_errors(file_path, errors)
+    return np.packbits(bits, axis=1).reshape(-1)
+
+
+def read_hex(file_path: str, endianness: str = "little") -> np.ndarray:
+    # The word size is given by the length of the lines
+    with open(file_path, 'rb') as file:
+        lines, lengths = split_lines(file.read())
+    used = np.flatnonzero(lengths != 0)
+    if len(used) == 0:
+        return np.zeros(0, dtype=np.uint8)
+    digits = lengths[used[0]]
+    errors = []
+    if digits % 2 != 0:
+        errors.append((used[0] + 1, "odd number of hexadecimal digits"))
+    errors += line_errors(used[lengths[used] != digits],
+                          f"expected {digits} hexadecimal digits, got", lines)
+    full = used[lengths[used] == digits]
+    nibbles = hex_digits[np.frombuffer(b"".join(lines[i] for i in full),
+                                       dtype=np.uint8)].reshape(len(full), -1)
+    errors += line_errors(full[(nibbles == 255).any(axis=1)],
+                          "invalid hexadecimal digit in", lines)
+    raise_errors(file_path, errors)
+    words = nibbles[:, 0::2] << 4 | nibbles[:, 1::2]  # Most significant first
+    if endianness == "little":
+        words = words[:, ::-1]
+    return np.ascontiguousarray(words).reshape(-1)
+
+
+def read_bin(file_path: str) -> np.ndarray:
+    return np.fromfile(file_path, dtype=np.uint8)
+
+
+def read_elf(file_path: str) -> tuple[np.ndarray, int]:
+    # Returns the image of the loadable segments and its base address
+    data = np.fromfile(file_path, dtype=np.uint8)
+    header = data[:64].tobytes()
+    if header[:4] != b"\x7fELF":
+        raise ValueError(f"{file_path}: not an ELF file")
+    is_64 = header[4] == 2
+    order = "<" if header[5] == 1 else ">"
+    if is_64:
+        phoff, = struct.unpack_from(order + "Q", header, 0x20)
+        phentsize, phnum = struct.unpack_from(order + "HH", header, 0x36)
+        segment_format = order + "IIQQQQQQ"
+    else:
+        phoff, = struct.unpack_from(order + "I", header, 0x1C)
+        phentsize, phnum = struct.unpack_from(order + "HH", header, 0x2A)
+        segment_format = order + "IIIIIIII"
+
+    segments = []
+    for i in range(phnum):
+        entry = data[phoff + i*phentsize:phoff + (i + 1)*phentsize].tobytes()
+        if is_64:
+            (p_type, _, p_offset, _, p_paddr, p_filesz,
+             p_memsz, _) = struct.unpack_from(segment_format, entry)
+        else:
+            (p_type, p_offset, _, p_paddr, p_filesz,
+             p_memsz, _, _) = struct.unpack_from(segment_format, entry)
+        if p_type == 1 and p_memsz != 0:  # PT_LOAD
+            segments.append((p_paddr, p_offset, p_filesz, p_memsz))
+    if len(segments) == 0:
+        raise ValueError(f"{file_path}: no loadable segments")
+
+    base = min(segment[0] for segment in segments)
+    end = max(segment[0] + segment[3] for segment in segments)
+    image = np.zeros(end - base, dtype=np.uint8)
+    for p_paddr, p_offset, p_filesz, _ in segments:
+        start = p_paddr - base
+        image[start:start + p_filesz] = data[p_offset:p_offset + p_filesz]
+    return image, base
+
 
-    return binary_lines
+def image_format(file_path: str) -> str:
+    extension = os.path.splitext(file_path)[1][1:].lower()
+    if extension in formats:
+        return extension
+    with open(file_path, 'rb') as file:
+        if file.read(4) == b"\x7fELF":
+            return "elf"
+    return "bin"
+
+
+def read_image(file_path: str, file_format: str | None = None,
+               endianness: str = "little") -> np.ndarray:
+    file_format = file_format or image_format(file_path)
+    if file_format == "mif":
+        return read_mif(file_path)
+    if file_format == "hex":
+        return read_hex(file_path, endianness)
+    if file_format == "elf":
+        return read_elf(file_path)[0]
+    return read_bin(file_path)
+
+
+def to_words(image: np.ndarray, word_size: int = 32,
+             endianness: str = "little") -> np.ndarray:
+    # (words, word_size/8) bytes, most significant byte first
+    # The image is padded with zeros up to a whole word
+    words = pad(image, word_size // 8).reshape(-1, word_size // 8)
+    return words[:, ::-1] if endianness == "little" else words
+
+
+def to_integers(image: np.ndarray, word_size: int = 32,
+                endianness: str = "little") -> np.ndarray:
+    # Words as integers (up to 64 bits)
+    byte_order = "<" if endianness == "little" else ">"
+    return (pad(image, word_size // 8).view(f"{byte_order}u{word_size // 8}")
+            .astype(f"u{word_size // 8}"))
+
+
+def write_mif(file_path: str, image: np.ndarray) -> None:
+    with open(file_path, 'wb') as file:
+        file.write(mif_lines[image].tobytes())
+
+
+def write_hex(file_path: str, image: np.ndarray, word_size: int = 32,
+              endianness: str = "little") -> None:
+    words = np.ascontiguousarray(to_words(image, word_size, endianness))
+    digits = np.frombuffer(words.tobytes().hex().upper().encode(),
+                           dtype=f"S{word_size // 4}")
+    with open(file_path, 'wb') as file:
+        if len(digits) != 0:
+            file.write(b"\n".join(digits) + b"\n")
+
+
+def write_bin(file_path: str, image: np.ndarray) -> None:
+    image.tofile(file_path)
+
+
+def write_image(file_path: str, image: np.ndarray,
+                file_format: str | None = None, word_size: int = 32,
+                endianness: str = "little") -> None:
+    file_format = file_format or image_format(file_path)
+    if file_format == "mif":
+        write_mif(file_path, image)
+    elif file_format == "hex":
+        write_hex(file_path, image, word_size, endianness)
+    elif file_format == "bin":
+        write_bin(file_path, image)
+    else:
+        raise ValueError(f"can't write {file_format} images")
+
+
+def convert_directory(input_dir: str, output_dir: str, file_format: str,
+                      word_size: int = 32,
+                      endianness: str = "little") -> list[str]:
+    # Converts every MIF of input_dir to output_dir, keeping the names
+    # Returns the converted images
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = []
+    for name in sorted(os.listdir(input_dir)):
+        if not name.endswith(".mif"):
+            continue
+        output = os.path.join(output_dir,
+                              os.path.splitext(name)[0] + "." + file_format)
+        write_image(output, read_mif(os.path.join(input_dir, name)),
+                    file_format, word_size, endianness)
+        outputs.append(output)
+    return outputs
 
 
 def bintohex(file_path: str) -> list[str]:
-    binary_lines: list[str] = read_binary_from_file(file_path)
-    hex_lines: list[str] = []
+    # 32-bit words of a byte-per-line MIF (used by web_scrapper2.py)
+    try:
+        image = read_mif(file_path)
+    except (OSError, ValueError) as error:
+        print(error)
+        return None
+    words = to_words(image[:len(image) - len(image) % 4])
+    return [word.hex().upper() + "\n" for word in map(bytes, words)]
 
-    for line in binary_lines:
 
-        # Convert the combined binary to hexadecimal
-        hex_lines.append(binary_to_hex(line) + "\n")
+# MAIN
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert memory images "
+                                     "between mif, hex, bin and elf")
+    parser.add_argument("input", help="input image (or a directory: every "
+                                      "MIF in it is converted)")
+    parser.add_argument("output", help="output image (or directory)")
+    parser.add_argument("-i", "--input-format", choices=formats,
+                        help="default: from the extension")
+    parser.add_argument("-f", "--output-format", choices=formats[:3],
+                        help="default: from the extension (bin for a "
+                             "directory)")
+    parser.add_argument("-w", "--word-size", type=int, default=32,
+                        choices=[8, 16, 32, 64, 128],
+                        help="hex word size in bits, the data width of the "
+                             "memory (rom.sv in core_tb uses 128-bit words)")
+    parser.add_argument("-e", "--endianness", choices=["little", "big"],
+                        default="little", help="byte order of hex words")
+    args = parser.parse_args()
 
-    return hex_lines
+    try:
+        if os.path.isdir(args.input):
+            convert_directory(args.input, args.output,
+                              args.output_format or "bin", args.word_size,
+                              args.endianness)
+        else:
+            image = read_image(args.input, args.input_format, args.endianness)
+            write_image(args.output, image, args.output_format,
+                        args.word_size, args.endianness)
+    except (OSError, ValueError) as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,159 @@
+import argparse
+import sys
+from typing import Iterator
+from isa import Instruction, instructions, csrs, fence_bits
+
+# Lookup tables built once from isa.instructions
+# (opcode, funct3, funct7) -> (mnemonic, instruction); None is a wildcard
+decode_table = {}
+# Whole word -> mnemonic, for instructions without operands
+system_table = {}
+for _mnemonic, _inst in instructions.items():
+    match _inst.fmt:
+        case "SYS":
+            system_table[_inst.funct7 << 20 | _inst.funct3 << 12 |
+                         _inst.opcode] = _mnemonic
+        case "R" | "SH":
+            decode_table[(_inst.opcode, _inst.funct3, _inst.funct7)] = \
+                (_mnemonic, _inst)
+        case "U" | "J":
+            decode_table[(_inst.opcode, None, None)] = (_mnemonic, _inst)
+        case _:
+            decode_table[(_inst.opcode, _inst.funct3, None)] = \
+                (_mnemonic, _inst)
+
+register_names = [f"x{i}" for i in range(32)]
+csr_names = {address: name for name, address in csrs.items()}
+
+
+def sign_extend(value: int, bits: int) -> int:
+    return value - (1 << bits) if value >> (bits - 1) else value
+
+
+def fence_set(bits: int) -> str:
+    return "".join(name for name, bit in fence_bits.items() if bits & bit)
+
+
+def decode(word: int, rv64: bool = True) -> tuple[str, Instruction] | None:
+    # Mnemonic and description of a word (None if it isn't a valid instruction)
+    if word in system_table:
+        return system_table[word], instructions[system_table[word]]
+    opcode, funct3, funct7 = word & 0x7F, word >> 12 & 0x7, word >> 25
+    entry = decode_table.get((opcode, funct3, funct7))
+    if entry is None and rv64 and opcode == 0b0010011:
+        # RV64I shifts: shamt[5] is in funct7[0]
+        entry = decode_table.get((opcode, funct3, funct7 & 0x7E))
+    if entry is None:
+        entry = decode_table.get((opcode, funct3, None))
+    if entry is None:
+        entry = decode_table.get((opcode, None, None))
+    if entry is None or (entry[1].rv64 and not rv64):
+        return None
+    return entry
+
+
+def disassemble(word: int, rv64: bool = True) -> str | None:
+    # Returns None for words that aren't valid instructions
+    entry = decode(word, rv64)
+    if entry is None:
+        return None
+    mnemonic, inst = entry
+    if inst.fmt == "SYS":
+        return mnemonic
+    opcode, funct7 = word & 0x7F, word >> 25
+    rd, rs1, rs2 = word >> 7 & 0x1F, word >> 15 & 0x1F, word >> 20 & 0x1F
+    shamt = word >> 20 & 0x3F
+    x = register_names
+
+    match inst.fmt:
+        case "R":
+            return f"{mnemonic} {x[rd]}, {x[rs1]}, {x[rs2]}"
+        case "I":
+            imm = sign_extend(word >> 20, 12)
+            return f"{mnemonic} {x[rd]}, {x[rs1]}, {imm}"
+        case "SH":
+            if not (rv64 and opcode == 0b0010011):
+                shamt &= 0x1F
+            return f"{mnemonic} {x[rd]}, {x[rs1]}, {shamt}"
+        case "L" | "JALR":
+            imm = sign_extend(word >> 20, 12)
+            return f"{mnemonic} {x[rd]}, {imm}({x[rs1]})"
+        case "S":
+            imm = sign_extend(funct7 << 5 | rd, 12)
+            return f"{mnemonic} {x[rs2]}, {imm}({x[rs1]})"
+        case "B":
+            imm = ((word >> 31) << 12 | (word >> 7 & 1) << 11 |
+                   (word >> 25 & 0x3F) << 5 | (word >> 8 & 0xF) << 1)
+            return f"{mnemonic} {x[rs1]}, {x[rs2]}, {sign_extend(imm, 13)}"
+        case "U":
+            return f"{mnemonic} {x[rd]}, {word >> 12}"
+        case "J":
+            imm = ((word >> 31) << 20 | (word >> 12 & 0xFF) << 12 |
+                   (word >> 20 & 1) << 11 | (word >> 21 & 0x3FF) << 1)
+            return f"{mnemonic} {x[rd]}, {sign_extend(imm, 21)}"
+        case "CSR" | "CSRI":
+            csr = word >> 20
+            csr_name = csr_names.get(csr, f"0x{csr:03X}")
+            source = x[rs1] if inst.fmt == "CSR" else str(rs1)
+            return f"{mnemonic} {x[rd]}, {csr_name}, {source}"
+        case _:  # FENCE
+            pred = fence_set(word >> 24 & 0xF)
+            succ = fence_set(word >> 20 & 0xF)
+            if rd != 0 or rs1 != 0 or not pred or not succ:
+                return None
+            return f"{mnemonic} {pred}, {succ}"
+
+
+def read_words(file_path: str, word_size: int = 4) -> Iterator[int]:
+    # Streams the little endian words of a byte-per-line MIF
+    word, byte_index = 0, 0
+    with open(file_path, 'r') as file:
+        for line_number, line in enumerate(file, 1):
+            binary_line = line.split("//", 1)[0].strip()
+            if len(binary_line) == 0:
+                continue
+            if len(binary_line) != 8 or binary_line.strip("01") != "":
+                raise ValueError(f"{file_path}:{line_number}: invalid byte "
+                                 f"'{binary_line}'")
+            word |= int(binary_line, 2) << 8*byte_index
+            byte_index += 1
+            if byte_index == word_size:
+                yield word
+                word, byte_index = 0, 0
+    if byte_index != 0:
+        yield word  # Incomplete last word (zero padded)
+
+
+def listing(words: Iterator[int], base_address: int = 0,
+            rv64: bool = True) -> Iterator[str]:
+    # "<instruction> // <address>: <word>", which assembler.py reads back
+    for i, word in enumerate(words):
+        text = disassemble(word, rv64)
+        if text is None:
+            text = f".word 0x{word:08X}"
+        yield f"{text} // {base_address + 4*i:08X}: {word:08X}\n"
+
+
+# MAIN
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Disassemble byte-per-line "
+                                     "MIFs into RISC-V assembly listings")
+    parser.add_argument("file", help="MIF file")
+    parser.add_argument("-a", "--arch", choices=["RV32I", "RV64I"],
+                        default="RV64I", help="base ISA (default: RV64I)")
+    parser.add_argument("-b", "--base", type=lambda value: int(value, 0),
+                        default=0, help="address of the first word")
+    parser.add_argument("-o", "--output", default="-",
+                        help="output listing (default: stdout)")
+    args = parser.parse_args()
+
+    lines = listing(read_words(args.file), args.base, args.arch == "RV64I")
+    try:
+        if args.output == "-":
+            sys.stdout.writelines(lines)
+        else:
+            with open(args.output, 'w') as output:
+                output.writelines(lines)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
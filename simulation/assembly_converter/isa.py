@@ -0,0 +1,133 @@
+from typing import NamedTuple
+
+# Instructions implemented by PoliRISC-V: RV{32,64}I, RV{32,64}M, Zicsr and
+# TrapReturn (see utils/globals/instruction_pkg.sv and rtl/core/CSR)
+
+
+class Instruction(NamedTuple):
+    fmt: str  # Operand format (see below)
+    opcode: int
+    funct3: int = 0
+    funct7: int = 0  # funct12 for SYS, imm[11:5] for shifts
+    rv64: bool = False  # Only RV64I
+
+
+# Formats:
+# R: rd, rs1, rs2       I: rd, rs1, imm       SH: rd, rs1, shamt
+# L: rd, imm(rs1)       S: rs2, imm(rs1)      B: rs1, rs2, offset
+# U: rd, imm            J: rd, offset         JALR: rd, imm(rs1)
+# CSR: rd, csr, rs1     CSRI: rd, csr, uimm   FENCE: [pred, succ]
+# SYS: no operands (the whole word is fixed)
+instructions = {
+    # RV32I
+    "lui": Instruction("U", 0b0110111),
+    "auipc": Instruction("U", 0b0010111),
+    "jal": Instruction("J", 0b1101111),
+    "jalr": Instruction("JALR", 0b1100111),
+    "beq": Instruction("B", 0b1100011, 0b000),
+    "bne": Instruction("B", 0b1100011, 0b001),
+    "blt": Instruction("B", 0b1100011, 0b100),
+    "bge": Instruction("B", 0b1100011, 0b101),
+    "bltu": Instruction("B", 0b1100011, 0b110),
+    "bgeu": Instruction("B", 0b1100011, 0b111),
+    "lb": Instruction("L", 0b0000011, 0b000),
+    "lh": Instruction("L", 0b0000011, 0b001),
+    "lw": Instruction("L", 0b0000011, 0b010),
+    "lbu": Instruction("L", 0b0000011, 0b100),
+    "lhu": Instruction("L", 0b0000011, 0b101),
+    "sb": Instruction("S", 0b0100011, 0b000),
+    "sh": Instruction("S", 0b0100011, 0b001),
+    "sw": Instruction("S", 0b0100011, 0b010),
+    "addi": Instruction("I", 0b0010011, 0b000),
+    "slti": Instruction("I", 0b0010011, 0b010),
+    "sltiu": Instruction("I", 0b0010011, 0b011),
+    "xori": Instruction("I", 0b0010011, 0b100),
+    "ori": Instruction("I", 0b0010011, 0b110),
+    "andi": Instruction("I", 0b0010011, 0b111),
+    "slli": Instruction("SH", 0b0010011, 0b001, 0b0000000),
+    "srli": Instruction("SH", 0b0010011, 0b101, 0b0000000),
+    "srai": Instruction("SH", 0b0010011, 0b101, 0b0100000),
+    "add": Instruction("R", 0b0110011, 0b000, 0b0000000),
+    "sub": Instruction("R", 0b0110011, 0b000, 0b0100000),
+    "sll": Instruction("R", 0b0110011, 0b001, 0b0000000),
+    "slt": Instruction("R", 0b0110011, 0b010, 0b0000000),
+    "sltu": Instruction("R", 0b0110011, 0b011, 0b0000000),
+    "xor": Instruction("R", 0b0110011, 0b100, 0b0000000),
+    "srl": Instruction("R", 0b0110011, 0b101, 0b0000000),
+    "sra": Instruction("R", 0b0110011, 0b101, 0b0100000),
+    "or": Instruction("R", 0b0110011, 0b110, 0b0000000),
+    "and": Instruction("R", 0b0110011, 0b111, 0b0000000),
+    "fence": Instruction("FENCE", 0b0001111, 0b000),
+    "fence.i": Instruction("SYS", 0b0001111, 0b001, 0x000),
+    "ecall": Instruction("SYS", 0b1110011, 0b000, 0x000),
+    "ebreak": Instruction("SYS", 0b1110011, 0b000, 0x001),
+    # RV64I
+    "lwu": Instruction("L", 0b0000011, 0b110, rv64=True),
+    "ld": Instruction("L", 0b0000011, 0b011, rv64=True),
+    "sd": Instruction("S", 0b0100011, 0b011, rv64=True),
+    "addiw": Instruction("I", 0b0011011, 0b000, rv64=True),
+    "slliw": Instruction("SH", 0b0011011, 0b001, 0b0000000, True),
+    "srliw": Instruction("SH", 0b0011011, 0b101, 0b0000000, True),
+    "sraiw": Instruction("SH", 0b0011011, 0b101, 0b0100000, True),
+    "addw": Instruction("R", 0b0111011, 0b000, 0b0000000, True),
+    "subw": Instruction("R", 0b0111011, 0b000, 0b0100000, True),
+    "sllw": Instruction("R", 0b0111011, 0b001, 0b0000000, True),
+    "srlw": Instruction("R", 0b0111011, 0b101, 0b0000000, True),
+    "sraw": Instruction("R", 0b0111011, 0b101, 0b0100000, True),
+    # RV32M
+    "mul": Instruction("R", 0b0110011, 0b000, 0b0000001),
+    "mulh": Instruction("R", 0b0110011, 0b001, 0b0000001),
+    "mulhsu": Instruction("R", 0b0110011, 0b010, 0b0000001),
+    "mulhu": Instruction("R", 0b0110011, 0b011, 0b0000001),
+    "div": Instruction("R", 0b0110011, 0b100, 0b0000001),
+    "divu": Instruction("R", 0b0110011, 0b101, 0b0000001),
+    "rem": Instruction("R", 0b0110011, 0b110, 0b0000001),
+    "remu": Instruction("R", 0b0110011, 0b111, 0b0000001),
+    # RV64M
+    "mulw": Instruction("R", 0b0111011, 0b000, 0b0000001, True),
+    "divw": Instruction("R", 0b0111011, 0b100, 0b0000001, True),
+    "divuw": Instruction("R", 0b0111011, 0b101, 0b0000001, True),
+    "remw": Instruction("R", 0b0111011, 0b110, 0b0000001, True),
+    "remuw": Instruction("R", 0b0111011, 0b111, 0b0000001, True),
+    # Zicsr
+    "csrrw": Instruction("CSR", 0b1110011, 0b001),
+    "csrrs": Instruction("CSR", 0b1110011, 0b010),
+    "csrrc": Instruction("CSR", 0b1110011, 0b011),
+    "csrrwi": Instruction("CSRI", 0b1110011, 0b101),
+    "csrrsi": Instruction("CSRI", 0b1110011, 0b110),
+    "csrrci": Instruction("CSRI", 0b1110011, 0b111),
+    # TrapReturn
+    "sret": Instruction("SYS", 0b1110011, 0b000, 0x102),
+    "mret": Instruction("SYS", 0b1110011, 0b000, 0x302),
+}
+
+abi_names = ["zero", "ra", "sp", "gp", "tp", "t0", "t1", "t2",
+             "s0", "s1", "a0", "a1", "a2", "a3", "a4", "a5",
+             "a6", "a7", "s2", "s3", "s4", "s5", "s6", "s7",
+             "s8", "s9", "s10", "s11", "t3", "t4", "t5", "t6"]
+
+registers = {f"x{i}": i for i in range(32)}
+registers.update({name: i for i, name in enumerate(abi_names)})
+registers["fp"] = 8
+
+# CSRs implemented by rtl/core/CSR (csr_pkg::csr_addr_t)
+csrs = {
+    "sstatus": 0x100, "sie": 0x104, "stvec": 0x105, "sscratch": 0x140,
+    "sepc": 0x141, "scause": 0x142, "stval": 0x143, "sip": 0x144,
+    "mstatus": 0x300, "misa": 0x301, "medeleg": 0x302, "mideleg": 0x303,
+    "mie": 0x304, "mtvec": 0x305, "mscratch": 0x340, "mepc": 0x341,
+    "mcause": 0x342, "mtval": 0x343, "mip": 0x344, "mvendorid": 0xF11,
+    "marchid": 0xF12, "mimpid": 0xF13, "mhartid": 0xF14,
+    "mcountinhibit": 0x320, "mcycle": 0xB00, "minstret": 0xB02,
+    "mcycleh": 0xB80, "minstreth": 0xB82,
+}
+# Performance counters (only mhpmcounter3 to mhpmcounter12 exist)
+hpm_counters = range(3, 13)
+csrs.update({f"mhpmevent{i}": 0x320 + i for i in hpm_counters})
+csrs.update({f"mhpmcounter{i}": 0xB00 + i for i in hpm_counters})
+csrs.update({f"mhpmcounter{i}h": 0xB80 + i for i in hpm_counters})
+# High halves of the counters, only on RV32
+rv32_csrs = {0xB80, 0xB82} | {0xB80 + i for i in hpm_counters}
+
+# fence predecessor/successor bits
+fence_bits = {"i": 8, "o": 4, "r": 2, "w": 1}
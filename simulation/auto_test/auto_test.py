@@ -1,7 +1,13 @@
 
+import argparse
+import os
 import subprocess
 import sys
 from manifest_utils import *
+from job_runner import run_test, run_jobs, run_compiled_jobs
+from build_cache import default_cache_size
+from results import *
+from impact import affected_tops, changed_files, manifest_graph
 from defines import *
 
 
@@ -19,6 +25,58 @@ def find_files(root_directory: str, extension: str):
 
 
 # MAIN
+parser = argparse.ArgumentParser(description="Run all PoliRISC-V testbenches")
+parser.add_argument("-j", "--jobs", type=int, default=1,
+                    help="number of simulations run in parallel "
+                         "(0 uses all cores)")
+parser.add_argument("-c", "--compile-once", action="store_true",
+                    help="compile each top with mifs only once and pass "
+                         "each mif to the simulator (+ROM_INIT_FILE)")
+parser.add_argument("-s", "--simulator", choices=["modelsim", "verilator"],
+                    default="modelsim",
+                    help="simulator (verilator always compiles the tops "
+                         "with mifs only once, as -c)")
+parser.add_argument("--no-cache", action="store_true",
+                    help="don't reuse compiled libraries from "
+                         "simulation/build_cache")
+parser.add_argument("--cache-size", type=int, default=default_cache_size,
+                    help="build cache size limit in MB")
+parser.add_argument("--junit", default=junit_path,
+                    help="JUnit XML report (default: "
+                         "simulation/results/junit.xml)")
+parser.add_argument("-t", "--threshold", type=float, default=default_threshold,
+                    help="simulated cycle increase over the baseline flagged "
+                         "as a regression, in %% (default: "
+                         f"{default_threshold})")
+parser.add_argument("--time-threshold", type=float,
+                    default=default_time_threshold,
+                    help="simulation wall time increase over the baseline "
+                         "flagged as a regression, in %% (default: "
+                         f"{default_time_threshold})")
+parser.add_argument("--update-baseline", action="store_true",
+                    help="make the passing tests of this run the baseline")
+parser.add_argument("--changed", nargs="?", const="HEAD", metavar="REF",
+                    help="only run the testbenches (and core programs) "
+                         "affected by the changes since REF (its merge base "
+                         "with HEAD; default: the uncommitted changes), "
+                         "from the Manifest dependency graph")
+args = parser.parse_args()
+num_jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+# The build cache is used by the jobs (parallel and compile-once) modes
+cache_size = None if args.no_cache else args.cache_size
+# A Verilator build takes longer than a run, so its models are always reused
+compile_once = args.compile_once or args.simulator == "verilator"
+skipped_tops = four_state_tops if args.simulator == "verilator" else []
+run = run_info()
+records = []
+# Top -> (changed file, programs to run or None for all)
+affected = None
+if args.changed is not None:
+    try:
+        affected = affected_tops(changed_files(args.changed), manifest_graph())
+    except ValueError as error:
+        parser.error(str(error))
+
 sys.stdout = open("../log.txt", "w")
 # Get all testbenches files
 sim_top_array = find_files("../../testbench", "sv")
@@ -26,24 +84,118 @@ print("############## tops: " + str(sim_top_array))
 # Get mifs files for core simulation
 mif_array = find_files("../MIFs/memory/ROM/core", "mif")
 print("############## mifs: " + str(mif_array))
+if affected is not None:
+    print("############## changed: " + str(sorted(affected)))
 
-write_lines(["gui_mode"], ["gui_mode = False"])  # Set TCL Mode
-write_lines(["use_mif"], ["use_mif = True"])  # Set Mifs
-# No support for RV64I
-write_lines(["lista_de_extensoes"], ["lista_de_extensoes = []"])
-# Nexys4 with Litex
-write_lines(["board_list"], ["board_list = [\"LITEX\", \"NEXYS4\"]"])
+settings = [
+    ("gui_mode", "gui_mode = False"),  # Set TCL Mode
+    ("use_mif", "use_mif = True"),  # Set Mifs
+    # No support for RV64I
+    ("lista_de_extensoes", "lista_de_extensoes = []"),
+    # Nexys4 with Litex
+    ("board_list", "board_list = [\"LITEX\", \"NEXYS4\"]"),
+    ("simulator", f"simulator = \"{args.simulator}\""),
+]
 
+# List every (testbench, mif) pair to be simulated
+jobs = []
 for testbench in sim_top_array:
     if not testbench.endswith("_tb"):
         continue
-    print(f'---------{testbench}---------')
-    write_lines(["sim_top"], [f"sim_top = \"{testbench}\""])
-    if testbench in excluded_tops:
-        print("---------PASS---------")
+    if affected is not None and testbench not in affected:
+        continue
+    if testbench in excluded_tops or testbench in skipped_tops:
+        jobs.append((testbench, None))  # Only reported
     elif tops_with_mifs.count(testbench) != 0:
-        for i, mif in enumerate(mif_array):
-            write_lines(["mif_name"], [f"mif_name = \"{mif}.mif\""])
-            run_simulation()
+        programs = affected[testbench][1] if affected is not None else None
+        for mif in mif_array:
+            if programs is None or mif in programs:
+                jobs.append((testbench, mif))
     else:
-        run_simulation()
+        jobs.append((testbench, None))
+
+if num_jobs == 1 and not compile_once:
+    write_lines([key for key, _ in settings], [line for _, line in settings])
+    last_testbench = None
+    for testbench, mif in jobs:
+        if testbench != last_testbench:
+            print(f'---------{testbench}---------')
+            write_lines(["sim_top"], [f"sim_top = \"{testbench}\""])
+            last_testbench = testbench
+        if testbench in excluded_tops:
+            print("---------PASS---------")
+            records.append(skipped_record(run, args.simulator, testbench,
+                                          "excluded"))
+            continue
+        if testbench in skipped_tops:
+            print(f"---------SKIPPED ({args.simulator})---------")
+            records.append(skipped_record(run, args.simulator, testbench,
+                                          "four-state testbench"))
+            continue
+        if mif is not None:
+            write_lines(["mif_name"], [f"mif_name = \"{mif}.mif\""])
+        build_output, sim_output, compile_time, sim_time = run_test(
+            testbench, "..", simulator=args.simulator)
+        print(build_output + sim_output, end="")
+        records.append(make_record(run, args.simulator, testbench, mif,
+                                   build_output, sim_output, compile_time,
+                                   sim_time))
+else:
+    # Each job runs on its own directory (simulation/jobs/<testbench>-<mif>)
+    simulated_jobs = [job for job in jobs if job[0] not in excluded_tops and
+                      job[0] not in skipped_tops]
+    results = {}
+    if compile_once:
+        # Tops with mifs are compiled on simulation/jobs/<testbench>
+        compiled_jobs = [job for job in simulated_jobs if job[1] is not None]
+        simulated_jobs = [job for job in simulated_jobs if job[1] is None]
+        for result in run_compiled_jobs(compiled_jobs, settings, num_jobs,
+                                        cache_size, args.simulator):
+            results[(result.testbench, result.mif)] = result
+    for result in run_jobs(simulated_jobs, settings, num_jobs, cache_size,
+                           args.simulator):
+        results[(result.testbench, result.mif)] = result
+    last_testbench = None
+    for testbench, mif in jobs:
+        # Compilation of the tops compiled only once
+        build = results.get((testbench, None)) if mif is not None else None
+        if testbench != last_testbench:
+            print(f'---------{testbench}---------')
+            last_testbench = testbench
+            if build is not None:
+                print(build.build_output, end="")
+        if testbench in excluded_tops:
+            print("---------PASS---------")
+            records.append(skipped_record(run, args.simulator, testbench,
+                                          "excluded"))
+            continue
+        if testbench in skipped_tops:
+            print(f"---------SKIPPED ({args.simulator})---------")
+            records.append(skipped_record(run, args.simulator, testbench,
+                                          "four-state testbench"))
+            continue
+        result = results[(testbench, mif)]
+        print(result.build_output + result.sim_output, end="")
+        if build is not None:
+            result = result._replace(build_output=build.build_output,
+                                     compile_time=build.compile_time)
+        records.append(make_record(run, args.simulator, testbench, mif,
+                                   result.build_output, result.sim_output,
+                                   result.compile_time, result.sim_time))
+
+# Results: history, JUnit report and the regressions against the baseline
+append_history(records)
+write_junit(records, args.junit)
+baseline = read_baseline()
+regressions = find_regressions(records, baseline, args.threshold,
+                               args.time_threshold)
+if args.update_baseline:
+    save_baseline(records)
+for file in [sys.stdout, sys.__stdout__]:  # Log and terminal
+    print(f"############## results: {run[0]} ({run[1]})", file=file)
+    report(records, baseline, file)
+    for regression in regressions:
+        print("REGRESSION " + regression, file=file)
+failed = any(record["status"] in failed_statuses for record in records)
+# The regressions are accepted by updating the baseline
+sys.exit(1 if failed or (regressions and not args.update_baseline) else 0)
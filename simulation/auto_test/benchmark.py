@@ -0,0 +1,233 @@
+import argparse
+import csv
+import math
+import os
+import re
+import sys
+from build_cache import default_cache_size
+from job_runner import run_compiled_jobs, sim_dir, ram_mif_path
+from results import job_status, simulated_cycles
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "..", "golden_model"))
+from iss import Core, BranchPredictor  # noqa: E402
+from bintohex import read_mif  # noqa: E402
+
+# Benchmark suite: the kernels in assembly_converter/assembly/bench are
+# assembled into MIFs/memory/ROM/bench/<kernel>.mif (RV32I, run on both ISAs)
+# and, for the kernels with an RV64 variant (<kernel>64.s, with ld/sd and
+# 64-bit data), into <kernel>64.mif for RV64I. They are run on core_tb until
+# they write their result to FinalAddress and checked against the golden
+# model. Each kernel gets a score per MHz (iterations per second at 1 MHz,
+# like DMIPS/MHz) and each configuration the geometric mean
+bench_dir = os.path.join(sim_dir, "assembly_converter", "assembly", "bench")
+rom_dir = "MIFs/memory/ROM/bench"
+iterations_line = re.compile(r"^;\s*iterations:\s*(\d+)")
+write_data_line = re.compile(r"^(?:# )?Write data: 0x([0-9a-fA-F]+)")
+default_cycle_limit = 1000000
+archs = ["RV32I", "RV64I"]
+# core_tb parameters modelled by the golden model
+iss_parameters = ["BTB_ENTRIES", "BHT_ENTRIES", "HISTORY_SIZE", "MUL_LATENCY",
+                  "DIV_RADIX"]
+iss_defaults = [16, 64, 0, 2, 4]
+
+
+def read_benchmarks() -> dict[str, int]:
+    # Iterations of each kernel, from its "; iterations: N" line
+    benchmarks = {}
+    file_names = sorted(os.listdir(bench_dir))
+    for file_name in file_names:
+        name = file_name[:-2]
+        if not file_name.endswith(".s") or \
+                name.endswith("64") and name[:-2] + ".s" in file_names:
+            continue  # Not a kernel or the RV64 variant of one
+        with open(os.path.join(bench_dir, file_name), 'r') as file:
+            for line in file:
+                if match := iterations_line.match(line):
+                    benchmarks[name] = int(match.group(1))
+                    break
+    return benchmarks
+
+
+def mif_name(benchmark: str, arch: str) -> str:
+    # The RV64 variant of a kernel, if it has one
+    if arch == "RV64I" and os.path.exists(os.path.join(bench_dir,
+                                                       benchmark + "64.s")):
+        return benchmark + "64"
+    return benchmark
+
+
+def parse_config(config: str) -> tuple[str, ...]:
+    # "NAME=VALUE NAME=VALUE" -> core_tb parameter overrides
+    parameters = tuple(config.split())
+    for parameter in parameters:
+        if not re.fullmatch(r"\w+=\S+", parameter):
+            raise ValueError(f"invalid parameter '{parameter}' (NAME=VALUE)")
+    return parameters
+
+
+def run_iss(mif: str, arch: str, parameters: tuple[str, ...],
+            limit: int) -> Core:
+    values = dict(zip(iss_parameters, iss_defaults))
+    for parameter in parameters:
+        name, value = parameter.split("=", 1)
+        if name in values:
+            values[name] = int(value, 0)
+    rom = read_mif(os.path.join(sim_dir, rom_dir, mif + ".mif"))
+    core = Core(rom.tobytes(), read_mif(ram_mif_path).tobytes(),
+                arch == "RV64I",
+                BranchPredictor(values["BTB_ENTRIES"], values["BHT_ENTRIES"],
+                                values["HISTORY_SIZE"]),
+                values["MUL_LATENCY"], values["DIV_RADIX"])
+    core.run(limit)
+    return core
+
+
+def run_rtl(arch: str, parameters: tuple[str, ...], benchmarks: list[str],
+            args: argparse.Namespace
+            ) -> dict[str, tuple[str, str, dict[str, int], int | None]]:
+    # (status, message, cycles, result) of each benchmark on core_tb
+    settings = [
+        ("gui_mode", "gui_mode = False"),
+        ("use_mif", "use_mif = True"),
+        ("lista_de_extensoes", "lista_de_extensoes = [\"RV64I\"]"
+         if arch == "RV64I" else "lista_de_extensoes = []"),
+        ("board_list", "board_list = [\"LITEX\", \"NEXYS4\"]"),
+        ("simulator", f"simulator = \"{args.simulator}\""),
+    ]
+    jobs = [("core_tb", mif_name(name, arch)) for name in benchmarks]
+    cache_size = None if args.no_cache else default_cache_size
+    results = run_compiled_jobs(jobs, settings, args.jobs, cache_size,
+                                args.simulator, rom_dir, parameters,
+                                (f"+CYCLE_LIMIT={args.cycle_limit}",))
+    build, programs = results[0], results[1:]
+    runs = {}
+    for name, program in zip(benchmarks, programs):
+        status, message = job_status("core_tb", build.build_output,
+                                     program.sim_output)
+        result = None
+        for line in program.sim_output.splitlines():
+            if match := write_data_line.match(line):
+                result = int(match.group(1), 16)
+        runs[name] = (status, message, simulated_cycles(program.sim_output),
+                      result)
+    return runs
+
+
+def report(config: str, arch: str, rows: list[list],
+           reference: float | None) -> float:
+    # rows: [benchmark, iterations, cycles, instret, check]
+    # Returns the geometric mean of the scores
+    print(f"############## {config or 'default'} ({arch})")
+    print(f"{'Benchmark':<12}{'Iter':>6}{'Cycles':>10}{'Instret':>10}"
+          f"{'CPI':>7}{'Iter/MHz':>11}  Check")
+    scores = []
+    for name, iterations, cycles, instret, check in rows:
+        score = iterations * 1e6 / cycles if cycles else 0
+        cpi = f"{cycles / instret:.3f}" if instret else "-"
+        if check == "ok":
+            scores.append(score)
+        print(f"{name:<12}{iterations:>6}{cycles or '-':>10}"
+              f"{instret or '-':>10}{cpi:>7}{score:>11.1f}  {check}")
+    mean = 0
+    if scores:
+        mean = math.exp(sum(math.log(score) for score in scores) / len(scores))
+    relative = ""
+    if reference:
+        relative = f" ({mean / reference:.3f}x the first configuration)"
+    print(f"Score: {mean:.1f} iterations/s per MHz (geometric mean of "
+          f"{len(scores)} kernels){relative}")
+    return mean
+
+
+# MAIN
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the benchmark suite on "
+                                     "core_tb and report cycles, CPI and a "
+                                     "score per MHz for each configuration")
+    parser.add_argument("benchmarks", nargs="*",
+                        help="kernels to run (default: every kernel in "
+                             "assembly_converter/assembly/bench)")
+    parser.add_argument("-a", "--arch", nargs="+", choices=archs,
+                        default=archs, help="base ISAs (default: both)")
+    parser.add_argument("-c", "--config", action="append",
+                        help="core_tb parameter overrides of a configuration, "
+                             "as \"NAME=VALUE ...\" (repeat to compare "
+                             "configurations; default: the core_tb defaults)")
+    parser.add_argument("-s", "--simulator", choices=["modelsim", "verilator"],
+                        default="modelsim",
+                        help="simulator (default: modelsim)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of simulations run in parallel "
+                             "(0 uses all cores)")
+    parser.add_argument("-n", "--cycle-limit", type=int,
+                        default=default_cycle_limit,
+                        help="core_tb cycle limit (default: "
+                             f"{default_cycle_limit})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="don't reuse compiled libraries from "
+                             "simulation/build_cache")
+    parser.add_argument("--iss", action="store_true",
+                        help="report the approximate cycles of the golden "
+                             "model instead of simulating the RTL")
+    parser.add_argument("-o", "--csv",
+                        help="also write the results to a CSV file")
+    args = parser.parse_args()
+    args.jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+
+    available = read_benchmarks()
+    benchmarks = args.benchmarks or list(available)
+    for name in benchmarks:
+        if name not in available:
+            parser.error(f"unknown benchmark '{name}' (available: "
+                         f"{', '.join(available)})")
+    configs = args.config or [""]
+    try:
+        parameters = [parse_config(config) for config in configs]
+    except ValueError as error:
+        parser.error(str(error))
+
+    failed = False
+    csv_rows = []
+    for arch in args.arch:
+        reference = None
+        for config, config_parameters in zip(configs, parameters):
+            # The golden model gives the expected result of each kernel
+            models = {name: run_iss(mif_name(name, arch), arch,
+                                    config_parameters, args.cycle_limit)
+                      for name in benchmarks}
+            if not args.iss:
+                runs = run_rtl(arch, config_parameters, benchmarks, args)
+            rows = []
+            for name in benchmarks:
+                model = models[name]
+                if model.final_data is None:
+                    rows.append([name, available[name], 0, 0,
+                                 "golden model didn't end"])
+                elif args.iss:
+                    rows.append([name, available[name], model.cycles,
+                                 model.instret, "ok"])
+                else:
+                    status, message, counters, result = runs[name]
+                    check = "ok"
+                    if status != "pass":
+                        check = f"{status}: {message}"
+                    elif (result is None or
+                          (result ^ model.final_data) & 0xFFFFFFFF):
+                        check = (f"result 0x{result or 0:x}, expected "
+                                 f"0x{model.final_data & 0xFFFFFFFF:x}")
+                    rows.append([name, available[name],
+                                 counters.get("cycles", 0),
+                                 counters.get("instret", 0), check])
+                failed |= rows[-1][-1] != "ok"
+            score = report(config, arch, rows, reference)
+            reference = reference or score
+            for row in rows:
+                csv_rows.append([config or "default", arch] + row)
+    if args.csv:
+        with open(args.csv, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(["config", "arch", "benchmark", "iterations",
+                             "cycles", "instret", "check"])
+            writer.writerows(csv_rows)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from functools import cache
+
+# simulation/ directory (where the shared Manifest.py lives)
+sim_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Compiled work libraries, one directory per build hash
+cache_dir = os.path.join(sim_dir, "build_cache")
+default_cache_size = 2048  # MB
+# Headers generated in each job directory by the Manifest
+define_files = ["extensions.vh", "board.vh"]
+
+
+@cache
+def tool_version() -> str:
+    try:
+        result = subprocess.run(['vsim', '-version'],
+                                capture_output=True, text=True)
+    except FileNotFoundError:
+        return ""
+    return result.stdout.strip()
+
+
+def read_makefile(job_dir: str) -> tuple[str, str, list[str], list[str]]:
+    # Top, vlog flags, sources and include directories resolved by hdlmake
+    # from the Manifest tree
+    with open(os.path.join(job_dir, "Makefile"), 'r') as file:
+        text = file.read().replace("\\\n", " ")
+    variables = {}
+    for line in text.splitlines():
+        if ":=" in line:
+            name, value = line.split(":=", 1)
+            variables[name.strip()] = value.strip()
+    sources = (variables.get("VERILOG_SRC", "").split() +
+               variables.get("VHDL_SRC", "").split())
+    include_dirs = [flag.split("+incdir+", 1)[1]
+                    for flag in variables.get("INCLUDE_DIRS", "").split()
+                    if "+incdir+" in flag]
+    return (variables.get("TOP_MODULE", ""), variables.get("VLOG_FLAGS", ""),
+            sources, include_dirs)
+
+
+def file_hash(file_path: str) -> str:
+    with open(file_path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def include_files(job_dir: str, sources: list[str],
+                  include_dirs: list[str]) -> list[str]:
+    # Headers that the sources can `include: the .vh/.svh files next to them
+    # and in the include directories (extensions.vh and board.vh come from
+    # job_dir)
+    directories = {os.path.dirname(source) for source in sources}
+    directories.update(include_dirs)
+    files = []
+    for directory in sorted(directories):
+        try:
+            names = sorted(os.listdir(os.path.join(job_dir, directory)))
+        except OSError:
+            continue
+        files += [os.path.join(directory, name) for name in names
+                  if name.endswith((".vh", ".svh")) and
+                  name not in define_files]
+    return files
+
+
+def stamp_path(job_dir: str, source: str) -> str:
+    # hdlmake touches work/hdlmake/<file>_<ext> after compiling each source
+    return os.path.join(job_dir, "work", "hdlmake",
+                        os.path.basename(source).replace(".", "_"))
+
+
+def build_keys(job_dir: str, variant: str = ""
+               ) -> tuple[str, str, dict[str, str]]:
+    # The configuration key covers everything but the sources: tool version,
+    # top, vlog_opt, the generated extensions.vh/board.vh, the other headers
+    # (a changed header must rebuild every source, so it isn't seeded) and
+    # the variant of the build (what was run after make)
+    top, vlog_flags, sources, include_dirs = read_makefile(job_dir)
+    config = hashlib.sha256()
+    for item in [tool_version(), top, vlog_flags, variant]:
+        config.update(item.encode() + b"\0")
+    for define_file in define_files:
+        config.update(file_hash(os.path.join(job_dir, define_file)).encode())
+    for header in include_files(job_dir, sources, include_dirs):
+        digest = file_hash(os.path.join(job_dir, header))
+        config.update(f"{header}:{digest}\n".encode())
+    # The build key also covers the contents of every source
+    hashes = {source: file_hash(os.path.join(job_dir, source))
+              for source in sources}
+    build = config.copy()
+    for source, digest in hashes.items():
+        build.update(f"{source}:{digest}\n".encode())
+    return config.hexdigest(), build.hexdigest(), hashes
+
+
+def read_entry(entry_dir: str) -> dict | None:
+    try:
+        with open(os.path.join(entry_dir, "entry.json"), 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def latest_entry(config_key: str) -> str | None:
+    # Most recently used build with the same configuration
+    latest, latest_time = None, 0.0
+    if not os.path.isdir(cache_dir):
+        return None
+    for name in os.listdir(cache_dir):
+        entry_dir = os.path.join(cache_dir, name)
+        entry = read_entry(entry_dir)
+        if entry is None or entry["config"] != config_key:
+            continue
+        try:
+            entry_time = os.path.getmtime(entry_dir)
+        except OSError:
+            continue  # Evicted by another job
+        if entry_time > latest_time:
+            latest, latest_time = entry_dir, entry_time
+    return latest
+
+
+def restore(job_dir: str, variant: str = ""
+            ) -> tuple[tuple[str, str, dict[str, str]], bool, str]:
+    # Must be called after hdlmake and before make
+    # variant: steps run after make on the stored library (e.g. vopt), which
+    # only builds of the same variant have
+    # Returns the keys (for store), if it was a full hit and a log message
+    keys = build_keys(job_dir, variant)
+    config_key, build_key, hashes = keys
+    entry_dir = os.path.join(cache_dir, build_key)
+    hit = read_entry(entry_dir) is not None
+    if not hit:
+        # Seed the build with the closest entry, make recompiles the rest
+        entry_dir = latest_entry(config_key)
+        if entry_dir is None:
+            return keys, False, f"Build cache: miss ({build_key[:12]})\n"
+    entry = read_entry(entry_dir)
+
+    shutil.rmtree(os.path.join(job_dir, "work"), ignore_errors=True)
+    try:
+        if entry is None:
+            raise FileNotFoundError(entry_dir)
+        shutil.copytree(os.path.join(entry_dir, "work"),
+                        os.path.join(job_dir, "work"), symlinks=True)
+        if os.path.exists(os.path.join(entry_dir, "modelsim.ini")):
+            shutil.copy2(os.path.join(entry_dir, "modelsim.ini"), job_dir)
+    except OSError:
+        # Evicted by another job (evict renames it first, so a partial copy
+        # always fails): build from scratch
+        shutil.rmtree(os.path.join(job_dir, "work"), ignore_errors=True)
+        evicted = os.path.basename(entry_dir)[:12]
+        return keys, False, (f"Build cache: miss ({build_key[:12]}), "
+                             f"{evicted} was evicted\n")
+
+    # Unchanged sources get the same (new) timestamp, so make sees them as
+    # up to date; changed sources lose their stamp and are recompiled,
+    # together with everything that depends on them
+    now = time.time()
+    os.utime(os.path.join(job_dir, "work", "hdlmake", "work-stamp"),
+             (now, now))
+    for source, digest in hashes.items():
+        stamp = stamp_path(job_dir, source)
+        if not os.path.exists(stamp):
+            continue
+        if entry["sources"].get(source) == digest:
+            os.utime(stamp, (now, now))
+        else:
+            os.remove(stamp)
+    try:
+        os.utime(entry_dir)  # Least recently used order
+    except OSError:
+        pass
+    if hit:
+        return keys, True, f"Build cache: hit ({build_key[:12]})\n"
+    return keys, False, (f"Build cache: miss ({build_key[:12]}), seeded "
+                         f"from {os.path.basename(entry_dir)[:12]}\n")
+
+
+def dir_size(path: str) -> int:
+    size = 0
+    for root, _, files in os.walk(path):
+        for file in files:
+            file_path = os.path.join(root, file)
+            if not os.path.islink(file_path):
+                try:
+                    size += os.path.getsize(file_path)
+                except OSError:
+                    pass  # Evicted by another job
+    return size
+
+
+def evict(max_size: int) -> None:
+    # Remove the least recently used builds until the cache fits max_size MB
+    # Entries can disappear at any time with parallel jobs
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.startswith("."):
+            continue  # Build being stored or removed
+        entry_dir = os.path.join(cache_dir, name)
+        try:
+            entries.append((os.path.getmtime(entry_dir), dir_size(entry_dir),
+                            entry_dir))
+        except OSError:
+            continue  # Evicted by another job
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry_dir in sorted(entries):
+        if total <= max_size * 2**20:
+            break
+        total -= size
+        # Renamed before it is removed, so a job restoring it gets an error
+        # instead of a partial copy
+        trash_dir = tempfile.mkdtemp(prefix=".", dir=cache_dir)
+        try:
+            os.rename(entry_dir, os.path.join(trash_dir, "entry"))
+        except OSError:
+            pass  # Evicted by another job
+        shutil.rmtree(trash_dir, ignore_errors=True)
+
+
+def store(job_dir: str, keys: tuple[str, str, dict[str, str]],
+          max_size: int = default_cache_size) -> None:
+    # Must be called after make
+    config_key, build_key, hashes = keys
+    entry_dir = os.path.join(cache_dir, build_key)
+    if read_entry(entry_dir) is not None:
+        return
+    # Only complete builds are stored
+    if not all(os.path.exists(stamp_path(job_dir, source))
+               for source in hashes):
+        return
+
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_dir = tempfile.mkdtemp(prefix=".", dir=cache_dir)
+    shutil.copytree(os.path.join(job_dir, "work"),
+                    os.path.join(temp_dir, "work"), symlinks=True)
+    if os.path.exists(os.path.join(job_dir, "modelsim.ini")):
+        shutil.copy2(os.path.join(job_dir, "modelsim.ini"), temp_dir)
+    with open(os.path.join(temp_dir, "entry.json"), 'w') as file:
+        json.dump({"config": config_key, "sources": hashes}, file)
+    try:
+        os.rename(temp_dir, entry_dir)
+    except OSError:  # Another job stored the same build first
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    evict(max_size)
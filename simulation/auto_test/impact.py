@@ -0,0 +1,223 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from defines import tops_with_mifs
+
+# Change-impact test selection: the files and modules["local"] of every
+# Manifest.py under rtl/, testbench/, utils/ and toplevel/ form a graph of
+# directories, and a testbench depends on every file of the directories its
+# Manifest reaches. A change reruns only the testbenches that depend on it
+sim_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+root_dir = os.path.dirname(sim_dir)
+manifest_roots = ["rtl", "testbench", "utils", "toplevel"]
+graph_path = os.path.join(sim_dir, "jobs", "manifest_graph.json")
+hdl_suffixes = [".sv", ".svh", ".v", ".vh", ".vhd", ".vhdl"]
+data_suffixes = [".mif", ".hex", ".bin", ".mem"]
+# Programs run by the tops with mifs (one job per ROM MIF)
+rom_programs_dir = "simulation/MIFs/memory/ROM/core/"
+ram_program = "simulation/MIFs/memory/RAM/core.mif"
+# Files that change how every testbench is built or run
+global_files = ["simulation/Manifest.py", "simulation/vsim_tcl.do",
+                "simulation/auto_test/",
+                "simulation/assembly_converter/bintohex.py"]
+
+
+def manifest_paths() -> list[str]:
+    paths = []
+    for manifest_root in manifest_roots:
+        for directory, _, files in os.walk(os.path.join(root_dir,
+                                                        manifest_root)):
+            if "Manifest.py" in files:
+                paths.append(os.path.join(directory, "Manifest.py"))
+    return sorted(paths)
+
+
+def parse_manifest(file_path: str) -> dict[str, list[str]]:
+    # files and modules["local"] of a Manifest, relative to the repository
+    namespace = {}
+    with open(file_path, 'r') as file:
+        exec(file.read(), {}, namespace)
+    directory = os.path.dirname(file_path)
+
+    def relative(path: str) -> str:
+        return os.path.relpath(os.path.normpath(os.path.join(directory, path)),
+                               root_dir)
+    return {"files": [relative(path) for path in namespace.get("files", [])],
+            "modules": [relative(path) for path in
+                        namespace.get("modules", {}).get("local", [])]}
+
+
+def manifest_graph() -> dict[str, dict[str, list[str]]]:
+    # Directory -> its files and modules, cached in simulation/jobs until a
+    # Manifest.py is added, removed or edited
+    paths = manifest_paths()
+    key = [[os.path.relpath(path, root_dir), os.stat(path).st_mtime_ns,
+            os.stat(path).st_size] for path in paths]
+    try:
+        with open(graph_path, 'r') as file:
+            cached = json.load(file)
+        if cached["key"] == key:
+            return cached["graph"]
+    except (OSError, ValueError, KeyError):
+        pass
+    graph = {os.path.relpath(os.path.dirname(path), root_dir):
+             parse_manifest(path) for path in paths}
+    os.makedirs(os.path.dirname(graph_path), exist_ok=True)
+    with open(graph_path, 'w') as file:
+        json.dump({"key": key, "graph": graph}, file)
+    return graph
+
+
+def closure(graph: dict[str, dict[str, list[str]]],
+            directory: str) -> set[str]:
+    # Directories reached from a Manifest through modules["local"]
+    reached, pending = set(), [directory]
+    while pending:
+        current = pending.pop()
+        if current in reached or current not in graph:
+            continue
+        reached.add(current)
+        pending += graph[current]["modules"]
+    return reached
+
+
+def testbenches(graph: dict[str, dict[str, list[str]]]) -> dict[str, str]:
+    # Top -> file, for the *_tb files listed by the testbench/ Manifests
+    tops = {}
+    for directory, manifest in graph.items():
+        if not directory.startswith("testbench"):
+            continue
+        for path in manifest["files"]:
+            name, suffix = os.path.splitext(os.path.basename(path))
+            if name.endswith("_tb") and suffix in hdl_suffixes:
+                tops[name] = path
+    return tops
+
+
+def changed_files(base: str = "HEAD") -> list[str]:
+    # Files changed since the merge base of base and HEAD, including the
+    # uncommitted and untracked ones
+    merge_base = subprocess.run(['git', 'merge-base', base, 'HEAD'],
+                                capture_output=True, text=True, cwd=root_dir)
+    if merge_base.returncode != 0:
+        raise ValueError(f"git merge-base {base} HEAD: "
+                         f"{merge_base.stderr.strip()}")
+    diff = subprocess.run(['git', 'diff', '--name-only',
+                           merge_base.stdout.strip()],
+                          capture_output=True, text=True, cwd=root_dir)
+    untracked = subprocess.run(['git', 'ls-files', '--others',
+                                '--exclude-standard'],
+                               capture_output=True, text=True, cwd=root_dir)
+    return sorted(set(diff.stdout.split() + untracked.stdout.split()))
+
+
+def mentions(file_path: str, text: str) -> bool:
+    try:
+        with open(os.path.join(root_dir, file_path), 'r',
+                  errors="replace") as file:
+            return text in file.read()
+    except OSError:
+        return False
+
+
+def affected_tops(files: list[str], graph: dict[str, dict[str, list[str]]]
+                  ) -> dict[str, tuple[str, set[str] | None]]:
+    # Top -> (first changed file that affects it, the ROM programs to rerun
+    # or None for all of them)
+    tops = testbenches(graph)
+    directories = {top: closure(graph, os.path.dirname(path))
+                   for top, path in tops.items()}
+    listed = {path: directory for directory, manifest in graph.items()
+              for path in manifest["files"]}
+    affected = {}
+
+    def select(top: str, file: str, programs: set[str] | None = None) -> None:
+        if top not in affected:
+            affected[top] = (file, programs)
+        elif affected[top][1] is not None:
+            # Every program when programs is None
+            affected[top] = (affected[top][0],
+                             programs and affected[top][1] | programs)
+
+    for file in files:
+        name, suffix = os.path.splitext(os.path.basename(file))
+        directory = os.path.dirname(file)
+        if any(file == path or path.endswith("/") and file.startswith(path)
+               for path in global_files):
+            for top in tops:
+                select(top, file)
+        elif file.startswith(rom_programs_dir) and suffix == ".mif":
+            for top in tops_with_mifs:
+                select(top, file, {name})
+        elif file == ram_program:
+            for top in tops_with_mifs:
+                select(top, file)
+        elif name in tops and file == tops[name]:
+            # The testbench itself and the ones in other directories that
+            # instantiate it (e.g. the parameter variants of cache_tb)
+            for top in tops:
+                if top == name or (os.path.dirname(tops[top]) != directory and
+                                   directory in directories[top]):
+                    select(top, file)
+        elif file in listed or (directory in graph and suffix in hdl_suffixes):
+            # Sources and the include files next to them
+            for top in tops:
+                if listed.get(file, directory) in directories[top]:
+                    select(top, file)
+        elif os.path.basename(file) == "Manifest.py" and directory in graph:
+            for top in tops:
+                if directory in directories[top]:
+                    select(top, file)
+        elif suffix in data_suffixes:
+            # Memory images read by the sources (but not by the other
+            # testbenches of the same Manifest) through their file name
+            top_files = set(tops.values())
+            for top in tops:
+                sources = [path for reached in directories[top]
+                           for path in graph[reached]["files"]
+                           if path == tops[top] or path not in top_files]
+                if any(mentions(path, os.path.basename(file))
+                       for path in sources):
+                    select(top, file)
+        elif suffix in hdl_suffixes and file.split("/")[0] in manifest_roots:
+            # HDL outside the Manifest tree: can't tell, rerun everything
+            for top in tops:
+                select(top, file)
+    return affected
+
+
+# MAIN
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List the testbenches "
+                                     "affected by a change, from the Manifest "
+                                     "dependency graph")
+    parser.add_argument("base", nargs="?", default="HEAD",
+                        help="git revision to compare with (its merge base "
+                             "with HEAD; default: HEAD, the uncommitted "
+                             "changes)")
+    parser.add_argument("-f", "--files", nargs="+",
+                        help="changed files (relative to the repository) "
+                             "instead of git")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="only print the names of the testbenches")
+    args = parser.parse_args()
+
+    try:
+        files = args.files or changed_files(args.base)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+    graph = manifest_graph()
+    affected = affected_tops(files, graph)
+    for top in sorted(affected):
+        if args.quiet:
+            print(top)
+            continue
+        file, programs = affected[top]
+        runs = f" ({', '.join(sorted(programs))})" if programs else ""
+        print(f"{top:<28}{file}{runs}")
+    if not args.quiet:
+        print(f"{len(affected)} of {len(testbenches(graph))} testbenches "
+              f"affected by {len(files)} changed files")
@@ -0,0 +1,198 @@
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import NamedTuple
+from manifest_utils import write_lines, run_command
+import build_cache
+import verilator_sim
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "..", "assembly_converter"))
+from bintohex import convert_directory, read_mif, write_bin  # noqa: E402
+
+# simulation/ directory (where the shared Manifest.py lives)
+sim_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Each job gets its own scratch directory inside jobs_dir
+jobs_dir = os.path.join(sim_dir, "jobs")
+# Raw binary images of the MIFs (loaded by rom.sv/single_port_ram.sv with
+# $fread instead of parsing one line per byte)
+images_dir = os.path.join(jobs_dir, "images")
+ram_mif_path = os.path.join(sim_dir, "MIFs/memory/RAM/core.mif")
+ram_image_path = os.path.join(images_dir, "core.bin")
+
+
+class JobResult(NamedTuple):
+    testbench: str
+    mif: str | None
+    build_output: str  # hdlmake and compilation
+    sim_output: str
+    compile_time: float  # Wall times in seconds
+    sim_time: float
+
+
+def job_name(testbench: str, mif: str | None) -> str:
+    if mif is None:
+        return testbench
+    return testbench + "-" + mif
+
+
+def prepare_job(testbench: str, mif: str | None,
+                settings: list[tuple[str, str]]) -> str:
+    # Create a clean scratch directory with its own Manifest.py
+    job_dir = os.path.join(jobs_dir, job_name(testbench, mif))
+    shutil.rmtree(job_dir, ignore_errors=True)
+    os.makedirs(job_dir)
+    manifest_path = os.path.join(job_dir, "Manifest.py")
+    shutil.copy(os.path.join(sim_dir, "Manifest.py"), manifest_path)
+
+    # Sources, MIFs and .do files are referenced from the simulation dir,
+    # while extensions.vh, board.vh, ROM.mif and RAM.mif are generated
+    # inside the job directory, so jobs never touch each other's files
+    # (hdlmake only accepts relative paths for the modules)
+    search_string = ["sim_dir", "sim_top"]
+    new_content = [f"sim_dir = \"{os.path.relpath(sim_dir, job_dir)}\"",
+                   f"sim_top = \"{testbench}\""]
+    if mif is not None:
+        search_string.append("mif_name")
+        new_content.append(f"mif_name = \"{mif}.mif\"")
+    for key, line in settings:
+        search_string.append(key)
+        new_content.append(line)
+    write_lines(search_string, new_content, manifest_path)
+    return job_dir
+
+
+def run_test(testbench: str, job_dir: str, cache_size: int | None = None,
+             simulator: str = "modelsim") -> tuple[str, str, float, float]:
+    # Same steps as "make" (sim_pre_cmd, simulation and sim_post_cmd), timing
+    # the compilation and the simulation apart
+    start = time.monotonic()
+    output = run_command(['hdlmake'], job_dir)
+    if simulator == "verilator":
+        output += run_command(['make', 'sim_pre_cmd'], job_dir)
+        output += verilator_sim.build(job_dir, testbench)
+        compiled = time.monotonic()
+        sim_output = verilator_sim.simulate(job_dir, testbench, [])
+        # The rest of sim_post_cmd (verilator_sim.py would build again)
+        run_command(['rm', '-f', 'ROM.mif', 'RAM.mif'], job_dir)
+        return (output, sim_output, compiled - start,
+                time.monotonic() - compiled)
+    # The build cache holds ModelSim work libraries only
+    # make only compiles what the cached work library doesn't have
+    if cache_size is not None:
+        keys, _, message = build_cache.restore(job_dir)
+        output += message
+    output += run_command(['make', 'sim_pre_cmd', 'simulation'], job_dir)
+    if cache_size is not None:
+        build_cache.store(job_dir, keys, cache_size)
+    compiled = time.monotonic()
+    sim_output = run_command(['make', 'sim_post_cmd'], job_dir)
+    return output, sim_output, compiled - start, time.monotonic() - compiled
+
+
+def run_job(job: tuple[str, str | None, str, int | None, str]) -> JobResult:
+    testbench, mif, job_dir, cache_size, simulator = job
+    return JobResult(testbench, mif, *run_test(testbench, job_dir, cache_size,
+                                               simulator))
+
+
+def run_jobs(jobs: list[tuple[str, str | None]],
+             settings: list[tuple[str, str]],
+             num_jobs: int,
+             cache_size: int | None = None,
+             simulator: str = "modelsim") -> list[JobResult]:
+    # Manifests are generated serially, simulations run in parallel
+    # cache_size (MB) enables the build cache (None disables it)
+    prepared = [(testbench, mif, prepare_job(testbench, mif, settings),
+                 cache_size, simulator) for testbench, mif in jobs]
+    with ProcessPoolExecutor(max_workers=num_jobs) as executor:
+        # map keeps the results in the same order as the jobs
+        return list(executor.map(run_job, prepared))
+
+
+def compile_design(testbench: str, settings: list[tuple[str, str]],
+                   cache_size: int | None = None, simulator: str = "modelsim",
+                   build_jobs: int = 0, parameters: tuple[str, ...] = ()
+                   ) -> tuple[str, str, float]:
+    # Compile ("make simulation" doesn't call vsim) and optimize only once
+    # parameters: overrides of the top parameters ("NAME=VALUE")
+    # Returns the job directory, the output and the wall time
+    job_dir = prepare_job(testbench, None, settings)
+    start = time.monotonic()
+    if simulator == "verilator":
+        output = verilator_sim.build(job_dir, testbench, build_jobs,
+                                     parameters)
+        return job_dir, output, time.monotonic() - start
+    vopt = (['vopt', testbench, '-o', testbench + "_opt"] +
+            ["-G" + parameter for parameter in parameters])
+    output = run_command(['hdlmake'], job_dir)
+    if cache_size is not None:
+        # Only the builds optimized by the same vopt command are hits (run_test
+        # stores libraries without the optimized design)
+        keys, hit, message = build_cache.restore(job_dir, " ".join(vopt))
+        output += message
+        if hit:  # The cached library already has the optimized design
+            return job_dir, output, time.monotonic() - start
+    output += run_command(['make', 'simulation'], job_dir)
+    output += run_command(vopt, job_dir)
+    if cache_size is not None:
+        build_cache.store(job_dir, keys, cache_size)
+    return job_dir, output, time.monotonic() - start
+
+
+def simulate_program(job: tuple[str, str, str, str, tuple[str, ...]]
+                     ) -> JobResult:
+    testbench, mif, job_dir, simulator, extra_plusargs = job
+    # rom.sv/single_port_ram.sv read their init files from these plusargs
+    rom_image_path = os.path.join(images_dir, "ROM", mif + ".bin")
+    plusargs = ["+ROM_INIT_FILE=" + rom_image_path,
+                "+RAM_INIT_FILE=" + ram_image_path] + list(extra_plusargs)
+    start = time.monotonic()
+    if simulator == "verilator":
+        output = verilator_sim.simulate(job_dir, testbench, plusargs)
+        with open(os.path.join(job_dir, f"transcript_{mif}"), 'w') as file:
+            file.write(output)
+        return JobResult(testbench, mif, "", output, 0.0,
+                         time.monotonic() - start)
+    # Each program gets its own transcript and wlf, so they can run together
+    command = ['vsim', '-c', '-do', os.path.join(sim_dir, "vsim_tcl.do"),
+               '-l', f"transcript_{mif}", '-wlf', f"vsim_{mif}.wlf",
+               testbench + "_opt"] + plusargs
+    output = run_command(command, job_dir)
+    return JobResult(testbench, mif, "", output, 0.0, time.monotonic() - start)
+
+
+def run_compiled_jobs(jobs: list[tuple[str, str]],
+                      settings: list[tuple[str, str]],
+                      num_jobs: int,
+                      cache_size: int | None = None,
+                      simulator: str = "modelsim",
+                      rom_dir: str = "MIFs/memory/ROM/core",
+                      parameters: tuple[str, ...] = (),
+                      plusargs: tuple[str, ...] = ()) -> list[JobResult]:
+    # Compile each top once and then only simulate each of its MIFs
+    # (from rom_dir, relative to simulation/), with the given top parameters
+    # and extra plusargs. The compilation is returned as the (testbench,
+    # None) job
+    tops = list(dict.fromkeys(testbench for testbench, _ in jobs))
+    convert_directory(os.path.join(sim_dir, rom_dir),
+                      os.path.join(images_dir, "ROM"), "bin")
+    write_bin(ram_image_path, read_mif(ram_mif_path))
+    # The C++ compilation of each Verilator model shares the cores
+    build_jobs = max(1, (os.cpu_count() or 1) // min(num_jobs, len(tops) or 1))
+    with ProcessPoolExecutor(max_workers=num_jobs) as executor:
+        builds = dict(zip(tops, executor.map(compile_design, tops,
+                                             repeat(settings),
+                                             repeat(cache_size),
+                                             repeat(simulator),
+                                             repeat(build_jobs),
+                                             repeat(parameters))))
+        programs = [(testbench, mif, builds[testbench][0], simulator,
+                     plusargs) for testbench, mif in jobs]
+        results = list(executor.map(simulate_program, programs))
+    return [JobResult(testbench, None, builds[testbench][1], "",
+                      builds[testbench][2], 0.0)
+            for testbench in tops] + results
@@ -1,9 +1,10 @@
 import subprocess
 
 
-def write_lines(search_string: list[str], new_content: list[str]) -> None:
+def write_lines(search_string: list[str], new_content: list[str],
+                manifest_path: str = "../Manifest.py") -> None:
     # Read the content of the file
-    with open("../Manifest.py", 'r') as file:
+    with open(manifest_path, 'r') as file:
         lines = file.readlines()
 
     line_number = [0]*len(search_string)
@@ -19,16 +20,12 @@ def write_lines(search_string: list[str], new_content: list[str]) -> None:
             lines[line_number[j] - 1] = content + '\n'
 
             # Write the modified content back to the file
-            with open("../Manifest.py", 'w') as file:
+            with open(manifest_path, 'w') as file:
                 file.writelines(lines)
         else:
             print(f"String '{search_string[j]}' not found in the file.")
 
 
-def run_simulation() -> None:
-    result = subprocess.run(['hdlmake'],
-                            capture_output=True, text=True, cwd="..")
-    print(result.stdout + result.stderr)
-    result = subprocess.run(['make'],
-                            capture_output=True, text=True, cwd="..")
-    print(result.stdout + result.stderr)
+def run_command(command: list[str], cwd: str = "..") -> str:
+    result = subprocess.run(command, capture_output=True, text=True, cwd=cwd)
+    return result.stdout + result.stderr + "\n"
@@ -0,0 +1,100 @@
+import argparse
+import ast
+import os
+import re
+from defines import tops_with_mifs
+
+# Reads the performance counters printed by core_tb at the end of each
+# program (mcycle, minstret and mhpmcounter3+, see csr_pkg::hpm_event_t)
+# and reports the CPI and where the cycles went
+counter_line = re.compile(r"^(?:# )?(mcycle|minstret|mhpmcounter\d+ "
+                          r"Hpm(\w+)): (\d+)$")
+section_line = re.compile(r"^-{9}(\w+)-{9}$")
+rom_plusarg = re.compile(r"\+ROM_INIT_FILE=\S*?([^/\s]+)\.(?:mif|hex|bin)")
+columns = [
+    # (title, event, counted in cycles)
+    ("Hazard", "DataHazardStall", True),
+    ("Mispred", "BranchMispredict", True),
+    ("Memory", "MemoryStall", True),
+    ("MulDiv", "MulDivStall", True),
+    ("Traps", "TrapFlush", False),
+    ("Fwd", "Forwarding", False),
+    ("I$ miss", "InstCacheMiss", False),
+    ("D$ miss", "DataCacheMiss", False),
+    ("D$ wb", "DataCacheWriteBack", False),
+    ("Branches", "Branch", False),
+]
+
+
+def read_runs(file_path: str) -> list[tuple[str, dict[str, int], bool]]:
+    # (program, counters, reached the end of the program) of each run
+    runs = []
+    default_name = os.path.basename(file_path)
+    if default_name.startswith("transcript_"):  # auto_test -c transcripts
+        default_name = default_name[len("transcript_"):]
+    mifs, top, program_index = [], None, 0
+    name, counters, ended = None, None, False
+    with open(file_path, errors="replace") as file:
+        for line in file:
+            line = line.rstrip()
+            if line.startswith("############## mifs: "):
+                mifs = ast.literal_eval(line[len("############## mifs: "):])
+            elif match := section_line.match(line):
+                top, program_index = match.group(1), 0
+            elif match := rom_plusarg.search(line):
+                name = match.group(1)
+            elif line.endswith("SOT!"):
+                if (name is None and top in tops_with_mifs and
+                        program_index < len(mifs)):
+                    name = mifs[program_index]
+                program_index += 1
+                ended = False
+            elif line.endswith("End of program!"):
+                ended = True
+            elif line.endswith("Performance counters:"):
+                counters = {}
+                runs.append((name or default_name, counters, ended))
+                name = None
+            elif (counters is not None and
+                  (match := counter_line.match(line))):
+                counters[match.group(2) or match.group(1)] = int(
+                    match.group(3))
+    return runs
+
+
+def report(runs: list[tuple[str, dict[str, int], bool]]) -> None:
+    print(f"{'Program':<20}{'Cycles':>9}{'Instret':>9}{'CPI':>7}" +
+          "".join(f"{title:>9}" for title, _, _ in columns))
+    for name, counters, ended in runs:
+        cycles = counters.get("mcycle", 0)
+        instret = counters.get("minstret", 0)
+        cpi = f"{cycles / instret:.2f}" if instret else "-"
+        line = f"{name:<20}{cycles:>9}{instret:>9}{cpi:>7}"
+        for _, event, in_cycles in columns:
+            count = counters.get(event, 0)
+            if in_cycles and cycles:
+                line += f"{100 * count / cycles:>8.1f}%"
+            else:
+                line += f"{count:>9}"
+        print(line + ("" if ended else "  (cycle limit)"))
+    print("Hazard, Mispred, Memory and MulDiv: % of the cycles stalled by "
+          "data hazards, lost to mispredicted branches/jumps, waiting for "
+          "memory and waiting for multi-cycle mul/div")
+
+
+# MAIN
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report CPI and stalls "
+                                     "from the core_tb performance counters")
+    parser.add_argument("logs", nargs="*", default=["../log.txt"],
+                        help="auto_test log or vsim transcripts "
+                             "(default: ../log.txt)")
+    args = parser.parse_args()
+
+    runs = []
+    for log in args.logs:
+        runs += read_runs(log)
+    if len(runs) == 0:
+        print("No performance counters found (only core_tb prints them)")
+    else:
+        report(runs)
@@ -0,0 +1,292 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from defines import tops_with_mifs
+from perf_report import counter_line
+
+# Results of each (testbench, mif) run by auto_test: status, wall times and
+# simulated cycles, appended to a history (one JSON record per line) and
+# compared with a baseline to catch the changes that cost cycles or time
+sim_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+results_dir = os.path.join(sim_dir, "results")
+history_path = os.path.join(results_dir, "history.jsonl")
+baseline_path = os.path.join(results_dir, "baseline.json")
+junit_path = os.path.join(results_dir, "junit.xml")
+# Failures reported by ModelSim, Verilator, make, verilator_sim.py and by
+# the $display of the testbenches (Verilator prefixes the time of $error and
+# $fatal). Verilator also reports $stop (the end of every testbench)
+# as an error
+error_line = re.compile(r"^(?:# )?\s*(?:\[\d+\] )?"
+                        r"(?:\*\* (?:Error|Fatal)|%Error|%Fatal|Error:|ERRO|"
+                        r"make: \*\*\*|Verilator: )")
+stop_line = re.compile(r"Verilog \$stop$")
+final_cycles_line = re.compile(r"^(?:# )?Number of Cycles:\s*(\d+)$")
+# Cycles are deterministic, wall times are not: a run is only slower if it
+# also takes min_time_increase seconds more
+default_threshold = 1  # %
+default_time_threshold = 25  # %
+min_time_increase = 1  # s
+failed_statuses = ["fail", "error", "timeout"]
+
+
+def run_info() -> tuple[str, str]:
+    # Run id (start time) and the commit of the tree being tested
+    result = subprocess.run(['git', 'describe', '--always', '--dirty'],
+                            capture_output=True, text=True, cwd=sim_dir)
+    return time.strftime("%Y%m%d-%H%M%S"), result.stdout.strip()
+
+
+def first_error(output: str) -> str | None:
+    for line in output.splitlines():
+        line = line.rstrip()
+        if error_line.match(line) and not stop_line.search(line):
+            return line.lstrip("# ").strip()
+    return None
+
+
+def job_status(testbench: str, build_output: str,
+               sim_output: str) -> tuple[str, str]:
+    # (status, message): error (didn't compile), fail, timeout (a program
+    # that didn't reach FinalAddress) or pass
+    if (line := first_error(build_output)) is not None:
+        return "error", line
+    if (line := first_error(sim_output)) is not None:
+        return "fail", line
+    if testbench in tops_with_mifs and "End of program!" not in sim_output:
+        return "timeout", "cycle limit reached before the end of the program"
+    return "pass", ""
+
+
+def simulated_cycles(output: str) -> dict[str, int]:
+    # mcycle and minstret of the performance counters and the cycles to the
+    # write to FinalAddress (core_tb and dataflow_tb)
+    cycles = {}
+    for line in output.splitlines():
+        line = line.rstrip()
+        if match := final_cycles_line.match(line):
+            cycles["final_cycles"] = int(match.group(1))
+        elif (match := counter_line.match(line)) and match.group(2) is None:
+            name = "cycles" if match.group(1) == "mcycle" else "instret"
+            cycles[name] = int(match.group(3))
+    return cycles
+
+
+def make_record(run: tuple[str, str], simulator: str, testbench: str,
+                mif: str | None, build_output: str, sim_output: str,
+                compile_time: float, sim_time: float) -> dict:
+    status, message = job_status(testbench, build_output, sim_output)
+    record = {"run": run[0], "commit": run[1], "simulator": simulator,
+              "testbench": testbench, "program": mif or "", "status": status,
+              "message": message, "compile_time": round(compile_time, 3),
+              "sim_time": round(sim_time, 3),
+              "cycles": None, "instret": None, "final_cycles": None}
+    record.update(simulated_cycles(sim_output))
+    return record
+
+
+def skipped_record(run: tuple[str, str], simulator: str, testbench: str,
+                   reason: str) -> dict:
+    return {"run": run[0], "commit": run[1], "simulator": simulator,
+            "testbench": testbench, "program": "", "status": "skipped",
+            "message": reason, "compile_time": 0.0, "sim_time": 0.0,
+            "cycles": None, "instret": None, "final_cycles": None}
+
+
+def record_key(record: dict) -> str:
+    return "/".join([record["simulator"], record["testbench"],
+                     record["program"]])
+
+
+def append_history(records: list[dict], file_path: str = history_path) -> None:
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'a') as file:
+        for record in records:
+            file.write(json.dumps(record) + "\n")
+
+
+def read_history(file_path: str = history_path) -> list[dict]:
+    records = []
+    try:
+        with open(file_path, 'r') as file:
+            for line in file:
+                if line.strip():
+                    records.append(json.loads(line))
+    except OSError:
+        pass
+    return records
+
+
+def read_baseline(file_path: str = baseline_path) -> dict[str, dict]:
+    try:
+        with open(file_path, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baseline(records: list[dict], file_path: str = baseline_path) -> int:
+    # Only passing runs replace the baseline of their (simulator, testbench,
+    # program); returns how many were saved
+    baseline = read_baseline(file_path)
+    saved = 0
+    for record in records:
+        if record["status"] == "pass":
+            baseline[record_key(record)] = record
+            saved += 1
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'w') as file:
+        json.dump(baseline, file, indent=1, sort_keys=True)
+    return saved
+
+
+def find_regressions(records: list[dict], baseline: dict[str, dict],
+                     threshold: float = default_threshold,
+                     time_threshold: float = default_time_threshold
+                     ) -> list[str]:
+    # Thresholds in % of the baseline
+    regressions = []
+    for record in records:
+        base = baseline.get(record_key(record))
+        if base is None or record["status"] == "skipped":
+            continue
+        name = record_key(record)
+        if record["status"] != "pass":
+            regressions.append(f"{name}: {record['status']} (passed on "
+                               f"{base['commit']})")
+            continue
+        for field in ["cycles", "final_cycles"]:
+            if record[field] is None or not base.get(field):
+                continue
+            increase = 100 * (record[field] - base[field]) / base[field]
+            if increase > threshold:
+                regressions.append(f"{name}: {field} {base[field]} -> "
+                                   f"{record[field]} (+{increase:.1f}%)")
+        if (base["sim_time"] and
+                record["sim_time"] - base["sim_time"] > min_time_increase):
+            increase = (100 * (record["sim_time"] - base["sim_time"]) /
+                        base["sim_time"])
+            if increase > time_threshold:
+                regressions.append(f"{name}: sim time "
+                                   f"{base['sim_time']:.1f} s -> "
+                                   f"{record['sim_time']:.1f} s "
+                                   f"(+{increase:.0f}%)")
+    return regressions
+
+
+def write_junit(records: list[dict], file_path: str = junit_path) -> None:
+    # One testsuite per testbench, one testcase per program
+    suites = {}
+    for record in records:
+        suites.setdefault(record["testbench"], []).append(record)
+    root = ET.Element("testsuites", name="auto_test")
+    for testbench, suite_records in suites.items():
+        suite = ET.SubElement(root, "testsuite", name=testbench,
+                              tests=str(len(suite_records)))
+        counts = {"failures": 0, "errors": 0, "skipped": 0}
+        suite_time = 0.0
+        for record in suite_records:
+            case_time = record["compile_time"] + record["sim_time"]
+            suite_time += case_time
+            classname = f"{record['simulator']}.{testbench}"
+            case = ET.SubElement(suite, "testcase", classname=classname,
+                                 name=record["program"] or testbench,
+                                 time=f"{case_time:.3f}")
+            if record["status"] == "error":
+                ET.SubElement(case, "error", message=record["message"])
+                counts["errors"] += 1
+            elif record["status"] in failed_statuses:
+                ET.SubElement(case, "failure", message=record["message"],
+                              type=record["status"])
+                counts["failures"] += 1
+            elif record["status"] == "skipped":
+                ET.SubElement(case, "skipped", message=record["message"])
+                counts["skipped"] += 1
+            if (record["cycles"] is not None or
+                    record["final_cycles"] is not None):
+                properties = ET.SubElement(case, "properties")
+                for field in ["cycles", "instret", "final_cycles"]:
+                    if record[field] is not None:
+                        ET.SubElement(properties, "property", name=field,
+                                      value=str(record[field]))
+        for name, count in counts.items():
+            suite.set(name, str(count))
+        suite.set("time", f"{suite_time:.3f}")
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    ET.ElementTree(root).write(file_path, encoding="utf-8",
+                               xml_declaration=True)
+
+
+def report(records: list[dict], baseline: dict[str, dict],
+           file=sys.stdout) -> None:
+    print(f"{'Test':<40}{'Status':>9}{'Compile':>9}{'Sim':>8}{'Cycles':>10}"
+          f"{'Baseline':>10}", file=file)
+    for record in records:
+        base = baseline.get(record_key(record), {})
+        cycles = record["cycles"] or record["final_cycles"]
+        base_cycles = base.get("cycles") or base.get("final_cycles")
+        name = record["testbench"]
+        if record["program"]:
+            name += f" {record['program']}"
+        print(f"{name:<40}{record['status']:>9}{record['compile_time']:>8.1f}s"
+              f"{record['sim_time']:>7.1f}s{cycles or '-':>10}"
+              f"{base_cycles or '-':>10}", file=file)
+    counts = {status: sum(record["status"] == status for record in records)
+              for status in ["pass"] + failed_statuses + ["skipped"]}
+    print(", ".join(f"{count} {status}" for status, count in counts.items()),
+          file=file)
+
+
+# MAIN
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare a run of auto_test "
+                                     "with the baseline")
+    parser.add_argument("-r", "--run",
+                        help="run id (default: the last one in the history)")
+    parser.add_argument("-l", "--list", action="store_true",
+                        help="list the runs in the history")
+    parser.add_argument("-t", "--threshold", type=float,
+                        default=default_threshold,
+                        help="cycle increase flagged as a regression, in %% "
+                             f"(default: {default_threshold})")
+    parser.add_argument("--time-threshold", type=float,
+                        default=default_time_threshold,
+                        help="simulation time increase flagged as a "
+                             "regression, in %% (default: "
+                             f"{default_time_threshold})")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="make the passing tests of the run the baseline")
+    args = parser.parse_args()
+
+    history = read_history()
+    runs = list(dict.fromkeys(record["run"] for record in history))
+    if len(runs) == 0:
+        print(f"No runs in {history_path}")
+        sys.exit(1)
+    if args.list:
+        for run in runs:
+            records = [record for record in history if record["run"] == run]
+            failed = sum(record["status"] in failed_statuses
+                         for record in records)
+            print(f"{run}  {records[0]['commit']:<20}{len(records):>4} tests"
+                  f"{failed:>4} failed")
+        sys.exit(0)
+    run = args.run or runs[-1]
+    records = [record for record in history if record["run"] == run]
+    if len(records) == 0:
+        print(f"Run {run} not found")
+        sys.exit(1)
+    baseline = read_baseline()
+    if args.save_baseline:
+        print(f"{save_baseline(records)} tests of {run} saved as the baseline")
+        sys.exit(0)
+    report(records, baseline)
+    regressions = find_regressions(records, baseline, args.threshold,
+                                   args.time_threshold)
+    for regression in regressions:
+        print("REGRESSION " + regression)
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,83 @@
+import argparse
+import os
+import subprocess
+import sys
+from manifest_utils import run_command
+
+# Verilator backend: hdlmake only resolves the Manifest tree (list-files gives
+# the sources of the top in dependency order), Verilator compiles them into a
+# C++ model (obj_dir/<top>/<top>) and the model runs the testbench like vsim.
+# The executable can be changed with the VERILATOR environment variable
+verilator = os.environ.get("VERILATOR", "verilator")
+# Same conditions as ModelSim: 1 ns time unit, delays and assertions enabled
+# and the lint warnings of the existing code don't stop the build (but the
+# $error/$fatal of the elaboration-time parameter checks do)
+verilator_flags = ["--binary", "--timing", "--assert", "--quiet",
+                   "--timescale", "1ns/1ns", "-Wno-fatal", "-Werror-USERERROR",
+                   "-Werror-USERFATAL", "-Wno-lint",
+                   "-Wno-style", "-Wno-HIERPARAM", "-Wno-TIMESCALEMOD",
+                   "-Wno-UNOPTFLAT"]
+
+
+def list_sources(job_dir: str, top: str) -> list[str]:
+    # Also runs the Manifest, which generates board.vh and extensions.vh
+    result = subprocess.run(['hdlmake', 'list-files', '--top', top],
+                            capture_output=True, text=True, cwd=job_dir)
+    return result.stdout.split()
+
+
+def model_path(job_dir: str, top: str) -> str:
+    return os.path.join(os.path.abspath(job_dir), "obj_dir", top, top)
+
+
+def build(job_dir: str, top: str, jobs: int = 0,
+          parameters: tuple[str, ...] = ()) -> str:
+    # jobs: C++ compilation jobs (0 uses all cores)
+    # parameters: overrides of the top parameters ("NAME=VALUE")
+    sources = list_sources(job_dir, top)
+    if len(sources) == 0:
+        return f"Verilator: no sources found for {top}\n"
+    # board.vh and extensions.vh of job_dir come before the ones linked
+    # from utils/globals
+    include_dirs = [os.path.abspath(job_dir)]
+    include_dirs += sorted({os.path.dirname(source) for source in sources})
+    os.makedirs(os.path.join(job_dir, "obj_dir"), exist_ok=True)
+    command = ([verilator] + verilator_flags +
+               ["-j", str(jobs), "--top-module", top,
+                "--Mdir", os.path.join("obj_dir", top), "-o", top] +
+               ["-G" + parameter for parameter in parameters] +
+               ["-I" + include_dir for include_dir in include_dirs] + sources)
+    return run_command(command, job_dir)
+
+
+def simulate(job_dir: str, top: str, plusargs: list[str]) -> str:
+    # The command line is echoed like in the vsim transcript (perf_report.py
+    # takes the program name from +ROM_INIT_FILE)
+    command = [model_path(job_dir, top)] + plusargs
+    if not os.path.exists(command[0]):
+        return f"Verilator: {top} was not built\n"
+    return " ".join(command) + "\n" + run_command(command, job_dir)
+
+
+# MAIN
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and run a testbench "
+                                     "with Verilator (run where the "
+                                     "Manifest.py is)")
+    parser.add_argument("top", help="testbench top module")
+    parser.add_argument("plusargs", nargs="*",
+                        help="plusargs of the model (+ROM_INIT_FILE=...)")
+    parser.add_argument("-n", "--no-build", action="store_true",
+                        help="run the model built before")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="C++ compilation jobs (0 uses all cores)")
+    parser.add_argument("-G", dest="parameters", action="append", default=[],
+                        metavar="NAME=VALUE", help="override a top parameter")
+    args = parser.parse_args()
+
+    if not args.no_build:
+        print(build(".", args.top, args.jobs, tuple(args.parameters)), end="")
+    if not os.path.exists(model_path(".", args.top)):
+        print(f"Verilator: {args.top} was not built", file=sys.stderr)
+        sys.exit(1)
+    print(simulate(".", args.top, args.plusargs), end="")
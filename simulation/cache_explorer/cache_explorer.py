@@ -0,0 +1,380 @@
+import argparse
+import csv
+import os
+import sys
+import time
+from typing import NamedTuple
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "..", "golden_model"))
+from iss import Core, BranchPredictor  # noqa: E402
+from bintohex import read_mif  # noqa: E402
+
+# Trace-driven model of rtl/memory/Cache: write-back and write-allocate
+# caches with the cache_control states and the cache_path replacement
+# policies (cache_pkg::replacement_policy_t)
+# Idle -> CompareTag (hit: ack) or -> [WriteBack ->] Allocate -> CompareTag
+policies = ["lru", "plru", "fifo", "random"]
+hit_cycles = 2  # Idle + CompareTag
+max_events = 2**23  # (configuration, access) pairs simulated at a time
+min_lanes = 64  # Below this, the remaining sets are simulated one at a time
+
+
+class Config(NamedTuple):
+    cache_size: int  # Bits, like the CACHE_SIZE parameter
+    set_size: int
+    policy: str
+    block_size: int  # Bits, the width of the memory side of the wishbone
+
+
+class Trace(NamedTuple):
+    name: str
+    addresses: np.ndarray  # Byte addresses (int64)
+    writes: np.ndarray  # bool
+
+
+def read_trace(file_path: str) -> tuple[np.ndarray, np.ndarray]:
+    # core_tb +CACHE_TRACE=<file>: "<I|R|W> <hex address>" per access
+    with open(file_path) as file:
+        fields = file.read().split()
+    kinds = np.array(fields[0::2])
+    addresses = np.array([int(address, 16) for address in fields[1::2]],
+                         dtype=np.int64)
+    return kinds, addresses
+
+
+def run_program(program: str, ram: bytes, rv64: bool,
+                limit: int) -> tuple[np.ndarray, np.ndarray]:
+    # Accesses of a ROM MIF, recorded by the golden model
+    core = Core(read_mif(program).tobytes(), ram, rv64, BranchPredictor(0))
+    core.accesses = []
+    core.run(limit)
+    if len(core.accesses) == 0:
+        return np.array([], dtype=str), np.array([], dtype=np.int64)
+    kinds, addresses = zip(*core.accesses)
+    return np.array(kinds), np.array(addresses, dtype=np.int64)
+
+
+def split_trace(name: str, kinds: np.ndarray,
+                addresses: np.ndarray) -> list[Trace]:
+    # One trace for the instruction cache and one for the data cache
+    data = kinds != "I"
+    return [Trace(f"{name} I$", addresses[~data],
+                  np.zeros(np.sum(~data), dtype=bool)),
+            Trace(f"{name} D$", addresses[data], kinds[data] == "W")]
+
+
+def is_power_of_2(value: int) -> bool:
+    return value > 0 and value & (value - 1) == 0
+
+
+def valid_config(config: Config) -> bool:
+    # cache_path indexes the sets and the ways with bit fields
+    if not (is_power_of_2(config.set_size) and
+            is_power_of_2(config.block_size)):
+        return False
+    depth, remainder = divmod(config.cache_size,
+                              config.block_size * config.set_size)
+    return remainder == 0 and is_power_of_2(depth) and config.block_size >= 8
+
+
+def simulate(trace: Trace, configs: list[Config]) -> np.ndarray:
+    # Returns the (hits, misses, write backs) of each configuration
+    results = np.zeros((len(configs), 3), dtype=np.int64)
+    if len(trace.addresses) == 0:
+        return results
+    groups = {}
+    for i, config in enumerate(configs):
+        groups.setdefault((config.block_size, config.policy), []).append(i)
+    batch_size = max(1, max_events // len(trace.addresses))
+    for (block_size, policy), indexes in groups.items():
+        blocks = trace.addresses >> (block_size // 8).bit_length() - 1
+        for start in range(0, len(indexes), batch_size):
+            batch = indexes[start:start + batch_size]
+            results[batch] = simulate_batch(
+                blocks, trace.writes, [configs[i] for i in batch], policy)
+    return results
+
+
+class LaneState(NamedTuple):
+    tag: list[int]
+    dirty: list[bool]
+    age: list[int]
+    tree: list[bool]
+    fifo_next: int
+
+
+def simulate_lane(state: LaneState, ways: int, policy: str, tags: list[int],
+                  writes: list[bool],
+                  times: list[int]) -> tuple[list[bool], list[bool]]:
+    # Same as the steps of simulate_batch, for a single set
+    hits, write_backs = [], []
+    fifo_next = state.fifo_next
+    # LRU: ways from the most to the least recently used (increasing ages)
+    recency = sorted(range(ways), key=lambda way: state.age[way])
+    for tag, write, access_time in zip(tags, writes, times):
+        hit = tag in state.tag
+        write_back = False
+        if hit:
+            way = state.tag.index(tag)
+        else:
+            if policy == "lru":
+                way = recency[-1]
+            elif policy == "plru":
+                node = 1
+                while node < ways:
+                    node = 2*node + state.tree[node]
+                way = node - ways
+            elif policy == "fifo":
+                way, fifo_next = fifo_next, (fifo_next + 1) % ways
+            else:
+                way = access_time % ways
+            write_back = state.dirty[way]
+            state.tag[way], state.dirty[way] = tag, False
+        state.dirty[way] |= write
+        if policy == "lru":
+            recency.remove(way)
+            recency.insert(0, way)
+        elif policy == "plru":
+            node = ways + way
+            while node > 1:
+                state.tree[node >> 1] = node & 1 == 0
+                node >>= 1
+        hits.append(hit)
+        write_backs.append(write_back)
+    return hits, write_backs
+
+
+def simulate_batch(blocks: np.ndarray, writes: np.ndarray,
+                   configs: list[Config], policy: str) -> np.ndarray:
+    # Every set of every configuration is a lane with its own ways. Accesses
+    # to different lanes are independent, so the k-th access of all lanes is
+    # simulated at once (the number of steps is the length of the busiest set)
+    n = len(blocks)
+    depths = np.array([c.cache_size // (c.block_size * c.set_size)
+                       for c in configs])
+    ways = np.array([c.set_size for c in configs])
+    first_lane = np.concatenate(([0], np.cumsum(depths)[:-1]))
+    lane_ways = np.repeat(ways, depths)
+    max_ways = int(ways.max())
+
+    # Events: (configuration, access) pairs, sorted by lane and then by time
+    config_of = np.repeat(np.arange(len(configs)), n)
+    times = np.tile(np.arange(n), len(configs))
+    tags = np.tile(blocks, len(configs))
+    lanes = first_lane[config_of] + (tags & (depths[config_of] - 1))
+    order = np.lexsort((times, lanes))
+    config_of, lanes = config_of[order], lanes[order]
+    times, tags = times[order], tags[order]
+    is_write = writes[times]
+
+    # Repeated accesses to the block of the previous access of the same set
+    # always hit and don't change the replacement state: only their writes
+    # (to the dirty bit) are kept
+    repeat = np.zeros(len(lanes), dtype=bool)
+    repeat[1:] = (lanes[1:] == lanes[:-1]) & (tags[1:] == tags[:-1])
+    repeat_hits = np.bincount(config_of[repeat], minlength=len(configs))
+    first = np.flatnonzero(~repeat)
+    is_write = np.logical_or.reduceat(is_write, first)
+    config_of, lanes = config_of[first], lanes[first]
+    times, tags = times[first], tags[first]
+
+    starts = np.flatnonzero(np.diff(lanes, prepend=-1))
+    rank = np.arange(len(lanes)) - np.repeat(
+        starts, np.diff(np.append(starts, len(lanes))))
+    # Events sorted by rank in their set: each step is a slice
+    steps = np.argsort(rank, kind="stable")
+    config_of, lanes = config_of[steps], lanes[steps]
+    times, tags = times[steps], tags[steps]
+    is_write, rank = is_write[steps], rank[steps]
+    step_ends = np.cumsum(np.bincount(rank))
+
+    # State of the ways (the ways above the set size never match)
+    way_numbers = np.arange(max_ways)
+    used = way_numbers < lane_ways[:, None]
+    cache_tag = np.where(used, -1, -2)
+    cache_dirty = np.zeros(cache_tag.shape, dtype=bool)
+    age = np.where(used, way_numbers, -1)  # LRU: ages start at the way index
+    tree = np.zeros(cache_tag.shape, dtype=bool)  # PLRU: nodes 1 to ways-1
+    event_ways = lane_ways[lanes]
+    event_levels = np.log2(event_ways).astype(np.int64)
+    fifo_next = np.zeros(len(lane_ways), dtype=np.int64)
+
+    hit = np.zeros(len(lanes), dtype=bool)
+    write_back = np.zeros(len(lanes), dtype=bool)
+    start = 0
+    for end in step_ends:
+        if end - start < min_lanes:
+            break
+        events = slice(start, end)
+        start = end
+        lane, tag, lane_way = lanes[events], tags[events], event_ways[events]
+        rows = cache_tag[lane]
+        matches = rows == tag[:, None]
+        step_hit = matches.any(axis=1)
+
+        # Victim of the misses (cache_path set_index_victim)
+        if policy == "lru":
+            victim = np.argmax(age[lane], axis=1)
+        elif policy == "plru":
+            node = np.ones(len(lane), dtype=np.int64)
+            levels = event_levels[events]
+            for level in range(int(levels.max())):
+                node = np.where(level < levels, 2*node + tree[lane, node],
+                                node)
+            victim = node - lane_way
+        elif policy == "fifo":
+            victim = fifo_next[lane]
+        else:  # Counter incremented in Idle: about once per access
+            victim = times[events] % lane_way
+        way = np.where(step_hit, np.argmax(matches, axis=1), victim)
+
+        miss = ~step_hit
+        write_back[events] = miss & cache_dirty[lane, way]
+        cache_tag[lane[miss], way[miss]] = tag[miss]
+        cache_dirty[lane, way] = (step_hit & cache_dirty[lane, way] |
+                                  is_write[events])
+        hit[events] = step_hit
+
+        # The replacement state follows set_valid (hits and fills)
+        if policy == "lru":
+            accessed_age = age[lane, way]
+            lane_age = age[lane]
+            age[lane] = lane_age + ((lane_age >= 0) &
+                                    (lane_age < accessed_age[:, None]))
+            age[lane, way] = 0
+        elif policy == "plru":
+            node = lane_way + way
+            while np.any(node > 1):
+                active = node > 1
+                tree[lane[active], node[active] >> 1] = (node[active] & 1) == 0
+                node = np.where(active, node >> 1, node)
+        elif policy == "fifo":
+            fifo_next[lane[miss]] = ((fifo_next[lane[miss]] + 1) %
+                                     lane_way[miss])
+
+    # The few longest sets are finished one access at a time
+    events = start + np.lexsort((rank[start:], lanes[start:]))
+    lane_starts = np.flatnonzero(np.diff(lanes[events], prepend=-1))
+    lanes_events = np.split(events, lane_starts[1:]) if len(events) else []
+    for lane_events in lanes_events:
+        lane = lanes[lane_events[0]]
+        state = LaneState(cache_tag[lane].tolist(), cache_dirty[lane].tolist(),
+                          age[lane].tolist(), tree[lane].tolist(),
+                          int(fifo_next[lane]))
+        hit[lane_events], write_back[lane_events] = simulate_lane(
+            state, int(lane_ways[lane]), policy, tags[lane_events].tolist(),
+            is_write[lane_events].tolist(), times[lane_events].tolist())
+
+    counts = len(configs)
+    hits = np.bincount(config_of, weights=hit, minlength=counts) + repeat_hits
+    write_backs = np.bincount(config_of, weights=write_back, minlength=counts)
+    return np.stack([hits, n - hits, write_backs], axis=1).astype(np.int64)
+
+
+def estimated_cycles(accesses: int, misses: int, write_backs: int,
+                     memory_cycles: int) -> int:
+    # Allocate and WriteBack wait for the memory, the fill is followed by
+    # another CompareTag
+    return (hit_cycles * accesses + (memory_cycles + 1) * misses +
+            memory_cycles * write_backs)
+
+
+def report(trace: Trace, configs: list[Config], results: np.ndarray,
+           memory_cycles: int) -> list[list]:
+    accesses = len(trace.addresses)
+    print(f"############## {trace.name}: {accesses} accesses, "
+          f"{int(np.sum(trace.writes))} writes")
+    print(f"{'Size (B)':>9}{'Ways':>6}{'Sets':>6}{'Block':>7}  {'Policy':<8}"
+          f"{'Hit rate':>9}{'Misses':>8}{'WBs':>7}{'Cycles':>10}"
+          f"{'Per acc.':>9}")
+    rows = []
+    for config, (hits, misses, write_backs) in zip(configs, results):
+        cycles = estimated_cycles(accesses, misses, write_backs, memory_cycles)
+        sets = config.cache_size // (config.block_size * config.set_size)
+        hit_rate = 100 * hits / accesses if accesses else 0.0
+        per_access = cycles / accesses if accesses else 0.0
+        print(f"{config.cache_size // 8:>9}{config.set_size:>6}{sets:>6}"
+              f"{config.block_size:>7}  {config.policy:<8}{hit_rate:>8.2f}%"
+              f"{misses:>8}{write_backs:>7}{cycles:>10}{per_access:>9.2f}")
+        rows.append([trace.name, config.cache_size, config.set_size, sets,
+                     config.block_size, config.policy, accesses, hits, misses,
+                     write_backs, cycles])
+    return rows
+
+
+# MAIN
+if __name__ == "__main__":
+    default_ram = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               "..", "MIFs", "memory", "RAM", "core.mif")
+    parser = argparse.ArgumentParser(description="Sweep cache configurations "
+                                     "over memory access traces")
+    parser.add_argument("traces", nargs="+", help="core_tb cache traces "
+                        "(+CACHE_TRACE=<file>) or ROM MIFs, run on the golden "
+                        "model")
+    parser.add_argument("-c", "--cache-sizes", type=int, nargs="+",
+                        default=[2048, 4096, 8192, 16384, 32768, 65536],
+                        help="CACHE_SIZE values, in bits (default: 2048 to "
+                        "65536)")
+    parser.add_argument("-w", "--set-sizes", type=int, nargs="+",
+                        default=[1, 2, 4, 8],
+                        help="SET_SIZE values (default: 1 2 4 8)")
+    parser.add_argument("-p", "--policies", nargs="+", choices=policies,
+                        default=policies,
+                        help="replacement policies (default: all)")
+    parser.add_argument("-b", "--block-sizes", type=int, nargs="+",
+                        default=[128],
+                        help="block sizes in bits, the data width of the "
+                        "memory wishbone (default: 128, as in core_tb)")
+    parser.add_argument("-m", "--memory-cycles", type=int, default=5,
+                        help="cycles of each block transfer (default: 5, "
+                        "BUSY_CYCLES 4 of core_tb plus the ack)")
+    parser.add_argument("-r", "--ram", default=default_ram,
+                        help="RAM MIF of the programs (default: "
+                        "MIFs/memory/RAM/core.mif)")
+    parser.add_argument("-a", "--arch", choices=["RV32I", "RV64I"],
+                        default="RV64I",
+                        help="base ISA of the programs (default: RV64I)")
+    parser.add_argument("-n", "--limit", type=int, default=1000000,
+                        help="maximum number of instructions of each program")
+    parser.add_argument("-o", "--csv",
+                        help="also write the results to a CSV file")
+    args = parser.parse_args()
+
+    configs = [Config(cache_size, set_size, policy, block_size)
+               for block_size in args.block_sizes
+               for cache_size in args.cache_sizes
+               for set_size in args.set_sizes
+               for policy in args.policies]
+    invalid = [config for config in configs if not valid_config(config)]
+    for config in invalid:
+        print(f"Skipping CACHE_SIZE {config.cache_size}, "
+              f"SET_SIZE {config.set_size}, block {config.block_size}: "
+              "the number of sets must be a power of 2")
+    configs = [config for config in configs if valid_config(config)]
+    if len(configs) == 0:
+        sys.exit(1)
+
+    ram = read_mif(args.ram).tobytes() if args.ram else b""
+    rows = []
+    start = time.time()
+    for trace_path in args.traces:
+        name = os.path.splitext(os.path.basename(trace_path))[0]
+        if trace_path.endswith(".mif"):
+            kinds, addresses = run_program(trace_path, ram,
+                                           args.arch == "RV64I", args.limit)
+        else:
+            kinds, addresses = read_trace(trace_path)
+        for trace in split_trace(name, kinds, addresses):
+            results = simulate(trace, configs)
+            rows += report(trace, configs, results, args.memory_cycles)
+    print(f"{len(configs)} configurations, {time.time() - start:.1f} s")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["trace", "cache_size", "set_size", "sets",
+                             "block_size", "policy", "accesses", "hits",
+                             "misses", "write_backs", "cycles"])
+            writer.writerows(rows)
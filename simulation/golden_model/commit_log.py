@@ -0,0 +1,202 @@
+import argparse
+import os
+import struct
+import sys
+from collections import deque
+from typing import Iterator
+from iss import Core, disassemble, read_mif
+
+# Commit log records, as written by testbench/core/CommitLog/commit_log.sv
+# (kind, rd, csr, instruction, pc, value, extra)
+record_format = struct.Struct("<BBHIQQQ")
+Commit, CsrWrite, Trap = 1, 2, 3
+chunk_records = 4096  # Records read from a log at a time
+
+
+def read_log(file_path: str) -> Iterator[tuple]:
+    # Streams the records of a log (an incomplete last record is ignored)
+    with open(file_path, 'rb') as file:
+        while chunk := file.read(record_format.size * chunk_records):
+            yield from record_format.iter_unpack(
+                chunk[:len(chunk) - len(chunk) % record_format.size])
+
+
+def write_log(file_path: str, records: Iterator[tuple]) -> None:
+    with open(file_path, 'wb') as file:
+        for record in records:
+            file.write(record_format.pack(*record))
+
+
+def format_record(record: tuple | None, rv64: bool = True) -> str:
+    if record is None:
+        return "(end of log)"
+    kind, rd, csr, inst, pc, value, extra = record
+    if kind == Trap:
+        return (f"trap: cause 0x{value:X}, epc 0x{pc:08X}, "
+                f"handler 0x{extra:08X}")
+    text = disassemble(inst, rv64) or f".word 0x{inst:08X}"
+    if kind == CsrWrite:
+        return f"{pc:08X}: {inst:08X} {text} (csr 0x{csr:03X} <- 0x{value:X})"
+    write = f" (x{rd} <- 0x{value:X})" if rd != 0 or value != 0 else ""
+    return f"{pc:08X}: {inst:08X} {text}{write}"
+
+
+def group(record: tuple) -> int:
+    # Traps are compared apart: interrupts are recorded by the RTL before
+    # the instructions that were still in the pipeline
+    return 1 if record[0] == Trap else 0
+
+
+class LogReference:
+    # Reference given by another commit log
+    def __init__(self, file_path: str):
+        self.records = read_log(file_path)
+
+    def next_record(self) -> tuple | None:
+        return next(self.records, None)
+
+    def rtl_record(self, record: tuple, commits: int) -> None:
+        pass
+
+
+class IssReference:
+    # Reference given by the golden model, run in batches
+    # Interrupts are taken at the same point of the commit stream as in the
+    # RTL log: an interrupt trap is followed by the commits of the older
+    # instructions still in the pipeline and then by the handler
+    def __init__(self, core: Core, limit: int):
+        self.core = core
+        self.limit = limit
+        core.log = []
+        core.forced_interrupts = deque()
+        self.records = deque()
+        self.safe_commits = 0  # The golden model can't go past this commit
+        self.waiting = None  # (commit count, trap) of an unresolved interrupt
+
+    def rtl_record(self, record: tuple, commits: int) -> None:
+        # Called for every record read from the RTL log (commits: commit
+        # records read before this one)
+        kind, _, _, _, pc, value, extra = record
+        if self.waiting is not None:
+            _, trap = self.waiting
+            if kind == Commit and pc == trap[6]:  # First handler instruction
+                self.core.forced_interrupts.append((commits, trap[5]))
+                self.waiting = None
+        if kind == Trap and value >> (self.core.xlen - 1):
+            # Interrupts can't be delegated to the handler of a previous one
+            if self.waiting is None:
+                self.waiting = (commits, record)
+        if self.waiting is None:
+            self.safe_commits = commits + (kind == Commit)
+        else:
+            self.safe_commits = self.waiting[0]
+
+    def next_record(self) -> tuple | None:
+        core = self.core
+        while not self.records:
+            steps = min(self.safe_commits - core.commits,
+                        self.limit - core.instret)
+            if not core.running or core.error or steps <= 0:
+                return None
+            core.run(core.instret + steps)
+            self.records.extend(core.log)
+            core.log.clear()
+        return self.records.popleft()
+
+
+def compare(log: Iterator[tuple], reference, rv64: bool = True,
+            context: int = 8, window: int = 1 << 16) -> bool:
+    # Streams the RTL log against the reference, stopping at the first
+    # mismatch; only window records are kept in memory
+    rtl = deque()  # Records read ahead from the RTL log
+    commits_read = 0
+    buffered = (deque(), deque())  # Reference records, by group
+    history = deque(maxlen=context)
+    compared = 0
+    log = iter(log)
+
+    def fill() -> None:
+        nonlocal commits_read
+        while len(rtl) < window:
+            record = next(log, None)
+            if record is None:
+                return
+            reference.rtl_record(record, commits_read)
+            commits_read += record[0] == Commit
+            rtl.append(record)
+
+    def next_reference(record_group: int) -> tuple | None:
+        queue = buffered[record_group]
+        while not queue:
+            record = reference.next_record()
+            if record is None:
+                return None
+            buffered[group(record)].append(record)
+            if len(buffered[1 - record_group]) > window:
+                return None  # The logs have diverged
+        return queue.popleft()
+
+    fill()
+    while rtl:
+        record = rtl.popleft()
+        expected = next_reference(group(record))
+        if record != expected:
+            print(f"Mismatch after {compared} records:")
+            for previous in history:
+                print(f"         {format_record(previous, rv64)}")
+            print(f"RTL:     {format_record(record, rv64)}")
+            print(f"Expected {format_record(expected, rv64)}")
+            return False
+        history.append(record)
+        compared += 1
+        if len(rtl) < window // 2:
+            fill()
+    print(f"{compared} records match")
+    if any(buffered) or reference.next_record() is not None:
+        print("Note: the RTL log ended first (was the simulation stopped?)")
+    return True
+
+
+# MAIN
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare a commit log of "
+                                     "core_tb/dataflow_tb "
+                                     "(+COMMIT_LOG=<file>) with the golden "
+                                     "model or another log")
+    parser.add_argument("log", help="commit log of the RTL simulation")
+    parser.add_argument("reference", help="ROM MIF (run on the golden "
+                        "model) or commit log")
+    parser.add_argument("-r", "--ram", default=os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "MIFs", "memory",
+        "RAM", "core.mif"), help="RAM MIF (default: MIFs/memory/RAM/core.mif)")
+    parser.add_argument("-a", "--arch", choices=["RV32I", "RV64I"],
+                        default="RV64I", help="base ISA (default: RV64I)")
+    parser.add_argument("-n", "--limit", type=int, default=100000000,
+                        help="maximum number of golden model instructions")
+    parser.add_argument("-c", "--context", type=int, default=8,
+                        help="matching records shown before a mismatch")
+    parser.add_argument("-o", "--output", help="write the golden "
+                        "model log to OUTPUT instead of comparing")
+    args = parser.parse_args()
+    rv64 = args.arch == "RV64I"
+
+    if args.reference.endswith(".mif"):
+        core = Core(read_mif(args.reference).tobytes(),
+                    read_mif(args.ram).tobytes() if args.ram else b"", rv64)
+        if args.output:
+            # Free-running golden model, with its own interrupts
+            core.log = []
+
+            def records() -> Iterator[tuple]:
+                while (core.running and not core.error and
+                       core.instret < args.limit):
+                    core.run(min(core.instret + chunk_records, args.limit))
+                    yield from core.log
+                    core.log.clear()
+            write_log(args.output, records())
+            sys.exit(0)
+        reference = IssReference(core, args.limit)
+    else:
+        reference = LogReference(args.reference)
+    sys.exit(0 if compare(read_log(args.log), reference, rv64,
+                          args.context) else 1)
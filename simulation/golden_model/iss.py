@@ -0,0 +1,930 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "..", "assembly_converter"))
+from bintohex import read_mif, write_mif  # noqa: E402
+from disassembler import decode, disassemble  # noqa: E402
+from isa import instructions, csrs, hpm_counters, rv32_csrs  # noqa: E402
+
+# Instruction set simulator of PoliRISC-V (RV{32,64}I, M, Zicsr and
+# TrapReturn), used as a golden model for the programs in MIFs/memory/ROM/core
+# Memory map of core_tb (testbench/core/core/core_tb.sv)
+rom_addr, rom_addr_mask = 0x00000000, 0xFF000000
+ram_addr, ram_addr_mask = 0x01000000, 0xFF000000
+uart_addr, uart_addr_mask = 0x10013000, 0xFFFFF000
+csr_addr, csr_addr_mask = 0x3FFFF000, 0xFFFFFFC0
+memory_size = 2**16  # MemoryAddrSize = 16 (addresses wrap around)
+final_address = 0x01000FFC  # A write here ends the program
+external_interrupt_address = 0x01001008  # Writes set external_interrupt
+clock_cycles = 100  # Clock cycles per mtime tick (csr_mem CLOCK_CYCLES)
+
+# Approximate cost (in cycles) of each pipeline event (see hazard_unit.sv)
+# Memory latency (caches and BUSY_CYCLES) isn't modelled
+cycle_costs = {
+    "instruction": 1,
+    "mispredict": 1,  # Branches and jumps are resolved in ID: flush IF
+    "load_use": 1,  # Load followed by a user in EX
+    # Branch/jalr operand produced by the previous instruction
+    "branch_use": 1,
+    "trap": 4,  # Traps and xRET leave WB and flush the pipeline
+}
+# The M extension stalls EX in mul_div_unit.sv: MUL_LATENCY cycles for
+# multiplications and ceil(xlen/log2(DIV_RADIX)) + 1 for divisions (0: none)
+
+# Privilege modes, mstatus bits and interrupt/exception codes (csr_pkg)
+User, Supervisor, Machine = 0, 1, 3
+SIE, MIE, SPIE, MPIE, SPP, MPP = 1, 3, 5, 7, 8, 11
+SSI, MSI, STI, MTI, SEI, MEI = 1, 3, 5, 7, 9, 11
+II, ECU, ECS, ECM = 2, 8, 9, 11
+# Interrupt priority (csr.sv trap_calc)
+m_interrupts = [MEI, MTI, MSI]
+s_interrupts = [SEI, STI, SSI]
+
+# Only writable bits of the interrupt registers
+m_interrupt_bits = 1 << MSI | 1 << MTI | 1 << MEI
+s_interrupt_bits = 1 << SSI | 1 << STI | 1 << SEI
+exception_bits = 1 << II | 1 << ECU | 1 << ECS
+# Bits of the CSR writes in the commit log (commit_log.sv): the other bits of
+# mip/sip are read-only and depend on when the CLINT stores reach the CSRs
+logged_csr_bits = {0x144: 1 << SSI, 0x344: s_interrupt_bits}
+
+# Instructions of the SYSTEM opcode with funct3 = 0 are decoded by the core
+# only by funct7 (ebreak is an ecall), see control_unit.sv
+system_funct7 = {}
+for _mnemonic, _inst in instructions.items():
+    if _inst.fmt == "SYS" and _inst.opcode == 0b1110011:
+        system_funct7.setdefault(_inst.funct7 >> 5, _mnemonic)
+
+immediate_operations = {
+    "addi": "add", "slti": "slt", "sltiu": "sltu", "xori": "xor",
+    "ori": "or", "andi": "and", "slli": "sll", "srli": "srl", "srai": "sra",
+    "addiw": "addw", "slliw": "sllw", "srliw": "srlw", "sraiw": "sraw",
+}
+
+branch_conditions = {
+    "beq": lambda a, b, sign: a == b,
+    "bne": lambda a, b, sign: a != b,
+    "blt": lambda a, b, sign: sign(a) < sign(b),
+    "bge": lambda a, b, sign: sign(a) >= sign(b),
+    "bltu": lambda a, b, sign: a < b,
+    "bgeu": lambda a, b, sign: a >= b,
+}
+
+csr_addresses = set(csrs.values())
+
+load_sizes = {"lb": (1, True), "lh": (2, True), "lw": (4, True),
+              "ld": (8, True), "lbu": (1, False), "lhu": (2, False),
+              "lwu": (4, False)}
+store_sizes = {"sb": 1, "sh": 2, "sw": 4, "sd": 8}
+
+
+class BusError(Exception):
+    # Access outside the memory map (the bus never acks it)
+    pass
+
+
+class BranchPredictor:
+    # Model of rtl/core/BranchPredictor/branch_predictor.sv: direct-mapped
+    # BTB and 2-bit counters indexed by the pc (xor the global history when
+    # history_size > 0); btb_entries = 0 always predicts pc + 4
+    def __init__(self, btb_entries: int = 16, bht_entries: int = 64,
+                 history_size: int = 0):
+        self.btb_entries, self.bht_entries = btb_entries, bht_entries
+        self.history_mask = (1 << history_size) - 1
+        self.btb = {}  # index -> (pc, target, conditional)
+        self.bht = [1] * bht_entries  # Weakly not taken
+        self.history = 0
+        self.branches = self.mispredicts = 0
+
+    def resolve(self, pc: int, next_pc: int, conditional: bool) -> bool:
+        # Predicts the branch/jump at pc, trains on its outcome and returns
+        # whether it was mispredicted
+        self.branches += 1
+        predicted = pc + 4
+        if self.btb_entries:
+            index = pc >> 2 & (self.btb_entries - 1)
+            counter = (pc >> 2 ^ self.history) & (self.bht_entries - 1)
+            entry = self.btb.get(index)
+            if entry is not None and entry[0] == pc and \
+                    (not entry[2] or self.bht[counter] >= 2):
+                predicted = entry[1]
+            taken = next_pc != pc + 4
+            if conditional:
+                self.bht[counter] = (min(self.bht[counter] + 1, 3) if taken
+                                     else max(self.bht[counter] - 1, 0))
+                self.history = (self.history << 1 | taken) & self.history_mask
+            if taken:
+                self.btb[index] = (pc, next_pc, conditional)
+        self.mispredicts += predicted != next_pc
+        return predicted != next_pc
+
+
+def sign_extend(value: int, bits: int) -> int:
+    return value - (1 << bits) if value >> (bits - 1) & 1 else value
+
+
+def alu_operations(xlen: int) -> dict[str, Callable[[int, int], int]]:
+    # Operations of the R-type instructions on unsigned xlen-bit values
+    mask, shamt_mask = (1 << xlen) - 1, xlen - 1
+    minimum = 1 << (xlen - 1)
+
+    def sign(value: int) -> int:
+        return value - (1 << xlen) if value & minimum else value
+
+    def div(a: int, b: int) -> int:
+        if b == 0:
+            return mask
+        if a == minimum and b == mask:
+            return a  # Overflow
+        quotient = abs(sign(a)) // abs(sign(b))
+        negative = (sign(a) < 0) != (sign(b) < 0)
+        return (-quotient if negative else quotient) & mask
+
+    def rem(a: int, b: int) -> int:
+        if b == 0:
+            return a
+        if a == minimum and b == mask:
+            return 0  # Overflow
+        remainder = abs(sign(a)) % abs(sign(b))
+        return (-remainder if sign(a) < 0 else remainder) & mask
+
+    operations = {
+        "add": lambda a, b: (a + b) & mask,
+        "sub": lambda a, b: (a - b) & mask,
+        "sll": lambda a, b: (a << (b & shamt_mask)) & mask,
+        "slt": lambda a, b: int(sign(a) < sign(b)),
+        "sltu": lambda a, b: int(a < b),
+        "xor": lambda a, b: a ^ b,
+        "srl": lambda a, b: a >> (b & shamt_mask),
+        "sra": lambda a, b: (sign(a) >> (b & shamt_mask)) & mask,
+        "or": lambda a, b: a | b,
+        "and": lambda a, b: a & b,
+        "mul": lambda a, b: (a * b) & mask,
+        "mulh": lambda a, b: (sign(a) * sign(b) >> xlen) & mask,
+        "mulhsu": lambda a, b: (sign(a) * b >> xlen) & mask,
+        "mulhu": lambda a, b: (a * b) >> xlen,
+        "div": div,
+        "divu": lambda a, b: a // b if b != 0 else mask,
+        "rem": rem,
+        "remu": lambda a, b: a % b if b != 0 else a,
+    }
+    # *W: 32-bit operation, sign extended to 64 bits (the same as the base
+    # operation in RV32I, see Core.build)
+    for name, operation in (alu_operations(32) if xlen == 64
+                            else dict(operations)).items():
+        if name + "w" in instructions:
+            operations[name + "w"] = (
+                lambda a, b, operation=operation:
+                sign_extend(operation(a & 0xFFFFFFFF, b & 0xFFFFFFFF),
+                            32) & mask)
+    return operations
+
+
+class Core:
+    def __init__(self, rom: bytes, ram: bytes = b"", rv64: bool = True,
+                 predictor: BranchPredictor | None = None,
+                 mul_latency: int = 2, div_radix: int = 4):
+        self.xlen = 64 if rv64 else 32
+        self.mask = (1 << self.xlen) - 1
+        self.rv64 = rv64
+        self.x = [0] * 32
+        self.pc = 0
+        self.rom = bytearray(memory_size)
+        self.rom[:min(len(rom), memory_size)] = rom[:memory_size]
+        self.ram = bytearray(memory_size)
+        self.ram[:min(len(ram), memory_size)] = ram[:memory_size]
+        self.operations = alu_operations(self.xlen)
+        self.decoded = {}  # pc -> (step, hazard information)
+        # Statistics
+        self.instret = 0
+        self.cycles = 0
+        self.predictor = predictor or BranchPredictor()
+        div_bits = max(div_radix.bit_length() - 1, 1)
+        div_cycles = -(-self.xlen // div_bits) + 1 if div_radix else 0
+        self.muldiv_cycles = {"mul": mul_latency, "div": div_cycles}
+        # Memory mapped peripherals
+        self.external_interrupt = 0
+        self.msip = 0
+        self.mtime_offset = 0
+        self.mtimecmp = 0
+        self.uart = [0] * 8
+        self.uart_output = bytearray()
+        self.running = True
+        self.final_data = None
+        # CSRs (csr.sv)
+        self.priv = Machine
+        self.status = 0  # SIE, MIE, SPIE, MPIE, SPP and MPP of mstatus
+        self.status |= Machine << MPP
+        self.mtvec = self.stvec = 0
+        self.mideleg = self.medeleg = 0
+        self.ip = 0  # SSIP, STIP and SEIP
+        self.ie = 0
+        self.mscratch = self.sscratch = 0
+        self.mepc = self.sepc = 0
+        self.mcause = self.scause = 0
+        self.mtval = self.stval = 0
+        # Counters: mcycle and minstret follow cycles and instret (offsets
+        # hold the frozen values while inhibited), hpm events aren't modeled
+        self.mcountinhibit = 0
+        self.counter_offsets = {0: 0, 2: 0}
+        self.hpm = {i: 0 for i in hpm_counters}
+        # Interrupts are only evaluated when something they depend on changes
+        self.check_interrupts = True
+        self.timer_cycle = None  # Cycle in which MTI becomes pending
+        # Memory accesses seen by the caches (see cache_explorer.py), enabled
+        # by setting accesses to a list of (kind, address), with kind "I",
+        # "R" or "W"
+        self.accesses = None
+        # Commit log (see commit_log.py), enabled by setting log to a list
+        self.log = None
+        self.commits = 0
+        self.trapped = False
+        # CSR writes still in the pipeline: csr -> (cycle, written value)
+        self.csr_writes = {}
+        # (commit count, cause) of the interrupts taken by the RTL: when set,
+        # interrupts are only taken there
+        self.forced_interrupts = None
+        self.error = None
+
+    # Memory
+    def region(self, address: int) -> tuple[str, int]:
+        address &= 0xFFFFFFFF  # 32-bit bus
+        if address & rom_addr_mask == rom_addr:
+            return "rom", address % memory_size
+        if address & ram_addr_mask == ram_addr:
+            return "ram", address % memory_size
+        if address & uart_addr_mask == uart_addr:
+            return "uart", address & ~uart_addr_mask
+        if address & csr_addr_mask == csr_addr:
+            return "csr", address & ~csr_addr_mask
+        raise BusError(f"access to unmapped address 0x{address:08X}")
+
+    def load(self, address: int, size: int) -> int:
+        region, offset = self.region(address)
+        if region in ("rom", "ram"):
+            memory = self.rom if region == "rom" else self.ram
+            if offset + size <= memory_size:
+                return int.from_bytes(memory[offset:offset + size], "little")
+            return int.from_bytes(bytes(memory[(offset + i) % memory_size]
+                                        for i in range(size)), "little")
+        if region == "uart":
+            return self.uart_read(offset >> 2)
+        return self.timer_read(offset)
+
+    def store(self, address: int, size: int, value: int) -> None:
+        region, offset = self.region(address)
+        if region == "ram":
+            data = (value & ((1 << 8*size) - 1)).to_bytes(size, "little")
+            for i in range(size):
+                self.ram[(offset + i) % memory_size] = data[i]
+            # Instructions decoded from the overwritten words
+            for word_address in range(address & ~3, address + size, 4):
+                self.decoded.pop(word_address, None)
+            address &= 0xFFFFFFFF
+            if address == final_address:
+                self.running = False
+                self.final_data = value
+            elif address == external_interrupt_address:
+                self.external_interrupt = int(value != 0)
+                self.check_interrupts = True
+        elif region == "uart":
+            self.uart_write(offset >> 2, value & 0xFFFFFFFF)
+        elif region == "csr":
+            self.timer_write(offset, value)
+        # The ROM ignores writes
+
+    def record_access(self, kind: str, address: int) -> None:
+        # Only the ROM and the RAM are behind the data cache
+        address &= 0xFFFFFFFF
+        if (address & rom_addr_mask == rom_addr or
+                address & ram_addr_mask == ram_addr):
+            self.accesses.append((kind, address))
+
+    def uart_read(self, register: int) -> int:
+        # SiFive register map: the transmitter is never full and
+        # the receiver is always empty
+        if register == 0:  # txdata
+            return 0
+        if register == 1:  # rxdata
+            return 1 << 31
+        return self.uart[register]
+
+    def uart_write(self, register: int, value: int) -> None:
+        if register == 0:
+            self.uart_output.append(value & 0xFF)
+        else:
+            self.uart[register] = value
+
+    def mtime(self) -> int:
+        return (self.cycles // clock_cycles + self.mtime_offset) & (2**64 - 1)
+
+    def timer_read(self, offset: int) -> int:
+        # csr_mem.sv: msip, mtime and mtimecmp selected by addr[5:4]
+        value = {0: self.msip, 1: self.mtime(), 3: self.mtimecmp}.get(
+            offset >> 4 & 3, 0)
+        return value & self.mask
+
+    def timer_write(self, offset: int, value: int) -> None:
+        # The registers take the whole data bus (sel is ignored)
+        value &= self.mask
+        match offset >> 4 & 3:
+            case 0:
+                self.msip = value
+            case 1:
+                if self.xlen == 32:
+                    value |= self.mtime() & ~0xFFFFFFFF
+                self.mtime_offset = value - self.cycles // clock_cycles
+            case 3:
+                if self.xlen == 32:
+                    value |= self.mtimecmp & ~0xFFFFFFFF
+                self.mtimecmp = value
+        self.check_interrupts = True
+
+    # CSRs
+    def mip(self) -> int:
+        return (self.ip | (self.msip != 0) << MSI |
+                (self.mtime() >= self.mtimecmp) << MTI |
+                self.external_interrupt << MEI)
+
+    def csr_read(self, address: int) -> int:
+        status_mask = 1 << SIE | 1 << SPIE | 1 << SPP
+        match address:
+            case 0x100:  # sstatus
+                return self.status & status_mask
+            case 0x104:  # sie
+                return self.ie & s_interrupt_bits
+            case 0x105:
+                return self.stvec
+            case 0x140:
+                return self.sscratch
+            case 0x141:
+                return self.sepc
+            case 0x142:
+                return self.scause
+            case 0x143:
+                return self.stval
+            case 0x144:  # sip
+                return self.ip & s_interrupt_bits
+            case 0x300:  # mstatus
+                return self.status
+            case 0x301:  # misa: U, S, M and I
+                return self.xlen // 32 << (self.xlen - 2) | 0x1401100
+            case 0x302:
+                return self.medeleg
+            case 0x303:
+                return self.mideleg
+            case 0x304:  # mie
+                return self.ie
+            case 0x305:
+                return self.mtvec
+            case 0x340:
+                return self.mscratch
+            case 0x341:
+                return self.mepc
+            case 0x342:
+                return self.mcause
+            case 0x343:
+                return self.mtval
+            case 0x344:
+                return self.mip()
+            case 0x320:
+                return self.mcountinhibit
+            case _ if 0x323 <= address < 0x320 + hpm_counters.stop:
+                return address - 0x320  # mhpmeventN is hardwired to N
+            case _ if 0xB00 <= address < 0xB00 + hpm_counters.stop:
+                return self.read_counter(address & 0x1F) & self.mask
+            case _ if 0xB80 <= address < 0xB80 + hpm_counters.stop:
+                return self.read_counter(address & 0x1F) >> 32
+        return 0  # mvendorid, marchid, mimpid, mhartid and unknown CSRs
+
+    def legal_cause(self, value: int, is_mcause: bool) -> bool:
+        # mcause/scause are WLRL
+        code = value & (self.mask >> 1)
+        if value >> (self.xlen - 1):
+            return code in m_interrupts + s_interrupts
+        return code in ([II, ECU, ECS, ECM] if is_mcause else [II, ECU, ECS])
+
+    def csr_write(self, address: int, value: int) -> None:
+        self.check_interrupts = True
+        match address:
+            case 0x100 | 0x300:  # sstatus, mstatus
+                status_bits = 1 << SIE | 1 << SPIE | 1 << SPP
+                if address == 0x300:
+                    status_bits |= 1 << MIE | 1 << MPIE
+                    if value >> MPP & 3 != 2:
+                        status_bits |= 3 << MPP
+                self.status = ((self.status & ~status_bits) |
+                               (value & status_bits))
+            case 0x104:
+                self.ie = ((self.ie & ~s_interrupt_bits) |
+                           (value & s_interrupt_bits))
+            case 0x105:
+                self.stvec = value & ~2
+            case 0x140:
+                self.sscratch = value
+            case 0x141:
+                self.sepc = value & ~3
+            case 0x142:
+                if self.legal_cause(value, False):
+                    self.scause = value
+            case 0x143:
+                self.stval = value
+            case 0x144:  # sip: SSIP
+                self.ip = (self.ip & ~(1 << SSI)) | (value & 1 << SSI)
+            case 0x302:
+                self.medeleg = value & exception_bits
+            case 0x303:
+                self.mideleg = value & s_interrupt_bits
+            case 0x304:
+                self.ie = value & (m_interrupt_bits | s_interrupt_bits)
+            case 0x305:
+                self.mtvec = value & ~2
+            case 0x340:
+                self.mscratch = value
+            case 0x341:
+                self.mepc = value & ~3
+            case 0x342:
+                if self.legal_cause(value, True):
+                    self.mcause = value
+            case 0x343:
+                self.mtval = value
+            case 0x344:  # mip: SSIP, STIP and SEIP
+                self.ip = value & s_interrupt_bits
+            case 0x320:  # mcountinhibit: CY, IR and HPM3+
+                values = {i: self.read_counter(i)
+                          for i in self.counter_offsets}
+                counters = (1 << hpm_counters.stop) - 1
+                self.mcountinhibit = value & counters & ~2
+                for i, count in values.items():
+                    if self.mcountinhibit >> i & 1:
+                        self.counter_offsets[i] = count
+                    else:
+                        self.counter_offsets[i] = count - self.counter_base(i)
+            case _ if 0xB00 <= address < 0xB00 + hpm_counters.stop:
+                i = address & 0x1F
+                if self.xlen == 32:
+                    value |= self.read_counter(i) & 0xFFFFFFFF00000000
+                self.write_counter(i, value)
+            case _ if 0xB80 <= address < 0xB80 + hpm_counters.stop:
+                i = address & 0x1F
+                self.write_counter(i, value << 32 |
+                                   self.read_counter(i) & 0xFFFFFFFF)
+
+    def read_counter(self, i: int) -> int:
+        # 64-bit value of mcycle (0), minstret (2) or mhpmcounterN
+        if i in self.hpm:
+            return self.hpm[i]
+        if self.mcountinhibit >> i & 1:
+            return self.counter_offsets[i]
+        return ((self.counter_base(i) + self.counter_offsets[i]) &
+                0xFFFFFFFFFFFFFFFF)
+
+    def write_counter(self, i: int, value: int) -> None:
+        if i in self.hpm:
+            self.hpm[i] = value
+        elif self.mcountinhibit >> i & 1:
+            self.counter_offsets[i] = value
+        else:
+            # The writing instruction isn't counted
+            self.counter_offsets[i] = value - self.counter_base(i) - (i == 2)
+
+    def counter_base(self, i: int) -> int:
+        return self.cycles if i == 0 else self.instret
+
+    # Traps
+    def trap(self, cause: int, epc: int, interrupt: bool, to_machine: bool,
+             tval: int | None = None) -> int:
+        # Returns the address of the trap handler
+        code = cause
+        if interrupt:
+            cause |= 1 << (self.xlen - 1)
+        if to_machine:
+            self.mcause, self.mepc = cause, epc
+            if tval is not None:
+                self.mtval = tval
+            mie = self.status >> MIE & 1
+            self.status &= ~(1 << MIE | 1 << MPIE | 3 << MPP)
+            self.status |= mie << MPIE | self.priv << MPP
+            self.priv = Machine
+            tvec = self.mtvec
+        else:
+            self.scause, self.sepc = cause, epc
+            if tval is not None:
+                self.stval = tval
+            sie = self.status >> SIE & 1
+            self.status &= ~(1 << SIE | 1 << SPIE | 1 << SPP)
+            self.status |= sie << SPIE | (self.priv & 1) << SPP
+            self.priv = Supervisor
+            tvec = self.stvec
+        self.check_interrupts = True
+        self.trapped = True
+        self.cycles += cycle_costs["trap"]
+        handler = tvec & ~3
+        if tvec & 1 and interrupt:  # Vectored mode
+            handler += 4*code
+        if self.log is not None:
+            self.log.append((3, 0, 0, 0, epc, cause, handler))
+        return handler
+
+    def pending_interrupt(self) -> int | None:
+        # csr.sv: interrupt_vector
+        mip = self.mip()
+        enabled = mip & self.ie
+        mie, sie = self.status >> MIE & 1, self.status >> SIE & 1
+        for code in m_interrupts:
+            # U, S: always enabled; M: mie[code] and mstatus.MIE
+            if mip >> code & 1 and (self.priv != Machine or
+                                    (enabled >> code & 1 and mie)):
+                return code
+        for code in s_interrupts:
+            # U: always enabled; S: sie[code] and sstatus.SIE; M: disabled
+            if mip >> code & 1 and (self.priv == User or
+                                    (self.priv == Supervisor and
+                                     enabled >> code & 1 and sie)):
+                return code
+        return None
+
+    def take_interrupt(self, pc: int) -> int:
+        # Returns the next pc (the handler's, if an interrupt was taken)
+        if self.forced_interrupts is not None:
+            return self.take_forced_interrupt(pc)
+        code = self.pending_interrupt()
+        if code is None:
+            self.check_interrupts = False
+            # MTI becomes pending with time: find out when
+            self.timer_cycle = None
+            if self.mtime() < self.mtimecmp:
+                self.timer_cycle = ((self.mtimecmp - self.mtime_offset) *
+                                    clock_cycles)
+            return pc
+        to_machine = code in m_interrupts or not self.mideleg >> code & 1
+        return self.trap(code, pc, True, to_machine)
+
+    def take_forced_interrupt(self, pc: int) -> int:
+        # check_interrupts stays set: checked before every instruction
+        forced = self.forced_interrupts
+        if not forced or forced[0][0] != self.commits:
+            return pc
+        _, cause = forced.popleft()
+        code = cause & (self.mask >> 1)
+        to_machine = code in m_interrupts or not self.mideleg >> code & 1
+        return self.trap(code, pc, True, to_machine)
+
+    def exception(self, code: int, pc: int, word: int | None = None) -> int:
+        # csr.sv: exception_vector, disabled exceptions are ignored
+        mie, sie = self.status >> MIE & 1, self.status >> SIE & 1
+        delegated = self.medeleg >> code & 1
+        if code == II:
+            enabled = (self.priv == User or
+                       (self.priv == Supervisor and (not delegated or sie)) or
+                       (self.priv == Machine and mie))
+        elif code == ECU:
+            enabled = True
+        elif code == ECS:
+            enabled = not delegated or sie
+        else:  # ECM
+            enabled = mie
+        if not enabled:
+            return pc + 4
+        to_machine = self.priv == Machine or not delegated
+        return self.trap(code, pc, False, to_machine, word)
+
+    def xret(self, mnemonic: str) -> int:
+        self.check_interrupts = True
+        self.cycles += cycle_costs["trap"]
+        if mnemonic == "mret":
+            mpie = self.status >> MPIE & 1
+            self.priv = self.status >> MPP & 3
+            self.status &= ~(1 << MIE | 3 << MPP)
+            self.status |= mpie << MIE | 1 << MPIE | Machine << MPP
+            return self.mepc
+        spie = self.status >> SPIE & 1
+        self.priv = self.status >> SPP & 1
+        self.status &= ~(1 << SIE | 1 << SPP)
+        self.status |= spie << SIE | 1 << SPIE
+        return self.sepc
+
+    # Decode
+    def decode_at(self, pc: int) -> tuple:
+        word = self.load(pc, 4)
+        entry = self.build(word) + (word,)
+        self.decoded[pc] = entry
+        return entry
+
+    def build(self, word: int) -> tuple:
+        # Returns (step(pc) -> next pc, hazard information)
+        # hazard information: (decode or execute hazard, rd, sources, is load)
+        x, mask, operations = self.x, self.mask, self.operations
+        opcode, funct3 = word & 0x7F, word >> 12 & 7
+        rd, rs1, rs2 = word >> 7 & 0x1F, word >> 15 & 0x1F, word >> 20 & 0x1F
+        imm_i = sign_extend(word >> 20, 12)
+
+        def illegal(pc: int) -> int:
+            return self.exception(II, pc, word)
+
+        if opcode == 0b0001111:  # fence, fence.i: nothing to do
+            return (lambda pc: pc + 4), (None, 0, (), False)
+        if opcode == 0b1110011:
+            mnemonic = system_funct7.get(word >> 25) if funct3 == 0 else None
+            if mnemonic in ("ecall", "ebreak"):
+                return (lambda pc: self.exception(ECU + self.priv, pc)), \
+                    (None, 0, (), False)
+            if mnemonic in ("mret", "sret"):
+                privileges = ((Machine,) if mnemonic == "mret" else
+                              (Machine, Supervisor))
+                return (lambda pc: self.xret(mnemonic)
+                        if self.priv in privileges else illegal(pc)), \
+                    (None, 0, (), False)
+        # control_unit.sv doesn't check the base ISA: the RV32I core runs
+        # the RV64I instructions on 32 bits (ld/lwu as lw, sd as sw)
+        entry = decode(word)
+        if entry is None:
+            return illegal, (None, 0, (), False)
+        mnemonic, inst = entry
+
+        match inst.fmt:
+            case "R" | "I" | "SH":
+                operation = operations[immediate_operations.get(mnemonic,
+                                                                mnemonic)]
+                if inst.fmt == "R":
+                    def step(pc: int) -> int:
+                        x[rd] = operation(x[rs1], x[rs2])
+                        return pc + 4
+                    unit = ("mul" if mnemonic.startswith("mul") else
+                            "div" if mnemonic[:3] in ("div", "rem") else
+                            "execute")
+                    return step, (unit, rd, (rs1, rs2), False)
+                operand = (imm_i & mask if inst.fmt == "I" else
+                           rs2 | (word >> 20 & 0x20
+                                  if self.rv64 and opcode == 0b0010011 else 0))
+
+                def step(pc: int) -> int:
+                    x[rd] = operation(x[rs1], operand)
+                    return pc + 4
+                return step, ("execute", rd, (rs1,), False)
+            case "L":
+                size, signed = load_sizes[mnemonic]
+                size = min(size, self.xlen // 8)
+
+                def step(pc: int) -> int:
+                    if self.accesses is not None:
+                        self.record_access("R", x[rs1] + imm_i)
+                    value = self.load(x[rs1] + imm_i, size)
+                    x[rd] = (sign_extend(value, 8*size) & mask if signed else
+                             value)
+                    return pc + 4
+                return step, ("execute", rd, (rs1,), True)
+            case "S":
+                size = store_sizes[mnemonic]
+                imm = sign_extend(word >> 25 << 5 | rd, 12)
+                size = min(size, self.xlen // 8)
+
+                def step(pc: int) -> int:
+                    if self.accesses is not None:
+                        self.record_access("W", x[rs1] + imm)
+                    self.store(x[rs1] + imm, size, x[rs2])
+                    return pc + 4
+                # The stored data is forwarded in MEM
+                return step, ("execute", 0, (rs1,), False)
+            case "B":
+                condition, sign = branch_conditions[mnemonic], self.sign
+                imm = sign_extend((word >> 31) << 12 | (word >> 7 & 1) << 11 |
+                                  (word >> 25 & 0x3F) << 5 |
+                                  (word >> 8 & 0xF) << 1, 13)
+
+                def step(pc: int) -> int:
+                    if condition(x[rs1], x[rs2], sign):
+                        return (pc + imm) & mask
+                    return pc + 4
+                return step, ("decode", 0, (rs1, rs2), False)
+            case "U":
+                imm = sign_extend(word & 0xFFFFF000, 32) & mask
+                if mnemonic == "lui":
+                    def step(pc: int) -> int:
+                        x[rd] = imm
+                        return pc + 4
+                else:
+                    def step(pc: int) -> int:
+                        x[rd] = (pc + imm) & mask
+                        return pc + 4
+                return step, (None, rd, (), False)
+            case "J":
+                imm = sign_extend((word >> 31) << 20 |
+                                  (word >> 12 & 0xFF) << 12 |
+                                  (word >> 20 & 1) << 11 |
+                                  (word >> 21 & 0x3FF) << 1, 21)
+
+                def step(pc: int) -> int:
+                    x[rd] = pc + 4
+                    return (pc + imm) & mask
+                return step, ("jump", rd, (), False)
+            case "JALR":
+                def step(pc: int) -> int:
+                    target = (x[rs1] + imm_i) & mask & ~1
+                    x[rd] = pc + 4
+                    return target
+                return step, ("jump", rd, (rs1,), False)
+            case "CSR" | "CSRI":
+                csr = word >> 20
+                immediate = inst.fmt == "CSRI"
+
+                def step(pc: int) -> int:
+                    return self.csr_instruction(pc, word, mnemonic, csr, rd,
+                                                rs1 if immediate else x[rs1])
+                sources = () if immediate else (rs1,)
+                return step, ("execute", rd, sources, False)
+        return illegal, (None, 0, (), False)
+
+    def sign(self, value: int) -> int:
+        return value - (1 << self.xlen) if value >> (self.xlen - 1) else value
+
+    def csr_instruction(self, pc: int, word: int, mnemonic: str, csr: int,
+                        rd: int, source: int) -> int:
+        # Privilege check in the control unit (csr[11:10], as in the RTL)
+        if self.priv < csr >> 10 & 3:
+            return self.exception(II, pc, word)
+        # Address check in csr.sv: rd still gets 0 if the exception is disabled
+        if csr not in csr_addresses or (csr in rv32_csrs and self.xlen == 64):
+            next_pc = self.exception(II, pc, word)
+            if not self.trapped:
+                self.x[rd] = 0
+            return next_pc
+        old = self.csr_read(csr)
+        # dataflow.sv forwards the written value (not what csr.sv keeps of it)
+        # of a write to the same CSR that hasn't left WB (up to 3 cycles ago)
+        written = self.csr_writes.get(csr)
+        if written is not None and self.cycles - written[0] <= 3:
+            old = written[1]
+        match mnemonic[:5]:
+            case "csrrw":
+                value = source
+            case "csrrs":
+                value = old | source
+            case _:
+                value = old & ~source & self.mask
+        # csrrs/csrrc with rs1 = x0 (or uimm = 0) only read the CSR
+        if mnemonic[:5] == "csrrw" or word >> 15 & 0x1F != 0:
+            self.csr_write(csr, value)
+            self.csr_writes[csr] = (self.cycles, value)
+            if self.log is not None:
+                logged = value & logged_csr_bits.get(csr, self.mask)
+                self.log.append((2, 0, csr, word, pc, logged, 0))
+        if csr == 0x344:
+            # dataflow.sv: external_interrupt is read as SEIP
+            old |= self.external_interrupt << SEI
+        self.x[rd] = old
+        return pc + 4
+
+    # Execution
+    def run(self, limit: int = 1000000) -> str:
+        # Returns why the simulation stopped
+        x, decoded, costs, log = self.x, self.decoded, cycle_costs, self.log
+        accesses = self.accesses
+        predictor, muldiv_cycles = self.predictor, self.muldiv_cycles
+        pc = self.pc
+        previous_rd, previous_load, previous_writes = 0, False, False
+        try:
+            while self.running and self.instret < limit:
+                if self.check_interrupts or (self.timer_cycle is not None and
+                                             self.cycles >= self.timer_cycle):
+                    pc = self.take_interrupt(pc)
+                entry = decoded.get(pc)
+                if entry is None:
+                    entry = self.decode_at(pc)
+                step, (hazard, rd, sources, is_load), word = entry
+                if accesses is not None:
+                    accesses.append(("I", pc & 0xFFFFFFFF))
+                self.trapped = False
+                next_pc = step(pc)
+                x[0] = 0
+                self.instret += 1
+                if log is not None and not self.trapped:
+                    # Instructions that raised exceptions aren't committed
+                    log.append((1, rd, 0, word, pc, x[rd], 0))
+                    self.commits += 1
+                # Approximate cycles
+                cycles = costs["instruction"]
+                if hazard in ("decode", "jump") and not self.trapped and \
+                        predictor.resolve(pc, next_pc, hazard == "decode"):
+                    cycles += costs["mispredict"]
+                elif hazard in muldiv_cycles:
+                    cycles += muldiv_cycles[hazard]
+                if previous_rd != 0 and previous_rd in sources:
+                    if hazard in ("decode", "jump") and previous_writes:
+                        cycles += (costs["branch_use"] *
+                                   (2 if previous_load else 1))
+                    elif previous_load:
+                        cycles += costs["load_use"]
+                self.cycles += cycles
+                previous_rd, previous_load = rd, is_load
+                previous_writes = hazard != "jump"
+                pc = next_pc
+        except BusError as error:
+            self.pc = pc
+            self.error = f"Bus error at pc 0x{pc:08X}: {error}"
+            return self.error
+        self.pc = pc
+        if not self.running:
+            return "End of program!"
+        return f"Instruction limit ({limit}) reached"
+
+    def state(self) -> dict:
+        # Architectural state, for comparisons with the RTL
+        return {
+            "pc": self.pc,
+            "registers": list(self.x),
+            "privilege": self.priv,
+            "csrs": {name: self.csr_read(address)
+                     for name, address in csrs.items()},
+            "final_data": self.final_data,
+            "instret": self.instret,
+            "cycles": self.cycles,
+            "uart": self.uart_output.decode(errors="replace"),
+        }
+
+
+def trace(core: Core, limit: int) -> str:
+    # Slow path: prints each instruction before executing it
+    result = ""
+    while core.running and core.instret < limit:
+        word = core.load(core.pc, 4)
+        text = disassemble(word, core.rv64) or f".word 0x{word:08X}"
+        print(f"{core.pc:08X}: {word:08X} {text}")
+        result = core.run(core.instret + 1)
+    return result
+
+
+def print_registers(core: Core) -> None:
+    digits = core.xlen // 4
+    for i in range(0, 32, 4):
+        print("  ".join(f"x{j:<2} = {core.x[j]:0{digits}X}"
+                        for j in range(i, i + 4)))
+
+
+# MAIN
+if __name__ == "__main__":
+    default_ram = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               "..", "MIFs", "memory", "RAM", "core.mif")
+    parser = argparse.ArgumentParser(description="Run ROM MIFs on a Python "
+                                     "model of PoliRISC-V")
+    parser.add_argument("programs", nargs="+", help="ROM MIFs")
+    parser.add_argument("-r", "--ram", default=default_ram,
+                        help="RAM MIF (default: MIFs/memory/RAM/core.mif)")
+    parser.add_argument("-a", "--arch", choices=["RV32I", "RV64I"],
+                        default="RV64I", help="base ISA (default: RV64I)")
+    parser.add_argument("-n", "--limit", type=int, default=1000000,
+                        help="maximum number of instructions")
+    parser.add_argument("-p", "--predictor", type=int, nargs=3,
+                        default=[16, 64, 0], metavar=("BTB", "BHT", "HISTORY"),
+                        help="branch predictor entries and history bits "
+                        "(default: 16 64 0, as in core.sv; BTB 0 disables it)")
+    parser.add_argument("-d", "--muldiv", type=int, nargs=2, default=[2, 4],
+                        metavar=("MUL_LATENCY", "DIV_RADIX"),
+                        help="M extension latencies (default: 2 4, as in "
+                        "core.sv)")
+    parser.add_argument("-t", "--trace", action="store_true",
+                        help="print every executed instruction")
+    parser.add_argument("-s", "--state", help="write the final state of each "
+                        "program to <STATE>/<program>.json")
+    parser.add_argument("-m", "--ram-out", help="write the final RAM of each "
+                        "program to <RAM_OUT>/<program>.mif")
+    args = parser.parse_args()
+
+    ram = read_mif(args.ram).tobytes() if args.ram else b""
+    failed = False
+    for program in args.programs:
+        name = os.path.splitext(os.path.basename(program))[0]
+        print(f"############## {name}")
+        core = Core(read_mif(program).tobytes(), ram, args.arch == "RV64I",
+                    BranchPredictor(*args.predictor), *args.muldiv)
+        start = time.time()
+        result = (trace(core, args.limit) if args.trace else
+                  core.run(args.limit))
+        elapsed = time.time() - start
+        print(result)
+        if core.final_data is not None:
+            print(f"Write data: 0x{core.final_data:0{core.xlen // 4}x}")
+        else:
+            failed = True
+        print(f"Instructions: {core.instret}, "
+              f"cycles (approx.): {core.cycles}, {1000*elapsed:.1f} ms")
+        print(f"Branches: {core.predictor.branches}, "
+              f"mispredicted: {core.predictor.mispredicts}")
+        print_registers(core)
+        if core.uart_output:
+            print(f"UART: {core.uart_output.decode(errors='replace')}")
+        if args.state:
+            os.makedirs(args.state, exist_ok=True)
+            with open(os.path.join(args.state, name + ".json"), 'w') as file:
+                json.dump(core.state(), file, indent=2)
+        if args.ram_out:
+            os.makedirs(args.ram_out, exist_ok=True)
+            write_mif(os.path.join(args.ram_out, name + ".mif"),
+                      np.frombuffer(core.ram, dtype=np.uint8))
+    sys.exit(1 if failed else 0)
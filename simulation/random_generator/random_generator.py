@@ -1,22 +1,89 @@
-from random import randint
+import argparse
+import time
+from typing import Iterator
+import numpy as np
 
-# Define the file name and the number of words to generate
-file_name = "random_numbers.mif"
-num_words = 4096
+# Random binary MIFs (one word per line, most significant bit first)
+# uniform: every bit is random
+# sparse: each word is random with probability density, zero otherwise
+# address-pattern: each word holds its own byte address (finds aliasing)
+distributions = ["uniform", "sparse", "address-pattern"]
+chunk_size = 2**20  # Words generated and written at a time
 
-# Define the number of bits per word and the maximum value for each bit
-num_bits = 8
-max_value = 2 ** num_bits - 1
 
-# Open the file for writing
-with open(file_name, "w") as f:
-    # Write the header information
-    # Generate random binary numbers and write them to the file
-    for i in range(num_words):
-        value = randint(0, max_value)
-        binary = "{:08b}".format(value)
-        f.write("{}\n".format(binary))
+def word_bytes(width: int) -> int:
+    return (width + 7) // 8
 
-# Print a message to indicate that the file was generated
-print("File {} generated.".format(file_name))
 
+def generate(depth: int, width: int = 8, seed: int | None = None,
+             distribution: str = "uniform",
+             density: float = 0.1) -> Iterator[np.ndarray]:
+    # Yields (words, word_bytes) uint8 chunks, most significant byte first
+    # The same seed always gives the same image
+    rng = np.random.default_rng(seed)
+    num_bytes = word_bytes(width)
+    for start in range(0, depth, chunk_size):
+        num_words = min(chunk_size, depth - start)
+        if distribution == "address-pattern":
+            addresses = (np.arange(start, start + num_words, dtype=np.uint64) *
+                         np.uint64(num_bytes)).astype(">u8")
+            words = addresses.view(np.uint8).reshape(-1, 8)
+            if num_bytes > 8:
+                words = np.pad(words, ((0, 0), (num_bytes - 8, 0)))
+            else:
+                words = words[:, 8 - num_bytes:]
+        else:
+            words = rng.integers(0, 256, (num_words, num_bytes),
+                                 dtype=np.uint8)
+            if distribution == "sparse":
+                words[rng.random(num_words) >= density] = 0
+        yield words
+
+
+def bits_offset(width: int) -> int:
+    return 8*word_bytes(width) - width
+
+
+def to_lines(words: np.ndarray, width: int) -> bytes:
+    # Binary text of each word, without the bits above width
+    bits = np.unpackbits(words, axis=1)[:, bits_offset(width):] + ord('0')
+    lines = np.empty((len(words), width + 1), dtype=np.uint8)
+    lines[:, :width] = bits
+    lines[:, width] = ord('\n')
+    return lines.tobytes()
+
+
+def write_random_mif(file_path: str, depth: int, width: int = 8,
+                     seed: int | None = None, distribution: str = "uniform",
+                     density: float = 0.1) -> None:
+    if distribution not in distributions:
+        raise ValueError(f"unknown distribution '{distribution}'")
+    if width < 1 or depth < 0:
+        raise ValueError("width must be positive and depth non-negative")
+    with open(file_path, "wb") as file:
+        for words in generate(depth, width, seed, distribution, density):
+            file.write(to_lines(words, width))
+
+
+# MAIN
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate random binary "
+                                     "MIFs for the RAM/ROM models")
+    parser.add_argument("-o", "--output", default="random_numbers.mif",
+                        help="output file (default: random_numbers.mif)")
+    parser.add_argument("-w", "--width", type=int, default=8,
+                        help="bits per line (default: 8, byte-per-line MIF)")
+    parser.add_argument("-d", "--depth", type=lambda value: int(value, 0),
+                        default=4096, help="number of lines (default: 4096)")
+    parser.add_argument("-s", "--seed", type=int,
+                        help="seed, for reproducible images")
+    parser.add_argument("-t", "--distribution", choices=distributions,
+                        default="uniform", help="default: uniform")
+    parser.add_argument("--density", type=float, default=0.1,
+                        help="fraction of non-zero words when sparse")
+    args = parser.parse_args()
+
+    start = time.time()
+    write_random_mif(args.output, args.depth, args.width, args.seed,
+                     args.distribution, args.density)
+    print(f"File {args.output} generated in {time.time() - start:.2f} s.")
@@ -0,0 +1,166 @@
+import argparse
+import math
+import re
+from typing import NamedTuple
+
+# Behavioral model of an SD card in SPI mode behind
+# rtl/memory/SD/sd_controller: adds up the sck cycles of the commands,
+# responses, data blocks and busy periods of a transfer to estimate the
+# sustained MB/s of single-block (CMD17/CMD24) and burst (CMD18/CMD25)
+# transfers. With --log, checks the model against the cycles measured by
+# testbench/memory/SD/sd_controller_tb
+block_bytes = 512
+command_bits = 48 + 2 + 8  # Command, Ncr and R1
+cmd13_bits = 48 + 2 + 16  # Command, Ncr and R2
+data_bits = 8 + 4096 + 16  # Start token, block and CRC16
+data_response_bits = 8
+stop_token_bits = 8
+read_gap_bits = 16  # Between the blocks of a CMD18 (sd_model.sv ReadGap)
+# Controller cycles (in sck periods) spent in its own states, measured in
+# sd_controller_tb: per CMD17/CMD24 block, per CMD18/CMD25 block and per burst
+overhead = {
+    "CMD17": (9, 0),
+    "CMD18": (4, 11),
+    "CMD24": (13, 0),
+    "CMD25": (7, 9),
+}
+# Native SD bus (not implemented by the SPI-mode controller): 4 data lines
+# with their own CRC16, 48-bit R1 and a CRC status token after each write
+native_command_bits = 48 + 2 + 48
+native_data_bits = 1 + 4096 // 4 + 16 + 1
+native_data_response_bits = 5 + 2
+transfers = ["CMD17", "CMD18", "CMD24", "CMD25"]
+result_line = re.compile(r"^(?:# )?\s*(?:Read|Wrote) (\d+) blocks with "
+                         r"(CMD\d+): (\d+) cycles")
+config_line = re.compile(r"^(?:# )?\s*Clock divider: (\d+), read latency: "
+                         r"(\d+) bits")
+
+
+class Card(NamedTuple):
+    # Card timings, in sck periods
+    read_latency: float  # Nac: R1 of CMD17/CMD18 to the first start token
+    write_busy: float  # After each CMD24 block
+    # After each CMD25 block (the card buffers the burst)
+    burst_write_busy: float
+    cmd12_busy: float  # After the CMD12 R1 (R1b)
+    stop_busy: float  # After the CMD25 stop token
+
+
+def card_from_us(sck_mhz: float, args: argparse.Namespace) -> Card:
+    # Stopping a read leaves nothing to program: one busy cycle
+    return Card(math.ceil(args.read_latency * sck_mhz),
+                math.ceil(args.write_busy * sck_mhz),
+                math.ceil(args.burst_write_busy * sck_mhz), 1,
+                math.ceil(args.stop_busy * sck_mhz))
+
+
+def testbench_card(read_latency: int) -> Card:
+    # sd_model.sv: random_busy_cycles (3 bits) plus one cycle in Busy, and
+    # 8 more cycles after the stop token
+    busy = 3.5 + 1
+    return Card(read_latency, busy, busy, busy, busy + 8 + 1)
+
+
+def transfer_ticks(transfer: str, blocks: int, card: Card,
+                   native: bool = False) -> float:
+    # sck periods from the first request to the controller back in Idle
+    command = native_command_bits if native else command_bits
+    data = native_data_bits if native else data_bits
+    data_response = native_data_response_bits if native else data_response_bits
+    if blocks == 1:  # A one-beat burst is a CMD17/CMD24
+        transfer = {"CMD18": "CMD17", "CMD25": "CMD24"}.get(transfer, transfer)
+    per_block, per_burst = overhead[transfer]
+    if transfer == "CMD17":
+        return blocks * (command + card.read_latency + data + per_block)
+    if transfer == "CMD18":
+        return (command + card.read_latency + blocks * data +
+                (blocks - 1) * (read_gap_bits + per_block) +
+                command + card.cmd12_busy + per_burst)
+    if transfer == "CMD24":
+        return blocks * (command + data + data_response + card.write_busy +
+                         cmd13_bits + per_block)
+    return (command + blocks * (data + data_response + card.burst_write_busy +
+                                per_block) +
+            stop_token_bits + card.stop_busy + cmd13_bits + per_burst)
+
+
+def mbps(blocks: int, cycles: float, clock_mhz: float) -> float:
+    return block_bytes * blocks * clock_mhz / cycles
+
+
+def check_log(file_path: str, clock_mhz: float) -> None:
+    # Compares the sd_controller_tb results with the model of its sd_model.sv
+    clock_div, card = None, None
+    print(f"{'Transfer':<10}{'Blocks':>7}{'Measured':>10}{'Model':>10}"
+          f"{'Error':>8}")
+    with open(file_path, errors="replace") as file:
+        for line in file:
+            if match := config_line.match(line):
+                clock_div = int(match.group(1))
+                card = testbench_card(int(match.group(2)))
+            elif (match := result_line.match(line)) and card is not None:
+                blocks, transfer, measured = (int(match.group(1)),
+                                              match.group(2),
+                                              int(match.group(3)))
+                model = transfer_ticks(transfer, blocks, card) * clock_div
+                print(f"{transfer:<10}{blocks:>7}{measured:>10}{model:>10.0f}"
+                      f"{100 * (model - measured) / measured:>7.1f}%  "
+                      f"({mbps(blocks, measured, clock_mhz):.2f} MB/s)")
+    if card is None:
+        print("No sd_controller_tb throughput results found")
+
+
+def report(args: argparse.Namespace) -> None:
+    print(f"{'Transfer':<16}{'Div':>4}{'sck MHz':>9}{'us/block':>10}"
+          f"{'MB/s':>8}")
+    for clock_div in args.clock_divs:
+        sck_mhz = args.clock / clock_div
+        card = card_from_us(sck_mhz, args)
+        for bus in ["SPI", "4-bit"] if args.native else ["SPI"]:
+            for transfer in transfers:
+                ticks = transfer_ticks(transfer, args.blocks, card,
+                                       bus == "4-bit")
+                cycles = ticks * clock_div
+                us_per_block = cycles / args.clock / args.blocks
+                name = f"{transfer} {bus}"
+                print(f"{name:<16}{clock_div:>4}{sck_mhz:>9.2f}"
+                      f"{us_per_block:>10.1f}"
+                      f"{mbps(args.blocks, cycles, args.clock):>8.2f}")
+    if args.native:
+        print("4-bit: estimate for the native SD bus, which the SPI-mode "
+              "controller does not implement")
+
+
+# MAIN
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estimate the sustained MB/s "
+                                     "of sd_controller with an SD card model")
+    parser.add_argument("-f", "--clock", type=float, default=50,
+                        help="system clock in MHz (default: 50)")
+    parser.add_argument("-d", "--clock-divs", type=int, nargs="+",
+                        default=[2, 4, 8],
+                        help="CLOCK_DIV values (sck = clock / CLOCK_DIV, "
+                             "default: 2 4 8)")
+    parser.add_argument("-n", "--blocks", type=int, default=64,
+                        help="blocks per transfer (default: 64)")
+    parser.add_argument("--read-latency", type=float, default=100,
+                        help="card read access time (Nac) in us "
+                             "(default: 100)")
+    parser.add_argument("--write-busy", type=float, default=500,
+                        help="busy after a CMD24 block in us (default: 500)")
+    parser.add_argument("--burst-write-busy", type=float, default=50,
+                        help="busy after a CMD25 block in us (default: 50)")
+    parser.add_argument("--stop-busy", type=float, default=500,
+                        help="busy after the CMD25 stop token in us "
+                             "(default: 500)")
+    parser.add_argument("-4", "--native", action="store_true",
+                        help="also estimate the 4-bit native SD bus")
+    parser.add_argument("-l", "--log",
+                        help="check the model against a sd_controller_tb "
+                             "transcript")
+    args = parser.parse_args()
+
+    if args.log:
+        check_log(args.log, args.clock)
+    else:
+        report(args)
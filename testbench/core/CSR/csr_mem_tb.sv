@@ -47,6 +47,8 @@ module csr_mem_tb ();
   assign wb_if.we  = wr_en;
   assign wb_if.sel = 0;
   assign wb_if.tgd = 0;
+  assign wb_if.cti = wishbone_pkg::Classic;
+  assign wb_if.bte = wishbone_pkg::LinearBurst;
   assign wb_if.addr = {addr, 4'h0};
   assign wb_if.dat_o_p = wr_data;
   assign ack = wb_if.ack;
@@ -0,0 +1,9 @@
+files = [
+    "commit_log.sv"
+]
+
+modules = {
+    "local": [
+        "../../../utils/globals"
+    ],
+}
@@ -0,0 +1,104 @@
+// Binary commit log of the core, compared with the golden model by
+// simulation/golden_model/commit_log.py
+// Only enabled with +COMMIT_LOG=<file>
+// Each record has 32 bytes (little endian):
+// kind (1), rd (1), csr (2), instruction (4), pc (8), value (8), extra (8)
+// kind 1: instruction left WB (rd = 0 if no register was written)
+// kind 2: CSR write (comes before the kind 1 record of its instruction), only
+//         the writable bits of mip/sip
+// kind 3: trap (pc = xepc, value = cause, extra = handler address)
+
+module commit_log #(
+    parameter integer DATA_SIZE = 64
+) (
+    input logic clock,
+    input logic reset,
+    // WB stage
+    input logic commit,
+    input logic [DATA_SIZE-1:0] pc,
+    input logic [31:0] inst,
+    input logic reg_we,
+    input logic [4:0] rd,
+    input logic [DATA_SIZE-1:0] rd_data,
+    // CSR bank
+    input logic csr_we,
+    input logic [11:0] csr_addr,
+    input logic [DATA_SIZE-1:0] csr_data,
+    input logic trap,
+    input logic interrupt,
+    input logic exception,
+    input logic [DATA_SIZE-1:0] cause,
+    input logic [DATA_SIZE-1:0] interrupt_pc,
+    input logic [DATA_SIZE-1:0] trap_addr
+);
+
+  import instruction_pkg::*;
+
+  typedef enum logic [7:0] {
+    Commit = 8'h1,
+    CsrWrite = 8'h2,
+    Trap = 8'h3
+  } commit_log_kind_t;
+
+  integer fd = 0;
+  string file_name;
+
+  initial begin
+    if ($value$plusargs("COMMIT_LOG=%s", file_name)) begin
+      fd = $fopen(file_name, "wb");
+      if (fd == 0) $error("Can't open commit log %s", file_name);
+    end
+  end
+
+  final begin
+    if (fd != 0) $fclose(fd);
+  end
+
+  task automatic write_bytes(input logic [63:0] value, input integer size);
+    for (int i = 0; i < size; i++) $fwrite(fd, "%c", value[8*i+:8]);
+  endtask
+
+  task automatic write_record(input commit_log_kind_t kind, input logic [4:0] reg_addr,
+                              input logic [11:0] csr, input logic [31:0] instruction,
+                              input logic [63:0] address, input logic [63:0] value,
+                              input logic [63:0] extra);
+    write_bytes(kind, 1);
+    write_bytes(reg_addr, 1);
+    write_bytes(csr, 2);
+    write_bytes(instruction, 4);
+    write_bytes(address, 8);
+    write_bytes(value, 8);
+    write_bytes(extra, 8);
+  endtask
+
+  // Bolhas: flush em IF/ID insere Fence, os demais estágios são zerados
+  function automatic logic is_bubble(input logic [31:0] instruction);
+    return instruction == 0 || instruction == {25'b0, Fence};
+  endfunction
+
+  // mip/sip: the read-only bits (MSIP, MTIP, MEIP) come from the CLINT and the
+  // external interrupt, so the written value depends on when their stores land
+  function automatic logic [DATA_SIZE-1:0] written_bits(input logic [11:0] csr,
+                                                        input logic [DATA_SIZE-1:0] value);
+    unique case (csr)
+      12'h144: return value & DATA_SIZE'(12'h002);  // sip: SSIP
+      12'h344: return value & DATA_SIZE'(12'h222);  // mip: SSIP, STIP and SEIP
+      default: return value;
+    endcase
+  endfunction
+
+  always @(posedge clock iff fd != 0) begin
+    if (!reset) begin
+      // Exceptions use the pc of the instruction in WB
+      if (trap)
+        write_record(Trap, 0, 0, 0, interrupt ? interrupt_pc : pc, cause, trap_addr);
+      if (commit && !exception && !is_bubble(inst)) begin
+        if (csr_we)
+          write_record(CsrWrite, 0, csr_addr, inst, pc, written_bits(csr_addr, csr_data), 0);
+        write_record(Commit, reg_we ? rd : 5'b0, 0, inst, pc,
+                     (reg_we && rd != 0) ? rd_data : 0, 0);
+      end
+    end
+  end
+
+endmodule
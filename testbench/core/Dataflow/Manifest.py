@@ -5,6 +5,7 @@ files = [
 
 modules = {
     "local": [
+        "../CommitLog",
         "../../../rtl/core/CSR",
         "../../../rtl/core/Dataflow",
         "../../../rtl/core/ImmediateExtender",
@@ -85,6 +85,10 @@ module dataflow_tb ();
   logic [DataSize-1:0] msip;
   logic [63:0] mtime;
   logic [63:0] mtimecmp;
+  // Performance counter events
+  logic inst_cache_miss;
+  logic data_cache_miss;
+  logic data_cache_write_back;
   // To Control Unit
   opcode_t opcode;
   logic [2:0] funct3;
@@ -139,6 +143,7 @@ module dataflow_tb ();
   logic mem_rd_en_ex;
   logic mem_rd_en_mem;
   logic store_id;
+  logic muldiv_busy;
   // Others
   hazard_t hazard_type;
   rs_used_t rs_used;
@@ -252,8 +257,12 @@ module dataflow_tb ();
   ///////////////////////////////////
   //////////// DUT //////////////////
   ///////////////////////////////////
+  // The model below has no branch predictor and computes the M extension in one cycle
   dataflow #(
-    .DATA_SIZE(DataSize)
+    .DATA_SIZE(DataSize),
+    .BTB_ENTRIES(0),
+    .MUL_LATENCY(0),
+    .DIV_RADIX(0)
   ) DUT (
     .clock,
     .reset,
@@ -288,6 +297,9 @@ module dataflow_tb ();
     .msip,
     .mtime,
     .mtimecmp,
+    .inst_cache_miss,
+    .data_cache_miss,
+    .data_cache_write_back,
     .opcode,
     .funct3,
     .funct7,
@@ -334,7 +346,8 @@ module dataflow_tb ();
     .reg_we_ex,
     .mem_rd_en_ex,
     .mem_rd_en_mem,
-    .store_id
+    .store_id,
+    .muldiv_busy
   );
 
   ///////////////////////////////////
@@ -404,11 +417,15 @@ module dataflow_tb ();
   assign wish_proc0.stb = wish_proc0.cyc;
   assign wish_proc0.we = 1'b0;
   assign wish_proc0.tgd = 1'b0;
+  assign wish_proc0.cti = wishbone_pkg::Classic;
+  assign wish_proc0.bte = wishbone_pkg::LinearBurst;
   assign wish_proc0.addr = inst_mem_addr;
   assign wish_proc0.sel = 4'hF;
   assign wish_proc0.dat_o_p = '0;
   assign wish_proc1.stb = wish_proc1.cyc;
   assign wish_proc1.tgd = signed_en;
+  assign wish_proc1.cti = wishbone_pkg::Classic;
+  assign wish_proc1.bte = wishbone_pkg::LinearBurst;
   assign wish_proc1.addr = data_mem_addr;
   assign wish_proc1.sel = byte_en;
   assign wish_proc1.dat_o_p = wr_data;
@@ -422,7 +439,9 @@ module dataflow_tb ();
       .SET_SIZE(SetSize)
   ) instruction_cache (
     .wb_if_ctrl(wish_cache_inst0),
-    .wb_if_mem(wish_cache_inst1)
+    .wb_if_mem(wish_cache_inst1),
+    .miss(inst_cache_miss),
+    .write_back()
   );
 
   // Data Cache
@@ -431,7 +450,9 @@ module dataflow_tb ();
       .SET_SIZE(SetSize)
   ) data_cache (
     .wb_if_ctrl(wish_cache_data0),
-    .wb_if_mem(wish_cache_data1)
+    .wb_if_mem(wish_cache_data1),
+    .miss(data_cache_miss),
+    .write_back(data_cache_write_back)
   );
 
   // Instruction Memory
@@ -526,6 +547,7 @@ module dataflow_tb ();
       .msip(|msip),
       .mtime(mtime),
       .mtimecmp(mtimecmp),
+      .hpm_events('0),
       // External Interrupt
       .external_interrupt(external_interrupt),
       // Trap Handler
@@ -541,6 +563,29 @@ module dataflow_tb ();
       .sepc(sepc)
   );
 
+  // Commit log (+COMMIT_LOG=<file>)
+  commit_log #(
+      .DATA_SIZE(DataSize)
+  ) commit_logger (
+      .clock,
+      .reset,
+      .commit(!stall_wb && !mem_busy),
+      .pc(DUT.mem_wb_reg.pc),
+      .inst(DUT.mem_wb_reg.inst),
+      .reg_we(DUT.bank.write_enable),
+      .rd(DUT.bank.write_address),
+      .rd_data(DUT.bank.write_data),
+      .csr_we(DUT.csr_bank.wr_en_),
+      .csr_addr(DUT.csr_bank.wr_addr),
+      .csr_data(DUT.csr_bank.wr_data),
+      .trap(DUT.csr_bank.trap),
+      .interrupt(DUT.csr_bank.async_trap),
+      .exception(DUT.csr_bank.exception),
+      .cause(DUT.csr_bank.cause),
+      .interrupt_pc(DUT.csr_bank.interrupt_pc),
+      .trap_addr(DUT.csr_bank.trap_addr)
+  );
+
   // geração do clock
   always begin
     clock = 1'b0;
@@ -621,7 +666,9 @@ module dataflow_tb ();
   function automatic [DataSize-1:0] gen_alu_y(input logic [DataSize-1:0] A,
     input logic [DataSize-1:0] B, input alu_op_t seletor);
     reg [2*DataSize-1:0] mulh, mulhsu, mulhu;
+    reg [DataSize-1:0] min_int;
     begin
+      min_int = {1'b1, {DataSize-1{1'b0}}};
       unique case (seletor)
         ShiftLeftLogic: return A << (B[$clog2(DataSize)-1:0]);
         SetLessThan: return ($signed(A) < $signed(B));
@@ -638,17 +685,26 @@ module dataflow_tb ();
           return mulh[2*DataSize-1:DataSize];
         end
         MulHighSignedUnsigned: begin
-          mulhsu = $signed(A) * B;
+          mulhsu = $signed({{DataSize{A[DataSize-1]}}, A}) * B;
           return mulhsu[2*DataSize-1:DataSize];
         end
         MulHighUnsigned: begin
           mulhu = A * B;
           return mulhu[2*DataSize-1:DataSize];
         end
-        Div: return $signed(A) / $signed(B);
-        DivUnsigned: return A / B;
-        Rem: return $signed(A) % $signed(B);
-        RemUnsigned: return A % B;
+        // RISC-V: x/0 = all ones, x%0 = x, MIN/-1 = MIN and MIN%-1 = 0
+        Div: begin
+          if(B == '0) return '1;
+          if(A == min_int && B == '1) return min_int;
+          return $signed(A) / $signed(B);
+        end
+        DivUnsigned: return (B == '0) ? '1 : A / B;
+        Rem: begin
+          if(B == '0) return A;
+          if(A == min_int && B == '1) return '0;
+          return $signed(A) % $signed(B);
+        end
+        RemUnsigned: return (B == '0) ? A : A % B;
         default: return $signed(A) + $signed(B); // Add
       endcase
     end
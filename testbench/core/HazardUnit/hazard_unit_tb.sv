@@ -15,6 +15,7 @@ module hazard_unit_tb ();
   logic reg_we_ex, reg_we_mem;
   logic mem_rd_en_ex, mem_rd_en_mem;
   logic store_id, rd_complete_ex;
+  logic muldiv_busy;
   logic stall_if, stall_id, stall_ex, stall_mem, stall_wb;
   logic flush_id, flush_ex, flush_mem, flush_wb;
   logic flush_all;
@@ -84,6 +85,21 @@ module hazard_unit_tb ();
     end
   endfunction
 
+  function automatic void check_muldiv_hazard(input logic muldiv_busy, input logic flush_all,
+      input logic interrupt, output logic stall_if, output logic stall_id, output logic stall_ex,
+      output logic flush_mem);
+    stall_if = 1'b0;
+    stall_id = 1'b0;
+    stall_ex = 1'b0;
+    flush_mem = 1'b0;
+    if (muldiv_busy && !flush_all) begin
+      stall_if = !interrupt;
+      stall_id = !interrupt;
+      stall_ex = 1'b1;
+      flush_mem = 1'b1;
+    end
+  endfunction
+
   hazard_unit DUT (.*);
 
   initial begin : verify_dut
@@ -92,6 +108,7 @@ module hazard_unit_tb ();
     logic flush1_ex, flush2_ex;
     logic stall3_if, stall3_id, stall3_ex, stall3_mem, stall3_wb;
     logic flush3_id, flush3_ex, flush3_mem, flush3_wb;
+    logic stall4_if, stall4_id, stall4_ex, flush4_mem;
     repeat (number_of_tests) begin
       hazard_type = hazard_t'($urandom() % hazard_type.num());
       rs_used = rs_used_t'($urandom());
@@ -102,6 +119,7 @@ module hazard_unit_tb ();
       {store_id, rd_complete_ex} = $urandom();
       flush_all = $urandom();
       interrupt = $urandom();
+      muldiv_busy = $urandom();
       #5;
       check_data_hazard(rs1_id, rd_ex, rd_mem, reg_we_ex, reg_we_mem, mem_rd_en_ex, mem_rd_en_mem,
                    rd_complete_ex, 1'b0, hazard_type, stall1_if, stall1_id, flush1_ex);
@@ -110,14 +128,16 @@ module hazard_unit_tb ();
                    flush2_ex);
       check_control_hazard(pc_src, flush_all, interrupt, stall3_if, stall3_id, stall3_ex,
                    stall3_mem, stall3_wb, flush3_id, flush3_ex, flush3_mem, flush3_wb);
-      CHECK_STALL_IF : assert (stall_if  === (stall1_if  || stall2_if  || stall3_if));
-      CHECK_STALL_ID : assert (stall_id  === (stall1_id  || stall2_id  || stall3_id));
+      check_muldiv_hazard(muldiv_busy, flush_all, interrupt, stall4_if, stall4_id, stall4_ex,
+                   flush4_mem);
+      CHECK_STALL_IF : assert (stall_if  === (stall1_if  || stall2_if  || stall3_if || stall4_if));
+      CHECK_STALL_ID : assert (stall_id  === (stall1_id  || stall2_id  || stall3_id || stall4_id));
       CHECK_FLUSH_EX : assert (flush_ex  === (flush1_ex  || flush2_ex  || flush3_ex));
-      CHECK_STALL_EX : assert (stall_ex  === stall3_ex);
+      CHECK_STALL_EX : assert (stall_ex  === (stall3_ex || stall4_ex));
       CHECK_STALL_MEM: assert (stall_mem === stall3_mem);
       CHECK_STALL_WB: assert (stall_wb === stall3_wb);
       CHECK_FLUSH_ID : assert (flush_id  === flush3_id);
-      CHECK_FLUSH_MEM: assert (flush_mem === flush3_mem);
+      CHECK_FLUSH_MEM: assert (flush_mem === (flush3_mem || flush4_mem));
       CHECK_FLUSH_WB: assert (flush_wb === flush3_wb);
       #5;
     end
@@ -12,6 +12,7 @@ modules = {
         "RegisterFile",
         "ALU",
         "MemoryUnit",
+        "MulDivUnit",
         "Shifter"
     ],
 }
@@ -0,0 +1,10 @@
+files = [
+    "mul_div_unit_tb.sv"
+]
+
+modules = {
+    "local": [
+        "../../../rtl/core/MulDivUnit",
+        "../../../utils/globals"
+    ],
+}
@@ -0,0 +1,148 @@
+// Testa a mul_div_unit em todas as combinações de N (32 e 64), MUL_LATENCY
+// (0 a 3) e DIV_RADIX (0 e 2 a 32): resultado das operações da extensão M
+// (casos especiais da divisão da especificação) e ciclos de busy
+module mul_div_unit_tb ();
+
+  localparam integer NumberOfTests = 200;
+
+  logic clock = 1'b0;
+  logic reset;
+  logic [1:0][3:0][5:0] done;
+
+  always #3 clock = ~clock;
+
+  for (genvar n = 0; n < 2; n++) begin : gen_size
+    for (genvar m = 0; m < 4; m++) begin : gen_mul_latency
+      for (genvar d = 0; d < 6; d++) begin : gen_div_radix
+        mul_div_unit_checker #(
+            .N(32 << n),
+            .MUL_LATENCY(m),
+            .DIV_RADIX(d == 0 ? 0 : 1 << d),
+            .NumberOfTests(NumberOfTests)
+        ) unit_checker (
+            .clock,
+            .reset,
+            .done(done[n][m][d])
+        );
+      end
+    end
+  end
+
+  initial begin
+    $display("SOT!");
+    reset = 1'b1;
+    @(negedge clock);
+    reset = 1'b0;
+    wait (&done);
+    $display("EOT!");
+    $stop;
+  end
+
+endmodule
+
+module mul_div_unit_checker #(
+    parameter integer N = 32,
+    parameter integer MUL_LATENCY = 2,
+    parameter integer DIV_RADIX = 4,
+    parameter integer NumberOfTests = 100
+) (
+    input logic clock,
+    input logic reset,
+    output logic done
+);
+  import alu_pkg::*;
+
+  localparam integer DivBits = DIV_RADIX <= 2 ? 1 : $clog2(DIV_RADIX);
+  localparam integer DivCycles = DIV_RADIX == 0 ? 0 : (N + DivBits - 1) / DivBits + 1;
+  localparam logic [N-1:0] Min = {1'b1, {N - 1{1'b0}}};
+
+  // portas do DUT
+  logic en, advance;
+  logic [N-1:0] A, B, Y;
+  alu_op_t alu_op;
+  logic busy;
+
+  alu_op_t operations[8] = '{
+      Mul, MulHigh, MulHighSignedUnsigned, MulHighUnsigned, Div, DivUnsigned, Rem, RemUnsigned
+  };
+  logic [N-1:0] corners[8] = '{0, 1, 2, '1, -2, Min, Min - 1, 'h277ec04d};
+
+  mul_div_unit #(
+      .N(N),
+      .MUL_LATENCY(MUL_LATENCY),
+      .DIV_RADIX(DIV_RADIX)
+  ) DUT (
+      .*
+  );
+
+  // Modelo de referência (divisão por zero e overflow como na especificação)
+  function automatic logic [N-1:0] expected(input alu_op_t op, input logic [N-1:0] a,
+                                            input logic [N-1:0] b);
+    logic [2*N-1:0] product;
+    unique case (op)
+      MulHigh: product = $signed({{N{a[N-1]}}, a}) * $signed({{N{b[N-1]}}, b});
+      MulHighSignedUnsigned: product = {{N{a[N-1]}}, a} * {{N{1'b0}}, b};
+      MulHighUnsigned: product = {{N{1'b0}}, a} * {{N{1'b0}}, b};
+      Div: return b == 0 ? '1 : (a == Min && b == '1) ? Min : N'($signed(a) / $signed(b));
+      DivUnsigned: return b == 0 ? '1 : a / b;
+      Rem: return b == 0 ? a : (a == Min && b == '1) ? '0 : N'($signed(a) % $signed(b));
+      RemUnsigned: return b == 0 ? a : a % b;
+      default: return a * b;  // Mul
+    endcase
+    return product[2*N-1:N];
+  endfunction
+
+  function automatic logic [N-1:0] random_operand();
+    return N'({$urandom(), $urandom()}) >> ($urandom() % N);
+  endfunction
+
+  string config_name;
+
+  initial
+    config_name = $sformatf("N = %0d, MUL_LATENCY = %0d, DIV_RADIX = %0d", N, MUL_LATENCY,
+                            DIV_RADIX);
+
+  // Mantém a operação em EX até busy cair e confere o resultado e a latência
+  task automatic check(input alu_op_t op, input logic [N-1:0] a, input logic [N-1:0] b);
+    integer cycles = 0, latency;
+    latency = op inside {Div, DivUnsigned, Rem, RemUnsigned} ? DivCycles : MUL_LATENCY;
+    alu_op = op;
+    A = a;
+    B = b;
+    en = 1'b1;
+    #1;
+    while (busy) begin
+      @(negedge clock);
+      cycles++;
+      if (cycles > latency)
+        $fatal(1, "Error (%s): %s still busy after %0d cycles", config_name, op.name(), cycles);
+    end
+    if (Y !== expected(op, a, b) || cycles != latency)
+      $fatal(1, "Error (%s): %s A = 0x%h, B = 0x%h, Y = 0x%h (expected 0x%h) in %0d cycles (%0d)",
+             config_name, op.name(), a, b, Y, expected(op, a, b), cycles, latency);
+    // A instrução deixa EX
+    advance = 1'b1;
+    @(negedge clock);
+    advance = 1'b0;
+    en = 1'b0;
+    @(negedge clock);
+  endtask
+
+  initial begin
+    done = 1'b0;
+    en = 1'b0;
+    advance = 1'b0;
+    alu_op = Mul;
+    A = '0;
+    B = '0;
+    @(negedge reset);
+    @(negedge clock);
+    foreach (operations[i]) begin
+      foreach (corners[j]) foreach (corners[k]) check(operations[i], corners[j], corners[k]);
+      check(operations[i], 'h277ec04d, 'h227dcf60);
+      repeat (NumberOfTests) check(operations[i], random_operand(), random_operand());
+    end
+    done = 1'b1;
+  end
+
+endmodule
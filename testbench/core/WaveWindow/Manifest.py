@@ -0,0 +1,3 @@
+files = [
+    "wave_window.sv"
+]
@@ -0,0 +1,150 @@
+// Triggered wave window: keeps the last cycles of a probe in a ring buffer
+// and writes only them to a VCD file around a trigger, so long runs can be
+// debugged without -voptargs=+acc (the design stays optimized)
+// Only enabled with +WAVE=<file.vcd>
+// +WAVE_DEPTH=<cycles>: cycles kept in memory (default 1024)
+// +WAVE_POST=<cycles>: cycles recorded after the trigger (default 64)
+// The testbench describes the probe with add_signal (from the MSB to the LSB),
+// calls fire when the trigger condition happens and flush before $stop/$error
+// (without a trigger, flush writes the last cycles of the run)
+
+module wave_window #(
+    parameter integer WIDTH = 32
+) (
+    input logic clock,
+    input logic [WIDTH-1:0] probe
+);
+
+  integer fd = 0;
+  string file_name;
+  int unsigned depth = 1024;
+  int unsigned post = 64;
+  // Ring buffer
+  logic [WIDTH-1:0] samples[];
+  longint unsigned times[];
+  int unsigned head = 0;
+  int unsigned count = 0;
+  // Cycles left to record after the trigger (-1: not triggered)
+  int remaining = -1;
+  bit fired = 0;
+  string reason;
+  longint unsigned trigger_time = 0;
+  // Probe layout
+  string scopes[$];
+  string names[$];
+  int widths[$];
+
+  initial begin
+    if ($value$plusargs("WAVE=%s", file_name)) begin
+      void'($value$plusargs("WAVE_DEPTH=%d", depth));
+      void'($value$plusargs("WAVE_POST=%d", post));
+      if (depth == 0) depth = 1;
+      if (post >= depth) post = depth - 1;
+      samples = new[depth];
+      times = new[depth];
+      fd = $fopen(file_name, "w");
+      if (fd == 0) $error("Can't open wave window %s", file_name);
+    end
+  end
+
+  task automatic add_signal(input string scope, input string name, input int width);
+    scopes.push_back(scope);
+    names.push_back(name);
+    widths.push_back(width);
+  endtask
+
+  task automatic fire(input string why);
+    if (fd != 0 && !fired) begin
+      fired = 1;
+      reason = why;
+      trigger_time = $time;
+      remaining = post + 1;  // The cycle of the trigger and the next post
+      $display("Wave window: %s at %0t", why, $time);
+    end
+  endtask
+
+  task automatic flush(input string why);
+    if (fd != 0) begin
+      if (!fired) begin
+        reason = why;
+        trigger_time = $time;
+      end
+      write_window();
+    end
+  endtask
+
+  // Identificadores do VCD: base 94 com os caracteres imprimíveis
+  function automatic string vcd_id(input int index);
+    string id = "";
+    do begin
+      id = $sformatf("%s%c", id, 8'(33 + index % 94));
+      index = index / 94;
+    end while (index != 0);
+    return id;
+  endfunction
+
+  task automatic write_window();
+    int total = 0;
+    int offset;
+    int unsigned entry;
+    longint unsigned previous_time = 0;
+    string scope = "";
+    string changes;
+    logic [WIDTH-1:0] value, previous, mask;
+    foreach (widths[j]) total += widths[j];
+    if (total != WIDTH) begin
+      $error("Wave window: the signals have %0d bits, the probe %0d", total, WIDTH);
+      $fclose(fd);
+      fd = 0;
+      return;
+    end
+    $fdisplay(fd, "$comment %s at %0t $end", reason, trigger_time);
+    $fdisplay(fd, "$timescale 1ns $end");
+    $fdisplay(fd, "$scope module wave_window $end");
+    $fdisplay(fd, "$var wire 1 %s trigger $end", vcd_id(names.size()));
+    $fdisplay(fd, "$upscope $end");
+    foreach (names[j]) begin
+      if (scopes[j] != scope) begin
+        if (scope != "") $fdisplay(fd, "$upscope $end");
+        $fdisplay(fd, "$scope module %s $end", scopes[j]);
+        scope = scopes[j];
+      end
+      $fdisplay(fd, "$var wire %0d %s %s $end", widths[j], vcd_id(j), names[j]);
+    end
+    if (scope != "") $fdisplay(fd, "$upscope $end");
+    $fdisplay(fd, "$enddefinitions $end");
+    // Only the signals that changed since the previous cycle
+    for (int unsigned k = 0; k < count; k++) begin
+      entry = (head + depth - count + k) % depth;
+      value = samples[entry];
+      changes = "";
+      if (k == 0) changes = $sformatf("b%0b %s\n", fired && times[entry] >= trigger_time,
+                                      vcd_id(names.size()));
+      else if (fired && times[entry] >= trigger_time && previous_time < trigger_time)
+        changes = $sformatf("b1 %s\n", vcd_id(names.size()));
+      offset = WIDTH;
+      foreach (names[j]) begin
+        offset -= widths[j];
+        mask = {WIDTH{1'b1}} >> (WIDTH - widths[j]);
+        if (k == 0 || (value >> offset & mask) !== (previous >> offset & mask))
+          changes = {changes, $sformatf("b%0b %s\n", value >> offset & mask, vcd_id(j))};
+      end
+      if (changes != "") $fwrite(fd, "#%0d\n%s", times[entry], changes);
+      previous = value;
+      previous_time = times[entry];
+    end
+    $fclose(fd);
+    fd = 0;
+    $display("Wave window: %0d cycles (%s) written to %s", count, reason, file_name);
+  endtask
+
+  always @(posedge clock iff fd != 0) begin
+    samples[head] = probe;
+    times[head] = $time;
+    head = (head + 1) % depth;
+    if (count < depth) count++;
+    if (remaining > 0) remaining--;
+    if (remaining == 0) write_window();
+  end
+
+endmodule
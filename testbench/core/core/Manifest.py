@@ -7,6 +7,8 @@ files = [
 
 modules = {
     "local": [
+        "../CommitLog",
+        "../WaveWindow",
         "../../../rtl/core/core",
         "../../../rtl/core/CSR",
         "../../../rtl/memory/Cache",
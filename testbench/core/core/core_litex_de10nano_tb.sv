@@ -85,7 +85,10 @@ module core_litex_de10nano_tb ();
       .external_interrupt(1'b0),
       .msip(0),
       .mtime(64'h64),
-      .mtimecmp(64'h0)
+      .mtimecmp(64'h0),
+      .inst_cache_miss(1'b0),
+      .data_cache_miss(1'b0),
+      .data_cache_write_back(1'b0)
   );
 
   // ROM
@@ -141,6 +144,8 @@ module core_litex_de10nano_tb ();
   assign wish_rom.stb = wish_rom.cyc;
   assign wish_rom.we = sel_rom ? wish_proc1.we : wish_proc0.we;
   assign wish_rom.sel = sel_rom ? wish_proc1.sel : wish_proc0.sel;
+  assign wish_rom.cti = sel_rom ? wish_proc1.cti : wish_proc0.cti;
+  assign wish_rom.bte = sel_rom ? wish_proc1.bte : wish_proc0.bte;
   assign wish_rom.addr = sel_rom ? wish_proc1.addr : wish_proc0.addr;
   assign wish_rom.dat_o_p = sel_rom ? wish_proc1.dat_o_p : wish_proc0.dat_o_p;
   // SRAM
@@ -148,6 +153,8 @@ module core_litex_de10nano_tb ();
   assign wish_sram.stb = wish_sram.cyc;
   assign wish_sram.we = wish_sram.cyc & wish_proc1.we;
   assign wish_sram.sel = wish_proc1.sel;
+  assign wish_sram.cti = wish_proc1.cti;
+  assign wish_sram.bte = wish_proc1.bte;
   assign wish_sram.addr = wish_proc1.addr;
   assign wish_sram.dat_o_p = wish_proc1.dat_o_p;
   // RAM
@@ -155,6 +162,8 @@ module core_litex_de10nano_tb ();
   assign wish_ram.stb = wish_ram.cyc;
   assign wish_ram.we = wish_ram.cyc & wish_proc1.we;
   assign wish_ram.sel = wish_proc1.sel;
+  assign wish_ram.cti = wish_proc1.cti;
+  assign wish_ram.bte = wish_proc1.bte;
   assign wish_ram.addr = wish_proc1.addr;
   assign wish_ram.dat_o_p = wish_proc1.dat_o_p;
   // CSR + CLINT
@@ -162,6 +171,8 @@ module core_litex_de10nano_tb ();
   assign wish_csr_clint.stb = wish_csr_clint.cyc;
   assign wish_csr_clint.we = wish_csr_clint.cyc & wish_proc1.we;
   assign wish_csr_clint.sel = wish_proc1.sel;
+  assign wish_csr_clint.cti = wish_proc1.cti;
+  assign wish_csr_clint.bte = wish_proc1.bte;
   assign wish_csr_clint.addr = wish_proc1.addr;
   assign wish_csr_clint.dat_o_p = wish_proc1.dat_o_p;
   // PLIC
@@ -1,10 +1,23 @@
 
-module core_tb ();
+module core_tb #(
+    // Branch predictor of the core (override with vsim -G to compare the CPI)
+    parameter integer BTB_ENTRIES = 16,
+    parameter integer BHT_ENTRIES = 64,
+    parameter integer HISTORY_SIZE = 0,
+    // M extension latencies of the core
+    parameter integer MUL_LATENCY = 2,
+    parameter integer DIV_RADIX = 4,
+    // Write buffer and hit-under-miss for stores in the data cache
+    parameter integer DATA_CACHE_NON_BLOCKING = 1,
+    // Next-line prefetch in the instruction cache
+    parameter integer INST_CACHE_PREFETCH = 1
+) ();
 
   ///////////////////////////////////
   ///////////// Imports /////////////
   ///////////////////////////////////
   import extensions_pkg::*;
+  import csr_pkg::*;
 
   ///////////////////////////////////
   //////////// Parameters ///////////
@@ -42,6 +55,10 @@ module core_tb ();
   logic [DataSize-1:0] msip;
   logic [63:0] mtime;
   logic [63:0] mtimecmp;
+  // Performance counter events
+  logic inst_cache_miss;
+  logic data_cache_miss;
+  logic data_cache_write_back;
 
   ///////////////////////////////////
   /////////// Interfaces ////////////
@@ -122,14 +139,19 @@ module core_tb ();
   ///////////////////////////////////
   // variáveis
   integer
-      limit = 1000, i = 0;  // número máximo de iterações a serem feitas (evitar loop infinito)
+      limit = 4000, i = 0;  // número máximo de iterações a serem feitas (evitar loop infinito)
   // Address
   localparam integer FinalAddress = 16781308;  // Final execution address
   localparam integer ExternalInterruptAddress = 16781320;  // Active/Desactive External Interrupt
 
   // DUT
   core #(
-      .DATA_SIZE(DataSize)
+      .DATA_SIZE(DataSize),
+      .BTB_ENTRIES(BTB_ENTRIES),
+      .BHT_ENTRIES(BHT_ENTRIES),
+      .HISTORY_SIZE(HISTORY_SIZE),
+      .MUL_LATENCY(MUL_LATENCY),
+      .DIV_RADIX(DIV_RADIX)
   ) DUT (
       .clock,
       .reset,
@@ -138,7 +160,10 @@ module core_tb ();
       .external_interrupt,
       .msip,
       .mtime,
-      .mtimecmp
+      .mtimecmp,
+      .inst_cache_miss,
+      .data_cache_miss,
+      .data_cache_write_back
   );
 
   ///////////////////////////////////
@@ -147,19 +172,25 @@ module core_tb ();
   // Instruction Cache
   cache #(
       .CACHE_SIZE(CacheSize),
-      .SET_SIZE  (SetSize)
+      .SET_SIZE  (SetSize),
+      .PREFETCH  (INST_CACHE_PREFETCH)
   ) instruction_cache (
       .wb_if_ctrl(wish_cache_inst0),
-      .wb_if_mem (wish_cache_inst1)
+      .wb_if_mem (wish_cache_inst1),
+      .miss(inst_cache_miss),
+      .write_back()
   );
 
   // Data Cache
   cache #(
-      .CACHE_SIZE(CacheSize),
-      .SET_SIZE  (SetSize)
+      .CACHE_SIZE  (CacheSize),
+      .SET_SIZE    (SetSize),
+      .NON_BLOCKING(DATA_CACHE_NON_BLOCKING)
   ) data_cache (
       .wb_if_ctrl(wish_cache_data0),
-      .wb_if_mem (wish_cache_data1)
+      .wb_if_mem (wish_cache_data1),
+      .miss(data_cache_miss),
+      .write_back(data_cache_write_back)
   );
 
   // Instruction Memory
@@ -212,6 +243,168 @@ module core_tb ();
       .wish_p_csr(wish_csr)
   );
 
+  // Commit log (+COMMIT_LOG=<file>)
+  commit_log #(
+      .DATA_SIZE(DataSize)
+  ) commit_logger (
+      .clock,
+      .reset,
+      .commit(!DUT.stall_wb && !DUT.mem_busy),
+      .pc(DUT.data_flow.mem_wb_reg.pc),
+      .inst(DUT.data_flow.mem_wb_reg.inst),
+      .reg_we(DUT.data_flow.bank.write_enable),
+      .rd(DUT.data_flow.bank.write_address),
+      .rd_data(DUT.data_flow.bank.write_data),
+      .csr_we(DUT.data_flow.csr_bank.wr_en_),
+      .csr_addr(DUT.data_flow.csr_bank.wr_addr),
+      .csr_data(DUT.data_flow.csr_bank.wr_data),
+      .trap(DUT.data_flow.csr_bank.trap),
+      .interrupt(DUT.data_flow.csr_bank.async_trap),
+      .exception(DUT.data_flow.csr_bank.exception),
+      .cause(DUT.data_flow.csr_bank.cause),
+      .interrupt_pc(DUT.data_flow.csr_bank.interrupt_pc),
+      .trap_addr(DUT.data_flow.csr_bank.trap_addr)
+  );
+
+  // Triggered wave window (+WAVE=<file.vcd>), written around +WAVE_PC=<hex> (the
+  // instruction leaves WB), +WAVE_TRAP=1 or +WAVE_CYCLE=<cycle> or else at the end of
+  // the run: the pipeline registers and the wishbone interfaces of the core
+  localparam integer WaveWidth = 12 * DataSize + DataSize / 8 + 248;
+  logic [DataSize-1:0] wave_pc;
+  logic wave_on_pc, wave_on_trap;
+  integer wave_cycle = -1;
+
+  wave_window #(
+      .WIDTH(WaveWidth)
+  ) waves (
+      .clock,
+      .probe({
+        DUT.data_flow.pc,
+        {DUT.stall_if, DUT.stall_id, DUT.stall_ex, DUT.stall_mem, DUT.stall_wb},
+        {DUT.flush_id, DUT.flush_ex, DUT.flush_mem, DUT.flush_wb},
+        DUT.mem_busy,
+        DUT.data_flow.if_id_reg.pc,
+        DUT.data_flow.if_id_reg.inst,
+        DUT.data_flow.id_ex_reg.pc,
+        DUT.data_flow.id_ex_reg.inst,
+        DUT.data_flow.ex_mem_reg.pc,
+        DUT.data_flow.ex_mem_reg.inst,
+        DUT.data_flow.ex_mem_reg.alu_y,
+        DUT.data_flow.ex_mem_reg.write_data,
+        DUT.data_flow.mem_wb_reg.pc,
+        DUT.data_flow.mem_wb_reg.inst,
+        DUT.data_flow.mem_wb_reg.rd,
+        DUT.data_flow.mem_wb_reg.wr_reg_en,
+        DUT.data_flow.mem_wb_reg.alu_y,
+        DUT.data_flow.mem_wb_reg.read_data,
+        DUT.data_flow.csr_bank.trap,
+        DUT.data_flow.csr_bank.cause,
+        {wish_proc0.cyc, wish_proc0.stb, wish_proc0.ack},
+        wish_proc0.addr,
+        wish_proc0.dat_i_p,
+        {wish_proc1.cyc, wish_proc1.stb, wish_proc1.we, wish_proc1.ack},
+        wish_proc1.addr,
+        wish_proc1.sel,
+        wish_proc1.dat_o_p,
+        wish_proc1.dat_i_p
+      })
+  );
+
+  initial begin
+    wave_on_pc = $value$plusargs("WAVE_PC=%h", wave_pc);
+    wave_on_trap = 1'b0;
+    void'($value$plusargs("WAVE_TRAP=%d", wave_on_trap));
+    void'($value$plusargs("WAVE_CYCLE=%d", wave_cycle));
+    // Same order as the probe
+    waves.add_signal("core", "pc", DataSize);
+    waves.add_signal("core", "stall_if_id_ex_mem_wb", 5);
+    waves.add_signal("core", "flush_id_ex_mem_wb", 4);
+    waves.add_signal("core", "mem_busy", 1);
+    waves.add_signal("if_id_reg", "pc", DataSize);
+    waves.add_signal("if_id_reg", "inst", 32);
+    waves.add_signal("id_ex_reg", "pc", DataSize);
+    waves.add_signal("id_ex_reg", "inst", 32);
+    waves.add_signal("ex_mem_reg", "pc", DataSize);
+    waves.add_signal("ex_mem_reg", "inst", 32);
+    waves.add_signal("ex_mem_reg", "alu_y", DataSize);
+    waves.add_signal("ex_mem_reg", "write_data", DataSize);
+    waves.add_signal("mem_wb_reg", "pc", DataSize);
+    waves.add_signal("mem_wb_reg", "inst", 32);
+    waves.add_signal("mem_wb_reg", "rd", 5);
+    waves.add_signal("mem_wb_reg", "wr_reg_en", 1);
+    waves.add_signal("mem_wb_reg", "alu_y", DataSize);
+    waves.add_signal("mem_wb_reg", "read_data", DataSize);
+    waves.add_signal("csr_bank", "trap", 1);
+    waves.add_signal("csr_bank", "cause", DataSize);
+    waves.add_signal("wish_proc0", "cyc_stb_ack", 3);
+    waves.add_signal("wish_proc0", "addr", 32);
+    waves.add_signal("wish_proc0", "dat_i_p", 32);
+    waves.add_signal("wish_proc1", "cyc_stb_we_ack", 4);
+    waves.add_signal("wish_proc1", "addr", 32);
+    waves.add_signal("wish_proc1", "sel", DataSize / 8);
+    waves.add_signal("wish_proc1", "dat_o_p", DataSize);
+    waves.add_signal("wish_proc1", "dat_i_p", DataSize);
+  end
+
+  always @(posedge clock iff waves.fd != 0) begin
+    if (!reset) begin
+      if (wave_on_pc && !DUT.stall_wb && !DUT.mem_busy &&
+          DUT.data_flow.mem_wb_reg.pc == wave_pc)
+        waves.fire($sformatf("pc 0x%0h", wave_pc));
+      if (wave_on_trap && DUT.data_flow.csr_bank.trap)
+        waves.fire($sformatf("trap (cause 0x%0h)", DUT.data_flow.csr_bank.cause));
+      if (i == wave_cycle) waves.fire($sformatf("cycle %0d", i));
+    end
+  end
+
+  // Checks of the run: a failed check writes the wave window with the cycles before it
+  // and then reports the error
+  localparam integer MemoryTimeout = 10000;
+  integer mem_busy_cycles = 0;
+
+  task automatic fail(input string message);
+    waves.flush({"error: ", message});
+    $error("%s", message);
+    $stop;
+  endtask
+
+  always @(posedge clock) begin
+    if (!reset) begin
+      mem_busy_cycles = DUT.mem_busy ? mem_busy_cycles + 1 : 0;
+      assert (mem_busy_cycles < MemoryTimeout)
+      else fail($sformatf("memory busy for %0d cycles", MemoryTimeout));
+      assert (!$isunknown(DUT.data_flow.pc))
+      else fail("unknown pc");
+      assert (!wish_proc1.cyc || !$isunknown({wish_proc1.we, wish_proc1.addr}))
+      else fail("unknown data bus access");
+    end
+  end
+
+  // Accesses to the caches (+CACHE_TRACE=<file>), replayed with different cache
+  // configurations by simulation/cache_explorer/cache_explorer.py
+  integer cache_trace = 0;
+  string cache_trace_name;
+
+  initial begin
+    if ($value$plusargs("CACHE_TRACE=%s", cache_trace_name)) begin
+      cache_trace = $fopen(cache_trace_name, "w");
+      if (cache_trace == 0) $error("Can't open cache trace %s", cache_trace_name);
+    end
+  end
+
+  always @(posedge clock) begin
+    if (cache_trace != 0) begin
+      if (wish_cache_inst0.op_en() && wish_cache_inst0.ack)
+        $fdisplay(cache_trace, "I %h", wish_cache_inst0.addr);
+      if (wish_cache_data0.op_en() && wish_cache_data0.ack)
+        $fdisplay(cache_trace, "%s %h", wish_cache_data0.we ? "W" : "R", wish_cache_data0.addr);
+    end
+  end
+
+  final begin
+    if (cache_trace != 0) $fclose(cache_trace);
+  end
+
   // geração do clock
   always begin
     clock = 1'b0;
@@ -220,6 +413,27 @@ module core_tb ();
     #3;
   end
 
+  // Performance counters (read by simulation/auto_test/perf_report.py)
+  task automatic print_counters();
+    $display("Performance counters:");
+    $display("mcycle: %0d", DUT.data_flow.csr_bank.mcycle);
+    $display("minstret: %0d", DUT.data_flow.csr_bank.minstret);
+    for (int j = 3; j < HpmCounters + 3; j++) begin
+      hpm_event_t hpm_event = hpm_event_t'(j);
+      $display("mhpmcounter%0d %s: %0d", j, hpm_event.name(),
+               DUT.data_flow.csr_bank.mhpmcounter[j]);
+    end
+    $display("Branch predictor: BTB %0d, BHT %0d, history %0d: %0d of %0d mispredicted",
+             BTB_ENTRIES, BHT_ENTRIES, HISTORY_SIZE,
+             DUT.data_flow.csr_bank.mhpmcounter[HpmBranchMispredict],
+             DUT.data_flow.csr_bank.mhpmcounter[HpmBranch]);
+    $display("I-cache: %0d hits, %0d misses, prefetch %0d useful, %0d useless",
+             instruction_cache.hit_count, instruction_cache.miss_count,
+             instruction_cache.prefetch_useful_count, instruction_cache.prefetch_useless_count);
+    $display("D-cache: %0d hits, %0d misses, %0d write backs", data_cache.hit_count,
+             data_cache.miss_count, data_cache.write_back_count);
+  endtask
+
   ///////////////////////////////////
   //////// Especial Address /////////
   ///////////////////////////////////
@@ -229,6 +443,8 @@ module core_tb ();
       $display("End of program!");
       $display("Write data: 0x%x", wish_proc1.dat_o_p);
       $display("Number of Cycles: %d", i);
+      print_counters();
+      waves.flush("end of program");
       $stop;
     end
   end
@@ -244,6 +460,8 @@ module core_tb ();
   ////////// Initializer ////////////
   ///////////////////////////////////
   initial begin
+    // Programs longer than the default limit (benchmarks) pass +CYCLE_LIMIT=<cycles>
+    void'($value$plusargs("CYCLE_LIMIT=%d", limit));
     $display("SOT!");
     reset = 1'b1;
     @(posedge clock);
@@ -253,6 +471,8 @@ module core_tb ();
       @(posedge clock);
       i++;
     end
+    print_counters();
+    waves.flush("cycle limit");
     $stop;
   end
 
@@ -8,6 +8,9 @@
 // Second TB (uart_tx_full_test.mif)
 // Check processor behavior when writing to TX
 // Observe how the processor sees tx_full
+// Throughput benchmarks (uart_poll_bench.mif and uart_dma_bench.mif)
+// Send 64 bytes and compare the echo, by polling or with the UART's DMA
+// The cycles until the result is written are printed
 
 
 module core_uart_tb;
@@ -30,7 +33,8 @@ module core_uart_tb;
   localparam integer CacheDataSize = 128;
   localparam integer ProcAddrSize = 32;
   localparam integer MemoryAddrSize = 16;
-  localparam integer UartAddrSize = 5;
+  localparam integer UartAddrSize = 6;
+  localparam integer UartFifoDepth = 64;
   localparam integer CsrAddrSize = 7;
   localparam integer ByteSize = 8;
   localparam integer ByteNum = DataSize / ByteSize;
@@ -56,6 +60,18 @@ module core_uart_tb;
   logic [DataSize-1:0] msip;
   logic [63:0] mtime;
   logic [63:0] mtimecmp;
+  // Performance counter events
+  logic inst_cache_miss;
+  logic data_cache_miss;
+  logic data_cache_write_back;
+  // DMA da UART
+  logic uart_dma_cyc;
+  logic uart_dma_we;
+  logic [31:0] uart_dma_addr;
+  logic [3:0] uart_dma_sel;
+  logic [31:0] uart_dma_wr_data;
+  logic uart_dma_ack;
+  logic [31:0] uart_dma_rd_data;
 
   ///////////////////////////////////
   /////////// Interfaces ////////////
@@ -67,6 +83,13 @@ module core_uart_tb;
   ) wish_proc0 (
       .*
   );
+  wishbone_if #(
+      .DATA_SIZE(DataSize),
+      .BYTE_SIZE(ByteSize),
+      .ADDR_SIZE(ProcAddrSize)
+  ) wish_core1 (
+      .*
+  );
   wishbone_if #(
       .DATA_SIZE(DataSize),
       .BYTE_SIZE(ByteSize),
@@ -136,6 +159,7 @@ module core_uart_tb;
   ///////////////////////////////////
   // variáveis
   integer i = 0;
+  integer cycles = 0;
 
   // DUT
   core #(
@@ -144,11 +168,14 @@ module core_uart_tb;
       .clock,
       .reset,
       .wish_proc0,
-      .wish_proc1,
+      .wish_proc1(wish_core1),
       .external_interrupt,
       .msip,
       .mtime,
-      .mtimecmp
+      .mtimecmp,
+      .inst_cache_miss,
+      .data_cache_miss,
+      .data_cache_write_back
   );
 
   ///////////////////////////////////
@@ -160,7 +187,9 @@ module core_uart_tb;
       .SET_SIZE  (SetSize)
   ) instruction_cache (
       .wb_if_ctrl(wish_cache_inst0),
-      .wb_if_mem (wish_cache_inst1)
+      .wb_if_mem (wish_cache_inst1),
+      .miss(inst_cache_miss),
+      .write_back()
   );
 
   // Data Cache
@@ -169,7 +198,9 @@ module core_uart_tb;
       .SET_SIZE  (SetSize)
   ) data_cache (
       .wb_if_ctrl(wish_cache_data0),
-      .wb_if_mem (wish_cache_data1)
+      .wb_if_mem (wish_cache_data1),
+      .miss(data_cache_miss),
+      .write_back(data_cache_write_back)
   );
 
   // Instruction Memory
@@ -222,16 +253,40 @@ module core_uart_tb;
       .wish_p_csr(wish_csr)
   );
 
+  // O DMA da UART acessa a memória pela cache de dados, como o núcleo
+  dma_arbiter #(
+      .DATA_SIZE(DataSize),
+      .BYTE_SIZE(ByteSize)
+  ) proc1_arbiter (
+      .wish_s_proc(wish_core1),
+      .wish_p_mem(wish_proc1),
+      .dma_cyc(uart_dma_cyc),
+      .dma_we(uart_dma_we),
+      .dma_addr(uart_dma_addr),
+      .dma_sel(uart_dma_sel),
+      .dma_wr_data(uart_dma_wr_data),
+      .dma_ack(uart_dma_ack),
+      .dma_rd_data(uart_dma_rd_data)
+  );
+
   // UART
   uart #(
       .LITEX_ARCH(0),
-      .FIFO_DEPTH(8),
-      .CLOCK_FREQ_HZ(115200 * 32)
+      .FIFO_DEPTH(UartFifoDepth),
+      .CLOCK_FREQ_HZ(115200 * 32),
+      .DMA(1)
   ) uart_0 (
       .wb_if_s            (wish_uart),
       .rxd                (uart_0_rxd),  // TX always high to simulate no data
       .txd                (uart_0_txd),
       .interrupt          (),
+      .dma_cyc            (uart_dma_cyc),
+      .dma_we             (uart_dma_we),
+      .dma_addr           (uart_dma_addr),
+      .dma_sel            (uart_dma_sel),
+      .dma_wr_data        (uart_dma_wr_data),
+      .dma_ack            (uart_dma_ack),
+      .dma_rd_data        (uart_dma_rd_data),
       .div_db             (),
       .rx_pending_db      (),
       .tx_pending_db      (),
@@ -278,7 +333,10 @@ module core_uart_tb;
 
     while (i < AmntOfTests) begin
       // Check for RAM write operation using wishbone interface signals
-      if (wish_cache_data0.we && wish_cache_data0.cyc && wish_cache_data0.stb) begin
+      // (the writes of the UART's DMA are not results)
+      if (wish_cache_data0.we && wish_cache_data0.cyc && wish_cache_data0.stb &&
+          !proc1_arbiter.grant[1]) begin
+        $display("[%0t] Result written after %0d cycles", $time, cycles);
         @(negedge clock);
         @(negedge clock);  // Wait for 2 cycles
 
@@ -295,6 +353,7 @@ module core_uart_tb;
         i ++;
       end
       @(negedge clock);
+      cycles++;
     end
 
     $display("[%0t] EOT", $time);
@@ -1,5 +1,9 @@
 
-module cache_tb ();
+module cache_tb #(
+    parameter cache_pkg::replacement_policy_t REPLACEMENT_POLICY = cache_pkg::Lru,
+    parameter integer NON_BLOCKING = 0,
+    parameter integer PREFETCH = 0
+) ();
 
   import macros_pkg::*;
 
@@ -14,8 +18,15 @@ module cache_tb ();
   localparam integer DataSize = 32;
   localparam integer ByteSize = 8;
   localparam integer SelSize = DataSize/ByteSize;
+  localparam integer BlockBytes = BlockSize/ByteSize;
+  localparam integer SetStride = CacheSize/(SetSize*ByteSize);  // Entre blocos do mesmo conjunto
 
-  localparam integer MemAddrSize = 15;
+  localparam integer MemAddrSize = 16;  // Cabe todo o de10nano_bios.mif
+
+  // Bloco substituído no teste de substituição: conjunto cheio (blocos 0 a SetSize-1), acessos
+  // aos blocos 0 e 3 e um miss
+  localparam integer Victim = REPLACEMENT_POLICY == cache_pkg::Lru ? 1 :
+                              REPLACEMENT_POLICY == cache_pkg::PseudoLru ? 2 : 0;
 
   localparam string InitFile = "./MIFs/memory/ROM/bios/de10nano_bios.mif";
 
@@ -27,6 +38,12 @@ module cache_tb ();
   logic [ByteSize-1:0] mem [2**MemAddrSize-1:0];
   logic [DataSize-1:0] wr_data, rd_data, aligned_data, expected_data;
   logic [1:0] access_to_same_addr;
+  logic miss, write_back;
+  logic [31:0] hit_count, miss_count, write_back_count;
+  logic [31:0] prefetch_useful_count, prefetch_useless_count;
+  logic [31:0] mem_read_count, mem_write_count;  // Beats respondidos pela memória
+  logic [31:0] reads, writes, hits, misses, write_backs;
+  logic [31:0] access_count = 0;  // Acessos feitos pelo testbench: cada um é um hit ou um miss
   /* //// */
 
   function automatic logic [SelSize-1:0] gen_random_sel();
@@ -60,6 +77,32 @@ module cache_tb ();
     end
   endfunction
 
+  // Acesso de uma palavra: loads são comparados com o modelo da memória
+  task automatic access(input logic write, input logic [AddrSize-1:0] address,
+                        input logic [DataSize-1:0] data = $urandom);
+    begin
+      sel = '1;
+      rd_signed = 1'b0;
+      addr = address;
+      wr_data = data;
+      wr_en = write;
+      rd_en = !write;
+      access_count++;
+      if(write) begin
+        for(int i = 0; i < SelSize; i++)
+          mem[addr + i] = wr_data[i*ByteSize+:ByteSize];
+      end
+      // O ack de um hit chega no primeiro ciclo: amostrado em cada borda de descida
+      do @(negedge clock); while(!ack);
+      if(!write) begin
+        CHK_ACCESS: assert(rd_data === aligned_data);
+      end
+      wr_en = 1'b0;
+      rd_en = 1'b0;
+      @(negedge clock);
+    end
+  endtask
+
   /* Barramentos */
   wishbone_if #(.DATA_SIZE(BlockSize), .BYTE_SIZE(ByteSize), .ADDR_SIZE(MemAddrSize)) wb_if_mem (.*);
   wishbone_if #(.DATA_SIZE(DataSize), .BYTE_SIZE(ByteSize), .ADDR_SIZE(AddrSize)) wb_if_ctrl (.*);
@@ -74,7 +117,10 @@ module cache_tb ();
 
   cache #(
       .CACHE_SIZE(CacheSize),
-      .SET_SIZE(SetSize)
+      .SET_SIZE(SetSize),
+      .REPLACEMENT_POLICY(REPLACEMENT_POLICY),
+      .NON_BLOCKING(NON_BLOCKING),
+      .PREFETCH(PREFETCH)
   ) DUT (.*);
 
   // Generate Clock
@@ -86,6 +132,8 @@ module cache_tb ();
   assign wb_if_ctrl.we = wr_en;
   assign wb_if_ctrl.sel = sel;
   assign wb_if_ctrl.tgd = rd_signed;
+  assign wb_if_ctrl.cti = wishbone_pkg::Classic;
+  assign wb_if_ctrl.bte = wishbone_pkg::LinearBurst;
   assign wb_if_ctrl.addr = addr;
   assign wb_if_ctrl.dat_o_p = wr_data;
   assign ack = wb_if_ctrl.ack;
@@ -98,6 +146,16 @@ module cache_tb ();
     end
   end
 
+  always_ff @(posedge clock, posedge reset) begin
+    if(reset) begin
+      mem_read_count <= '0;
+      mem_write_count <= '0;
+    end else if(wb_if_mem.cyc && wb_if_mem.stb && wb_if_mem.ack) begin
+      if(wb_if_mem.we) mem_write_count <= mem_write_count + 1;
+      else mem_read_count <= mem_read_count + 1;
+    end
+  end
+
   initial begin
     $readmemb(InitFile, mem);
     @(negedge clock);
@@ -108,6 +166,58 @@ module cache_tb ();
 
     $display("[%0t] SOT", $time);
 
+    // Substituição: o bloco escolhido por cada política (a aleatória não é verificada)
+    if(REPLACEMENT_POLICY != cache_pkg::Random) begin
+      hits = hit_count;
+      misses = miss_count;
+      write_backs = write_back_count;
+      for(int k = 0; k < SetSize; k++) access(1'b0, k*SetStride);
+      access(1'b0, 0);
+      access(1'b0, 3*SetStride);
+      access(1'b0, SetSize*SetStride);
+      for(int k = 0; k <= SetSize; k++) begin
+        if(k != Victim) begin
+          access(1'b0, k*SetStride);
+          CHK_NOT_EVICTED: assert(miss_count == misses + SetSize + 1);
+        end
+      end
+      access(1'b0, Victim*SetStride);
+      CHK_EVICTED: assert(miss_count == misses + SetSize + 2);
+      CHK_EVICTION_HITS: assert(hit_count == hits + SetSize + 2);
+      CHK_EVICTION_WRITE_BACKS: assert(write_back_count == write_backs);
+    end
+
+    // Cache não bloqueante: conjunto 2 cheio de blocos sujos e o bloco do endereço 48
+    // (conjunto 3) alocado
+    if(NON_BLOCKING) begin
+      for(int k = 0; k < SetSize; k++) access(1'b1, k*SetStride + 2*BlockBytes);
+      access(1'b0, 48);
+      reads = mem_read_count;
+      writes = mem_write_count;
+
+      // Store com miss: respondido antes do preenchimento, com o bloco sujo substituído
+      // (o primeiro do conjunto, exceto na política aleatória) no write buffer
+      access(1'b1, SetSize*SetStride + 2*BlockBytes);
+      CHK_STORE_MISS_ACK: assert(mem_read_count == reads);
+
+      // Hit-under-miss: acessos a outro conjunto são respondidos durante o preenchimento
+      access(1'b0, 48);
+      CHK_HIT_UNDER_MISS_LOAD: assert(mem_read_count == reads);
+      access(1'b1, 52);
+      CHK_HIT_UNDER_MISS_STORE: assert(mem_read_count == reads);
+
+      // Acesso ao conjunto do miss pendente: espera o fim do preenchimento
+      access(1'b0, SetStride + 2*BlockBytes);
+      CHK_MISS_INDEX_MATCH: assert(mem_read_count == reads + 1);
+
+      // Bloco substituído com o write buffer cheio: lido da memória depois do esvaziamento
+      if(REPLACEMENT_POLICY != cache_pkg::Random) begin
+        CHK_WRITE_BUFFER_FULL: assert(mem_write_count == writes);
+        access(1'b0, 2*BlockBytes);
+        CHK_WRITE_BUFFER_DRAIN: assert(mem_write_count == writes + 1);
+      end
+    end
+
     // Teste de leitura da Cache
     repeat(AmntOfTests) begin
       sel = gen_random_sel();
@@ -118,7 +228,7 @@ module cache_tb ();
         wr_data = $urandom;
         rd_en = $urandom;
         wr_en = ~rd_en;
-        @(negedge clock);
+        access_count++;
 
         if(wr_en) begin
           for(int i = 0; i < SelSize; i++) begin
@@ -127,13 +237,19 @@ module cache_tb ();
           end
         end
 
-        @(posedge ack);
-        @(negedge clock);
+        do @(negedge clock); while(!ack);
 
         expected_data = get_expected_data(aligned_data, sel, rd_signed);
 
         if(rd_en) begin
           CHK_READ: assert(rd_data === expected_data);
+        end else if(NON_BLOCKING) begin
+          // Stores com miss são respondidos antes da alocação do bloco: o dado é lido de volta
+          wr_en = 1'b0;
+          rd_en = 1'b1;
+          access_count++;
+          do @(negedge clock); while(!ack);
+          CHK_WRITE_READ: assert(rd_data === expected_data);
         end else begin
           @(negedge clock);
           CHK_WRITE: assert(rd_data === expected_data);
@@ -144,6 +260,11 @@ module cache_tb ();
         @(negedge clock);
       end
     end
+    $display("Policy %s: %0d hits, %0d misses, %0d write backs", REPLACEMENT_POLICY.name(),
+             hit_count, miss_count, write_back_count);
+    CHK_COUNTERS: assert(hit_count + miss_count == access_count);
+    if(PREFETCH)
+      $display("Prefetch: %0d useful, %0d useless", prefetch_useful_count, prefetch_useless_count);
     $display("[%0t] EOT", $time);
     $stop;
   end
@@ -0,0 +1,13 @@
+files = [
+    "cache_fifo_tb.sv",
+    "cache_non_blocking_tb.sv",
+    "cache_plru_tb.sv",
+    "cache_prefetch_tb.sv",
+    "cache_random_tb.sv"
+]
+
+modules = {
+    "local" : [
+        "../Cache"
+    ]
+}
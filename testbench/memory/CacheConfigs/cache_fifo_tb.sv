@@ -0,0 +1,8 @@
+// cache_tb with the FIFO replacement policy
+module cache_fifo_tb;
+
+  cache_tb #(
+      .REPLACEMENT_POLICY(cache_pkg::Fifo)
+  ) tb ();
+
+endmodule
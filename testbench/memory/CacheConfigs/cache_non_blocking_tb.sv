@@ -0,0 +1,8 @@
+// cache_tb with the write buffer and hit-under-miss for stores
+module cache_non_blocking_tb;
+
+  cache_tb #(
+      .NON_BLOCKING(1)
+  ) tb ();
+
+endmodule
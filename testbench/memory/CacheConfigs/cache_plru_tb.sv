@@ -0,0 +1,8 @@
+// cache_tb with the tree pseudo-LRU replacement policy
+module cache_plru_tb;
+
+  cache_tb #(
+      .REPLACEMENT_POLICY(cache_pkg::PseudoLru)
+  ) tb ();
+
+endmodule
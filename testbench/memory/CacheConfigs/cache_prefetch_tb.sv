@@ -0,0 +1,8 @@
+// cache_tb with the next-line prefetch
+module cache_prefetch_tb;
+
+  cache_tb #(
+      .PREFETCH(1)
+  ) tb ();
+
+endmodule
@@ -0,0 +1,8 @@
+// cache_tb with the random replacement policy
+module cache_random_tb;
+
+  cache_tb #(
+      .REPLACEMENT_POLICY(cache_pkg::Random)
+  ) tb ();
+
+endmodule
@@ -83,6 +83,8 @@ package memory_controller_pkg;
       wish_p.we = $urandom();
       wish_p.tgd = $urandom();
       wish_p.sel = $urandom();
+      wish_p.cti = $urandom();
+      wish_p.bte = $urandom();
       wish_p.addr = $urandom();
       wish_p.dat_o_p = $urandom();
     endfunction
@@ -103,6 +105,12 @@ package memory_controller_pkg;
       CHK_MEM_SEL :
       assert (wish_p.sel === wish_s.sel)
       else error_message(name_s, "sel");
+      CHK_MEM_CTI :
+      assert (wish_p.cti === wish_s.cti)
+      else error_message(name_s, "cti");
+      CHK_MEM_BTE :
+      assert (wish_p.bte === wish_s.bte)
+      else error_message(name_s, "bte");
       CHK_MEM_ADDR :
       assert (wish_p.addr === wish_s.addr)
       else error_message(name_s, "addr");
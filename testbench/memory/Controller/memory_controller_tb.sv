@@ -3,6 +3,7 @@ module memory_controller_tb;
 
   import macros_pkg::*;
   import memory_controller_pkg::*;
+  import wishbone_pkg::*;
 
   localparam integer ClockPeriod = 20;
   localparam integer BusyCycles = 10;
@@ -21,9 +22,24 @@ module memory_controller_tb;
   logic clock, reset;
 
   // Auxiliaries
-  logic sel_rom, sel_ram, sel_cache_inst, sel_cache_data, sel_uart, sel_csr;
+  logic sel_cache_inst, sel_cache_data, sel_uart, sel_csr;
+  logic [1:0] rom_request, ram_request, rom_grant, ram_grant;
+  logic rom_locked, rom_last, ram_locked, ram_last;
 
   // Functions
+  // Modelo do memory_arbiter: o secundário fica com o primário até o fim do ciclo ou do burst
+  function automatic logic [1:0] get_grant(input logic [1:0] request, input logic locked,
+                                           input logic last);
+    if (locked) return 2'b01 << last;
+    if (request[1] && (!request[0] || !last)) return 2'b10;
+    return {1'b0, request[0]};
+  endfunction
+
+  function automatic logic get_locked(input logic [1:0] request, input logic [1:0] grant,
+                                      input logic ack, input logic [2:0] cti);
+    if (!(|(grant & request))) return 1'b0;
+    return !ack || cti == IncrementingBurst;
+  endfunction
 
   // Interfaces
   wishbone_if #(
@@ -159,6 +175,31 @@ module memory_controller_tb;
   // Clock generation
   always #(ClockPeriod / 2) clock = ~clock;
 
+  // Arbiters
+  always_comb begin
+    rom_request[0] = ((wish_cache_inst1.addr & RomAddrMask) == RomAddr) &&
+                     wish_cache_inst1.cyc && wish_cache_inst1.stb;
+    rom_request[1] = ((wish_cache_data1.addr & RomAddrMask) == RomAddr) &&
+                     wish_cache_data1.cyc && wish_cache_data1.stb;
+    ram_request[0] = ((wish_cache_inst1.addr & RamAddrMask) == RamAddr) &&
+                     wish_cache_inst1.cyc && wish_cache_inst1.stb;
+    ram_request[1] = ((wish_cache_data1.addr & RamAddrMask) == RamAddr) &&
+                     wish_cache_data1.cyc && wish_cache_data1.stb;
+    rom_grant = get_grant(rom_request, rom_locked, rom_last);
+    ram_grant = get_grant(ram_request, ram_locked, ram_last);
+  end
+
+  always @(posedge clock, posedge reset) begin
+    if (reset) begin
+      {rom_locked, rom_last, ram_locked, ram_last} <= '0;
+    end else begin
+      rom_locked <= get_locked(rom_request, rom_grant, wish_rom.ack, wish_rom.cti);
+      ram_locked <= get_locked(ram_request, ram_grant, wish_ram.ack, wish_ram.cti);
+      if (|(rom_grant & rom_request)) rom_last <= rom_grant[1];
+      if (|(ram_grant & ram_request)) ram_last <= ram_grant[1];
+    end
+  end
+
   initial begin
     // Initializing
     clock       = 0;
@@ -196,25 +237,35 @@ module memory_controller_tb;
 
       @(negedge clock);
 
-      sel_rom = cache_data1.is_accessing(RomAddr, RomAddrMask);
-      sel_ram = cache_data1.is_accessing(RamAddr, RamAddrMask);
-      sel_cache_inst = proc0.is_accessing(RomAddr, RomAddrMask);
+      sel_cache_inst = proc0.is_accessing(RomAddr, RomAddrMask) |
+          proc0.is_accessing(RamAddr, RamAddrMask);
       sel_cache_data = proc1.is_accessing(RomAddr, RomAddrMask) |
           proc1.is_accessing(RamAddr, RamAddrMask);
       sel_uart = proc1.is_accessing(UartAddr, UartAddrMask);
       sel_csr = proc1.is_accessing(CsrAddr, CsrAddrMask);
 
-      if (sel_rom) begin
+      CHK_ROM_GRANT :
+      assert (DUT.rom_grant === rom_grant)
+      else $error("Error while testing the ROM arbiter");
+      CHK_RAM_GRANT :
+      assert (DUT.ram_grant === ram_grant)
+      else $error("Error while testing the RAM arbiter");
+
+      // Cada secundário é ligado ao primário que o árbitro escolheu
+      if (rom_grant[1] && rom_request[1]) begin
         cache_data1.check_mem(rom.get_interface(), rom.get_name());
         rom.check_cache(cache_data1.get_interface(), cache_data1.get_name());
-      end else begin
+      end else if (rom_grant[0] && rom_request[0]) begin
         cache_inst1.check_mem(rom.get_interface(), rom.get_name());
         rom.check_cache(cache_inst1.get_interface(), cache_inst1.get_name());
-      end
+      end else rom.check_disabled();
 
-      if (sel_ram) begin
+      if (ram_grant[1] && ram_request[1]) begin
         cache_data1.check_mem(ram.get_interface(), ram.get_name());
         ram.check_cache(cache_data1.get_interface(), cache_data1.get_name());
+      end else if (ram_grant[0] && ram_request[0]) begin
+        cache_inst1.check_mem(ram.get_interface(), ram.get_name());
+        ram.check_cache(cache_inst1.get_interface(), cache_inst1.get_name());
       end else ram.check_disabled();
 
       if (sel_cache_inst) begin
@@ -1,6 +1,7 @@
 modules = {
     "local" : [
         "Cache",
+        "CacheConfigs",
         "Controller",
         "RAM",
         "ROM",
@@ -31,6 +31,8 @@ module single_port_ram_tb;
     wb_if.tgd = 0;
     wb_if.sel = 0;
     wb_if.addr = 0;
+    wb_if.cti = wishbone_pkg::Classic;
+    wb_if.bte = wishbone_pkg::LinearBurst;
 
     // gerando valores aleatórios
     for (i = 0; i < AmountOfTests; i = i + 1) begin
@@ -46,7 +48,8 @@ module single_port_ram_tb;
       wb_if.cyc = 1'b1;
       wb_if.we  = 1'b1;
       wb_if.sel = 4'hF;
-      @(posedge clock);
+      // Desce o we só depois da borda da escrita, sem corrida com a RAM
+      @(negedge clock);
       wb_if.we = 1'b0;
       @(posedge wb_if.ack);
       @(negedge clock);
@@ -58,13 +61,14 @@ module single_port_ram_tb;
     end
 
     // testa leitura e escrita desalinhada
+    @(negedge clock);
     tb_data = 0;
     wb_if.addr = 4 * 3 + 2;
     wb_if.stb  = 1'b1;
     wb_if.cyc  = 1'b1;
     wb_if.we   = 1'b1;
     wb_if.sel  = 4'hF;
-    @(posedge clock);
+    @(negedge clock);
     wb_if.we  = 1'b0;
     wb_if.cyc = 1'b1;
     @(posedge wb_if.ack);
@@ -5,9 +5,10 @@ module rom_tb ();
 
   // sinais do DUT
   logic clock = 1'b0, reset = 1'b0;
-  wishbone_if #(.DATA_SIZE(32), .BYTE_SIZE(8), .ADDR_SIZE(6)) wb_if (.*);
+  // Memórias do tamanho dos MIFs (o Verilator aborta o $readmemb de arquivos maiores)
+  wishbone_if #(.DATA_SIZE(32), .BYTE_SIZE(8), .ADDR_SIZE(9)) wb_if (.*);
   // sinais intermediários
-  reg [31:0] memory[15:0];
+  reg [31:0] memory[127:0];
   reg [5:0] addr;
   int i;
 
@@ -32,6 +33,8 @@ module rom_tb ();
     wb_if.tgd = 0;
     wb_if.sel = 0;
     wb_if.addr = 0;
+    wb_if.cti = wishbone_pkg::Classic;
+    wb_if.bte = wishbone_pkg::LinearBurst;
     @(negedge clock);
     for (i = 0; i < 256; i = i + 1) begin
       wb_if.cyc = i % 2;
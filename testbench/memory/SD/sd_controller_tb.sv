@@ -5,17 +5,24 @@ module sd_controller_tb ();
   import sd_receiver_pkg::*;
   import sd_sender_pkg::*;
   import sd_controller_pkg::*;
+  import wishbone_pkg::*;
 
   // Parâmetros do testbench
   localparam integer AmntOfTests = 40;
   localparam integer Clock50MPeriod = 6;
   localparam integer Seed = 103;
   localparam integer SDSC = 1;
+  // sck de ~400 kHz na inicialização e de 25 MHz depois dela, com um clock de 50 MHz
+  localparam integer InitClockDiv = 128;
+  localparam integer ClockDiv = 2;
+  localparam integer BurstLength = 16;  // Blocos por medida de vazão
+  localparam integer ReadLatency = 2500;  // Nac do cartão: 100 us com o sck de 25 MHz
 
   // Sinais do DUT
   reg clock;
   reg reset;
   reg cyc, stb, wr;
+  reg [2:0] cti;
   reg [31:0] addr;
   wire [4095:0] read_data;
   reg [4095:0] write_data;
@@ -27,14 +34,18 @@ module sd_controller_tb ();
   wishbone_if #(.DATA_SIZE(4096), .BYTE_SIZE(8), .ADDR_SIZE(32)) wb_if (.*);
   // Sinais do modelo do cartão
   wire cmd_error;
+  reg inject_errors;
   // Sinais auxiliares
   reg generate_write_data;
   reg [1:0] teste;  // 00: Reset, 01: Init, 10: Read, 11: Write
+  integer cycles = 0;
 
   integer i;
 
   sd_controller #(
-      .SDSC(SDSC)
+      .SDSC(SDSC),
+      .INIT_CLOCK_DIV(InitClockDiv),
+      .CLOCK_DIV(ClockDiv)
   ) DUT (
       .wb_if_s(wb_if),
       .miso(miso),
@@ -61,13 +72,15 @@ module sd_controller_tb ();
   );
 
   sd_model #(
-      .SDSC(SDSC)
+      .SDSC(SDSC),
+      .READ_LATENCY(ReadLatency)
   ) sd_card (
       .cs(cs),
       .sck(sck),
       .mosi(mosi),
       .miso(miso),
       .expected_addr(addr),
+      .inject_errors(inject_errors),
       .cmd_error(cmd_error)
   );
 
@@ -76,12 +89,16 @@ module sd_controller_tb ();
   assign wb_if.stb = stb;
   assign wb_if.we = wr;
   assign wb_if.addr = addr;
+  assign wb_if.cti = cti;
+  assign wb_if.bte = LinearBurst;
   assign wb_if.dat_o_p = write_data;
   assign read_data = wb_if.dat_i_p;
   assign ack = wb_if.ack;
 
   always #(Clock50MPeriod / 2) clock = ~clock;
 
+  always @(posedge clock) cycles <= cycles + 1;
+
   task automatic CheckInitialization;
     begin
       teste = 2'b01;
@@ -106,10 +123,12 @@ module sd_controller_tb ();
         CHK_CMD_ERROR_READ: assert(cmd_error === 1'b0);
         // Confiro ack na borda de descida
         @(negedge clock);
-        // Enables não são mais relevantes
-        cyc = $urandom;
-        stb = $urandom;
-        wr  = $urandom;
+        // Enables não são mais relevantes depois que o controlador sai do Idle
+        if (DUT.state != sd_controller_pkg::Idle) begin
+          cyc = $urandom;
+          stb = $urandom;
+          wr  = $urandom;
+        end
       end
       cyc = 1'b0;
       stb = 1'b0;
@@ -138,10 +157,12 @@ module sd_controller_tb ();
         CHK_CMD_ERROR_WRITE: assert(cmd_error === 1'b0);
         // Confiro ack na borda de descida
         @(negedge clock);
-        // Enables não são mais relevantes
-        cyc = $urandom;
-        stb = $urandom;
-        wr  = $urandom;
+        // Enables não são mais relevantes depois que o controlador sai do Idle
+        if (DUT.state != sd_controller_pkg::Idle) begin
+          cyc = $urandom;
+          stb = $urandom;
+          wr  = $urandom;
+        end
       end
       cyc = 1'b1;
       stb = 1'b1;
@@ -153,9 +174,50 @@ module sd_controller_tb ();
     end
   endtask
 
+  // Transfere blocks blocos seguidos, com um ciclo clássico por bloco (CMD17/CMD24) ou com um
+  // burst (CMD18/CMD25), e mede a vazão sustentada até o controlador voltar ao Idle
+  task automatic CheckTransfer(input reg write, input reg multi_block, input integer blocks);
+    integer k, start;
+    real mbps;
+    begin
+      teste = {1'b1, write};
+      start = cycles;
+      cyc = 1'b1;
+      stb = 1'b1;
+      wr  = write;
+      for (k = 0; k < blocks; k = k + 1) begin
+        if (write) ->write_data_event;
+        if (!multi_block) cti = Classic;
+        else if (k == blocks - 1) cti = EndOfBurst;
+        else cti = IncrementingBurst;
+        @(negedge clock);
+        while (!ack) begin
+          @(posedge clock);
+          CHK_CMD_ERROR_TRANSFER: assert(cmd_error === 1'b0);
+          @(negedge clock);
+        end
+        if (write) CHK_WRITE_DATA_TRANSFER: assert(write_data === sd_card.received_data_block);
+        else CHK_READ_DATA_TRANSFER: assert(read_data === sd_card.data_block);
+        // Próximo beat (ou próximo ciclo clássico) logo após o ack
+        addr = addr + 1;
+      end
+      {cyc, stb, wr} = 3'b000;
+      cti = Classic;
+      wait (DUT.state == sd_controller_pkg::Idle);
+      CHK_CMD_ERROR_TRANSFER_END: assert(cmd_error === 1'b0);
+      mbps = 512.0 * blocks * 50.0 / (cycles - start);
+      $display("%s %0d blocks with %s: %0d cycles, %0.2f MB/s with a 50 MHz clock",
+               write ? "Wrote" : "Read", blocks,
+               multi_block ? (write ? "CMD25" : "CMD18") : (write ? "CMD24" : "CMD17"),
+               cycles - start, mbps);
+      @(negedge clock);
+    end
+  endtask
+
   // Initial para estimular o DUT
   initial begin
-    {clock, reset, cyc, stb, wr, addr, generate_write_data, teste} = 0;
+    {clock, reset, cyc, stb, wr, cti, addr, generate_write_data, teste} = 0;
+    inject_errors = 1'b1;
     // Reset inicial
     @(negedge clock);
     reset = 1'b1;
@@ -200,6 +262,18 @@ module sd_controller_tb ();
       @(negedge clock);
     end
 
+    // Vazão sustentada: blocos avulsos x bursts, sem erros aleatórios do cartão
+    {cyc, stb, wr} = 3'b000;
+    inject_errors = 1'b0;
+    repeat (2) @(negedge clock);
+    wait (DUT.state == sd_controller_pkg::Idle);
+    @(negedge clock);
+    $display("Clock divider: %0d, read latency: %0d bits", ClockDiv, ReadLatency);
+    CheckTransfer(1'b0, 1'b0, BurstLength);
+    CheckTransfer(1'b0, 1'b1, BurstLength);
+    CheckTransfer(1'b1, 1'b0, BurstLength);
+    CheckTransfer(1'b1, 1'b1, BurstLength);
+
     $display("EOT: [%0t]", $time);
     $stop;
   end
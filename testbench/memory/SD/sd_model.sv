@@ -1,11 +1,14 @@
 
 module sd_model #(
-    parameter integer SDSC = 0
+    parameter integer SDSC = 0,
+    // Bits de sck entre o R1 do CMD17/CMD18 e o start token do primeiro bloco (Nac)
+    parameter integer READ_LATENCY = 0
 ) (
     input wire sck,
     input wire cs,
     input wire mosi,
     input wire [31:0] expected_addr,
+    input wire inject_errors,
 
     output wire miso,
     output reg  cmd_error
@@ -51,8 +54,11 @@ module sd_model #(
     end
   endfunction
 
+  reg [47:0] ExpectedCmd12;
   reg [47:0] ExpectedCmd17;
+  reg [47:0] ExpectedCmd18;
   reg [47:0] ExpectedCmd24;
+  reg [47:0] ExpectedCmd25;
   reg [15:0] crc16_calc;
 
   sd_model_fsm_t state = sd_model_pkg::Idle, new_state = sd_model_pkg::Idle,
@@ -71,6 +77,8 @@ module sd_model #(
   reg receive_crc16;
   reg [15:0] received_crc16;
   reg change_crc;
+  reg multi_block = 1'b0;  // CMD18 ou CMD25 em andamento
+  reg [7:0] token;  // Últimos bits recebidos, para achar os tokens do CMD25
 
   reg miso_reg;
   wire [5:0] index = cmd[45:40];
@@ -100,11 +108,23 @@ module sd_model #(
 
   // Determinar Random Error Flag
   always_ff @(posedge sck) begin
-    if ((state == DecodeCmd && (index == 6'o21 || index == 6'o30)))
-      random_error_flag <= $urandom & $urandom;
+    if ((state == DecodeCmd && (index == 6'o21 || index == 6'o22 || index == 6'o30)))
+      random_error_flag <= inject_errors & $urandom & $urandom;
     else random_error_flag <= random_error_flag;
   end
 
+  // Comandos de vários blocos: encerrados pelo CMD12 ou pelo stop token
+  always_ff @(posedge sck) begin
+    if (state == DecodeCmd) multi_block <= index == 6'o22 || index == 6'o31;
+    else if (state == StopTran) multi_block <= 1'b0;
+    else multi_block <= multi_block;
+  end
+
+  always_ff @(posedge sck) begin
+    if (state == WaitToken) token <= {token[6:0], mosi};
+    else token <= 8'hFF;
+  end
+
   // Determinar Random Busy Cycles
   always_ff @(posedge sck) begin
     if (state == sd_model_pkg::CheckWrite) random_busy_cycles <= $urandom;
@@ -114,7 +134,8 @@ module sd_model #(
   // Determinar data block
   integer j;
   always_ff @(posedge sck) begin
-    if (state == ReturnCmd17 && bit_counter == 0 && random_error_flag == 1'b0) begin
+    if (((state == ReturnCmd17 || state == ReturnCmd18) && bit_counter == 0 &&
+         random_error_flag == 1'b0) || (state == ReadGap && bit_counter == 0 && mosi)) begin
       for (j = 0; j < 128; j = j + 1) begin
         data_block[32*j+:32] <= $urandom;
       end
@@ -151,6 +172,15 @@ module sd_model #(
     ExpectedCmd24[47:8] = {1'b0, 1'b1, 6'o30, expected_addr};
     ExpectedCmd24[7:1]  = CRC7(ExpectedCmd24[47:8]);
     ExpectedCmd24[0]    = 1'b1;
+    ExpectedCmd12[47:8] = {1'b0, 1'b1, 6'o14, 32'h0};
+    ExpectedCmd12[7:1]  = CRC7(ExpectedCmd12[47:8]);
+    ExpectedCmd12[0]    = 1'b1;
+    ExpectedCmd18[47:8] = {1'b0, 1'b1, 6'o22, expected_addr};
+    ExpectedCmd18[7:1]  = CRC7(ExpectedCmd18[47:8]);
+    ExpectedCmd18[0]    = 1'b1;
+    ExpectedCmd25[47:8] = {1'b0, 1'b1, 6'o31, expected_addr};
+    ExpectedCmd25[7:1]  = CRC7(ExpectedCmd25[47:8]);
+    ExpectedCmd25[0]    = 1'b1;
     receive_data_block  = 1'b0;
     receive_crc16       = 1'b0;
     crc16_calc          = 16'b0;
@@ -208,6 +238,18 @@ module sd_model #(
           new_bit_counter  = 13'd8;
           new_expected_cmd = ExpectedCmd24;
           new_return_state = ReturnCmd24;
+        end else if (index == 6'o14) begin
+          new_bit_counter  = 13'd8;
+          new_expected_cmd = ExpectedCmd12;
+          new_return_state = ReturnCmd12;
+        end else if (index == 6'o22) begin
+          new_bit_counter  = 13'd8;
+          new_expected_cmd = ExpectedCmd18;
+          new_return_state = ReturnCmd18;
+        end else if (index == 6'o31) begin
+          new_bit_counter  = 13'd8;
+          new_expected_cmd = ExpectedCmd25;
+          new_return_state = ReturnCmd25;
         end else new_state = CmdError;
       end
 
@@ -272,7 +314,7 @@ module sd_model #(
         end else new_state = sd_model_pkg::Idle;
       end
 
-      ReturnCmd17: begin
+      ReturnCmd17, ReturnCmd18: begin
         if (bit_counter) begin
           if (random_error_flag) begin
             miso_reg        = Cmd17ErrorResponse[bit_counter-1];
@@ -286,7 +328,7 @@ module sd_model #(
             new_bit_counter = 13'd8;
             new_state = SendErrorToken;
           end else begin
-            new_bit_counter = 13'd4120;
+            new_bit_counter = 13'd4120 + READ_LATENCY[12:0];
             new_state = SendDataBlock;
           end
         end
@@ -305,9 +347,58 @@ module sd_model #(
         end else if (bit_counter) begin
           miso_reg        = crc16[bit_counter-1];
           new_bit_counter = bit_counter - 6'o01;
+        end else if (multi_block) begin
+          new_bit_counter = 13'd16;
+          new_state = ReadGap;
         end else new_state = sd_model_pkg::Idle;
       end
 
+      // CMD18: envia o próximo bloco após 2 bytes, a não ser que chegue o CMD12
+      ReadGap: begin
+        if (~mosi) begin
+          new_state       = ReceivingCmd;
+          set_cmd         = 1'b1;
+          new_bit_counter = 13'd46;
+        end else if (bit_counter) begin
+          new_bit_counter = bit_counter - 6'o01;
+        end else begin
+          new_bit_counter = 13'd4120;
+          new_state = SendDataBlock;
+        end
+      end
+
+      ReturnCmd12: begin  // R1b
+        if (bit_counter) begin
+          miso_reg        = CmdInitializedResponse[bit_counter-1];
+          new_bit_counter = bit_counter - 6'o01;
+        end else begin
+          new_bit_counter = random_busy_cycles;
+          new_state = Busy;
+        end
+      end
+
+      ReturnCmd25: begin
+        if (bit_counter) begin
+          miso_reg        = CmdInitializedResponse[bit_counter-1];
+          new_bit_counter = bit_counter - 6'o01;
+        end else new_state = WaitToken;
+      end
+
+      // CMD25: 0xFC inicia um bloco e 0xFD encerra a escrita
+      WaitToken: begin
+        if ({token[6:0], mosi} == 8'hFC) begin
+          new_bit_counter = 13'd4112;
+          new_state = ReceiveDataBlock;
+        end else if ({token[6:0], mosi} == 8'hFD) begin
+          new_state = StopTran;
+        end
+      end
+
+      StopTran: begin  // Grava os blocos: busy logo após o stop token
+        new_bit_counter = random_busy_cycles + 13'd8;
+        new_state = Busy;
+      end
+
       SendErrorToken: begin
         if (bit_counter) begin
           miso_reg        = ErrorTokenResponse[bit_counter-1];
@@ -359,14 +450,14 @@ module sd_model #(
           miso_reg        = WriteErrorResponse[bit_counter-1];
           new_bit_counter = bit_counter - 6'o01;
         end else begin
-          new_state = sd_model_pkg::Idle;
+          new_state = multi_block ? WaitToken : sd_model_pkg::Idle;
         end
       end
 
       Busy: begin
         miso_reg = 1'b0;
         if (bit_counter) new_bit_counter = bit_counter - 1;
-        else new_state = sd_model_pkg::Idle;
+        else new_state = multi_block ? WaitToken : sd_model_pkg::Idle;
       end
 
       CmdError: begin
@@ -23,7 +23,13 @@ package sd_model_pkg;
     WriteError,
     WriteSuccessful,
     Busy,
-    CmdError
+    CmdError,
+    ReturnCmd12,
+    ReturnCmd18,
+    ReturnCmd25,
+    ReadGap,
+    WaitToken,
+    StopTran
   } sd_model_fsm_t;
 
   localparam reg [47:0] ExpectedCmd0 = {8'h40, 32'h00000000, 8'h95};
@@ -27,14 +27,14 @@ module uart_tb ();
   reg                           cyc_o;
   reg                           stb_o;
   reg                           wr_o;
-  reg   [                  2:0] addr;
+  reg   [                  3:0] addr;
   reg                           rxd;
   reg   [                 31:0] wr_data;
   wire                          txd;
   wire  [                 31:0] rd_data;
   wire                          ack_i;
   wire                          interrupt;
-  wishbone_if #(.DATA_SIZE(32), .BYTE_SIZE(8), .ADDR_SIZE(5)) wb_if (.*);
+  wishbone_if #(.DATA_SIZE(32), .BYTE_SIZE(8), .ADDR_SIZE(6)) wb_if (.*);
   ////
 
   // Sinais Auxiliares
@@ -95,6 +95,13 @@ module uart_tb ();
       .rxd      (rxd),       // dado serial
       .txd      (txd),       // dado de transmissão
       .interrupt(interrupt),
+      .dma_cyc(),
+      .dma_we(),
+      .dma_addr(),
+      .dma_sel(),
+      .dma_wr_data(),
+      .dma_ack(1'b0),
+      .dma_rd_data(32'b0),
       .div_db(),
       .rx_pending_db(),
       .tx_pending_db(),
@@ -126,6 +133,8 @@ module uart_tb ();
   assign wb_if.stb = stb_o;
   assign wb_if.we = wr_o;
   assign wb_if.addr = {addr, 2'b00};
+  assign wb_if.cti = wishbone_pkg::Classic;
+  assign wb_if.bte = wishbone_pkg::LinearBurst;
   assign wb_if.dat_o_p = wr_data;
   assign rd_data = wb_if.dat_i_p;
   assign ack_i = wb_if.ack;
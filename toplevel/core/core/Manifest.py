@@ -8,6 +8,7 @@ modules = {
     "local": [
         "../../../rtl/peripheral/UART",
         "../../../rtl/core/core",
+        "../../../rtl/memory/Controller",
         "../../../rtl/memory/RAM",
         "../../../rtl/memory/SD"
     ]
@@ -6,7 +6,16 @@ module csr_and_clint (
     // uart interface
     input  wire rxd,
     output wire txd,
-    output wire uart_interrupt
+    output wire uart_interrupt,
+
+    // uart DMA (memory accesses shared with the core's data port)
+    output wire        dma_cyc,
+    output wire        dma_we,
+    output wire [31:0] dma_addr,
+    output wire [ 3:0] dma_sel,
+    output wire [31:0] dma_wr_data,
+    input  wire        dma_ack,
+    input  wire [31:0] dma_rd_data
 );
 
   function automatic reg adr_i_is_base(input reg [31:0] base, input reg [31:0] addr);
@@ -60,7 +69,7 @@ module csr_and_clint (
 
   wire [31:0] _uart_wr_data;
   wire _uart_ack;
-  wishbone_if #(.DATA_SIZE(32), .ADDR_SIZE(5), .BYTE_SIZE(8)) wb_if_uart
+  wishbone_if #(.DATA_SIZE(32), .ADDR_SIZE(6), .BYTE_SIZE(8)) wb_if_uart
                (.clock(wb_if_s.clock), .reset(wb_if_s.reset));
 
   uart #(
@@ -71,7 +80,14 @@ module csr_and_clint (
       .wb_if_s(wb_if_uart),
       .rxd(rxd),
       .txd(txd),
-      .interrupt(uart_interrupt)
+      .interrupt(uart_interrupt),
+      .dma_cyc,
+      .dma_we,
+      .dma_addr,
+      .dma_sel,
+      .dma_wr_data,
+      .dma_ack,
+      .dma_rd_data
   );
   assign wb_if_uart.cyc = wb_if_s.cyc & adr_i_is_base(UartBase, wb_if_s.addr);
   assign wb_if_uart.stb = wb_if_s.stb & adr_i_is_base(UartBase, wb_if_s.addr);
@@ -79,6 +95,8 @@ module csr_and_clint (
   assign wb_if_uart.addr = wb_if_s.addr;
   assign wb_if_uart.tgd = wb_if_s.tgd;
   assign wb_if_uart.sel = wb_if_s.sel;
+  assign wb_if_uart.cti = wb_if_s.cti;
+  assign wb_if_uart.bte = wb_if_s.bte;
   assign wb_if_uart.dat_o_p = wb_if_s.dat_i_s;
   assign _uart_wr_data = wb_if_uart.dat_o_s;
   // uart block end
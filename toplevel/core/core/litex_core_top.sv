@@ -53,6 +53,13 @@ module litex_core_top (
   ) wish_proc0 (
       .*
   );
+  wishbone_if #(
+      .DATA_SIZE(DataSize),
+      .BYTE_SIZE(ByteSize),
+      .ADDR_SIZE(ProcAddrSize)
+  ) wish_core1 (
+      .*
+  );
   wishbone_if #(
       .DATA_SIZE(DataSize),
       .BYTE_SIZE(ByteSize),
@@ -104,6 +111,14 @@ module litex_core_top (
   ) wish_csr_ram (
       .*
   );
+  // UART DMA
+  wire dma_cyc;
+  wire dma_we;
+  wire [31:0] dma_addr;
+  wire [3:0] dma_sel;
+  wire [31:0] dma_wr_data;
+  wire dma_ack;
+  wire [31:0] dma_rd_data;
   // PLIC
   wire plic_cyc;
   wire [31:0] plic_dat;
@@ -115,11 +130,30 @@ module litex_core_top (
       .clock,
       .reset,
       .wish_proc0,
-      .wish_proc1,
+      .wish_proc1(wish_core1),
       .external_interrupt(external_interrupt),
       .msip(0),
       .mtime(64'h64),
-      .mtimecmp(64'h0)
+      .mtimecmp(64'h0),
+      .inst_cache_miss(1'b0),
+      .data_cache_miss(1'b0),
+      .data_cache_write_back(1'b0)
+  );
+
+  // The UART DMA shares the core's data port
+  dma_arbiter #(
+      .DATA_SIZE(DataSize),
+      .BYTE_SIZE(ByteSize)
+  ) proc1_arbiter (
+      .wish_s_proc(wish_core1),
+      .wish_p_mem(wish_proc1),
+      .dma_cyc,
+      .dma_we,
+      .dma_addr,
+      .dma_sel,
+      .dma_wr_data,
+      .dma_ack,
+      .dma_rd_data
   );
 
   sd_controller #(
@@ -224,7 +258,14 @@ module litex_core_top (
       .wb_if_s(wish_csr_clint),
       .rxd(rxd),
       .txd(txd),
-      .uart_interrupt(external_interrupt)
+      .uart_interrupt(external_interrupt),
+      .dma_cyc,
+      .dma_we,
+      .dma_addr,
+      .dma_sel,
+      .dma_wr_data,
+      .dma_ack,
+      .dma_rd_data
   );
 
   // PLIC
@@ -249,6 +290,8 @@ module litex_core_top (
   assign wish_rom.we = sel_rom ? wish_proc1.we : wish_proc0.we;
   assign wish_rom.sel = sel_rom ? wish_proc1.sel : wish_proc0.sel;
   assign wish_rom.tgd = wish_proc1.tgd;
+  assign wish_rom.cti = sel_rom ? wish_proc1.cti : wish_proc0.cti;
+  assign wish_rom.bte = sel_rom ? wish_proc1.bte : wish_proc0.bte;
   assign wish_rom.addr = sel_rom ? wish_proc1.addr : wish_proc0.addr;
   assign wish_rom.dat_o_p = sel_rom ? wish_proc1.dat_o_p : wish_proc0.dat_o_p;
   // SRAM
@@ -257,6 +300,8 @@ module litex_core_top (
   assign wish_sram.we = wish_sram.cyc & wish_proc1.we;
   assign wish_sram.sel = wish_proc1.sel;
   assign wish_sram.tgd = wish_proc1.tgd;
+  assign wish_sram.cti = wish_proc1.cti;
+  assign wish_sram.bte = wish_proc1.bte;
   assign wish_sram.addr = wish_proc1.addr;
   assign wish_sram.dat_o_p = wish_proc1.dat_o_p;
   // RAM
@@ -265,6 +310,8 @@ module litex_core_top (
   assign wish_ram.we = wish_ram.cyc & wish_proc1.we;
   assign wish_ram.sel = wish_proc1.sel;
   assign wish_ram.tgd = wish_proc1.tgd;
+  assign wish_ram.cti = wish_proc1.cti;
+  assign wish_ram.bte = wish_proc1.bte;
   assign wish_ram.addr = wish_proc1.addr[26:2];
   assign wish_ram.dat_o_p = wish_proc1.dat_o_p;
   // ETHMAC
@@ -277,6 +324,8 @@ module litex_core_top (
   assign wish_csr_clint.we = wish_csr_clint.cyc & wish_proc1.we;
   assign wish_csr_clint.sel = wish_proc1.sel;
   assign wish_csr_clint.tgd = wish_proc1.tgd;
+  assign wish_csr_clint.cti = wish_proc1.cti;
+  assign wish_csr_clint.bte = wish_proc1.bte;
   assign wish_csr_clint.addr = wish_proc1.addr;
   assign wish_csr_clint.dat_o_p = wish_proc1.dat_o_p;
   // CSR + RAM
@@ -285,6 +334,8 @@ module litex_core_top (
   assign wish_csr_ram.we = wish_csr_ram.cyc & wish_proc1.we;
   assign wish_csr_ram.sel = wish_proc1.sel;
   assign wish_csr_ram.tgd = wish_proc1.tgd;
+  assign wish_csr_ram.cti = wish_proc1.cti;
+  assign wish_csr_ram.bte = wish_proc1.bte;
   assign wish_csr_ram.addr = wish_proc1.addr[31:2];
   assign wish_csr_ram.dat_o_p = wish_proc1.dat_o_p;
   // PLIC
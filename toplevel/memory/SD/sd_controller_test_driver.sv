@@ -43,6 +43,9 @@ module sd_controller_test_driver (
     end
   end
 
+  assign wb_if_p.cti = wishbone_pkg::Classic;
+  assign wb_if_p.bte = wishbone_pkg::LinearBurst;
+
   always_comb begin
     wb_if_p.cyc            = 1'b0;
     wb_if_p.stb            = 1'b0;
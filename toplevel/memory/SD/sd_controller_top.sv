@@ -55,7 +55,11 @@ module sd_controller_top (
       .test_driver_state_return(tester_state_return)
   );
 
-  sd_controller DUT (
+  // sck de 400 kHz na inicialização e de 25 MHz depois dela
+  sd_controller #(
+      .INIT_CLOCK_DIV(250),
+      .CLOCK_DIV(4)
+  ) DUT (
       .wb_if_s(wb_if),
       .miso(miso),
       .cs(cs),
@@ -117,7 +121,7 @@ module sd_controller_top (
           5'b11100: led = read_data[4063:4048];
           5'b11101: led = read_data[4079:4064];
           5'b11110: led = read_data[4095:4080];
-          5'b11111: led = {6'b0, reset, crc_error, 3'b000, sd_controller_state_db};
+          5'b11111: led = {6'b0, reset, crc_error, 2'b00, sd_controller_state_db};
           default:  led = 0;
         endcase
       end
@@ -157,7 +161,7 @@ module sd_controller_top (
           5'b11100: led = read_data[4075:4066];
           5'b11101: led = read_data[4085:4076];
           5'b11110: led = read_data[4095:4086];
-          5'b11111: led = {2'b00, sd_sender_state_db, sd_receiver_state_db, sd_controller_state_db};
+          5'b11111: led = {1'b0, sd_sender_state_db, sd_receiver_state_db, sd_controller_state_db};
           default:  led = 0;
         endcase
       end
@@ -19,7 +19,7 @@ module uart_top (
   localparam reg Nstop = 1'b0;  // Numero de stop bits
 
   // Sinais para controlar o DUT
-  wishbone_if #(.DATA_SIZE(32), .BYTE_SIZE(8), .ADDR_SIZE(5)) wb_if (.*);
+  wishbone_if #(.DATA_SIZE(32), .BYTE_SIZE(8), .ADDR_SIZE(6)) wb_if (.*);
   reg                          rd_en;
   reg                          wr_en;
   reg  [                  2:0] addr;
@@ -43,7 +43,7 @@ module uart_top (
   wire                         tx_fifo_full_db;
   wire [                  7:0] txdata_db;
   wire [                  2:0] present_state_db;
-  wire [                  2:0] addr_db;
+  wire [                  3:0] addr_db;
   wire [                 31:0] wr_data_db;
   wire                         rx_data_valid_db;
   wire                         tx_data_valid_db;
@@ -65,6 +65,13 @@ module uart_top (
       .rxd                (rxd),
       .txd                (txd),
       .interrupt          (interrupt),
+      .dma_cyc            (),
+      .dma_we             (),
+      .dma_addr           (),
+      .dma_sel            (),
+      .dma_wr_data        (),
+      .dma_ack            (1'b0),
+      .dma_rd_data        (32'b0),
       .div_db             (div_db),
       .rx_pending_db      (rx_pending_db),
       .tx_pending_db      (tx_pending_db),
@@ -92,6 +99,8 @@ module uart_top (
   );
 
   // Wishbone
+  assign wb_if.cti = wishbone_pkg::Classic;
+  assign wb_if.bte = wishbone_pkg::LinearBurst;
   always_comb begin
     wb_if.cyc = 1'b0;
     wb_if.stb = 1'b0;
@@ -219,7 +228,7 @@ module uart_top (
             2'b00,
             rx_status_db,
             tx_status_db,
-            addr_db,
+            addr_db[2:0],
             rx_data_valid_db,
             tx_data_valid_db,
             tx_rdy_db,
@@ -242,7 +251,7 @@ module uart_top (
           3: leds = {1'b0, txcnt_db, txen_db, nstop_db, rx_fifo_empty_db, tx_fifo_full_db};
           4: leds = {1'b0, rx_status_db, rxdata_db};
           5: leds = {1'b0, tx_status_db, txdata_db};
-          6: leds = {1'b0, present_state_db, addr_db, rx_data_valid_db,
+          6: leds = {1'b0, present_state_db, addr_db[2:0], rx_data_valid_db,
                      tx_data_valid_db, tx_rdy_db};
           7: leds = {2'b00, rx_watermark_reg_db, tx_watermark_reg_db};
           8: leds = {2'b00, wr_data_db[7:0]};
@@ -2,6 +2,7 @@ files = [
     "macros_pkg.sv",
     "instruction_pkg.sv",
     "extensions_pkg.sv",
+    "wishbone_pkg.sv",
     "wishbone_if.sv",
     "board_pkg.sv",
 ]
@@ -12,11 +12,16 @@ interface wishbone_if #(
   logic [ADDR_SIZE-1:0] addr;
   logic [DATA_SIZE/BYTE_SIZE-1:0] sel;
   logic [DATA_SIZE-1:0] dat_i_p, dat_o_p, dat_i_s, dat_o_s;
-
-  modport primary(input clock, reset, ack, dat_i_p, output addr, cyc, stb, we, sel, tgd, dat_o_p,
-                  import rd_en, wr_en);
-  modport secondary(input clock, reset, addr, cyc, stb, we, tgd, sel, dat_i_s, output ack, dat_o_s,
-                  import rd_en, wr_en);
+  // Bursts (wishbone_pkg::cycle_type_t e burst_type_t); secundários sem suporte a bursts os
+  // ignoram, mas todo primário deve dirigi-los: primários sem bursts usam Classic e
+  // LinearBurst, pois cti/bte desconectados ficam em X e não valem como ciclo clássico
+  logic [2:0] cti;
+  logic [1:0] bte;
+
+  modport primary(input clock, reset, ack, dat_i_p, output addr, cyc, stb, we, sel, tgd, cti, bte,
+                  dat_o_p, import rd_en, wr_en);
+  modport secondary(input clock, reset, addr, cyc, stb, we, tgd, sel, cti, bte, dat_i_s,
+                  output ack, dat_o_s, import rd_en, wr_en);
 
   assign dat_i_p = dat_o_s;
   assign dat_i_s = dat_o_p;
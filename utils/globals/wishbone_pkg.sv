@@ -0,0 +1,19 @@
+package wishbone_pkg;
+
+  // Cycle Type Identifier (cti): ciclos de burst com registered feedback (Wishbone B4)
+  typedef enum logic [2:0] {
+    Classic = 3'b000,
+    ConstantBurst = 3'b001,
+    IncrementingBurst = 3'b010,  // O próximo beat usa o endereço seguinte
+    EndOfBurst = 3'b111  // Último beat do burst
+  } cycle_type_t;
+
+  // Burst Type Extension (bte) dos bursts incrementais
+  typedef enum logic [1:0] {
+    LinearBurst = 2'b00,
+    Wrap4Burst = 2'b01,
+    Wrap8Burst = 2'b10,
+    Wrap16Burst = 2'b11
+  } burst_type_t;
+
+endpackage